@@ -0,0 +1,169 @@
+"""
+Approximate Nearest Neighbour Index
+- IVF-PQ: k-means 조대 양자화(coarse quantizer) + 잔차(residual) 곱 양자화(product quantization)
+- 외부 서비스 / 추가 패키지 없이 NumPy만으로 프로세스 내에서 동작
+- 내적(코사인) 기준: 입력 벡터는 정규화해서 저장
+- 검색 결과는 후보 행(row) 번호 목록이며, 최종 점수는 호출 측(SearchEngine)이 원본 벡터로 재계산
+- 작은 코퍼스는 ANN_MIN_ROWS 미만이면 정확 검색(exact) 경로를 그대로 사용
+- 학습(k-means)은 SearchEngine.build_ann_index가 백그라운드 스레드에서 수행, 준비 전까지는 정확 검색
+"""
+
+import os
+from typing import List, Optional
+
+import numpy as np  # type: ignore
+
+ANN_BACKEND = os.environ.get("ANN_BACKEND", "ivfpq")            # ivfpq | exact
+ANN_MIN_ROWS = int(os.environ.get("ANN_MIN_ROWS", 5000))         # 이보다 작은 코퍼스는 정확 검색
+ANN_CANDIDATES = int(os.environ.get("ANN_CANDIDATES", 2000))     # ANN이 돌려줄 후보 행 수
+ANN_NPROBE = int(os.environ.get("ANN_NPROBE", 16))               # 탐색할 IVF 리스트 수
+
+ASSIGN_BATCH = 8192
+
+
+def _normalize(vectors) -> np.ndarray:
+    x = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def _nearest(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """L2 최근접 중심 (배치 단위로 메모리 제한)"""
+    c_sq = (centroids ** 2).sum(axis=1)
+    out = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), ASSIGN_BATCH):
+        block = x[start:start + ASSIGN_BATCH]
+        out[start:start + ASSIGN_BATCH] = np.argmin(c_sq[None, :] - 2.0 * block @ centroids.T, axis=1)
+    return out
+
+
+def _kmeans(x: np.ndarray, k: int, iters: int, rng: np.random.RandomState) -> np.ndarray:
+    k = min(k, len(x))
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(iters):
+        assign = _nearest(x, centroids)
+        counts = np.bincount(assign, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # 빈 클러스터는 임의의 점으로 재초기화
+        if empty.any():
+            centroids[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+    return centroids
+
+
+def top_n(scores: np.ndarray, n: int) -> np.ndarray:
+    """점수 상위 n개 인덱스 (내림차순)"""
+    if n >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    idx = np.argpartition(-scores, n - 1)[:n]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def exact_search(vectors, query, n: int) -> np.ndarray:
+    """브루트포스 코사인 검색 (기준선 / 벤치마크용)"""
+    return top_n(_normalize(vectors) @ _normalize([query])[0], n)
+
+
+class IVFPQIndex:
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        n_subvectors: Optional[int] = None,
+        nprobe: int = ANN_NPROBE,
+        train_size: int = 20000,
+        iters: int = 10,
+        seed: int = 0,
+    ):
+        self.n_lists = n_lists
+        self.n_subvectors = n_subvectors
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.iters = iters
+        self.seed = seed
+        self.ntotal = 0
+        self.centroids = None
+        self.codebooks = None   # (m, 256, dsub)
+        self._list_ids: List[np.ndarray] = []
+        self._list_codes: List[np.ndarray] = []
+
+    @staticmethod
+    def _default_subvectors(dim: int) -> int:
+        # 서브벡터당 16차원 근처, dim의 약수 (1536 → 96)
+        for dsub in (16, 8, 12, 24, 32, 4, 2, 1):
+            if dim % dsub == 0:
+                return dim // dsub
+        return dim
+
+    def build(self, vectors):
+        x = _normalize(vectors)
+        n, dim = x.shape
+        rng = np.random.RandomState(self.seed)
+        n_lists = self.n_lists or int(np.clip(4 * np.sqrt(n), 1, 4096))
+        m = self.n_subvectors or self._default_subvectors(dim)
+        if dim % m != 0:
+            raise ValueError(f"dim {dim} is not divisible by n_subvectors {m}")
+
+        sample = x[rng.choice(n, min(n, self.train_size), replace=False)]
+        self.centroids = _kmeans(sample, n_lists, self.iters, rng)
+
+        residuals = (sample - self.centroids[_nearest(sample, self.centroids)]).reshape(len(sample), m, dim // m)
+        self.codebooks = np.stack([
+            _kmeans(np.ascontiguousarray(residuals[:, j, :]), 256, self.iters, rng) for j in range(m)
+        ])
+
+        self.ntotal = 0
+        self._list_ids = [np.zeros(0, dtype=np.int64) for _ in range(len(self.centroids))]
+        self._list_codes = [np.zeros((0, m), dtype=np.uint8) for _ in range(len(self.centroids))]
+        self.add(x)
+        return self
+
+    def _encode(self, residuals: np.ndarray) -> np.ndarray:
+        m, _, dsub = self.codebooks.shape
+        parts = residuals.reshape(len(residuals), m, dsub)
+        return np.stack([_nearest(parts[:, j, :], self.codebooks[j]) for j in range(m)], axis=1).astype(np.uint8)
+
+    def add(self, vectors):
+        """학습된 중심 / 코드북으로 새 행을 추가 (재학습 없음). 행 번호는 ntotal부터 이어짐."""
+        x = _normalize(vectors)
+        assign = _nearest(x, self.centroids)
+        codes = self._encode(x - self.centroids[assign])
+        ids = np.arange(self.ntotal, self.ntotal + len(x), dtype=np.int64)
+        for lst in np.unique(assign):
+            sel = assign == lst
+            self._list_ids[lst] = np.concatenate([self._list_ids[lst], ids[sel]])
+            self._list_codes[lst] = np.concatenate([self._list_codes[lst], codes[sel]])
+        self.ntotal += len(x)
+
+    def search(self, query, n: int) -> np.ndarray:
+        """근사 내적 상위 n개 행 번호 (내림차순)"""
+        q = _normalize([query])[0]
+        coarse = self.centroids @ q
+        probe = top_n(coarse, min(self.nprobe, len(coarse)))
+
+        m, ksub, dsub = self.codebooks.shape
+        # 내적은 선형이므로 q·(c + r) = q·c + Σ_j q_j·r_j, 서브공간별 조회표는 리스트와 무관
+        table = np.einsum("jkd,jd->jk", self.codebooks, q.reshape(m, dsub))
+
+        ids, scores = [], []
+        for lst in probe:
+            codes = self._list_codes[lst]
+            if not len(codes):
+                continue
+            ids.append(self._list_ids[lst])
+            scores.append(coarse[lst] + table[np.arange(m), codes].sum(axis=1))
+        if not ids:
+            return np.zeros(0, dtype=np.int64)
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        return ids[top_n(scores, n)]
+
+
+def create_ann_index(backend: str = ANN_BACKEND):
+    """ANN_BACKEND에 맞는 인덱스 생성. exact면 None (SearchEngine이 브루트포스 경로 사용)"""
+    if backend == "ivfpq":
+        return IVFPQIndex()
+    if backend != "exact":
+        print(f"⚠️ 알 수 없는 ANN_BACKEND '{backend}', 정확 검색 사용")
+    return None
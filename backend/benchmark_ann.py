@@ -0,0 +1,75 @@
+"""
+ANN 벤치마크: IVF-PQ vs 브루트포스 코사인 (recall@k / 쿼리 지연)
+
+사용법:
+    python benchmark_ann.py                       # 합성 코퍼스 (군집 구조), 기본 50k x 1536
+    python benchmark_ann.py --rows 200000 --dim 256
+    python benchmark_ann.py --store embeddings_store   # 실제 임베딩 저장소 사용
+
+recall@k: 정확 검색 상위 k 행 중 ANN 후보(--candidates)에 포함된 비율.
+SearchEngine은 후보 행의 변호사들에 대해 원본 벡터로 점수를 다시 계산하므로 이 값이 최종 정확도를 결정한다.
+"""
+
+import argparse
+import time
+
+import numpy as np  # type: ignore
+
+from ann_index import IVFPQIndex, ANN_CANDIDATES, _normalize, top_n
+
+
+def synthetic_corpus(rows: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.RandomState(seed)
+    centers = rng.standard_normal((clusters, dim))
+    return (centers[rng.randint(0, clusters, rows)] + 0.6 * rng.standard_normal((rows, dim))).astype(np.float32)
+
+
+def load_store(directory: str) -> np.ndarray:
+    from embedding_store import EmbeddingStore  # type: ignore
+    vectors, _, meta = EmbeddingStore(directory).load()
+    print(f"Loaded {meta['count']} x {meta['dim']} vectors from {directory}")
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--store", help="embedding store directory (overrides --rows/--dim)")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--candidates", type=int, default=ANN_CANDIDATES)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    corpus = load_store(args.store) if args.store else synthetic_corpus(args.rows, args.dim, args.clusters)
+    rng = np.random.RandomState(1)
+    queries = corpus[rng.choice(len(corpus), args.queries)] + 0.3 * rng.standard_normal((args.queries, corpus.shape[1])).astype(np.float32)
+
+    # Brute force baseline (same work as cosine_similarity on a pre-normalized corpus)
+    normalized = _normalize(corpus)
+    start = time.perf_counter()
+    truth = [top_n(normalized @ _normalize([q])[0], args.k) for q in queries]
+    exact_ms = (time.perf_counter() - start) / len(queries) * 1000
+    print(f"corpus {corpus.shape[0]} x {corpus.shape[1]}, k={args.k}, candidates={args.candidates}")
+    print(f"{'exact':>12}  recall 1.000  {exact_ms:8.2f} ms/query")
+
+    start = time.perf_counter()
+    index = IVFPQIndex().build(corpus)
+    print(f"IVF-PQ build: {time.perf_counter() - start:.1f}s ({len(index.centroids)} lists, {index.codebooks.shape[0]} subvectors)")
+
+    for nprobe in args.nprobe:
+        index.nprobe = nprobe
+        hits = 0
+        start = time.perf_counter()
+        results = [index.search(q, args.candidates) for q in queries]
+        ann_ms = (time.perf_counter() - start) / len(queries) * 1000
+        for found, expected in zip(results, truth):
+            hits += len(set(found.tolist()) & set(expected.tolist()))
+        recall = hits / (len(queries) * args.k)
+        print(f"{'nprobe=' + str(nprobe):>12}  recall {recall:.3f}  {ann_ms:8.2f} ms/query  ({exact_ms / ann_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -155,9 +155,9 @@ async def toss_charge_billing(billing_key: str, amount: int, order_id: str, cust
 @router.post("/issue-key")
 async def issue_billing_key(req: BillingKeyRequest):
     """빌링키 발급 (카드 등록)"""
-    from data import LAWYERS_DB, save_lawyers_db
+    from data import LAWYERS_DB, LAWYERS, save_lawyers_db
 
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == req.lawyer_id), None)
+    lawyer = LAWYERS.get(req.lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다")
 
@@ -170,7 +170,7 @@ async def issue_billing_key(req: BillingKeyRequest):
         billing_key = result.get("billingKey")
 
     lawyer["billing_key"] = billing_key
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
 
     return {"message": "카드가 성공적으로 등록되었습니다", "billing_key_registered": True}
 
@@ -178,9 +178,9 @@ async def issue_billing_key(req: BillingKeyRequest):
 @router.post("/charge")
 async def charge_subscription(req: ChargeRequest):
     """수동 결제 실행"""
-    from data import LAWYERS_DB, save_lawyers_db
+    from data import LAWYERS_DB, LAWYERS, save_lawyers_db
 
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == req.lawyer_id), None)
+    lawyer = LAWYERS.get(req.lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다")
 
@@ -207,7 +207,7 @@ async def charge_subscription(req: ChargeRequest):
     # 결제 성공 → 구독 상태 갱신
     lawyer["is_subscribed"] = True
     lawyer["trial_ends_at"] = None  # 체험 종료, 정식 결제
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
 
     discount_text = " (파운딩 멤버 50% 할인 적용)" if lawyer.get("is_founder") else ""
     return {
@@ -220,9 +220,9 @@ async def charge_subscription(req: ChargeRequest):
 @router.get("/status/{lawyer_id}")
 async def get_subscription_status(lawyer_id: str):
     """구독 상태 조회"""
-    from data import LAWYERS_DB
+    from data import LAWYERS
 
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다")
 
@@ -285,9 +285,9 @@ class ActivateRequest(BaseModel):
 @router.post("/activate-founder")
 async def activate_founder(req: ActivateRequest):
     """기존 가입 변호사의 파운딩 멤버 구독 활성화"""
-    from data import LAWYERS_DB, save_lawyers_db
+    from data import LAWYERS_DB, LAWYERS, save_lawyers_db
 
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == req.lawyer_id), None)
+    lawyer = LAWYERS.get(req.lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다")
 
@@ -309,7 +309,7 @@ async def activate_founder(req: ActivateRequest):
         raise HTTPException(status_code=400, detail="파운딩 멤버 모집이 마감되었습니다")
 
     set_founder_benefits(lawyer)
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
 
     return {
         "message": "🚀 파운딩 멤버로 활성화되었습니다! 3개월 무료 체험 + 평생 50% 할인",
@@ -321,9 +321,9 @@ async def activate_founder(req: ActivateRequest):
 @router.post("/activate-standard")
 async def activate_standard(req: ActivateRequest):
     """기존 가입 변호사의 스탠다드 구독 활성화"""
-    from data import LAWYERS_DB, save_lawyers_db
+    from data import LAWYERS_DB, LAWYERS, save_lawyers_db
 
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == req.lawyer_id), None)
+    lawyer = LAWYERS.get(req.lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다")
 
@@ -331,7 +331,7 @@ async def activate_standard(req: ActivateRequest):
         return {"message": "이미 구독이 활성화되어 있습니다", "already_active": True}
 
     set_standard_trial(lawyer)
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
 
     return {
         "message": "스탠다드 구독이 활성화되었습니다! 14일 무료 체험",
@@ -5,6 +5,7 @@ import re
 from datetime import datetime
 from typing import List, Dict, Optional
 from pydantic import BaseModel
+from text_index import TextIndex  # type: ignore
 
 CASES_FILE = "cases.json"
 
@@ -46,7 +47,11 @@ class CaseManager:
     def __init__(self):
         self.cases: Dict[str, Case] = {}
         self.deid_cases: Dict[str, DeidCase] = {}
+        # 공개 사례만 색인 (제목 > 태그 > 요약 가중치), 승인 / 비공개 전환 시 증분 갱신
+        self.archive_index = TextIndex({"title": 3.0, "tags": 2.0, "summary": 1.0, "outcome_reason": 1.0})
         self.load_data()
+        for deid in self.deid_cases.values():
+            self._index_case(deid)
 
     def load_data(self):
         if os.path.exists(CASES_FILE):
@@ -187,26 +192,21 @@ class CaseManager:
                 })
         return sorted(results, key=lambda x: x["original"]["submitted_at"], reverse=True)
 
+    def _index_case(self, deid: DeidCase):
+        if deid.is_public:
+            self.archive_index.add(deid.id, deid.dict())
+        else:
+            self.archive_index.remove(deid.id)
+
     def get_archive_cases(self, query: str = None, field: str = None):
-        results = []
-        for deid in self.deid_cases.values():
-            if not deid.is_public:
-                continue
-            
-            # Filter Logic
-            if field and deid.field != field:
-                continue
-            
-            if query:
-                q = query.lower()
-                if (q not in deid.title.lower() and 
-                    q not in deid.summary.lower() and 
-                    q not in " ".join(deid.tags).lower()):
-                    continue
-            
-            results.append(deid.dict())
-        
-        return sorted(results, key=lambda x: x["view_count"], reverse=True)
+        # 검색어가 있으면 역색인 BM25 순, 없으면 조회수 순
+        if query and query.strip():
+            hits = self.archive_index.search(query)
+            cases = [self.deid_cases[case_id] for case_id, _ in hits]
+        else:
+            cases = sorted((d for d in self.deid_cases.values() if d.is_public),
+                           key=lambda d: d.view_count, reverse=True)
+        return [deid.dict() for deid in cases if not field or deid.field == field]
 
     def submit_case(self, lawyer_id: str, data: Dict):
         c_id = str(uuid.uuid4())
@@ -254,6 +254,7 @@ class CaseManager:
                     deid.approved_at = datetime.now().isoformat()
                 else:
                     deid.is_public = False
+                self._index_case(deid)
             
             self.save_data()
             return True
@@ -1,64 +1,132 @@
 import json
 import os
 import time
-from typing import List, Dict
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import List, Dict, Optional, Tuple
 from fastapi import WebSocket
 from datetime import datetime
 import uuid
 
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CHAT_DB_FILE = os.path.join(BASE_DIR, "chats.json")
-
-class PresenceManager:
-    def __init__(self):
-        self.last_active: Dict[str, float] = {} # lawyer_id -> timestamp
-        self.OFFLINE_THRESHOLD = 1800 # 30 mins
-        self.AWAY_THRESHOLD = 300 # 5 mins
+try:
+    from backend.chat_log import ChatMessageLog  # type: ignore
+    from backend.chat_hub import ConnectionHub  # type: ignore
+    from backend.chat_broker import ChatBroker, create_broker  # type: ignore
+    from backend.presence import PresenceManager  # type: ignore
+except ImportError:
+    from chat_log import ChatMessageLog  # type: ignore
+    from chat_hub import ConnectionHub  # type: ignore
+    from chat_broker import ChatBroker, create_broker  # type: ignore
+    from presence import PresenceManager  # type: ignore
 
-    def update_heartbeat(self, lawyer_id: str):
-        self.last_active[lawyer_id] = time.time()
-
-    def get_status(self, lawyer_id: str) -> str:
-        last = self.last_active.get(lawyer_id)
-        if not last:
-            return "offline"
-        
-        diff = time.time() - last
-        if diff < self.AWAY_THRESHOLD:
-            return "online"
-        elif diff < self.OFFLINE_THRESHOLD:
-            return "away"
-        else:
-            return "offline"
-
-    def is_online(self, lawyer_id: str) -> bool:
-        return self.get_status(lawyer_id) == "online"
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHAT_DB_FILE = os.path.join(BASE_DIR, "chats.json")  # 레거시 (최초 로드 시 로그로 마이그레이션)
+CHAT_LOG_DIR = os.environ.get("CHAT_LOG_DIR", os.path.join(BASE_DIR, "chat_log"))
 
 presence_manager = PresenceManager()
 
+CHAT_ROLES = ("user", "lawyer")
+CHAT_PAGE_SIZE = 50
+CHAT_PAGE_MAX = 200
+PRESENCE_SYNC_BATCH = 500 # lawyers per presence_state message (fits one broker datagram)
+
 class Message:
-    def __init__(self, sender: str, content: str, timestamp: str = None):
+    def __init__(self, sender: str, content: str, timestamp: str = None, id: str = None):
+        self.id = id or uuid.uuid4().hex[:16]
         self.sender = sender # "user" or "lawyer"
         self.content = content
         self.timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     def to_dict(self):
         return {
+            "id": self.id,
             "sender": self.sender,
             "content": self.content,
             "timestamp": self.timestamp
         }
 
 class ChatSession:
-    def __init__(self, lawyer_id: str, client_id: str, messages: List[Dict] = None):
+    def __init__(self, lawyer_id: str, client_id: str, messages: List[Dict] = None, read: Dict[str, int] = None):
         self.lawyer_id = lawyer_id
         self.client_id = client_id
         self.messages = messages or []
         self.last_updated = self.messages[-1]["timestamp"] if self.messages else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._positions: Dict[str, int] = {} # message id -> index
+        for i, msg in enumerate(self.messages):
+            # Messages stored before ids existed get a position-based id (same in every process)
+            self._positions[msg.setdefault("id", f"legacy-{i}")] = i
+        # role -> number of messages that role has seen (sending a message marks everything before it read)
+        self.read: Dict[str, int] = dict(read or {})
+        for role in CHAT_ROLES:
+            if role not in self.read:
+                last_sent = max((i for i, msg in enumerate(self.messages) if msg.get("sender") == role), default=-1)
+                self.read[role] = last_sent + 1
 
     def add_message(self, message: Message):
-        self.messages.append(message.to_dict())
-        self.last_updated = message.timestamp
+        self.append_dict(message.to_dict())
+
+    def append_dict(self, message: Dict):
+        message.setdefault("id", f"legacy-{len(self.messages)}")
+        self._positions[message["id"]] = len(self.messages)
+        self.messages.append(message)
+        self.last_updated = message["timestamp"]
+        if message.get("sender") in CHAT_ROLES:
+            self.read[message["sender"]] = len(self.messages)
+
+    def mark_read(self, role: str, upto: Optional[int] = None) -> int:
+        upto = len(self.messages) if upto is None else min(upto, len(self.messages))
+        self.read[role] = max(self.read.get(role, 0), upto)
+        return self.read[role]
+
+    def unread_count(self, role: str) -> int:
+        # Everything after the read marker was sent by the other party
+        return len(self.messages) - self.read.get(role, 0)
+
+    def page(self, limit: int = CHAT_PAGE_SIZE, before: str = None, after: str = None,
+             before_ts: str = None, after_ts: str = None) -> Dict:
+        """
+        Cursor page of messages in chronological order.
+        Default / before: the `limit` messages just before the cursor (newest page first).
+        after: the `limit` messages just after the cursor (catching up on new messages).
+        Timestamps are non-decreasing in append order, so *_ts cursors are a binary search.
+        Returns None for an unknown message id cursor.
+        """
+        limit = max(1, min(limit, CHAT_PAGE_MAX))
+        if (before is not None and before not in self._positions) or (after is not None and after not in self._positions):
+            return None # unknown cursor
+        if after is not None or after_ts is not None:
+            if after is not None:
+                start = self._positions[after] + 1
+            else:
+                start = bisect_right(self.messages, after_ts, key=lambda m: m["timestamp"])
+            end = min(start + limit, len(self.messages))
+            has_more = end < len(self.messages)
+        else:
+            if before is not None:
+                end = self._positions[before]
+            elif before_ts is not None:
+                end = bisect_left(self.messages, before_ts, key=lambda m: m["timestamp"])
+            else:
+                end = len(self.messages)
+            start = max(0, end - limit)
+            has_more = start > 0
+        page = self.messages[start:end]
+        return {
+            "messages": page,
+            "has_more": has_more,
+            "before": page[0]["id"] if page else before,
+            "after": page[-1]["id"] if page else after,
+        }
+
+    def summary(self, role: str = "lawyer") -> Dict:
+        return {
+            "lawyer_id": self.lawyer_id,
+            "client_id": self.client_id,
+            "last_updated": self.last_updated,
+            "last_message": self.messages[-1] if self.messages else None,
+            "message_count": len(self.messages),
+            "unread_count": self.unread_count(role),
+        }
 
     def to_dict(self):
         return {
@@ -69,127 +137,257 @@ class ChatSession:
         }
 
 class ChatManager:
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {} # key: "{lawyer_id}_{client_id}_{role}"
+    def __init__(self, log_dir: str = CHAT_LOG_DIR, broker: ChatBroker = None):
+        # Open sockets of this worker, many per key: "{lawyer_id}_{client_id}_{role}" / "monitor_{lawyer_id}"
+        self.hub = ConnectionHub()
+        # Fan-out to every chat server worker (each delivers to its own sockets)
+        self.broker = broker or create_broker()
+        self._broker_started = False
         self.sessions: Dict[str, ChatSession] = {} # key: "{lawyer_id}_{client_id}"
-        self.load_chats()
+        # Secondary indexes over self.sessions
+        self._by_lawyer: Dict[str, Dict[str, ChatSession]] = {}
+        self._by_client: Dict[str, Dict[str, ChatSession]] = {}
+        self._inbox: Dict[str, List[Tuple[str, str]]] = {} # lawyer_id -> [(last_updated, session_key)] ascending
+        self._store_lock = threading.RLock()
+        # Opened (and replayed into self.sessions) on first use, not when the module is imported
+        self._log_dir = log_dir
+        self._log: Optional[ChatMessageLog] = None
+
+    @property
+    def log(self) -> ChatMessageLog:
+        if self._log is None:
+            with self._store_lock:
+                if self._log is None:
+                    self._log = ChatMessageLog(self._log_dir).register_atexit()
+                    self.load_chats()
+        return self._log
 
     def get_session_key(self, lawyer_id: str, client_id: str):
         return f"{lawyer_id}_{client_id}"
 
+    async def start_broker(self):
+        if not self._broker_started:
+            self._broker_started = True
+            await self.broker.start(self._on_broker_message)
+            # Ask running workers for their presence state
+            await self.broker.publish("presence_sync", {"origin": self.broker.worker_id})
+
+    async def stop_broker(self):
+        if self._broker_started:
+            self._broker_started = False
+            await self.broker.close()
+
+    async def _on_broker_message(self, topic: str, payload: Dict):
+        if topic == "chat":
+            for key, body in payload["deliveries"]:
+                self.hub.publish(key, body)
+        elif topic == "presence":
+            presence_manager.update_heartbeat(payload["lawyer_id"], payload.get("ts"))
+        elif topic == "presence_sync":
+            if payload.get("origin") != self.broker.worker_id:
+                last_active = list(presence_manager.snapshot().items())
+                for i in range(0, len(last_active), PRESENCE_SYNC_BATCH):
+                    await self.broker.publish("presence_state", {"last_active": dict(last_active[i:i + PRESENCE_SYNC_BATCH])})
+        elif topic == "presence_state":
+            presence_manager.merge(payload["last_active"])
+
+    async def heartbeat(self, lawyer_id: str):
+        """Mark a lawyer online on every worker"""
+        await self.start_broker()
+        await self.broker.publish("presence", {"lawyer_id": lawyer_id, "ts": time.time()})
+
     async def connect(self, websocket: WebSocket, lawyer_id: str, client_id: str, role: str):
         await websocket.accept()
+        await self.start_broker()
         key = f"{lawyer_id}_{client_id}_{role}"
-        self.active_connections[key] = websocket
+        self.hub.register(key, websocket)
+        if role == "lawyer":
+            await self.heartbeat(lawyer_id)
         
         # Ensure session exists
         session_key = self.get_session_key(lawyer_id, client_id)
+        log = self.log
         if session_key not in self.sessions:
-            self.sessions[session_key] = ChatSession(lawyer_id, client_id)
-            self.save_chats()
+            self._ensure_session(session_key, lawyer_id, client_id)
+            self._append(log.append_session, session_key, lawyer_id, client_id)
 
-    def disconnect(self, lawyer_id: str, client_id: str, role: str):
-        key = f"{lawyer_id}_{client_id}_{role}"
-        if key in self.active_connections:
-            del self.active_connections[key]
+    def disconnect(self, lawyer_id: str, client_id: str, role: str, websocket: WebSocket = None):
+        # Without a websocket, every socket on this key is released
+        self.hub.unregister(f"{lawyer_id}_{client_id}_{role}", websocket)
 
     async def send_message(self, lawyer_id: str, client_id: str, sender_role: str, content: str):
         session_key = self.get_session_key(lawyer_id, client_id)
-        session = self.sessions.get(session_key)
-        
-        if not session:
-            # Should exist if connected, but safety check
-            session = ChatSession(lawyer_id, client_id)
-            self.sessions[session_key] = session
+        log = self.log
+        # Should exist if connected, but safety check
+        session = self._ensure_session(session_key, lawyer_id, client_id)
 
-        # 1. Save Message
+        # 1. Save Message (append one log record)
         message = Message(sender=sender_role, content=content)
-        session.add_message(message)
-        self.save_chats()
-
-        # 2. Broadcast to both parties (Lawyer and User)
         msg_dict = message.to_dict()
-        
-        # Target: User
-        user_conn = self.active_connections.get(f"{lawyer_id}_{client_id}_user")
-        if user_conn:
-            await user_conn.send_json(msg_dict)
-            
-        # Target: Lawyer (Specific Chat Room)
-        lawyer_conn = self.active_connections.get(f"{lawyer_id}_{client_id}_lawyer")
-        if lawyer_conn:
-            await lawyer_conn.send_json(msg_dict)
+        self._add_message(session_key, session, msg_dict)
+        self._append(log.append_message, session_key, lawyer_id, client_id, msg_dict)
 
+        # 2. Broadcast to both parties (every open tab, on whichever worker they are connected)
         # 3. Broadcast to Monitors (Global Notification)
-        # Monitors are stored in active_connections with a special key prefix or separate list?
-        # Let's use a convention: monitor_{lawyer_id}
-        monitor_key = f"monitor_{lawyer_id}"
-        if monitor_key in self.active_connections:
-            # Note: In a real app with multiple tabs, this should be a list of connections.
-            # For this prototype, we'll support one active monitor or assume the dict holds one.
-            # To support multiple, we would need a list. Let's keep it simple: Single Monitor wins or we broadcast to all if we change structure.
-            # But wait, active_connections is Dict[str, WebSocket].
-            # If we want multiple tabs to hear validly, we need a list.
-            # For now, let's just send to the one stored (last connected).
-            monitor_conn = self.active_connections[monitor_key]
-            try:
-                await monitor_conn.send_json({
-                    "type": "new_message",
-                    "client_id": client_id,
-                    "message": msg_dict
-                })
-            except Exception as e:
-                print(f"Monitor send error: {e}")
-                del self.active_connections[monitor_key]
+        await self.start_broker()
+        await self.broker.publish("chat", {"deliveries": [
+            [f"{lawyer_id}_{client_id}_user", msg_dict],
+            [f"{lawyer_id}_{client_id}_lawyer", msg_dict],
+            [f"monitor_{lawyer_id}", {
+                "type": "new_message",
+                "client_id": client_id,
+                "message": msg_dict
+            }],
+        ]})
+        if sender_role == "lawyer":
+            await self.heartbeat(lawyer_id)
 
     async def connect_monitor(self, websocket: WebSocket, lawyer_id: str):
         await websocket.accept()
-        key = f"monitor_{lawyer_id}"
-        self.active_connections[key] = websocket
+        await self.start_broker()
+        self.hub.register(f"monitor_{lawyer_id}", websocket)
+        await self.heartbeat(lawyer_id)
         
-    def disconnect_monitor(self, lawyer_id: str):
-        key = f"monitor_{lawyer_id}"
-        if key in self.active_connections:
-            del self.active_connections[key]
+    def disconnect_monitor(self, lawyer_id: str, websocket: WebSocket = None):
+        self.hub.unregister(f"monitor_{lawyer_id}", websocket)
+
+    def connection_metrics(self) -> Dict:
+        return dict(self.hub.metrics(), broker=self.broker.stats(), presence=presence_manager.stats())
 
     def get_history(self, lawyer_id: str, client_id: str):
-        self.load_chats() # Reload for multi-process support
+        self.refresh() # Pick up messages written by other processes
         session_key = self.get_session_key(lawyer_id, client_id)
         session = self.sessions.get(session_key)
         return session.messages if session else []
 
     def get_lawyer_chats(self, lawyer_id: str):
-        self.load_chats() # Reload for multi-process support
-        # Return list of chats for this lawyer
-        chats = []
-        for session in self.sessions.values():
-            if session.lawyer_id == lawyer_id:
-                chats.append(session.to_dict())
-        
-        # Sort by last updated
-        chats.sort(key=lambda x: x["last_updated"], reverse=True)
-        return chats
+        self.refresh() # Pick up messages written by other processes
+        # Per-lawyer inbox is kept sorted by last_updated; newest first
+        with self._store_lock:
+            inbox = self._inbox.get(lawyer_id, [])
+            return [self.sessions[key].to_dict() for _, key in reversed(inbox)]
+
+    def get_history_page(self, lawyer_id: str, client_id: str, **cursor) -> Optional[Dict]:
+        self.refresh()
+        session = self.sessions.get(self.get_session_key(lawyer_id, client_id))
+        if session is None:
+            return {"messages": [], "has_more": False, "before": None, "after": None}
+        with self._store_lock:
+            return session.page(**cursor)
+
+    def get_lawyer_inbox(self, lawyer_id: str, limit: int = CHAT_PAGE_SIZE, cursor: str = None) -> Dict:
+        """
+        Session summaries (last message + unread count, no full history), newest first.
+        cursor is the opaque "next_cursor" of the previous page.
+        """
+        self.refresh()
+        limit = max(1, min(limit, CHAT_PAGE_MAX))
+        with self._store_lock:
+            inbox = self._inbox.get(lawyer_id, [])
+            end = len(inbox)
+            if cursor:
+                last_updated, _, session_key = cursor.partition("|")
+                end = bisect_left(inbox, (last_updated, session_key))
+            start = max(0, end - limit)
+            entries = inbox[start:end][::-1]
+            chats = [self.sessions[key].summary("lawyer") for _, key in entries]
+        return {
+            "chats": chats,
+            "has_more": start > 0,
+            "next_cursor": f"{entries[-1][0]}|{entries[-1][1]}" if entries and start > 0 else None,
+        }
+
+    def mark_read(self, lawyer_id: str, client_id: str, role: str, upto: Optional[int] = None) -> Optional[Dict]:
+        self.refresh()
+        session_key = self.get_session_key(lawyer_id, client_id)
+        session = self.sessions.get(session_key)
+        if session is None:
+            return None
+        with self._store_lock:
+            read = session.mark_read(role, upto)
+        self._append(self.log.append_read, session_key, lawyer_id, client_id, role, read)
+        return {"read": read, "unread_count": session.unread_count(role)}
+
+    def get_client_chats(self, client_id: str):
+        self.refresh()
+        with self._store_lock:
+            sessions = list(self._by_client.get(client_id, {}).values())
+        sessions.sort(key=lambda s: s.last_updated, reverse=True)
+        return [session.to_dict() for session in sessions]
+
+    # --- In-memory session store ---
+
+    def _ensure_session(self, session_key: str, lawyer_id: str, client_id: str) -> ChatSession:
+        with self._store_lock:
+            session = self.sessions.get(session_key)
+            if session is None:
+                session = ChatSession(lawyer_id, client_id)
+                self._index_session(session_key, session)
+            return session
+
+    def _index_session(self, session_key: str, session: ChatSession):
+        self.sessions[session_key] = session
+        self._by_lawyer.setdefault(session.lawyer_id, {})[session_key] = session
+        self._by_client.setdefault(session.client_id, {})[session_key] = session
+        insort(self._inbox.setdefault(session.lawyer_id, []), (session.last_updated, session_key))
+
+    def _add_message(self, session_key: str, session: ChatSession, message: Dict):
+        with self._store_lock:
+            # Move the session to its new position in the lawyer's inbox
+            inbox = self._inbox.setdefault(session.lawyer_id, [])
+            entry = (session.last_updated, session_key)
+            i = bisect_left(inbox, entry)
+            if i < len(inbox) and inbox[i] == entry:
+                del inbox[i]
+            session.append_dict(message)
+            insort(inbox, (session.last_updated, session_key))
+
+    def refresh(self):
+        """Apply records appended by other processes (chat_server.py / main.py). One fstat when nothing changed."""
+        try:
+            records = self.log.poll()
+        except Exception as e:
+            print(f"Failed to poll chats: {e}")
+            return
+        if records is None:
+            # Log was compacted elsewhere: rebuild from snapshot + segment
+            self.load_chats()
+            return
+        for record in records:
+            session = self._ensure_session(record["key"], record["lawyer_id"], record["client_id"])
+            if record.get("op") == "message":
+                self._add_message(record["key"], session, record["message"])
+            elif record.get("op") == "read":
+                with self._store_lock:
+                    session.mark_read(record["role"], record["upto"])
+
+    def _append(self, write, *args):
+        try:
+            write(*args)
+        except Exception as e:
+            print(f"Failed to save chat: {e}")
 
     def load_chats(self):
-        if os.path.exists(CHAT_DB_FILE):
-            try:
-                with open(CHAT_DB_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    for key, val in data.items():
-                        self.sessions[key] = ChatSession(
-                            val["lawyer_id"], 
-                            val["client_id"], 
-                            val["messages"]
-                        )
-                print(f"Loaded {len(self.sessions)} chat sessions.")
-            except Exception as e:
-                print(f"Failed to load chats: {e}")
+        try:
+            data = self.log.load(legacy_file=CHAT_DB_FILE)
+            with self._store_lock:
+                self.sessions.clear()
+                self._by_lawyer, self._by_client, self._inbox = {}, {}, {}
+                for key, val in data.items():
+                    self._index_session(key, ChatSession(
+                        val["lawyer_id"], 
+                        val["client_id"], 
+                        val["messages"],
+                        val.get("read")
+                    ))
+            print(f"Loaded {len(self.sessions)} chat sessions.")
+        except Exception as e:
+            print(f"Failed to load chats: {e}")
 
     def save_chats(self):
+        """Fold the message log into a fresh snapshot (messages are already persisted on append)."""
         try:
-            data = {k: v.to_dict() for k, v in self.sessions.items()}
-            with open(CHAT_DB_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.log.compact()
         except Exception as e:
             print(f"Failed to save chats: {e}")
 
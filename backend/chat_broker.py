@@ -0,0 +1,175 @@
+"""
+Chat Broker (pub/sub backplane)
+- 채팅 메시지 팬아웃 / 프레즌스 이벤트를 모든 채팅 서버 워커에 전달하는 인터페이스
+- 각 워커는 자기 프로세스에 붙은 소켓에만 전달 (ConnectionHub) → 다른 워커에 연결된 변호사에게도 전달됨
+- 구현
+    memory : 같은 프로세스 안의 구독자끼리만 전달 (단일 워커 / 테스트)
+    local  : CHAT_BROKER_DIR 아래 워커별 Unix 데이터그램 소켓, 같은 호스트의 여러 워커 (로드밸런서 뒤 다중 uvicorn)
+- 다른 백엔드(Redis 등)는 ChatBroker의 start / publish / close만 구현하면 됨
+"""
+
+import os
+import json
+import uuid
+import socket
+import asyncio
+import tempfile
+from typing import Awaitable, Callable, Dict, List, Optional
+
+CHAT_BROKER = os.environ.get("CHAT_BROKER", "memory")  # memory | local
+CHAT_BROKER_DIR = os.environ.get("CHAT_BROKER_DIR", os.path.join(tempfile.gettempdir(), "lawnald_chat_broker"))
+
+Handler = Callable[[str, Dict], Awaitable[None]]
+
+# Unix 데이터그램 1건 최대 크기 (채팅 메시지 1건 기준으로 충분)
+MAX_DATAGRAM = 64 * 1024
+
+
+class ChatBroker:
+    """topic / payload(dict)를 모든 워커(자기 자신 포함)의 handler로 전달"""
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex[:12]
+        self.handler: Optional[Handler] = None
+        self.published = 0
+        self.received = 0
+
+    async def start(self, handler: Handler):
+        self.handler = handler
+
+    async def publish(self, topic: str, payload: Dict):
+        raise NotImplementedError
+
+    async def close(self):
+        self.handler = None
+
+    async def _deliver(self, topic: str, payload: Dict):
+        self.received += 1
+        if self.handler is None:
+            return
+        try:
+            await self.handler(topic, payload)
+        except Exception as e:
+            print(f"Broker handler error ({topic}): {e}")
+
+    def stats(self) -> Dict:
+        return {"backend": type(self).__name__, "worker_id": self.worker_id,
+                "published": self.published, "received": self.received}
+
+
+class InMemoryBroker(ChatBroker):
+    """같은 프로세스의 InMemoryBroker 인스턴스끼리 공유하는 채널"""
+
+    _channels: Dict[str, List["InMemoryBroker"]] = {}
+
+    def __init__(self, channel: str = "default"):
+        super().__init__()
+        self.channel = channel
+
+    async def start(self, handler: Handler):
+        await super().start(handler)
+        members = InMemoryBroker._channels.setdefault(self.channel, [])
+        if self not in members:
+            members.append(self)
+
+    async def publish(self, topic: str, payload: Dict):
+        self.published += 1
+        for member in list(InMemoryBroker._channels.get(self.channel, [])):
+            await member._deliver(topic, payload)
+
+    async def close(self):
+        members = InMemoryBroker._channels.get(self.channel, [])
+        if self in members:
+            members.remove(self)
+        await super().close()
+
+
+class LocalSocketBroker(ChatBroker):
+    """
+    디렉터리 하나를 공유하는 워커들 사이의 브로커 (Redis 대용 로컬 스탠드인).
+    워커마다 <dir>/<worker_id>.sock 데이터그램 소켓을 열고, publish는 디렉터리의 모든 소켓으로 전송.
+    응답 없는 소켓 파일(죽은 워커)은 전송 실패 시 삭제.
+    """
+
+    def __init__(self, directory: str = CHAT_BROKER_DIR):
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{self.worker_id}.sock")
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.send_errors = 0
+
+    async def start(self, handler: Handler):
+        await super().start(handler)
+        os.makedirs(self.directory, exist_ok=True)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._sock.setblocking(False)
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._sock.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        while True:
+            try:
+                data = self._sock.recv(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            try:
+                message = json.loads(data.decode("utf-8"))
+            except ValueError:
+                continue
+            self._loop.create_task(self._deliver(message["topic"], message["payload"]))
+
+    def _peers(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.directory, n) for n in names if n.endswith(".sock")]
+
+    async def publish(self, topic: str, payload: Dict):
+        if self._sock is None:
+            raise RuntimeError("LocalSocketBroker.start() must be called first")
+        self.published += 1
+        data = json.dumps({"topic": topic, "payload": payload, "origin": self.worker_id},
+                          ensure_ascii=False).encode("utf-8")
+        for peer in self._peers():
+            try:
+                self._sock.sendto(data, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # 정상 종료하지 못한 워커의 소켓 파일
+                try:
+                    os.remove(peer)
+                except OSError:
+                    pass
+            except OSError as e:
+                self.send_errors += 1
+                print(f"Broker send error ({peer}): {e}")
+
+    async def close(self):
+        if self._sock is not None:
+            if self._loop is not None:
+                self._loop.remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        await super().close()
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats.update({"peers": len(self._peers()), "send_errors": self.send_errors})
+        return stats
+
+
+def create_broker(backend: str = CHAT_BROKER) -> ChatBroker:
+    """CHAT_BROKER 설정에 맞는 브로커 생성"""
+    if backend == "local":
+        return LocalSocketBroker()
+    if backend != "memory":
+        print(f"⚠️ 알 수 없는 CHAT_BROKER '{backend}', memory 사용")
+    return InMemoryBroker()
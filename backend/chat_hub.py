@@ -0,0 +1,120 @@
+"""
+Chat Connection Hub
+- 키("{lawyer_id}_{client_id}_{role}", "monitor_{lawyer_id}") 하나에 여러 WebSocket (여러 탭) 등록
+- 소켓마다 크기 제한 송신 큐 + 전용 writer task: publish()는 큐에 넣기만 하고 기다리지 않음
+- 큐가 가득 찬 느린 소비자는 끊음 (close 1013) → 보내는 쪽이 멈추지 않음
+- metrics(): 연결 수 / 큐 적재량 / 전달·드롭·송신 실패 카운터
+"""
+
+import os
+import asyncio
+from typing import Any, Dict, List
+
+CHAT_SEND_QUEUE_SIZE = int(os.environ.get("CHAT_SEND_QUEUE_SIZE", 256))
+
+# WebSocket close code 1013: Try Again Later
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class _Subscriber:
+    def __init__(self, hub: "ConnectionHub", key: str, websocket, maxsize: int):
+        self.hub = hub
+        self.key = key
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.sent = 0
+        self.task = asyncio.get_running_loop().create_task(self._writer())
+
+    async def _writer(self):
+        try:
+            while True:
+                payload = await self.queue.get()
+                await self.websocket.send_json(payload)
+                self.sent += 1
+                self.hub.delivered += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Chat send error ({self.key}): {e}")
+            self.hub.send_errors += 1
+            self.hub._remove(self)
+
+
+class ConnectionHub:
+    def __init__(self, queue_size: int = CHAT_SEND_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, List[_Subscriber]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.dropped_slow = 0
+        self.send_errors = 0
+        self.max_queue_depth = 0
+
+    def register(self, key: str, websocket) -> _Subscriber:
+        """이벤트 루프 안에서 호출 (writer task 생성)"""
+        subscriber = _Subscriber(self, key, websocket, self.queue_size)
+        self._subscribers.setdefault(key, []).append(subscriber)
+        return subscriber
+
+    def unregister(self, key: str, websocket=None):
+        """websocket을 주면 해당 소켓만, 아니면 키에 걸린 모든 소켓 해제"""
+        for subscriber in list(self._subscribers.get(key, [])):
+            if websocket is None or subscriber.websocket is websocket:
+                self._remove(subscriber)
+
+    def _remove(self, subscriber: _Subscriber):
+        subscribers = self._subscribers.get(subscriber.key, [])
+        if subscriber in subscribers:
+            subscribers.remove(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.key]
+        if subscriber.task is not asyncio.current_task():
+            subscriber.task.cancel()
+
+    def has(self, key: str) -> bool:
+        return bool(self._subscribers.get(key))
+
+    def publish(self, key: str, payload: Any) -> int:
+        """키에 연결된 모든 소켓의 큐에 payload 적재 (대기 없음). 적재된 소켓 수 반환"""
+        subscribers = self._subscribers.get(key)
+        if not subscribers:
+            return 0
+        self.published += 1
+        queued = 0
+        for subscriber in list(subscribers):
+            try:
+                subscriber.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._drop_slow(subscriber)
+                continue
+            queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, subscriber.queue.qsize())
+        return queued
+
+    def _drop_slow(self, subscriber: _Subscriber):
+        print(f"Dropping slow chat consumer: {subscriber.key}")
+        self.dropped_slow += 1
+        self._remove(subscriber)
+
+        async def _close():
+            try:
+                await subscriber.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+            except Exception:
+                pass
+
+        asyncio.get_running_loop().create_task(_close())
+
+    def metrics(self) -> Dict:
+        depths = [s.queue.qsize() for subs in self._subscribers.values() for s in subs]
+        return {
+            "keys": len(self._subscribers),
+            "connections": len(depths),
+            "queued": sum(depths),
+            "deepest_queue": max(depths, default=0),
+            "max_queue_depth": self.max_queue_depth,
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_slow": self.dropped_slow,
+            "send_errors": self.send_errors,
+        }
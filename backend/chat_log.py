@@ -0,0 +1,334 @@
+"""
+Chat Message Log
+- 채팅 메시지를 append-only 로그(한 줄 = 한 레코드)로 기록: 메시지 1건 저장 비용 = 메시지 크기
+- 디렉터리 구성
+    snapshot.json        : 마지막 컴팩션 시점의 전체 세션 상태 + 이어서 재생할 세그먼트 번호
+    segment-000001.log   : 스냅샷 이후 레코드 ("<crc32> <json>\\n")
+    LOCK                 : 프로세스 간 잠금 (append = 공유, 컴팩션 = 배타)
+- fsync는 배치: append는 write + flush만 하고, 백그라운드 타이머가 CHAT_LOG_FSYNC_INTERVAL마다 한 번 fsync
+- 세그먼트가 CHAT_LOG_COMPACT_BYTES를 넘으면 디스크 상태를 새 스냅샷으로 접고 새 세그먼트로 교체
+- 시작 시 복구: 스냅샷 로드 → 세그먼트 재생, 깨진 꼬리 레코드(쓰기 중 크래시)는 잘라냄
+- 기존 chats.json은 로그가 비어 있을 때 최초 1회 스냅샷으로 마이그레이션
+- poll(): 다른 프로세스가 덧붙인 레코드만 읽어옴 (파일 크기 확인 1회, 전체 재파싱 없음)
+"""
+
+import os
+import json
+import zlib
+import uuid
+import atexit
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl  # type: ignore
+except ImportError:  # Windows: 단일 프로세스 전제
+    fcntl = None
+
+CHAT_LOG_FSYNC_INTERVAL = float(os.environ.get("CHAT_LOG_FSYNC_INTERVAL", "0.2"))  # 초
+CHAT_LOG_COMPACT_BYTES = int(os.environ.get("CHAT_LOG_COMPACT_BYTES", 4 * 1024 * 1024))
+
+SNAPSHOT_FILE = "snapshot.json"
+LOCK_FILE = "LOCK"
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+LOG_VERSION = 1
+
+
+def _segment_name(generation: int) -> str:
+    return f"{SEGMENT_PREFIX}{generation:06d}{SEGMENT_SUFFIX}"
+
+
+def _encode(record: Dict) -> bytes:
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return b"%08x " % (zlib.crc32(payload) & 0xFFFFFFFF) + payload + b"\n"
+
+
+def _decode(line: bytes) -> Optional[Dict]:
+    """CRC가 맞는 완전한 줄만 레코드로 인정 (아니면 None)"""
+    if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload) & 0xFFFFFFFF:
+            return None
+        return json.loads(payload.decode("utf-8"))
+    except ValueError:
+        return None
+
+
+def apply_record(sessions: Dict[str, Dict], record: Dict):
+    """로그 레코드 하나를 세션 상태(dict)에 반영"""
+    key = record["key"]
+    session = sessions.get(key)
+    if session is None:
+        session = sessions[key] = {
+            "lawyer_id": record["lawyer_id"],
+            "client_id": record["client_id"],
+            "messages": [],
+        }
+    if record.get("op") == "message":
+        session["messages"].append(record["message"])
+        # 보낸 쪽은 그 시점까지 모두 읽은 것으로 간주
+        session.setdefault("read", {})[record["message"].get("sender")] = len(session["messages"])
+    elif record.get("op") == "read":
+        read = session.setdefault("read", {})
+        read[record["role"]] = max(read.get(record["role"], 0), record["upto"])
+
+
+class ChatMessageLog:
+    def __init__(self, directory: str, fsync_interval: float = CHAT_LOG_FSYNC_INTERVAL,
+                 compact_bytes: int = CHAT_LOG_COMPACT_BYTES):
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.compact_bytes = compact_bytes
+        self.generation = 1
+        self.writer_id = uuid.uuid4().hex[:12]  # 자기 레코드는 poll()에서 건너뜀
+        self._file = None
+        self._reader = None
+        self._read_offset = 0
+        self._reset_needed = False
+        self._lock = threading.RLock()
+        self._timer = None
+        self._unsynced = False
+        os.makedirs(directory, exist_ok=True)
+
+    # --- Paths / locking ---
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _segments(self) -> List[int]:
+        generations = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    generations.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(generations)
+
+    def _flock(self, exclusive: bool):
+        lock_file = open(self._path(LOCK_FILE), "a")
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        return lock_file
+
+    def _unlock(self, lock_file):
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+    # --- Recovery ---
+
+    def _read_snapshot(self) -> Tuple[Dict[str, Dict], int]:
+        path = self._path(SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return {}, 1
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("sessions", {}), int(data.get("generation", 1))
+
+    def _replay(self, generation: int, sessions: Dict[str, Dict], repair: bool) -> int:
+        """세그먼트 재생. 깨진 꼬리는 repair=True일 때 잘라냄. 유효 구간 끝 offset 반환"""
+        path = self._path(_segment_name(generation))
+        good_offset = 0
+        with open(path, "rb") as f:
+            for line in f:
+                record = _decode(line)
+                if record is None:
+                    break
+                apply_record(sessions, record)
+                good_offset += len(line)
+        if repair and good_offset < os.path.getsize(path):
+            print(f"⚠️ 채팅 로그 손상 구간 제거: {path} ({good_offset} bytes 이후)")
+            with open(path, "r+b") as f:
+                f.truncate(good_offset)
+                os.fsync(f.fileno())
+        return good_offset
+
+    def _load_locked(self, repair: bool) -> Tuple[Dict[str, Dict], int, int]:
+        sessions, generation = self._read_snapshot()
+        segments = self._segments()
+        for old in [g for g in segments if g < generation]:
+            # 스냅샷에 이미 접힌 세그먼트 (컴팩션 도중 크래시)
+            if repair:
+                os.remove(self._path(_segment_name(old)))
+        offset = 0
+        for gen in [g for g in segments if g >= generation]:
+            offset = self._replay(gen, sessions, repair)
+            generation = gen
+        return sessions, generation, offset
+
+    def load(self, legacy_file: Optional[str] = None) -> Dict[str, Dict]:
+        """스냅샷 + 세그먼트 재생으로 전체 세션 상태 복구 (key -> {lawyer_id, client_id, messages})"""
+        with self._lock:
+            lock_file = self._flock(exclusive=True)
+            try:
+                if legacy_file and not os.path.exists(self._path(SNAPSHOT_FILE)) and not self._segments():
+                    self._migrate(legacy_file)
+                sessions, generation, offset = self._load_locked(repair=True)
+                self._open(generation)
+                self._read_offset = offset
+                self._reset_needed = False
+                return sessions
+            finally:
+                self._unlock(lock_file)
+
+    def _migrate(self, legacy_file: str):
+        if not os.path.exists(legacy_file):
+            return
+        try:
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            sessions = {
+                key: {"lawyer_id": val["lawyer_id"], "client_id": val["client_id"], "messages": val.get("messages", [])}
+                for key, val in data.items()
+            }
+            self._write_snapshot(sessions, 1)
+            print(f"📦 chats.json → 채팅 로그 마이그레이션 ({len(sessions)} sessions)")
+        except Exception as e:
+            print(f"chats.json 마이그레이션 실패: {e}")
+
+    # --- Append ---
+
+    def _open(self, generation: int):
+        if self._file is not None:
+            self._file.close()
+            self._reader.close()
+        self.generation = generation
+        # O_APPEND: 여러 프로세스가 같은 세그먼트에 써도 줄 단위로 섞이지 않음
+        self._file = open(self._path(_segment_name(generation)), "ab")
+        self._reader = open(self._path(_segment_name(generation)), "rb")
+        self._read_offset = 0
+
+    def _ensure_current(self):
+        """다른 프로세스가 컴팩션해서 세그먼트가 교체됐으면 최신 세그먼트로 다시 연다"""
+        if self._file is None or os.fstat(self._file.fileno()).st_nlink == 0:
+            segments = self._segments()
+            _, snapshot_generation = self._read_snapshot()
+            self._open(max(segments + [snapshot_generation]))
+            self._reset_needed = True  # 이전 세그먼트의 미확인 레코드는 스냅샷에만 있음
+
+    def append(self, record: Dict):
+        record["w"] = self.writer_id
+        data = _encode(record)
+        with self._lock:
+            lock_file = self._flock(exclusive=False)
+            try:
+                self._ensure_current()
+                self._file.write(data)
+                self._file.flush()
+                size = self._file.tell()
+            finally:
+                self._unlock(lock_file)
+            self._schedule_sync()
+        if size >= self.compact_bytes:
+            self.compact()
+
+    def append_session(self, key: str, lawyer_id: str, client_id: str):
+        self.append({"op": "session", "key": key, "lawyer_id": lawyer_id, "client_id": client_id})
+
+    def append_message(self, key: str, lawyer_id: str, client_id: str, message: Dict):
+        self.append({"op": "message", "key": key, "lawyer_id": lawyer_id, "client_id": client_id, "message": message})
+
+    def append_read(self, key: str, lawyer_id: str, client_id: str, role: str, upto: int):
+        self.append({"op": "read", "key": key, "lawyer_id": lawyer_id, "client_id": client_id, "role": role, "upto": upto})
+
+    # --- Cross-process change notification ---
+
+    def poll(self) -> Optional[List[Dict]]:
+        """
+        마지막 확인 이후 다른 프로세스가 덧붙인 레코드 목록.
+        변경이 없으면 파일 크기 확인(fstat) 한 번으로 끝남.
+        세그먼트가 교체되어(컴팩션) 이어 읽을 수 없으면 None → 호출 측에서 load()로 전체 재로드.
+        """
+        with self._lock:
+            if self._reader is None or self._reset_needed:
+                return None
+            stat = os.fstat(self._reader.fileno())
+            if stat.st_nlink == 0:
+                return None
+            if stat.st_size <= self._read_offset:
+                return []
+            self._reader.seek(self._read_offset)
+            records = []
+            for line in self._reader.read(stat.st_size - self._read_offset).splitlines(keepends=True):
+                record = _decode(line)
+                if record is None:
+                    break  # 아직 쓰는 중인 줄: 다음 poll에서 다시 읽음
+                self._read_offset += len(line)
+                if record.get("w") != self.writer_id:
+                    records.append(record)
+            return records
+
+    # --- fsync batching ---
+
+    def _schedule_sync(self):
+        self._unsynced = True
+        if self.fsync_interval <= 0:
+            self.sync()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.fsync_interval, self.sync)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def sync(self):
+        """쌓인 append를 한 번의 fsync로 디스크에 확정"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._unsynced or self._file is None:
+                return
+            try:
+                os.fsync(self._file.fileno())
+                self._unsynced = False
+            except Exception as e:
+                print(f"채팅 로그 fsync 실패: {e}")
+
+    # --- Compaction ---
+
+    def _write_snapshot(self, sessions: Dict[str, Dict], generation: int):
+        path = self._path(SNAPSHOT_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": LOG_VERSION, "generation": generation, "sessions": sessions}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def compact(self) -> Dict[str, Dict]:
+        """
+        디스크 상태(다른 프로세스의 append 포함)를 새 스냅샷으로 접고 세그먼트 교체.
+        순서: 새 세그먼트 생성 → 스냅샷 교체 → 이전 세그먼트 삭제 (어느 단계에서 죽어도 재생으로 복구)
+        """
+        with self._lock:
+            lock_file = self._flock(exclusive=True)
+            try:
+                self.sync()
+                sessions, generation, _ = self._load_locked(repair=True)
+                next_generation = generation + 1
+                self._open(next_generation)
+                self._write_snapshot(sessions, next_generation)
+                # 아직 poll하지 않은 다른 프로세스의 레코드는 스냅샷에만 남으므로 다음 poll은 전체 재로드
+                self._reset_needed = True
+                for old in self._segments():
+                    if old < next_generation:
+                        os.remove(self._path(_segment_name(old)))
+                return sessions
+            finally:
+                self._unlock(lock_file)
+
+    def close(self):
+        with self._lock:
+            self.sync()
+            if self._file is not None:
+                self._file.close()
+                self._reader.close()
+                self._file = None
+                self._reader = None
+
+    def register_atexit(self):
+        atexit.register(self.close)
+        return self
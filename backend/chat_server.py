@@ -8,12 +8,25 @@ import os
 sys.path.append(os.getcwd())
 
 try:
-    from backend.chat import chat_manager
+    from backend.chat import chat_manager, presence_manager
 except ImportError:
-    from chat import chat_manager
+    from chat import chat_manager, presence_manager
 
 app = FastAPI()
 
+# Several workers can run behind a load balancer (CHAT_BROKER=local, distinct CHAT_PORT each)
+CHAT_PORT = int(os.environ.get("CHAT_PORT", 8003))
+
+@app.on_event("startup")
+async def start_broker():
+    await chat_manager.start_broker()
+    presence_manager.start_sweeper()
+
+@app.on_event("shutdown")
+async def stop_broker():
+    presence_manager.stop_sweeper()
+    await chat_manager.stop_broker()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -40,10 +53,10 @@ async def websocket_endpoint(websocket: WebSocket, lawyer_id: str, client_id: st
             data = await websocket.receive_text()
             await chat_manager.send_message(lawyer_id, client_id, role, data)
     except WebSocketDisconnect:
-        chat_manager.disconnect(lawyer_id, client_id, role)
+        chat_manager.disconnect(lawyer_id, client_id, role, websocket)
     except Exception as e:
         print(f"Handler Error: {e}")
-        chat_manager.disconnect(lawyer_id, client_id, role)
+        chat_manager.disconnect(lawyer_id, client_id, role, websocket)
 
 @app.websocket("/ws/monitor/{lawyer_id}")
 async def monitor_endpoint(websocket: WebSocket, lawyer_id: str):
@@ -61,18 +74,24 @@ async def monitor_endpoint(websocket: WebSocket, lawyer_id: str):
     try:
         while True:
             # Monitors don't send messages, they just listen.
-            # But we need to keep the connection open.
+            # But we need to keep the connection open; any ping doubles as a presence heartbeat.
             await websocket.receive_text() 
+            await chat_manager.heartbeat(lawyer_id)
     except WebSocketDisconnect:
-        chat_manager.disconnect_monitor(lawyer_id)
+        chat_manager.disconnect_monitor(lawyer_id, websocket)
     except Exception as e:
         print(f"Monitor Handler Error: {e}")
-        chat_manager.disconnect_monitor(lawyer_id)
+        chat_manager.disconnect_monitor(lawyer_id, websocket)
+
+@app.get("/metrics")
+def connection_metrics():
+    """Open sockets, send-queue depth and slow-consumer drops"""
+    return chat_manager.connection_metrics()
 
 if __name__ == "__main__":
-    print("Starting Chat Server on port 8003...")
+    print(f"Starting Chat Server on port {CHAT_PORT}...")
     try:
-        uvicorn.run(app, host="127.0.0.1", port=8003)
+        uvicorn.run(app, host="127.0.0.1", port=CHAT_PORT)
     except Exception as e:
         print(f"CRITICAL ERROR: {e}")
         import traceback
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Tests that exercise search / chat open the analyze_query cache and the chat message log;
+# point both at a scratch directory so a test run never writes into the working tree.
+_scratch = tempfile.mkdtemp(prefix="lawyer-tests-")
+os.environ.setdefault("QUERY_CACHE_PATH", os.path.join(_scratch, "query_cache.sqlite3"))
+os.environ.setdefault("CHAT_LOG_DIR", os.path.join(_scratch, "chat_log"))
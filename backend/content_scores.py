@@ -0,0 +1,112 @@
+"""
+Content Relevance Score Table
+- search()의 콘텐츠 점수(raw_content_score / valid_content_count)는 primary_area에만 의존
+- 변호사 × 분야 → (가중 점수, 검증 콘텐츠 수) 표를 미리 계산해 두고 검색 시 배열 조회로 대체
+- 콘텐츠 승인 / 삭제 / 공개 전환 시 update_lawyer()로 해당 변호사 행만 재계산
+- 표에 없는 변호사(신규 가입 등)와 처음 보는 분야는 조회 시점에 계산해 추가
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np  # type: ignore
+
+CONTENT_TYPE_WEIGHTS = {
+    "book": 5,
+    "lecture": 3,
+    "column": 2,
+    "blog": 1,
+    "youtube": 1,  # Same as blog per user request
+}
+
+# primary_area별 추가 topic_tag 키워드 (primary_area 자체는 항상 포함)
+AREA_KEYWORDS = {
+    "가사": ["이혼", "상속", "가사"],
+    "형사": ["성범죄", "교통", "형사"],
+    "부동산": ["임대차", "건설", "부동산"],
+}
+
+
+def target_keywords(area: str) -> List[str]:
+    return [area] + AREA_KEYWORDS.get(area, [])
+
+
+def score_content_items(items: List[Dict], area: str) -> Tuple[int, int]:
+    """검증된 콘텐츠 중 topic_tags가 분야 키워드를 포함하는 항목의 (가중 점수, 개수)"""
+    keywords = target_keywords(area)
+    raw_score, count = 0, 0
+    for item in items or []:
+        if not item.get("verified"):
+            continue
+        if not any(kw in tag for tag in item.get("topic_tags", []) for kw in keywords):
+            continue
+        count += 1
+        raw_score += CONTENT_TYPE_WEIGHTS.get(item.get("type"), 0)
+    return raw_score, count
+
+
+class ContentScoreTable:
+    def __init__(self, areas: List[str]):
+        self._areas: Dict[str, int] = {area: col for col, area in enumerate(areas)}
+        self._rows: Dict[str, int] = {}
+        self._lawyers: List[Optional[Dict]] = []
+        self._raw = np.zeros((0, len(self._areas)), dtype=np.int32)
+        self._count = np.zeros((0, len(self._areas)), dtype=np.int32)
+
+    def _score_row(self, lawyer: Dict) -> Tuple[List[int], List[int]]:
+        scores = [score_content_items(lawyer.get("content_items") or [], area) for area in self._areas]
+        return [s for s, _ in scores], [c for _, c in scores]
+
+    def build(self, lawyers: List[Dict]):
+        self._rows = {}
+        self._lawyers = []
+        raw_rows, count_rows = [], []
+        for lawyer in lawyers:
+            raw, count = self._score_row(lawyer)
+            self._rows[lawyer["id"]] = len(self._lawyers)
+            self._lawyers.append(lawyer)
+            raw_rows.append(raw)
+            count_rows.append(count)
+        shape = (len(raw_rows), len(self._areas))
+        self._raw = np.array(raw_rows, dtype=np.int32).reshape(shape)
+        self._count = np.array(count_rows, dtype=np.int32).reshape(shape)
+
+    def update_lawyer(self, lawyer: Dict):
+        """변호사 한 명의 content_items가 바뀌었을 때 해당 행만 재계산"""
+        raw, count = self._score_row(lawyer)
+        row = self._rows.get(lawyer["id"])
+        if row is None:
+            row = self._rows[lawyer["id"]] = len(self._lawyers)
+            self._lawyers.append(lawyer)
+            self._raw = np.vstack([self._raw, np.zeros((1, len(self._areas)), dtype=np.int32)])
+            self._count = np.vstack([self._count, np.zeros((1, len(self._areas)), dtype=np.int32)])
+        self._lawyers[row] = lawyer
+        self._raw[row] = raw
+        self._count[row] = count
+
+    def remove_lawyer(self, lawyer_id: str):
+        row = self._rows.pop(lawyer_id, None)
+        if row is not None:
+            self._lawyers[row] = None
+            self._raw[row] = 0
+            self._count[row] = 0
+
+    def _column(self, area: str) -> int:
+        col = self._areas.get(area)
+        if col is None:
+            # 처음 보는 분야: 열을 추가하고 전체 변호사에 대해 한 번만 계산
+            col = self._areas[area] = len(self._areas)
+            scores = [score_content_items((l or {}).get("content_items") or [], area) for l in self._lawyers]
+            raw_col = np.array([s for s, _ in scores], dtype=np.int32).reshape(-1, 1)
+            count_col = np.array([c for _, c in scores], dtype=np.int32).reshape(-1, 1)
+            self._raw = np.hstack([self._raw, raw_col])
+            self._count = np.hstack([self._count, count_col])
+        return col
+
+    def lookup(self, lawyers: List[Dict], area: str) -> Tuple[np.ndarray, np.ndarray]:
+        """lawyers 순서대로 (raw_content_score, valid_content_count) 배열 반환"""
+        for lawyer in lawyers:
+            if lawyer["id"] not in self._rows:
+                self.update_lawyer(lawyer)
+        col = self._column(area)
+        rows = np.fromiter((self._rows[l["id"]] for l in lawyers), dtype=np.int64, count=len(lawyers))
+        return self._raw[rows, col], self._count[rows, col]
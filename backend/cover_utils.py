@@ -0,0 +1,189 @@
+"""
+Magazine Cover Images
+- 이미지 없는 기사의 커버를 기사 id로 결정적으로 배정 (요청마다 random 선택 X)
+    · 같은 기사 → 같은 프롬프트 + 같은 seed → 같은 URL: 피드 응답과 이미지 모두 CDN / 브라우저 캐시 적중
+    · assign_cover(item): content item의 image로 기록 (로드 시 보정 / 피드 갱신 시 적용, 변호사가 저장될 때 함께 저장)
+- MAGAZINE_COVER_CACHE=1 이면 생성형 커버를 한 번만 받아 리사이즈한 WebP 변형으로 보관
+    · storage_utils로 Supabase photos 버킷에 업로드, 실패 시 로컬 static/images/covers 폴백
+    · 800px는 image (상세), 400px는 image_variants["400"] → 매거진 목록 카드의 cover_image_small
+    · CoverQueue: 기동 시 전체 + 게시 / 승인 때마다 변호사 단위로 submit, 워커 스레드 1개가 순서대로 처리
+    · 다운로드 / 변환 / 업로드는 락 밖에서, item 교체는 피드와 같은 락 안에서 (요청 스레드가 반쯤 바뀐 항목을 보지 않도록)
+    · 이후 이미지 요청은 pollinations.ai로 나가지 않음
+"""
+
+import os
+import io
+import queue
+import hashlib
+import threading
+import contextlib
+import urllib.parse
+from typing import Callable, Dict, Iterable, Optional, Set
+
+POLLINATIONS_PREFIX = "https://image.pollinations.ai/prompt/"
+
+# Safe, English-only presets (Korean titles make unstable prompts)
+COVER_PROMPTS = [
+    "lawyer working at desk, professional, cinematic, 4k",
+    "supreme court building, architecture, dramatic sky",
+    "legal documents, pen, closeup, detailed",
+    "judge gavel, wooden, blurred background, high quality",
+    "statue of lady justice, silhouette, sunset",
+]
+
+COVER_CACHE_ENABLED = os.environ.get("MAGAZINE_COVER_CACHE", "0") == "1"
+COVER_WIDTHS = (800, 400)  # 상세 / 목록 카드
+COVER_WEBP_QUALITY = 80
+COVER_LOCAL_DIR = os.path.join("static", "images", "covers")
+COVER_LOCAL_BASE = os.environ.get("COVER_LOCAL_BASE", "http://localhost:8000")
+
+
+def _seed(key: str) -> int:
+    # hash() is salted per process; blake2b keeps the choice stable across restarts and workers
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def cover_for(key: str) -> str:
+    """기사 id → 항상 같은 생성형 커버 URL"""
+    seed = _seed(key)
+    prompt = urllib.parse.quote(COVER_PROMPTS[seed % len(COVER_PROMPTS)])
+    return f"{POLLINATIONS_PREFIX}{prompt}?width=800&height=600&nologo=true&seed={seed % 1000000}"
+
+
+def is_generated_cover(url: Optional[str]) -> bool:
+    return bool(url) and url.startswith(POLLINATIONS_PREFIX)  # type: ignore
+
+
+def assign_cover(item: Dict) -> bool:
+    """이미지도 첨부 파일도 없는 항목에 커버 배정. 바뀌었으면 True"""
+    if item.get("image") or item.get("file_url") or not item.get("id"):
+        return False
+    item["image"] = cover_for(item["id"])
+    return True
+
+
+def render_variants(image_bytes: bytes, widths: Iterable[int] = COVER_WIDTHS) -> Dict[int, bytes]:
+    """원본 이미지 → 너비별 WebP 바이트 (원본보다 크게 늘리지 않음)"""
+    from PIL import Image  # type: ignore
+
+    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    variants = {}
+    for width in widths:
+        resized = img
+        if width < img.width:
+            resized = img.resize((width, max(1, round(img.height * width / img.width))), Image.LANCZOS)
+        out = io.BytesIO()
+        resized.save(out, format="WEBP", quality=COVER_WEBP_QUALITY)
+        variants[width] = out.getvalue()
+    return variants
+
+
+def _fetch(url: str) -> bytes:
+    import requests  # type: ignore
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    return response.content
+
+
+def _save_variant(name: str, data: bytes) -> str:
+    try:
+        from storage_utils import upload_and_get_url  # type: ignore
+        url = upload_and_get_url("photos", f"covers/{name}", data, "image/webp")
+        if url:
+            return url
+    except Exception as e:
+        print(f"Supabase Storage 실패 (covers): {e}")
+
+    # 로컬 폴백
+    os.makedirs(COVER_LOCAL_DIR, exist_ok=True)
+    with open(os.path.join(COVER_LOCAL_DIR, name), "wb") as f:
+        f.write(data)
+    return f"{COVER_LOCAL_BASE}/static/images/covers/{name}"
+
+
+def store_cover(item: Dict, fetch: Callable[[str], bytes] = _fetch, lock=None) -> bool:
+    """
+    생성형 커버 1건을 받아 WebP 변형으로 저장하고 item의 image / image_variants를 교체 (lock을 잡고).
+    이미 저장된 항목 (생성형 URL이 아닌 경우)이나 그 사이 이미지가 바뀐 항목은 건너뜀. 실패 시 기존 URL 유지
+    """
+    url = item.get("image")
+    if not is_generated_cover(url):
+        return False
+    try:
+        variants = render_variants(fetch(url))
+    except Exception as e:
+        print(f"⚠️ 커버 이미지 캐시 실패 ({item.get('id')}): {e}")
+        return False
+    urls = {str(width): _save_variant(f"{item['id']}-{width}.webp", data) for width, data in variants.items()}
+    with lock or contextlib.nullcontext():
+        if item.get("image") != url:
+            return False
+        item["image"] = urls[str(max(variants))]
+        item["image_variants"] = urls
+    return True
+
+
+def prefetch_covers(lawyers: Iterable[Dict], on_lawyer: Optional[Callable[[Dict], None]] = None,
+                    fetch: Callable[[str], bytes] = _fetch, lock=None) -> int:
+    """모든 생성형 커버를 로컬 변형으로 교체. 바뀐 변호사마다 on_lawyer 호출, 바뀐 변호사 수 반환"""
+    changed = 0
+    for lawyer in list(lawyers):
+        stored = [store_cover(item, fetch, lock) for item in list(lawyer.get("content_items") or [])]
+        if any(stored):
+            changed += 1
+            if on_lawyer:
+                on_lawyer(lawyer)
+    return changed
+
+
+class CoverQueue:
+    """
+    변호사 단위 커버 캐시 작업 큐 (MAGAZINE_COVER_CACHE=1 일 때만 동작).
+    on_lawyer: 커버가 바뀐 변호사마다 (피드 갱신 + 저장), lock: item 교체 시 잡을 락 (피드 락)
+    """
+
+    def __init__(self, on_lawyer: Optional[Callable[[Dict], None]] = None, lock=None,
+                 fetch: Callable[[str], bytes] = _fetch, enabled: Optional[bool] = None):
+        self.on_lawyer = on_lawyer
+        self.lock = lock
+        self.fetch = fetch
+        self.enabled = COVER_CACHE_ENABLED if enabled is None else enabled
+        self._queue: "queue.Queue[Dict]" = queue.Queue()
+        self._waiting: Set[str] = set()  # 대기 중인 변호사 id (중복 submit 병합)
+        self._mutex = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, lawyer: Dict) -> bool:
+        """생성형 커버가 남아 있는 변호사를 큐에 넣음. 넣었으면 True"""
+        if not self.enabled:
+            return False
+        if not any(is_generated_cover(item.get("image")) for item in lawyer.get("content_items") or []):
+            return False
+        with self._mutex:
+            if lawyer.get("id") in self._waiting:
+                return False
+            self._waiting.add(lawyer.get("id"))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cover-cache", daemon=True)
+                self._thread.start()
+        self._queue.put(lawyer)
+        return True
+
+    def submit_all(self, lawyers: Iterable[Dict]) -> int:
+        return sum(self.submit(lawyer) for lawyer in list(lawyers))
+
+    def join(self):
+        """대기 중인 작업이 끝날 때까지 (테스트 / 종료용)"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            lawyer = self._queue.get()
+            with self._mutex:
+                self._waiting.discard(lawyer.get("id"))
+            try:
+                prefetch_covers([lawyer], self.on_lawyer, self.fetch, self.lock)
+            except Exception as e:
+                print(f"⚠️ 커버 캐시 작업 실패 ({lawyer.get('id')}): {e}")
+            finally:
+                self._queue.task_done()
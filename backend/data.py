@@ -246,64 +246,102 @@ def generate_lawyers(count=100):
 
 import json
 import os
+import time
+import re
+import atexit
+import hashlib
+import threading
+from repository import LawyerRepository
 
 DB_FILE = "lawyers_db.json"
 
+MOCK_ID_PATTERN = re.compile(r'^lawyer-\d+$')
+LAWYERS_PAGE_SIZE = int(os.environ.get("LAWYERS_PAGE_SIZE", "500"))  # Supabase 로드 페이지 크기
+_LAWYER_COLUMNS = "id,data,is_mock,verified"
+
+def _migrate_record(lawyer):
+    """기존 DB에 is_mock 플래그가 없는 경우 자동 마이그레이션 (레코드 단위)"""
+    if "is_mock" in lawyer:
+        return False
+    # lawyer-1, lawyer-2, ... 패턴의 ID는 가상 변호사
+    if MOCK_ID_PATTERN.match(lawyer.get("id", "")):
+        lawyer["is_mock"] = True
+        # 가상 변호사는 검증 완료 상태로 (pending에 안 뜨게)
+        if "verified" not in lawyer:
+            lawyer["verified"] = True
+    else:
+        lawyer["is_mock"] = False
+    return True
+
 def _migrate_is_mock(lawyers):
     """기존 DB에 is_mock 플래그가 없는 경우 자동 마이그레이션"""
-    import re
     migrated = False
     for lawyer in lawyers:
-        if "is_mock" not in lawyer:
-            # lawyer-1, lawyer-2, ... 패턴의 ID는 가상 변호사
-            if re.match(r'^lawyer-\d+$', lawyer.get("id", "")):
-                lawyer["is_mock"] = True
-                # 가상 변호사는 검증 완료 상태로 (pending에 안 뜨게)
-                if "verified" not in lawyer:
-                    lawyer["verified"] = True
-            else:
-                lawyer["is_mock"] = False
-            migrated = True
+        migrated = _migrate_record(lawyer) or migrated
     if migrated:
         print("✅ is_mock 플래그 마이그레이션 완료")
     return migrated
 
-def _backup_real_lawyers(lawyers):
+def _is_real_lawyer(lawyer):
+    # lawyer-N 패턴 ID도 가상으로 간주
+    return not lawyer.get("is_mock", False) and not MOCK_ID_PATTERN.match(lawyer.get("id", ""))
+
+def _backup_real_lawyers(lawyers, directory=None):
     """실제 가입 변호사 데이터를 별도 파일로 백업"""
     real_lawyers = [l for l in lawyers if not l.get("is_mock", False)]
     if real_lawyers:
-        backup_file = os.path.join(os.path.dirname(DB_FILE) or ".", "real_lawyers_backup.json")
+        backup_file = os.path.join(directory or os.path.dirname(DB_FILE) or ".", "real_lawyers_backup.json")
         try:
-            with open(backup_file, "w", encoding="utf-8") as f:
-                json.dump(real_lawyers, f, ensure_ascii=False, indent=2)
+            _write_json_atomic(backup_file, real_lawyers)
             print(f"💾 실제 변호사 {len(real_lawyers)}명 백업 완료 → {backup_file}")
         except Exception as e:
             print(f"⚠️ 실제 변호사 백업 실패: {e}")
 
+def _iter_supabase_lawyers(sb, page_size=LAWYERS_PAGE_SIZE):
+    """lawyers 테이블을 id 순 페이지 단위로 스트리밍 (필요한 칼럼만, 가상 변호사 행 제외)"""
+    start = 0
+    while True:
+        response = (sb.table("lawyers").select(_LAWYER_COLUMNS)
+                    .or_("is_mock.is.null,is_mock.eq.false")  # NULL도 실제 변호사 (eq false는 NULL 행을 버림)
+                    .order("id").range(start, start + page_size - 1).execute())
+        rows = response.data or []
+        for row in rows:
+            # JSONB 'data' 칼럼에서 변호사 dict를 복원
+            lawyer = row.get("data") or {}
+            # DB 칼럼 값으로 최신 상태 동기화
+            lawyer["id"] = row["id"]
+            lawyer["is_mock"] = bool(row.get("is_mock"))
+            lawyer["verified"] = row.get("verified", False)
+            yield lawyer
+        if len(rows) < page_size:
+            return
+        start += page_size
+
 def _load_from_supabase():
-    """Supabase에서 변호사 데이터를 로드합니다."""
+    """Supabase에서 실제 변호사 데이터를 페이지 단위로 로드합니다 (레코드별 보정 + 저장 상태 기록)."""
     try:
         from supabase_client import get_supabase  # type: ignore
         sb = get_supabase()
         if sb is None:
             return None
-        
-        response = sb.table("lawyers").select("*").execute()
-        if response.data:
-            # JSONB 'data' 칼럼에서 변호사 dict를 복원
-            lawyers = []
-            for row in response.data:
-                lawyer = row.get("data", {})
-                # DB 칼럼 값으로 최신 상태 동기화
-                lawyer["id"] = row["id"]
-                lawyer["is_mock"] = row.get("is_mock", False)
-                lawyer["verified"] = row.get("verified", False)
-                lawyers.append(lawyer)
+
+        lawyers = []
+        skipped = 0
+        for lawyer in _iter_supabase_lawyers(sb, LAWYERS_PAGE_SIZE):
+            if not _is_real_lawyer(lawyer):
+                skipped += 1
+                continue
+            _prepare_lawyer(lawyer, len(lawyers))
+            # 로드한 상태가 곧 저장된 상태: 이후 save_lawyers_db는 바뀐 행만 upsert (보정 필드만으로는 쓰지 않음)
+            _PERSISTED_FINGERPRINTS[lawyer["id"]] = _fingerprint(lawyer)
+            lawyers.append(lawyer)
+        if skipped:
+            print(f"🗑️ 가상 변호사 {skipped}명 제외 (실제 {len(lawyers)}명 유지)")
+        if lawyers:
             print(f"✅ Supabase에서 변호사 {len(lawyers)}명 로드 완료")
-            return lawyers
         else:
             print("📭 Supabase 테이블이 비어 있습니다")
-            return []
+        return lawyers
     except Exception as e:
         print(f"⚠️ Supabase 로드 실패: {e}")
         return None
@@ -378,16 +416,8 @@ def _delete_mock_from_supabase():
 
 def _filter_real_lawyers(lawyers):
     """is_mock=True인 가상 변호사를 필터링합니다."""
-    import re
-    real = []
-    mock_count = 0
-    for lawyer in lawyers:
-        is_mock = lawyer.get("is_mock", False)
-        # lawyer-N 패턴 ID도 가상으로 간주
-        if not is_mock and not re.match(r'^lawyer-\d+$', lawyer.get("id", "")):
-            real.append(lawyer)
-        else:
-            mock_count += 1  # type: ignore
+    real = [lawyer for lawyer in lawyers if _is_real_lawyer(lawyer)]
+    mock_count = len(lawyers) - len(real)
     if mock_count > 0:
         print(f"🗑️ 가상 변호사 {mock_count}명 필터링 완료 (실제 {len(real)}명 유지)")
     return real
@@ -455,66 +485,6 @@ _KIM_WON_YOUNG_SEED = {
 }
 
 
-def load_lawyers_db():
-    # 1. Supabase 시도
-    supabase_lawyers = _load_from_supabase()
-    if supabase_lawyers is not None and len(supabase_lawyers) > 0:
-        # 마이그레이션: 기존 데이터에 is_mock 플래그 추가
-        if _migrate_is_mock(supabase_lawyers):
-            _save_to_supabase(supabase_lawyers)
-        # ★ 가상 변호사 필터링
-        real_lawyers = _filter_real_lawyers(supabase_lawyers)
-        # Supabase에서도 가상 변호사 삭제
-        if len(real_lawyers) < len(supabase_lawyers):
-            _delete_mock_from_supabase()
-            save_lawyers_db(real_lawyers)  # JSON도 업데이트
-        return real_lawyers
-
-    # 2. JSON 파일 폴백 (로컬 개발 또는 최초 시드)
-    if os.path.exists(DB_FILE):
-        try:
-            with open(DB_FILE, "r", encoding="utf-8") as f:
-                print(f"Loading DB from {DB_FILE}")
-                lawyers = json.load(f)
-                # 마이그레이션: 기존 데이터에 is_mock 플래그 추가
-                if _migrate_is_mock(lawyers):
-                    pass  # will be saved below
-                # ★ 가상 변호사 필터링
-                real_lawyers = _filter_real_lawyers(lawyers)
-                # 필터링된 결과 저장
-                if len(real_lawyers) < len(lawyers):
-                    save_lawyers_db(real_lawyers)
-                # Supabase가 비어 있었다면 실제 데이터만 업로드
-                if supabase_lawyers is not None and len(supabase_lawyers) == 0 and real_lawyers:
-                    print("📤 JSON → Supabase 초기 시드 업로드 시작...")
-                    _save_to_supabase(real_lawyers)
-                return real_lawyers
-        except Exception as e:
-            print(f"Failed to load DB: {e}. Starting fresh.")
-
-    # 3. 데이터가 없으면 시드 유저만 생성 (가상 변호사 생성 안 함)
-    print("📋 DB 없음 → 시드 유저(김원영)만 생성")
-    lawyers = [_KIM_WON_YOUNG_SEED.copy()]
-    save_lawyers_db(lawyers)
-    return lawyers
-
-def save_lawyers_db(db):
-    # 1. JSON 파일 저장 (로컬 캐시)
-    try:
-        with open(DB_FILE, "w", encoding="utf-8") as f:
-            json.dump(db, f, ensure_ascii=False, indent=2)
-        print("DB Saved (JSON)")
-    except Exception as e:
-        print(f"JSON 저장 실패 (서버리스 환경에서는 정상): {e}")
-    
-    # 2. Supabase에도 저장 (프로덕션용)
-    _save_to_supabase(db)
-    
-    # 3. 실제 변호사 데이터 자동 백업
-    _backup_real_lawyers(db)
-
-LAWYERS_DB = load_lawyers_db()
-
 # Local images map
 LOCAL_IMAGES = {
     "Male": [
@@ -529,47 +499,210 @@ LOCAL_IMAGES = {
     ]
 }
 
-# Assign random avatars and ensure essential fields exist
-updated = False
-for i, lawyer in enumerate(LAWYERS_DB):
+def _prepare_lawyer(lawyer, i):
+    """
+    누락 필드 보정 (로드 시 레코드별, 메모리에서만).
+    변호사 id로 시드한 난수를 써서 콜드 스타트마다 같은 값이 나옴 → 따로 저장할 필요 없음.
+    """
+    rng = random.Random(lawyer.get("id", i))
+
     # 1. Backfill Image
     if not lawyer.get("imageUrl"):
-        is_female = random.choice([True, False])
-        gender = "Female" if is_female else "Male"
+        gender = "Female" if rng.choice([True, False]) else "Male"
         lawyer["gender"] = gender
         images_pool = LOCAL_IMAGES[gender]
-        lawyer["imageUrl"] = images_pool[i % len(images_pool)]
-        updated = True
+        lawyer["imageUrl"] = rng.choice(images_pool)
 
     # 2. Backfill Kakao ID
     if not lawyer.get("kakao_id"):
-        lawyer["kakao_id"] = f"lawyer_{random.randint(100, 999)}"
-        updated = True
+        lawyer["kakao_id"] = f"lawyer_{rng.randint(100, 999)}"
 
     # 3. Backfill Homepage
     if not lawyer.get("homepage"):
-        lawyer["homepage"] = f"https://lawfirm-{i}.com"
-        updated = True
+        lawyer["homepage"] = f"https://lawfirm-{rng.randint(1000, 9999)}.com"
 
     # 4. Backfill Cases (if empty)
     if not lawyer.get("cases"):
         # Borrow from templates based on their expertise or random if not found
-        specialty = lawyer.get("expertise", ["형사법 전문"])[0]
+        specialty = (lawyer.get("expertise") or ["형사법 전문"])[0]
         # Fallback if specialty not in templates
-        template_key = specialty if specialty in CASE_TEMPLATES else random.choice(list(CASE_TEMPLATES.keys()))
-        
+        template_key = specialty if specialty in CASE_TEMPLATES else rng.choice(list(CASE_TEMPLATES.keys()))
+
         # Pick 3 random cases
         case_pool = CASE_TEMPLATES[template_key]
         lawyer["cases"] = []
         for _ in range(3):
-            case_template = random.choice(case_pool)
+            case_template = rng.choice(case_pool)
             lawyer["cases"].append({
                 "title": case_template[0],
                 "summary": case_template[1]
             })
-        updated = True
 
-if updated:
-    print("Backfilled missing data for lawyers.")
-    save_lawyers_db(LAWYERS_DB)
+def prepare_lawyers(lawyers):
+    """다른 경로로 다시 읽어 들인 목록에도 로드 시 보정을 같은 방식으로 적용"""
+    for i, lawyer in enumerate(lawyers):
+        _prepare_lawyer(lawyer, i)
+    return lawyers
+
+def load_lawyers_db():
+    """
+    임포트 시 호출. 전체 저장(save_lawyers_db)을 하지 않음:
+    마이그레이션 / 누락 필드 보정은 레코드별로 메모리에서만 적용되고, 해당 변호사가 다음에 저장될 때 함께 기록됨.
+    """
+    # 1. Supabase 시도 (페이지 단위 스트리밍)
+    supabase_lawyers = _load_from_supabase()
+    if supabase_lawyers:
+        return supabase_lawyers
+
+    # 2. JSON 파일 폴백 (로컬 개발 또는 최초 시드)
+    if os.path.exists(DB_FILE):
+        try:
+            with open(DB_FILE, "r", encoding="utf-8") as f:
+                print(f"Loading DB from {DB_FILE}")
+                lawyers = json.load(f)
+            # ★ 가상 변호사 필터링 (레코드별 마이그레이션 포함)
+            real_lawyers = []
+            for lawyer in lawyers:
+                _migrate_record(lawyer)
+                if _is_real_lawyer(lawyer):
+                    _prepare_lawyer(lawyer, len(real_lawyers))
+                    real_lawyers.append(lawyer)
+            if len(real_lawyers) < len(lawyers):
+                print(f"🗑️ 가상 변호사 {len(lawyers) - len(real_lawyers)}명 필터링 완료 (실제 {len(real_lawyers)}명 유지)")
+            # Supabase가 비어 있었다면 실제 데이터만 업로드 (최초 1회 시드)
+            if supabase_lawyers is not None and real_lawyers:
+                print("📤 JSON → Supabase 초기 시드 업로드 시작...")
+                if _save_to_supabase(real_lawyers):
+                    _remember_persisted(real_lawyers)
+            return real_lawyers
+        except Exception as e:
+            print(f"Failed to load DB: {e}. Starting fresh.")
+
+    # 3. 데이터가 없으면 시드 유저만 생성 (가상 변호사 생성 안 함)
+    print("📋 DB 없음 → 시드 유저(김원영)만 생성")
+    lawyers = [_KIM_WON_YOUNG_SEED.copy()]
+    _prepare_lawyer(lawyers[0], 0)
+    save_lawyers_db(lawyers)
+    return lawyers
+
+# save_lawyers_db 이후 호출되는 콜백 (예: 검색 필터 인덱스 무효화)
+_SAVE_LISTENERS = []
+
+def on_lawyers_db_saved(callback):
+    _SAVE_LISTENERS.append(callback)
+
+# --- 변경 추적 저장 ---
+# 마지막으로 Supabase에 저장된 변호사별 지문(fingerprint). 바뀐 행만 upsert.
+_PERSISTED_FINGERPRINTS = {}
+SNAPSHOT_DELAY = float(os.environ.get("LAWYERS_DB_SNAPSHOT_DELAY", "1.0"))  # JSON 스냅샷 디바운스 (초)
+
+def _fingerprint(lawyer):
+    payload = json.dumps(lawyer, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+def _remember_persisted(lawyers):
+    """이미 Supabase에 있는 상태로 간주 (로드 직후 / 전체 업로드 후)"""
+    _PERSISTED_FINGERPRINTS.clear()
+    for lawyer in lawyers:
+        _PERSISTED_FINGERPRINTS[lawyer["id"]] = _fingerprint(lawyer)
+
+def _changed_lawyers(lawyers):
+    """주어진 변호사 중 마지막 저장 이후 내용이 바뀌었거나 새로 추가된 변호사와 그 지문"""
+    changed = []
+    for lawyer in lawyers:
+        fp = _fingerprint(lawyer)
+        if _PERSISTED_FINGERPRINTS.get(lawyer.get("id")) != fp:
+            changed.append((lawyer, fp))
+    return changed
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _SnapshotWriter:
+    """
+    lawyers_db.json / real_lawyers_backup.json 스냅샷을 백그라운드에서 디바운스 후 원자적으로 기록.
+    연속 저장 요청은 마지막 상태 한 번으로 합쳐짐.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._pending = None  # (db, db_path)
+        self._timer = None
+
+    def schedule(self, db):
+        with self._lock:
+            # 경로는 요청 시점 기준 (작업 디렉터리가 바뀌어도 같은 파일에 기록)
+            self._pending = (db, os.path.abspath(DB_FILE))
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if pending is None:
+            return
+        db, db_path = pending
+        for attempt in range(3):
+            try:
+                # 다른 스레드가 수정 중이면 직렬화가 실패할 수 있으므로 재시도
+                snapshot = json.loads(json.dumps(db, ensure_ascii=False, default=str))
+                break
+            except RuntimeError:
+                time.sleep(0.05)
+        else:
+            print("JSON 스냅샷 직렬화 실패, 다음 저장 때 재시도")
+            return
+        try:
+            _write_json_atomic(db_path, snapshot)
+            print("DB Saved (JSON)")
+        except Exception as e:
+            print(f"JSON 저장 실패 (서버리스 환경에서는 정상): {e}")
+        _backup_real_lawyers(snapshot, os.path.dirname(db_path))
+
+_snapshot_writer = _SnapshotWriter(SNAPSHOT_DELAY)
+atexit.register(_snapshot_writer.flush)
+
+def flush_lawyers_db():
+    """대기 중인 JSON 스냅샷을 즉시 기록 (종료 / 테스트용)"""
+    _snapshot_writer.flush()
+
+def save_lawyers_db(db, changed=None):
+    """
+    changed: 이번 요청에서 수정 / 추가한 변호사 목록 (삭제만 했으면 []). 그 변호사들만 지문 비교 후 upsert.
+    None이면 전체 변호사를 직렬화해 지문을 비교하는 스윕 (어디가 바뀌었는지 모르는 저장용 폴백)
+    """
+    # 0. 인메모리 파생 인덱스 무효화
+    for callback in _SAVE_LISTENERS:
+        try:
+            callback(db)
+        except Exception as e:
+            print(f"save listener 실패: {e}")
+
+    # 1. Supabase: 마지막 저장 이후 바뀐 변호사만 upsert (프로필 수정 1건 = 1행)
+    dirty = _changed_lawyers(db if changed is None else changed)
+    if dirty:
+        lawyers = [lawyer for lawyer, _ in dirty]
+        ok = _save_single_to_supabase(lawyers[0]) if len(lawyers) == 1 else _save_to_supabase(lawyers)
+        if ok:
+            for lawyer, fp in dirty:
+                _PERSISTED_FINGERPRINTS[lawyer["id"]] = fp
+
+    # 2. JSON 파일 (로컬 캐시) + 실제 변호사 백업: 디바운스 후 백그라운드에서 원자적으로 기록
+    _snapshot_writer.schedule(db)
+
+LAWYERS_DB = load_lawyers_db()
 
+# id / 콘텐츠 id / slug 조회는 LAWYERS를 통해 (LAWYERS_DB와 같은 리스트 객체를 감쌈)
+LAWYERS = LawyerRepository(LAWYERS_DB)
@@ -0,0 +1,225 @@
+"""
+Embedding Store Module
+- SearchEngine 코퍼스 임베딩을 바이너리(float32/float16) 파일로 저장
+- np.memmap으로 열어 워커 프로세스 간 페이지 공유 (JSON 파싱 없이 즉시 로드)
+- meta.json에 포맷 버전 / dtype / shape / CRC32 체크섬 기록
+- 세대(generation)별 파일(vectors-<gen>.bin / mapping-<gen>.json)에 쓰고 meta.json 교체 한 번으로 커밋
+- 기존 embeddings_cache.json은 최초 로드 시 자동 마이그레이션
+"""
+
+import os
+import re
+import json
+import zlib
+import secrets
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np  # type: ignore
+
+STORE_VERSION = 2
+LEGACY_STORE_VERSIONS = (1,)  # 고정 파일명(vectors.bin / mapping.json)을 쓰던 포맷
+SUPPORTED_DTYPES = ("float32", "float16")
+
+VECTORS_FILE = "vectors.bin"
+MAPPING_FILE = "mapping.json"
+META_FILE = "meta.json"
+
+_GENERATION_FILE = re.compile(r"^(?:vectors|mapping)-(\d+)-[0-9a-f]+\.(?:bin|json)$")
+
+_CHECKSUM_CHUNK = 16 * 1024 * 1024  # 16MB 단위로 CRC 계산
+
+
+def _crc32_of(buffer) -> str:
+    """바이트 버퍼(memmap 포함)의 CRC32를 청크 단위로 계산"""
+    view = memoryview(buffer).cast("B")
+    crc = 0
+    for start in range(0, len(view), _CHECKSUM_CHUNK):
+        crc = zlib.crc32(view[start:start + _CHECKSUM_CHUNK], crc)
+    return f"{crc & 0xFFFFFFFF:08x}"
+
+
+def _write_atomic(path: str, data: bytes):
+    """임시 파일에 쓴 뒤 os.replace로 교체 (쓰기 도중 크래시 시 기존 파일 보존)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class EmbeddingStoreError(Exception):
+    pass
+
+
+class EmbeddingStore:
+    """
+    디렉터리 하나에 vectors-<gen>.bin / mapping-<gen>.json / meta.json 을 저장합니다.
+    save는 매번 새 세대 파일을 쓰고 meta.json(파일명 + 체크섬)을 마지막에 교체하는 것이 유일한 커밋 지점입니다.
+    - 읽는 쪽은 meta가 가리키는 한 쌍만 열므로 새 vectors와 옛 mapping이 섞일 수 없음
+    - 메모리 매핑 중인 파일을 덮어쓰지 않음 (Windows에서는 매핑된 파일의 교체/삭제가 실패)
+    - 직전 세대는 남겨 두고 그보다 오래된 세대만 정리, 삭제 실패(매핑 중)는 다음 save에서 재시도
+    """
+
+    def __init__(self, directory: str, dtype: str = "float32"):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype} (expected one of {SUPPORTED_DTYPES})")
+        self.directory = directory
+        self.dtype = dtype
+
+    @property
+    def vectors_path(self) -> str:
+        """현재 meta.json이 가리키는 vectors 파일 경로"""
+        return self._paths(self._current_meta())[0]
+
+    @property
+    def mapping_path(self) -> str:
+        """현재 meta.json이 가리키는 mapping 파일 경로"""
+        return self._paths(self._current_meta())[1]
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.directory, META_FILE)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.meta_path)
+
+    def _current_meta(self) -> Dict:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _paths(self, meta: Dict) -> Tuple[str, str]:
+        """meta에 기록된 (vectors, mapping) 경로, 구버전 meta는 고정 파일명"""
+        return (
+            os.path.join(self.directory, os.path.basename(meta.get("vectors_file") or VECTORS_FILE)),
+            os.path.join(self.directory, os.path.basename(meta.get("mapping_file") or MAPPING_FILE)),
+        )
+
+    def save(self, embeddings, mapping: List[Dict], model: str = "") -> Dict:
+        """임베딩 행렬과 매핑을 저장하고 meta dict를 반환"""
+        matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=self.dtype))
+        if matrix.ndim != 2:
+            raise EmbeddingStoreError(f"embeddings must be 2-D, got shape {matrix.shape}")
+        if matrix.shape[0] != len(mapping):
+            raise EmbeddingStoreError(f"row count {matrix.shape[0]} != mapping length {len(mapping)}")
+
+        os.makedirs(self.directory, exist_ok=True)
+        previous = self._current_meta()
+        generation = int(previous.get("generation") or 0) + 1
+        # 같은 세대 번호로 동시에 저장하는 다른 워커와 파일명이 겹치지 않도록 임의 토큰을 붙임
+        tag = f"{generation}-{secrets.token_hex(4)}"
+
+        raw = matrix.tobytes()
+        mapping_bytes = json.dumps(mapping, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        meta = {
+            "version": STORE_VERSION,
+            "dtype": self.dtype,
+            "count": int(matrix.shape[0]),
+            "dim": int(matrix.shape[1]),
+            "model": model,
+            "checksum": _crc32_of(raw),
+            "mapping_checksum": _crc32_of(mapping_bytes),
+            "generation": generation,
+            "vectors_file": f"vectors-{tag}.bin",
+            "mapping_file": f"mapping-{tag}.json",
+        }
+
+        vectors_path, mapping_path = self._paths(meta)
+        _write_atomic(vectors_path, raw)
+        _write_atomic(mapping_path, mapping_bytes)
+        _write_atomic(self.meta_path, json.dumps(meta, indent=2).encode("utf-8"))  # 커밋 지점
+
+        keep = {os.path.basename(p) for p in self._paths(meta)}
+        if previous:
+            keep.update(os.path.basename(p) for p in self._paths(previous))
+        self._collect_garbage(keep)
+        return meta
+
+    def _collect_garbage(self, keep):
+        """
+        keep(현재 + 직전 세대)에 없는 세대 파일과 구버전 고정 파일을 삭제합니다.
+        직전 세대는 방금 옛 meta를 읽은 워커가 아직 열지 않았을 수 있어 한 번 더 남겨 둡니다.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name in keep:
+                continue
+            if not (_GENERATION_FILE.match(name) or name in (VECTORS_FILE, MAPPING_FILE)):
+                continue
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass  # 아직 매핑 중(Windows) → 다음 save에서 다시 시도
+
+    def read_meta(self) -> Dict:
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION and meta.get("version") not in LEGACY_STORE_VERSIONS:
+            raise EmbeddingStoreError(f"Unsupported store version: {meta.get('version')}")
+        if meta.get("dtype") not in SUPPORTED_DTYPES:
+            raise EmbeddingStoreError(f"Unsupported store dtype: {meta.get('dtype')}")
+        return meta
+
+    def load(self, verify: bool = True) -> Tuple[np.ndarray, List[Dict], Dict]:
+        """
+        (vectors, mapping, meta) 를 반환합니다.
+        vectors는 읽기 전용 np.memmap 이므로 여러 워커가 같은 페이지 캐시를 공유합니다.
+        경로는 한 번 읽은 meta에서만 정하므로 동시에 save가 일어나도 같은 세대의 파일 쌍을 엽니다.
+        verify=True는 vectors 파일 전체를 읽어 CRC를 확인 (지연 로드가 무의미해짐) → 기동 후 verify_vectors를 백그라운드로 권장
+        """
+        meta = self.read_meta()
+        vectors_path, mapping_path = self._paths(meta)
+        dtype = np.dtype(meta["dtype"])
+        count, dim = int(meta["count"]), int(meta["dim"])
+
+        expected_size = count * dim * dtype.itemsize
+        actual_size = os.path.getsize(vectors_path)
+        if actual_size != expected_size:
+            raise EmbeddingStoreError(f"{os.path.basename(vectors_path)} size {actual_size} != expected {expected_size}")
+
+        with open(mapping_path, "rb") as f:
+            mapping_bytes = f.read()
+        if verify and _crc32_of(mapping_bytes) != meta.get("mapping_checksum"):
+            raise EmbeddingStoreError("mapping checksum mismatch")
+        mapping = json.loads(mapping_bytes.decode("utf-8"))
+        if len(mapping) != count:
+            raise EmbeddingStoreError(f"mapping length {len(mapping)} != count {count}")
+
+        if count == 0:
+            return np.zeros((0, dim), dtype=dtype), mapping, meta
+
+        vectors = np.memmap(vectors_path, dtype=dtype, mode="r", shape=(count, dim))
+        if verify and not self.verify_vectors(vectors, meta):
+            raise EmbeddingStoreError("vectors checksum mismatch")
+        return vectors, mapping, meta
+
+    @staticmethod
+    def verify_vectors(vectors, meta: Dict) -> bool:
+        """load(verify=False)로 연 벡터의 CRC 확인 (전체 읽기)"""
+        if len(vectors) == 0:
+            return True
+        return _crc32_of(vectors) == meta.get("checksum")
+
+    def migrate_json_cache(self, json_path: str, model: str = "") -> Optional[Dict]:
+        """
+        기존 embeddings_cache.json ({"embeddings": [...], "mapping": [...]}) 을 바이너리 스토어로 변환.
+        원본 JSON 파일은 삭제하지 않습니다.
+        """
+        if not os.path.exists(json_path):
+            return None
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        embeddings = data.get("embeddings") or []
+        mapping = data.get("mapping") or []
+        if not embeddings:
+            return None
+        meta = self.save(np.asarray(embeddings, dtype=self.dtype), mapping, model=model)
+        print(f"✅ {json_path} → {self.directory} 마이그레이션 완료 ({meta['count']}건, {self.dtype})")
+        return meta
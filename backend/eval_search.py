@@ -0,0 +1,131 @@
+"""
+추천 검색 오프라인 평가: vector vs hybrid (BM25 + 벡터 RRF) 모드 비교 (recall@k / MRR / nDCG@k / 쿼리 지연)
+
+사용법:
+    EMBEDDING_BACKEND=fake python eval_search.py --from-cases 200      # 사례 제목 → 보유 변호사 (known-item) 자동 라벨
+    python eval_search.py --queries eval_queries.json --k 10
+    python eval_search.py --queries eval_queries.json --modes hybrid --rrf-k 30 --lexical-weight 0.5
+
+라벨 파일 형식 (JSON 리스트):
+    [{"query": "준강간 혐의 무죄", "relevant": ["lawyer-id", ...], "location": "서울"}, ...]
+    location / gender / education / career가 있으면 /api/recommend와 같은 하드 필터로 전달.
+
+평가는 실제 SearchEngine.search를 그대로 호출하므로 후보 필터 / ANN / 점수 계산이 운영 경로와 같다.
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+from typing import Dict, List, Sequence
+
+FILTER_KEYS = ("location", "gender", "education", "career")
+
+
+def recall_at_k(ranked: Sequence[str], relevant: Sequence[str], k: int) -> float:
+    if not relevant:
+        return 0.0
+    return len(set(ranked[:k]) & set(relevant)) / len(set(relevant))
+
+
+def reciprocal_rank(ranked: Sequence[str], relevant: Sequence[str]) -> float:
+    wanted = set(relevant)
+    for rank, lawyer_id in enumerate(ranked, start=1):
+        if lawyer_id in wanted:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(ranked: Sequence[str], relevant: Sequence[str], k: int) -> float:
+    wanted = set(relevant)
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, lawyer_id in enumerate(ranked[:k], start=1) if lawyer_id in wanted)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(wanted), k) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+def queries_from_cases(lawyers: List[Dict], count: int, seed: int = 0) -> List[Dict]:
+    """사례 제목을 질의로, 같은 제목의 사례를 가진 변호사들을 정답으로 하는 known-item 라벨"""
+    owners: Dict[str, set] = {}
+    for lawyer in lawyers:
+        for case in lawyer.get("cases") or []:
+            if case.get("title"):
+                owners.setdefault(case["title"], set()).add(lawyer["id"])
+    titles = sorted(owners)
+    random.Random(seed).shuffle(titles)
+    return [{"query": title, "relevant": sorted(owners[title])} for title in titles[:count]]
+
+
+def evaluate(engine, labelled: List[Dict], mode: str, k: int) -> Dict:
+    totals = {"recall": 0.0, "mrr": 0.0, "ndcg": 0.0}
+    latencies = []
+    for sample in labelled:
+        filters = {key: sample[key] for key in FILTER_KEYS if sample.get(key)}
+        start = time.perf_counter()
+        result = engine.search(sample["query"], top_k=k, mode=mode, **filters)
+        latencies.append(time.perf_counter() - start)
+        ranked = [lawyer["id"] for lawyer in result["lawyers"]]
+        totals["recall"] += recall_at_k(ranked, sample["relevant"], k)
+        totals["mrr"] += reciprocal_rank(ranked, sample["relevant"])
+        totals["ndcg"] += ndcg_at_k(ranked, sample["relevant"], k)
+    n = max(len(labelled), 1)
+    latencies.sort()
+    return {
+        "mode": mode,
+        "queries": len(labelled),
+        f"recall@{k}": totals["recall"] / n,
+        "mrr": totals["mrr"] / n,
+        f"ndcg@{k}": totals["ndcg"] / n,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", help="labelled query file (JSON)")
+    parser.add_argument("--from-cases", type=int, default=0, help="generate N known-item queries from case titles")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=["vector", "hybrid"])
+    parser.add_argument("--rrf-k", type=int, help="override RRF_K")
+    parser.add_argument("--lexical-weight", type=float, help="override LEXICAL_WEIGHT")
+    parser.add_argument("--output", help="write the metrics as JSON")
+    args = parser.parse_args()
+
+    import search  # type: ignore
+    from data import LAWYERS_DB  # type: ignore
+
+    if args.rrf_k is not None:
+        search.RRF_K = args.rrf_k
+    if args.lexical_weight is not None:
+        search.LEXICAL_WEIGHT = args.lexical_weight
+
+    labelled = []
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            labelled.extend(json.load(f))
+    if args.from_cases:
+        labelled.extend(queries_from_cases(LAWYERS_DB, args.from_cases))
+    if not labelled:
+        parser.error("no queries: pass --queries and/or --from-cases")
+
+    engine = search.search_engine
+    engine.load_index()
+    engine.build_ann_index(background=False)  # measure the steady state, not the exact fallback during training
+    engine.build_lexical_index(background=False)  # rows loaded from the store get their BM25 documents
+    print(f"corpus {len(engine.mapping)} rows / {len(engine._lawyer_ids)} lawyers, {len(labelled)} queries, k={args.k}")
+
+    report = []
+    for mode in args.modes:
+        engine.search(labelled[0]["query"], top_k=args.k, mode=mode)  # warm up (query analysis / embedding caches)
+        metrics = evaluate(engine, labelled, mode, args.k)
+        report.append(metrics)
+        print(f"{mode:>8}  " + "  ".join(f"{key} {value:.3f}" for key, value in metrics.items() if isinstance(value, float)))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
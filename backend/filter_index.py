@@ -0,0 +1,108 @@
+"""
+Lawyer Filter Index Module
+- 검색 하드 필터(gender / education / careerTags / location / expertise)를 값별 정렬된 위치 배열로 보관
+- search()는 필터를 먼저 풀어 살아남은 변호사의 행에 대해서만 유사도를 계산
+- 위치(position)는 인덱싱한 lawyers 리스트(LAWYERS_DB)의 인덱스
+- location은 기존 동작과 같은 부분 문자열 매칭: 서로 다른 location 값(수백 개 이하)만 훑어서 합집합
+- save_lawyers_db 리스너 또는 invalidate()로 무효화, 다음 조회 시 재빌드
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np  # type: ignore
+
+SINGLE_FIELDS = ("gender", "education", "location")
+MULTI_FIELDS = ("careerTags", "expertise")
+
+_EMPTY = np.zeros(0, dtype=np.int32)
+
+
+class LawyerFilterIndex:
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, np.ndarray]] = {}
+        self._by_id: Dict[str, int] = {}
+        self._size = -1
+        self._dirty = True
+
+    def invalidate(self, *_args):
+        """변호사 데이터가 바뀌었을 때 호출 (save_lawyers_db 리스너 시그니처 호환)"""
+        self._dirty = True
+
+    def build(self, lawyers: List[Dict]):
+        buckets: Dict[str, Dict[str, List[int]]] = {f: {} for f in SINGLE_FIELDS + MULTI_FIELDS}
+        self._by_id = {}
+        for pos, lawyer in enumerate(lawyers):
+            self._by_id[lawyer["id"]] = pos
+            for field in SINGLE_FIELDS:
+                value = lawyer.get(field) or ""
+                buckets[field].setdefault(value, []).append(pos)
+            for field in MULTI_FIELDS:
+                for value in set(lawyer.get(field) or []):
+                    buckets[field].setdefault(value, []).append(pos)
+
+        self._postings = {
+            field: {value: np.asarray(ids, dtype=np.int32) for value, ids in values.items()}
+            for field, values in buckets.items()
+        }
+        self._size = len(lawyers)
+        self._dirty = False
+
+    def ensure(self, lawyers: List[Dict]):
+        """무효화되었거나 변호사 수가 바뀌었으면 재빌드"""
+        if self._dirty or self._size != len(lawyers):
+            self.build(lawyers)
+
+    def positions_of(self, lawyer_ids) -> List[int]:
+        """변호사 id → 위치 (오름차순, 없는 id는 제외)"""
+        return sorted(self._by_id[i] for i in lawyer_ids if i in self._by_id)
+
+    def _exact(self, field: str, value: str) -> np.ndarray:
+        return self._postings.get(field, {}).get(value, _EMPTY)
+
+    def _union(self, arrays: List[np.ndarray]) -> np.ndarray:
+        arrays = [a for a in arrays if len(a)]
+        if not arrays:
+            return _EMPTY
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays))
+
+    def _location(self, location: str) -> np.ndarray:
+        values = self._postings.get("location", {})
+        return self._union([ids for value, ids in values.items() if location in value])
+
+    def select(
+        self,
+        gender: Optional[str] = None,
+        education: Optional[str] = None,
+        career: Optional[str] = None,
+        location: Optional[str] = None,
+        expertise: Optional[List[str]] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        필터를 모두 만족하는 변호사 위치(오름차순)를 반환.
+        필터가 하나도 없으면 None (= 전체).
+        expertise는 목록 중 하나라도 보유하면 통과.
+        """
+        sets = []
+        if gender:
+            sets.append(self._exact("gender", gender))
+        if education:
+            sets.append(self._exact("education", education))
+        if career:
+            sets.append(self._exact("careerTags", career))
+        if location:
+            sets.append(self._location(location))
+        if expertise:
+            sets.append(self._union([self._exact("expertise", tag) for tag in expertise]))
+        if not sets:
+            return None
+
+        # 작은 집합부터 교집합
+        sets.sort(key=len)
+        result = sets[0]
+        for ids in sets[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, ids, assume_unique=True)
+        return result
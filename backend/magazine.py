@@ -0,0 +1,389 @@
+"""
+Magazine Feed (materialized)
+- /api/magazine 응답을 미리 계산해 메모리에 유지: 날짜 내림차순 정렬 + 제목 중복 제거 + enrichment 적용 상태
+- 커버 이미지는 cover_utils로 기사 id에서 결정적으로 배정 → 같은 기사는 항상 같은 URL
+- 변호사 단위 증분 갱신: 콘텐츠 제출 / 승인 / 공개 전환 / 삭제 / 프로필 변경 시 refresh_lawyer(lawyer)
+    · 기사 정렬 키 (date, lawyer_id, item_id), 정규화 제목별 후보 목록 → 제목마다 최신 1건만 피드에 노출
+    · 대표 기사가 빠지면 같은 제목의 다음 후보가 자동으로 올라옴
+- 목록은 카드 필드만 (본문 content 제외, 본문은 /api/magazine/{id}):
+    · payload(): 전체 카드 배열의 직렬화 JSON + ETag를 변경 시에만 다시 만듦 (If-None-Match → 304)
+    · page(): 정렬 인덱스 위 커서 페이지네이션, 커서 = (date, lawyer_id, id). 카테고리 / 태그별 정렬 인덱스도 유지
+    · page(q=...): 노출 기사 전문 검색 (text_index 역색인, BM25F), 노출 / 숨김 시 증분 갱신
+      페이지 끝 (offset + limit)까지만 순위 계산 (top-k), total은 매칭 문서 수
+- bind(lawyers) + invalidate(): 저장 리스너로 무효화하고 다음 조회 때 다시 만드는 지연 모드 (Vercel API)
+"""
+
+import re
+import os
+import json
+import base64
+import hashlib
+import threading
+import urllib.parse
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from cover_utils import assign_cover  # type: ignore
+from text_index import TextIndex  # type: ignore
+
+MAGAZINE_TYPES = ("column", "case")
+MAGAZINE_PAGE_SIZE = int(os.environ.get("MAGAZINE_PAGE_SIZE", 12))
+MAGAZINE_PAGE_MAX = 60
+CATEGORY_LABELS = {"case": "승소사례", "column": "법률칼럼", "blog": "블로그"}
+
+SortKey = Tuple[str, str, str]  # (date, lawyer_id, item_id)
+
+SEARCH_FIELDS = {"display_title": 3.0, "tags": 2.0, "lawyer_name": 2.0, "content": 1.0}
+
+
+def normalize_title(t: str) -> str:
+    # Remove extensions, special chars, standardize
+    t = re.sub(r'\.(pdf|docx|txt)$', '', t, flags=re.IGNORECASE)
+    t = re.sub(r'[_\-]', ' ', t)
+    return t.strip()
+
+
+def get_mock_enrichment(output_id: str) -> Dict:
+    """Deterministic enrichment (simulated "analysis") based on the id hash"""
+    h = sum(ord(c) for c in output_id)
+
+    durations = ["3개월", "6개월", "8개월", "1년", "1년 4개월", "2년"]
+    results = [
+        "승소 (전부 승소)", "일부 승소 (80% 인정)", "화해 권고 결정",
+        "조정 성립", "집행유예", "기소유예", "무죄 판결"
+    ]
+    issues_pool = [
+        "증거 불충분 입증", "법리적 오해 주장", "절차적 위법성 강조",
+        "피해자 합의 유도", "양형 사유 적극 소명", "재산 형성 기여도 입증",
+        "계약 해석의 다툼", "과실 비율 산정"
+    ]
+
+    return {
+        "duration": durations[h % len(durations)],
+        "result": results[(h + 1) % len(results)],
+        "key_issues": [
+            issues_pool[(h + 2) % len(issues_pool)],
+            issues_pool[(h + 5) % len(issues_pool)]
+        ]
+    }
+
+
+def is_magazine_item(item: Dict) -> bool:
+    # Verified columns/cases only: admin injected content and 'youtube' (score-only) are hidden
+    return bool(item.get("verified")) and item.get("type") in MAGAZINE_TYPES and item.get("source") != "admin_injected"
+
+
+def build_article(lawyer: Dict, item: Dict) -> Dict:
+    """피드 기사 1건 (enrichment 포함). 커버는 item의 image (없으면 assign_cover로 먼저 배정)"""
+    enrichment = get_mock_enrichment(item["id"])
+    return {
+        "id": item["id"],
+        "lawyer_id": lawyer["id"],
+        "lawyer_name": lawyer["name"],
+        "lawyer_firm": lawyer.get("firm", "Lawnald Partner"),
+        "lawyer_image": lawyer.get("cutoutImageUrl") or lawyer.get("imageUrl"),  # Frontend handles null with default icon
+        "type": item["type"],
+        "title": item["title"],
+        "summary": item.get("content", "")[:100] + "..." if item.get("content") else f"{item['title']}에 대한 법률적 분석과 해결 사례입니다.",
+        "content": item.get("content", ""),
+        "date": item.get("date") or item.get("timestamp", "")[:10] or "2025-01-01",
+        "tags": item.get("topic_tags", []),
+        "url": item.get("url"),
+        "cover_image": item.get("image"),
+        "cover_image_small": (item.get("image_variants") or {}).get("400"),  # 목록 카드용 (커버 캐시 사용 시)
+        "display_title": normalize_title(item["title"]),
+        "key_issues": enrichment["key_issues"],
+        "result_summary": enrichment["result"],
+        "duration": enrichment["duration"],
+        "category_label": CATEGORY_LABELS.get(item["type"], "기타"),
+    }
+
+
+def to_card(article: Dict) -> Dict:
+    """목록 카드: 본문(content)을 뺀 필드"""
+    return {k: v for k, v in article.items() if k != "content"}
+
+
+def _encode(value) -> str:
+    raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8"))
+    except Exception:
+        raise ValueError(f"invalid cursor: {cursor}")
+
+
+def encode_cursor(key: SortKey) -> str:
+    return _encode(list(key))
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """잘못된 커서는 ValueError"""
+    value = _decode(cursor)
+    if not isinstance(value, list) or len(value) != 3:
+        raise ValueError(f"invalid cursor: {cursor}")
+    return (str(value[0]), str(value[1]), str(value[2]))
+
+
+def decode_offset(cursor: str) -> int:
+    """검색 결과 커서 (관련도 순위 offset)"""
+    value = _decode(cursor)
+    if not isinstance(value, int) or value < 0:
+        raise ValueError(f"invalid cursor: {cursor}")
+    return value
+
+
+class MagazineFeed:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._articles: Dict[Tuple[str, str], Dict] = {}  # (lawyer_id, item_id) -> article
+        self._by_lawyer: Dict[str, Set[str]] = {}  # lawyer_id -> item ids in the feed pool
+        self._groups: Dict[str, List[SortKey]] = {}  # normalized title -> ascending sort keys
+        self._visible: List[SortKey] = []  # ascending sort keys of the newest article per title
+        self._by_category: Dict[str, List[SortKey]] = {}  # category_label -> visible keys
+        self._by_tag: Dict[str, List[SortKey]] = {}  # tag -> visible keys
+        self._cards: Dict[Tuple[str, str], Dict] = {}
+        self._search = TextIndex(SEARCH_FIELDS)  # visible articles, keyed by sort key
+        self._source: Optional[List[Dict]] = None
+        self._dirty = False
+        self.version = 0
+        self._payload: Optional[Tuple[str, bytes]] = None
+        self._list: Optional[List[Dict]] = None
+
+    @property
+    def lock(self) -> threading.RLock:
+        """피드가 읽는 content item을 다른 스레드에서 바꿀 때 잡는 락 (커버 캐시)"""
+        return self._lock
+
+    @staticmethod
+    def _key(article: Dict) -> SortKey:
+        return (article["date"] or "", article["lawyer_id"], article["id"])
+
+    def _insert(self, article: Dict):
+        key = self._key(article)
+        self._articles[(article["lawyer_id"], article["id"])] = article
+        self._cards[(article["lawyer_id"], article["id"])] = to_card(article)
+        group = self._groups.setdefault(article["display_title"], [])
+        insort(group, key)
+        if group[-1] == key:
+            if len(group) > 1:
+                self._hide(group[-2])
+            self._show(key)
+
+    def _remove(self, lawyer_id: str, item_id: str):
+        article = self._articles.pop((lawyer_id, item_id), None)
+        if article is None:
+            return
+        self._cards.pop((lawyer_id, item_id), None)
+        key = self._key(article)
+        title = article["display_title"]
+        group = self._groups[title]
+        was_visible = group[-1] == key
+        self._discard(group, key)
+        if was_visible:
+            self._hide(key, article)
+            if group:
+                self._show(group[-1])
+        if not group:
+            del self._groups[title]
+
+    def _indexes(self, article: Dict) -> List[List[SortKey]]:
+        indexes = [self._visible, self._by_category.setdefault(article["category_label"], [])]
+        for tag in set(article.get("tags") or []):
+            indexes.append(self._by_tag.setdefault(tag, []))
+        return indexes
+
+    def _show(self, key: SortKey):
+        article = self._articles[(key[1], key[2])]
+        for keys in self._indexes(article):
+            insort(keys, key)
+        self._search.add(key, article)
+
+    def _hide(self, key: SortKey, article: Dict = None):
+        article = article or self._articles[(key[1], key[2])]
+        for keys in self._indexes(article):
+            self._discard(keys, key)
+        self._search.remove(key)
+        if not self._by_category.get(article["category_label"]):
+            self._by_category.pop(article["category_label"], None)
+        for tag in set(article.get("tags") or []):
+            if not self._by_tag.get(tag):
+                self._by_tag.pop(tag, None)
+
+    @staticmethod
+    def _discard(keys: List[SortKey], key: SortKey):
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+
+    def _changed(self):
+        self.version += 1
+        self._payload = None
+        self._list = None
+
+    def rebuild(self, lawyers: Iterable[Dict]):
+        with self._lock:
+            self._articles.clear()
+            self._cards.clear()
+            self._by_lawyer.clear()
+            self._groups.clear()
+            self._visible = []
+            self._by_category.clear()
+            self._by_tag.clear()
+            self._search.clear()
+            self._dirty = False
+            for lawyer in lawyers:
+                self._refresh(lawyer)
+            self._changed()
+
+    def refresh_lawyer(self, lawyer: Dict) -> bool:
+        """변호사 한 명의 기사만 다시 반영. 피드가 바뀌었으면 True"""
+        with self._lock:
+            changed = self._refresh(lawyer)
+            if changed:
+                self._changed()
+            return changed
+
+    def _refresh(self, lawyer: Dict) -> bool:
+        lawyer_id = lawyer["id"]
+        current = self._by_lawyer.get(lawyer_id, set())
+        wanted = {}
+        for item in lawyer.get("content_items", []):
+            if is_magazine_item(item):
+                # Deterministic cover, written onto the item so it is saved with the lawyer
+                assign_cover(item)
+                wanted[item["id"]] = build_article(lawyer, item)
+        changed = False
+        for item_id in current - set(wanted):
+            self._remove(lawyer_id, item_id)
+            changed = True
+        for item_id, article in wanted.items():
+            if self._articles.get((lawyer_id, item_id)) != article:
+                self._remove(lawyer_id, item_id)
+                self._insert(article)
+                changed = True
+        if wanted:
+            self._by_lawyer[lawyer_id] = set(wanted)
+        else:
+            self._by_lawyer.pop(lawyer_id, None)
+        return changed
+
+    def remove_lawyer(self, lawyer_id: str) -> bool:
+        with self._lock:
+            item_ids = self._by_lawyer.pop(lawyer_id, set())
+            for item_id in item_ids:
+                self._remove(lawyer_id, item_id)
+            if item_ids:
+                self._changed()
+            return bool(item_ids)
+
+    def bind(self, lawyers: List[Dict]):
+        """지연 모드: invalidate() 후 다음 조회 때 lawyers 전체로 다시 만듦"""
+        self._source = lawyers
+        self._dirty = True
+
+    def invalidate(self, *_args):
+        self._dirty = True
+
+    def _ensure(self):
+        if self._dirty and self._source is not None:
+            self.rebuild(self._source)
+
+    def articles(self) -> List[Dict]:
+        """최신순, 제목 중복 제거된 기사 목록 (본문 포함)"""
+        with self._lock:
+            self._ensure()
+            if self._list is None:
+                self._list = [self._articles[(key[1], key[2])] for key in reversed(self._visible)]
+            return self._list
+
+    def page(self, limit: int = MAGAZINE_PAGE_SIZE, cursor: Optional[str] = None,
+             category: Optional[str] = None, tag: Optional[str] = None, q: Optional[str] = None) -> Dict:
+        """
+        최신순 카드 페이지. cursor는 직전 페이지의 next_cursor (그 기사 다음부터).
+        category는 category_label (승소사례 / 법률칼럼), tag는 topic_tags 값. 잘못된 커서는 ValueError.
+        q가 있으면 제목 / 태그 / 변호사 / 본문 전문 검색 결과를 관련도 순으로 (커서 = 순위 offset)
+        """
+        limit = max(1, min(limit, MAGAZINE_PAGE_MAX))
+        with self._lock:
+            self._ensure()
+            if q and q.strip():
+                return self._search_page(q, limit, cursor, category, tag)
+            keys = self._filtered(category, tag)
+            end = bisect_left(keys, decode_cursor(cursor)) if cursor else len(keys)
+            start = max(0, end - limit)
+            items = [self._cards[(k[1], k[2])] for k in reversed(keys[start:end])]
+            return {
+                "items": items,
+                "next_cursor": encode_cursor(keys[start]) if start > 0 else None,
+                "total": len(keys),
+            }
+
+    def _filtered(self, category: Optional[str], tag: Optional[str]) -> List[SortKey]:
+        """category / tag 조건에 맞는 노출 기사 키 (오름차순)"""
+        keys = self._visible
+        if category is not None:
+            keys = self._by_category.get(category, [])
+        if tag is not None:
+            tagged = self._by_tag.get(tag, [])
+            # Both filters: walk the smaller index, check the other article field
+            if category is not None and len(tagged) < len(keys):
+                keys = [k for k in tagged if self._matches(k, category, None)]
+            elif category is not None:
+                keys = [k for k in keys if self._matches(k, None, tag)]
+            else:
+                keys = tagged
+        return keys
+
+    def _matches(self, key: SortKey, category: Optional[str], tag: Optional[str]) -> bool:
+        article = self._articles[(key[1], key[2])]
+        if category is not None and article["category_label"] != category:
+            return False
+        return tag is None or tag in (article.get("tags") or [])
+
+    def _search_page(self, q: str, limit: int, cursor: Optional[str],
+                     category: Optional[str], tag: Optional[str]) -> Dict:
+        offset = decode_offset(cursor) if cursor else 0
+        allowed = None
+        if category is not None or tag is not None:
+            allowed = set(self._filtered(category, tag))
+        end = offset + limit
+        # Only rank as deep as this page; the total is a plain match count
+        hits = self._search.search(q, limit=end, allowed=allowed)
+        total = self._search.count(q, allowed=allowed)
+        return {
+            "items": [self._cards[(k[1], k[2])] for k, _ in hits[offset:end]],
+            "next_cursor": _encode(end) if end < total else None,
+            "total": total,
+        }
+
+    def payload(self) -> Tuple[str, bytes]:
+        """(ETag, 전체 카드 배열 JSON 바이트) — 피드가 바뀐 뒤 처음 호출될 때만 직렬화"""
+        with self._lock:
+            self._ensure()
+            if self._payload is None:
+                cards = [self._cards[(key[1], key[2])] for key in reversed(self._visible)]
+                body = json.dumps(cards, ensure_ascii=False).encode("utf-8")
+                etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+                self._payload = (etag, body)
+            return self._payload
+
+    def stats(self) -> Dict:
+        return {"articles": len(self._articles), "visible": len(self._visible), "version": self.version}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더 (쉼표 구분 목록, W/ 약한 검증자, *) 비교"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+MAGAZINE = MagazineFeed()
@@ -10,13 +10,15 @@ _backend_dir = _os.path.dirname(_os.path.abspath(__file__))
 if _backend_dir not in sys.path:
     sys.path.insert(0, _backend_dir)
 
-from fastapi import FastAPI, Query, UploadFile, File, HTTPException, Form, Body  # type: ignore
+from fastapi import FastAPI, Query, UploadFile, File, HTTPException, Form, Body, Header  # type: ignore
 from pydantic import BaseModel  # type: ignore
 from typing import List, Optional, Dict, Any
 from fastapi.middleware.cors import CORSMiddleware  # type: ignore
 from fastapi.staticfiles import StaticFiles  # type: ignore
 from search import search_engine  # type: ignore
-from data import LAWYERS_DB, save_lawyers_db  # type: ignore
+from magazine import MAGAZINE, MAGAZINE_PAGE_MAX, MAGAZINE_PAGE_SIZE, etag_matches  # type: ignore
+from cover_utils import CoverQueue  # type: ignore
+from data import LAWYERS_DB, LAWYERS, save_lawyers_db, flush_lawyers_db, prepare_lawyers  # type: ignore
 # --- is_mock 마이그레이션: 서버 시작 시 in-memory DB에 플래그 보장 ---
 import re as _re
 _mock_migrated = False
@@ -50,6 +52,23 @@ import hashlib
 from datetime import datetime, timedelta
 from uuid import uuid4
 
+
+def _cover_stored(lawyer):
+    """커버 캐시 워커: 생성형 커버가 저장된 WebP로 바뀐 변호사"""
+    MAGAZINE.refresh_lawyer(lawyer)
+    save_db(changed=[lawyer])
+
+# MAGAZINE_COVER_CACHE=1: generated covers → stored WebP variants, one lawyer at a time in the background
+COVER_QUEUE = CoverQueue(on_lawyer=_cover_stored, lock=MAGAZINE.lock)
+
+
+def _content_changed(lawyer):
+    """content_items 추가 / 삭제 / 상태 변경 후 호출: 추천 콘텐츠 점수와 매거진 피드를 함께 갱신"""
+    search_engine.update_content_scores(lawyer)
+    MAGAZINE.refresh_lawyer(lawyer)
+    COVER_QUEUE.submit(lawyer) # covers assigned by the refresh
+
+
 app = FastAPI()
 
 # Mount uploads directory for serving license images etc.
@@ -225,6 +244,11 @@ def get_admin_stats(date: Optional[str] = None):
         "available_dates": available_dates[:30],  # Last 30 days max  # type: ignore
     }
 
+@app.get("/api/admin/stats/search-cache")
+def get_search_cache_stats():
+    """검색 캐시 적중률 (질의 분석 등)"""
+    return search_engine.cache_stats()
+
 @app.get("/api/admin/stats/dates")
 def get_stats_dates():
     """사용 가능한 통계 날짜 목록"""
@@ -233,9 +257,9 @@ def get_stats_dates():
 
 # --- WebSocket Setup (Declared early) ---
 try:
-    from backend.chat import chat_manager  # type: ignore
+    from backend.chat import chat_manager, CHAT_ROLES, CHAT_PAGE_SIZE, presence_manager  # type: ignore
 except ImportError:
-    from chat import chat_manager  # type: ignore
+    from chat import chat_manager, CHAT_ROLES, CHAT_PAGE_SIZE, presence_manager  # type: ignore
 from fastapi import WebSocket, WebSocketDisconnect  # type: ignore
 
 @app.websocket("/ws/chat/{lawyer_id}/{client_id}/{role}")
@@ -248,11 +272,43 @@ async def websocket_endpoint(websocket: WebSocket, lawyer_id: str, client_id: st
             data = await websocket.receive_text()
             await chat_manager.send_message(lawyer_id, client_id, role, data)
     except WebSocketDisconnect:
-        chat_manager.disconnect(lawyer_id, client_id, role)
+        chat_manager.disconnect(lawyer_id, client_id, role, websocket)
 
 @app.get("/api/chats/{lawyer_id}/{client_id}/messages")
-async def get_chat_history(lawyer_id: str, client_id: str):
-    return chat_manager.get_history(lawyer_id, client_id)
+async def get_chat_history(lawyer_id: str, client_id: str, limit: Optional[int] = None,
+                           before: Optional[str] = None, after: Optional[str] = None,
+                           before_ts: Optional[str] = None, after_ts: Optional[str] = None):
+    """
+    Cursor pagination: ?limit=50 (latest page), &before=<message id> (older), &after=<message id> (newer),
+    or before_ts / after_ts ("YYYY-MM-DD HH:MM:SS"). Without any of these, the full list (legacy clients).
+    """
+    if limit is None and before is None and after is None and before_ts is None and after_ts is None:
+        return chat_manager.get_history(lawyer_id, client_id)
+    page = chat_manager.get_history_page(
+        lawyer_id, client_id, limit=limit or CHAT_PAGE_SIZE,
+        before=before, after=after, before_ts=before_ts, after_ts=after_ts,
+    )
+    if page is None:
+        raise HTTPException(status_code=400, detail="Unknown message cursor")
+    return page
+
+class ChatReadRequest(BaseModel):
+    role: str # "user" or "lawyer"
+    upto: Optional[int] = None # number of messages seen; defaults to all
+
+@app.post("/api/chats/{lawyer_id}/{client_id}/read")
+async def mark_chat_read(lawyer_id: str, client_id: str, request: ChatReadRequest):
+    if request.role not in CHAT_ROLES:
+        raise HTTPException(status_code=400, detail="role must be 'user' or 'lawyer'")
+    result = chat_manager.mark_read(lawyer_id, client_id, request.role, request.upto)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    return result
+
+@app.get("/api/lawyers/{lawyer_id}/chats/inbox")
+async def get_lawyer_chat_inbox(lawyer_id: str, limit: int = CHAT_PAGE_SIZE, cursor: Optional[str] = None):
+    """Session summaries (last message + unread count) newest first; pass next_cursor for the next page."""
+    return chat_manager.get_lawyer_inbox(lawyer_id, limit=limit, cursor=cursor)
 
 @app.get("/api/lawyers/{lawyer_id}/chats")
 async def get_lawyer_chats(lawyer_id: str):
@@ -502,6 +558,10 @@ def is_port_in_use(port: int) -> bool:
 
 @app.on_event("startup")
 async def startup_event():
+    # Join the chat backplane so presence from chat server workers is visible here
+    await chat_manager.start_broker()
+    presence_manager.start_sweeper()
+
     chat_port = 8003
     if not is_port_in_use(chat_port):
         print(f"Chat server not running on port {chat_port}. Starting it automatically...")
@@ -661,7 +721,7 @@ LEADS_DB = []
 @app.post("/api/lawyers/{lawyer_id}/leads")
 def create_lead(lawyer_id: str, request: LeadCreateRequest):
     # Verify lawyer exists
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
         
@@ -720,36 +780,31 @@ def get_client_stories(client_id: str):
 @app.get("/api/client/{client_id}/chats")
 def get_client_chats(client_id: str):
     from chat import chat_manager  # type: ignore
-    chat_manager.load_chats()
-    chats = []
-    for session in chat_manager.sessions.values():
-        if session.client_id == client_id:
-            # Find lawyer name
-            lawyer = next((l for l in LAWYERS_DB if l["id"] == session.lawyer_id), None)
-            chat_data = session.to_dict()
-            chat_data["lawyer_name"] = lawyer["name"] if lawyer else "알 수 없음"
-            chat_data["lawyer_firm"] = lawyer.get("firm", "") if lawyer else ""
-            chat_data["lawyer_image"] = lawyer.get("imageUrl") if lawyer else None
-            chats.append(chat_data)
-    chats.sort(key=lambda x: x["last_updated"], reverse=True)
+    chats = chat_manager.get_client_chats(client_id)
+    for chat_data in chats:
+        # Find lawyer name
+        lawyer = LAWYERS.get(chat_data["lawyer_id"])
+        chat_data["lawyer_name"] = lawyer["name"] if lawyer else "알 수 없음"
+        chat_data["lawyer_firm"] = lawyer.get("firm", "") if lawyer else ""
+        chat_data["lawyer_image"] = lawyer.get("imageUrl") if lawyer else None
     return chats
 
 @app.get("/api/lawyers/online")
 def get_online_lawyers():
-    from chat import presence_manager  # type: ignore
     online = []
-    for lawyer in LAWYERS_DB:
-        status = presence_manager.get_status(lawyer["id"])
-        if status in ("online", "away"):
-            online.append({
-                "id": lawyer["id"],
-                "name": lawyer["name"],
-                "firm": lawyer.get("firm", ""),
-                "expertise": lawyer.get("expertise", []),
-                "imageUrl": lawyer.get("imageUrl"),
-                "status": status,
-                "location": lawyer.get("location", "")
-            })
+    for lawyer_id, status in presence_manager.active().items():
+        lawyer = LAWYERS.get(lawyer_id)
+        if not lawyer:
+            continue
+        online.append({
+            "id": lawyer["id"],
+            "name": lawyer["name"],
+            "firm": lawyer.get("firm", ""),
+            "expertise": lawyer.get("expertise", []),
+            "imageUrl": lawyer.get("imageUrl"),
+            "status": status,
+            "location": lawyer.get("location", "")
+        })
     return online
 
 # --- SEO Analysis Endpoints ---
@@ -813,29 +868,26 @@ def get_all_magazine_content():
 
 @app.post("/api/admin/content/{item_id}/toggle-visibility")
 def toggle_content_visibility(item_id: str):
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            if item.get("id") == item_id:
-                # Toggle
-                current_status = item.get("verified", False)
-                item["verified"] = not current_status
-                save_lawyers_db(LAWYERS_DB)
-                return {"message": "Visibility toggled", "new_status": item["verified"]}
-    
-    raise HTTPException(status_code=404, detail="Content not found")
+    lawyer, item = LAWYERS.get_content(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+
+    # Toggle
+    current_status = item.get("verified", False)
+    item["verified"] = not current_status
+    _content_changed(lawyer)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
+    return {"message": "Visibility toggled", "new_status": item["verified"]}
 
 @app.delete("/api/admin/content/{item_id}")
 def delete_content(item_id: str):
-    for lawyer in LAWYERS_DB:
-        if "content_items" in lawyer:
-            initial_len = len(lawyer["content_items"])
-            lawyer["content_items"] = [item for item in lawyer["content_items"] if item.get("id") != item_id]
-            
-            if len(lawyer["content_items"]) < initial_len:
-                save_lawyers_db(LAWYERS_DB)
-                return {"message": "Content deleted successfully"}
-                
-    raise HTTPException(status_code=404, detail="Content not found")
+    lawyer, item = LAWYERS.remove_content(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+
+    _content_changed(lawyer)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
+    return {"message": "Content deleted successfully"}
 
 class MagazineCreateRequest(BaseModel):
     title: str
@@ -850,7 +902,7 @@ class MagazineCreateRequest(BaseModel):
 def create_magazine_post(request: MagazineCreateRequest):
     # Default to main lawyer for demo
     target_lawyer_id = "welder49264@naver.com" 
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == target_lawyer_id), None)
+    lawyer = LAWYERS.get(target_lawyer_id)
     
     if not lawyer:
         lawyer = LAWYERS_DB[0] # Fallback
@@ -899,24 +951,15 @@ def create_magazine_post(request: MagazineCreateRequest):
         }
     }
     
-    if "content_items" not in lawyer:  # type: ignore
-        lawyer["content_items"] = []  # type: ignore
-        
-    lawyer["content_items"].insert(0, new_item)  # type: ignore
-    save_lawyers_db(LAWYERS_DB)
+    LAWYERS.add_content(lawyer, new_item, position=0)  # type: ignore
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     
     # 검색 인덱스에 즉시 추가 (변호사 추천 알고리즘 점수 반영)
     try:
         from search import search_engine  # type: ignore
-        text = f"{new_item['title']} {new_item['summary']}"
-        embedding = search_engine._get_embedding(text)
-        import numpy as np  # type: ignore
-        if len(search_engine.corpus_embeddings) > 0:
-            search_engine.corpus_embeddings = np.vstack([search_engine.corpus_embeddings, embedding])
-        else:
-            search_engine.corpus_embeddings = np.array([embedding])
-        content_idx = len(lawyer["content_items"]) - 1  # type: ignore
-        search_engine.mapping.append({"lawyer_id": lawyer["id"], "type": "content", "index": 0})  # type: ignore
+        # 새 글은 content_items 맨 앞(index 0)에 삽입됨
+        search_engine.add_content_to_index(lawyer["id"], 0, new_item)  # type: ignore
+        _content_changed(lawyer)
         print(f"✅ 블로그/매거진 콘텐츠가 추천 알고리즘 인덱스에 추가됨: {new_item['title']}")
     except Exception as e:
         print(f"⚠️ 인덱스 업데이트 실패 (추후 재시작 시 반영): {e}")
@@ -1139,10 +1182,10 @@ async def upload_case_pdf(lawyer_id: str = Form(...), file: UploadFile = File(..
     }
     
     # Save to DB
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if lawyer:
-        lawyer["content_items"].insert(0, draft) # Add to top
-        save_db()
+        LAWYERS.add_content(lawyer, draft, position=0) # Add to top
+        save_db(changed=[lawyer])
         
     return {
         "success": True,
@@ -1193,10 +1236,10 @@ def create_case_draft(request: CaseSummaryRequest):
         "image": image_url # Store generated image
     }
     
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == request.lawyer_id), None)
+    lawyer = LAWYERS.get(request.lawyer_id)
     if lawyer:
-        lawyer["content_items"].insert(0, draft)
-        save_db()
+        LAWYERS.add_content(lawyer, draft, position=0)
+        save_db(changed=[lawyer])
         
     return {
         "success": True,
@@ -1341,7 +1384,7 @@ def get_dashboard_actions(lawyer_id: str):
     suggestions = []
     
     # 1. Check profile completeness (Mock logic)
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if lawyer:
         if not lawyer.get("imageUrl"):
              suggestions.append({
@@ -1514,15 +1557,16 @@ def recommend_lawyers(
     location: Optional[str] = Query(None),
     gender: Optional[str] = Query(None),
     education: Optional[str] = Query(None),
-    career: Optional[str] = Query(None)
+    career: Optional[str] = Query(None),
+    mode: Optional[str] = Query(None, pattern="^(vector|hybrid)$", description="Retrieval mode (default SEARCH_MODE)")
 ):
-    results = search_engine.search(q, location=location, gender=gender, education=education, career=career)
+    results = search_engine.search(q, location=location, gender=gender, education=education, career=career, mode=mode)
     return results
 
 @app.post("/api/lawyers/{lawyer_id}/upload-photo")
 async def upload_lawyer_photo(lawyer_id: str, file: UploadFile = File(...)):
     # 1. Find the lawyer
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
 
@@ -1552,8 +1596,9 @@ async def upload_lawyer_photo(lawyer_id: str, file: UploadFile = File(...)):
     lawyer["imageUrl"] = full_url
     lawyer["cutoutImageUrl"] = full_url
     lawyer["bgRemoveStatus"] = "skipped"
+    MAGAZINE.refresh_lawyer(lawyer) # lawyer_image on articles
     
-    save_db()
+    save_db(changed=[lawyer])
     
     return {
         "message": "Photo uploaded successfully", 
@@ -1619,7 +1664,7 @@ async def submit_content(
     file: Optional[UploadFile] = File(None)
 ):
     # Verify lawyer exists
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
 
@@ -1693,16 +1738,15 @@ async def submit_content(
             "url": None, # Internal content
             "content": submission["content"] # Store content for magazine detail
         }
-        if "content_items" not in lawyer:
-            lawyer["content_items"] = []
-        lawyer["content_items"].append(new_content_item)
-        save_db() # Persist changes
+        LAWYERS.add_content(lawyer, new_content_item)
+        _content_changed(lawyer)
+        save_db(changed=[lawyer]) # Persist changes
 
     return {"message": "Submission received and published", "id": submission["id"]}
 
 @app.get("/api/lawyers/{lawyer_id}/blog")
 def get_lawyer_blog_posts(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
         
@@ -1713,12 +1757,12 @@ def get_lawyer_blog_posts(lawyer_id: str):
 
 @app.get("/api/lawyers/{lawyer_id}/blog/{slug}")
 def get_lawyer_blog_post_detail(lawyer_id: str, slug: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
         
     # Match by slug
-    post = next((item for item in lawyer.get("content_items", []) if item.get("slug") == slug), None)
+    post = LAWYERS.get_content_by_slug(lawyer_id, slug)
     
     # Fallback to ID match if slug not found (for legacy compatibility or if slug is actually an ID)
     if not post:
@@ -1741,7 +1785,7 @@ def approve_submission_legacy(submission_id: str):
         
     submission["status"] = "approved"
     
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == submission["lawyer_id"]), None)
+    lawyer = LAWYERS.get(submission["lawyer_id"])
     if not lawyer:
         return {"message": "Approved, but lawyer not found"}
 
@@ -1768,7 +1812,8 @@ def approve_submission_legacy(submission_id: str):
             # Fix NoneType error: check if content exists before startswith
             "url": submission.get("url") or submission.get("file_url") or (submission["content"] if submission["content"] and submission["content"].startswith("http") else None)  # type: ignore
         }
-        lawyer["content_items"].insert(0, new_content) # Add to top
+        LAWYERS.add_content(lawyer, new_content, position=0) # Add to top
+        _content_changed(lawyer)
         
         # Update Content Highlights
         count = len([c for c in lawyer["content_items"] if c["verified"]])
@@ -1793,7 +1838,7 @@ class InjectContentRequest(BaseModel):
 
 @app.post("/api/admin/lawyers/{lawyer_id}/content/inject")
 def inject_content(lawyer_id: str, request: InjectContentRequest):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
@@ -1828,8 +1873,9 @@ def inject_content(lawyer_id: str, request: InjectContentRequest):
             "url": None,
             "source": "admin_injected" # Flag to hide from magazine
         }
-        lawyer["content_items"].append(item)
+        LAWYERS.add_content(lawyer, item)
         added_items.append(item)
+    _content_changed(lawyer)
         
     # Update Highlights
     count = len([c for c in lawyer["content_items"] if c["verified"]])
@@ -1845,12 +1891,14 @@ def inject_content(lawyer_id: str, request: InjectContentRequest):
 
 
 def load_db():
+    flush_lawyers_db() # JSON snapshots are written in the background; make sure the file is current
     if os.path.exists(DB_FILE):
         try:
             with open(DB_FILE, "r", encoding="utf-8") as f:
                 loaded_data = json.load(f)
                 LAWYERS_DB.clear()
-                LAWYERS_DB.extend(loaded_data)
+                LAWYERS_DB.extend(prepare_lawyers(loaded_data))  # backfilled fields are not stored
+                LAWYERS.invalidate() # same list object, new records
             print(f"Loaded {len(LAWYERS_DB)} lawyers from {DB_FILE}")
         except Exception as e:
             print(f"Failed to load DB: {e}. Using initial mock data.")
@@ -1858,12 +1906,14 @@ def load_db():
         print("No DB file found. Using initial mock data.")
         save_db()
 
-def save_db():
-    save_lawyers_db(LAWYERS_DB)
+def save_db(changed=None):
+    save_lawyers_db(LAWYERS_DB, changed=changed) # changed=None: full fingerprint sweep
 
 
 # Initialize DB on startup (module level)
 load_db()
+MAGAZINE.rebuild(LAWYERS_DB)
+COVER_QUEUE.submit_all(LAWYERS_DB)
 
 # Initialize Search Engine (Load/Generate Embeddings)
 try:
@@ -1885,7 +1935,7 @@ async def signup_lawyer(
     licenseImage: UploadFile = File(...)
 ):
     # Check if email exists
-    if any(l["id"] == email for l in LAWYERS_DB):
+    if LAWYERS.exists(email):
         raise HTTPException(status_code=400, detail="Email already registered")
         
     # Validation: licenseImage must be an image
@@ -1958,8 +2008,8 @@ async def signup_lawyer(
     else:
         set_standard_trial(new_lawyer)
     
-    LAWYERS_DB.append(new_lawyer)
-    save_lawyers_db(LAWYERS_DB)
+    LAWYERS.add(new_lawyer)
+    save_lawyers_db(LAWYERS_DB, changed=[new_lawyer])
 
     founder_msg = " 🚀 파운딩 멤버로 선정되었습니다! 3개월 무료 + 평생 50% 할인" if new_lawyer.get("is_founder") else ""
     return {"message": f"Signup successful{founder_msg}", "lawyer_id": new_lawyer["id"], "is_founder": new_lawyer.get("is_founder", False)}
@@ -1971,7 +2021,7 @@ class LawyerLoginRequest(BaseModel):
 @app.post("/api/auth/login")
 def login_lawyer(request: LawyerLoginRequest):
     # Find lawyer by email (id)
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == request.email), None)
+    lawyer = LAWYERS.get(request.email)
     
     if not lawyer:
         raise HTTPException(status_code=400, detail="Invalid email or password")
@@ -2016,7 +2066,7 @@ def get_public_lawyers():
 
 @app.get("/api/public/lawyers/{lawyer_id}")
 def get_public_lawyer_detail(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
@@ -2043,149 +2093,51 @@ def get_public_lawyer_detail(lawyer_id: str):
 # --- Legal Magazine API ---
 
 @app.get("/api/magazine")
-def get_magazine_articles():
-    import urllib.parse
-    
-    def generate_ai_image_url(prompt: str) -> str:
-        """Generate a dynamic AI image URL using pollinations.ai"""
-        # Ignore input prompt (which might be Korean/complex) and use safe presets
-        import random
-        safe_prompts = [
-            "lawyer working at desk, professional, cinematic, 4k",
-            "supreme court building, architecture, dramatic sky",
-            "legal documents, pen, closeup, detailed",
-            "judge gavel, wooden, blurred background, high quality",
-            "statue of lady justice, silhouette, sunset"
-        ]
-        chosen_prompt = random.choice(safe_prompts)
-        encoded = urllib.parse.quote(chosen_prompt)
-        return f"https://image.pollinations.ai/prompt/{encoded}?width=800&height=600&nologo=true"
-
-    # Gather all verified content from all lawyers
-    articles = []
-    
-    # 1. From LAWYERS_DB (Verified content)
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            # Filter out admin injected content
-            # Filter out admin injected content AND 'youtube' type (Score-only)
-            if item.get("verified") and item.get("type") in ["column", "case"] and item.get("source") != "admin_injected":
-                
-                # Ensure cover image exists
-                cover_image = item.get("image")
-                if not cover_image and not item.get("file_url"):
-                    # Generate one on the fly if missing (and persist it optionally, but here just return dynamic)
-                    # For performance, we should persist, but for now let's just generate URL.
-                    # Best to stick to what's in DB, but if DB is empty, provide dynamic one.
-                    cover_image = generate_ai_image_url(item["title"])
-                
-                articles.append({
-                    "id": item["id"],
-                    "lawyer_id": lawyer["id"],  # type: ignore
-                    "lawyer_name": lawyer["name"],  # type: ignore
-                    "lawyer_firm": lawyer.get("firm", "Lawnald Partner"),
-                    "lawyer_firm": lawyer.get("firm", "Lawnald Partner"),
-                    "lawyer_image": lawyer.get("cutoutImageUrl") or lawyer.get("imageUrl"), # Frontend handles null with default icon
-                    "type": item["type"],
-                    "type": item["type"],
-                    "title": item["title"],
-                    "summary": item.get("content", "")[:100] + "..." if item.get("content") else f"{item['title']}에 대한 법률적 분석과 해결 사례입니다.",
-                    "content": item.get("content", ""), # Return full content
-                    "date": item.get("date") or item.get("timestamp", "")[:10] or "2025-01-01",
-                    "tags": item.get("topic_tags", []),
-                    "url": item.get("url"),
-                    "cover_image": cover_image
-                })
-                
-    # Sort by date desc initially to prioritize latest when deduplicating
-    articles.sort(key=lambda x: x["date"] or "", reverse=True)
-    
-    # 2. Deduplicate by standardized title
-    unique_articles = []
-    seen_titles = set()
-    
-    import re
-    def normalize_title(t):
-        # Remove extensions, special chars, standardize
-        t = re.sub(r'\.(pdf|docx|txt)$', '', t, flags=re.IGNORECASE)
-        t = re.sub(r'[_\-]', ' ', t)
-        return t.strip()
-
-    # Deterministic helpers for enrichment (simulate "analysis")
-    def get_mock_enrichment(output_id):
-        # deterministically generate based on ID hash
-        h = sum(ord(c) for c in output_id)
-        
-        durations = ["3개월", "6개월", "8개월", "1년", "1년 4개월", "2년"]
-        results = [
-            "승소 (전부 승소)", "일부 승소 (80% 인정)", "화해 권고 결정", 
-            "조정 성립", "집행유예", "기소유예", "무죄 판결"
-        ]
-        issues_pool = [
-            "증거 불충분 입증", "법리적 오해 주장", "절차적 위법성 강조", 
-            "피해자 합의 유도", "양형 사유 적극 소명", "재산 형성 기여도 입증",
-            "계약 해석의 다툼", "과실 비율 산정"
-        ]
-        
-        return {
-            "duration": durations[h % len(durations)],
-            "result": results[(h + 1) % len(results)],
-            "key_issues": [
-                issues_pool[(h + 2) % len(issues_pool)],
-                issues_pool[(h + 5) % len(issues_pool)]
-            ]
-        }
-
-    for art in articles:
-        norm_title = normalize_title(art["title"])
-        
-        # Humanize title for display
-        art["display_title"] = norm_title
-        
-        if norm_title in seen_titles:
-            continue
-            
-        seen_titles.add(norm_title)
-        
-        # Enrich if missing
-        # Check if item has 'case_result' usually not in content_items of old mocks
-        # So we use mock generator
-        enrichment = get_mock_enrichment(art["id"])
-        
-        art["key_issues"] = art.get("key_issues") or enrichment["key_issues"]
-        art["result_summary"] = art.get("result_summary") or enrichment["result"]
-        art["duration"] = art.get("duration") or enrichment["duration"]
-        
-        # Simplify category mapping
-        type_map = {"case": "승소사례", "column": "법률칼럼", "blog": "블로그"}
-        art["category_label"] = type_map.get(art["type"], "기타")
-        
-        unique_articles.append(art)
-        
-    return unique_articles
+def get_magazine_articles(
+    limit: Optional[int] = Query(None, ge=1, le=MAGAZINE_PAGE_MAX),
+    cursor: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    tag: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, max_length=100),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Materialized feed (see magazine.py): list cards only, the body comes from /api/magazine/{id}.
+    With limit/cursor/category/tag/q → {"items", "next_cursor", "total"} page (q: full-text search, relevance order),
+    without → the full card array (RSS / sitemap) as pre-serialized bytes with an ETag
+    """
+    from fastapi.responses import Response  # type: ignore
+    if limit is not None or cursor or category or tag or q:
+        try:
+            return MAGAZINE.page(limit or MAGAZINE_PAGE_SIZE, cursor, category, tag, q)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+    etag, body = MAGAZINE.payload()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/api/magazine/{article_id}")
 def get_magazine_article_detail(article_id: str):
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            if item["id"] == article_id:
-                # Found the item
-                return {
-                    "id": item["id"],
-                    "lawyer_id": lawyer["id"],  # type: ignore
-                    "lawyer_name": lawyer["name"],  # type: ignore
-                    "lawyer_image": lawyer.get("cutoutImageUrl"),
-                    "firm": lawyer.get("firm", "Lawnald Partner"),
-                    "type": item["type"],
-                    "title": item["title"],
-                    "summary": item.get("summary") or (item.get("content", "")[:100] + "..." if item.get("content") else f"{item['title']}에 대한 요약입니다."),
-                    "content": item.get("content") or f"{item['title']}에 대한 상세 내용입니다.\n\n(본문 내용이 없습니다.)",
-                    "date": item["date"],
-                    "tags": item.get("topic_tags", []),
-                    "url": item.get("url")
-                }
-    
-    raise HTTPException(status_code=404, detail="기사를 찾을 수 없습니다.")
+    lawyer, item = LAWYERS.get_content(article_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="기사를 찾을 수 없습니다.")
+
+    return {
+        "id": item["id"],
+        "lawyer_id": lawyer["id"],  # type: ignore
+        "lawyer_name": lawyer["name"],  # type: ignore
+        "lawyer_image": lawyer.get("cutoutImageUrl"),
+        "firm": lawyer.get("firm", "Lawnald Partner"),
+        "type": item["type"],
+        "title": item["title"],
+        "summary": item.get("summary") or (item.get("content", "")[:100] + "..." if item.get("content") else f"{item['title']}에 대한 요약입니다."),
+        "content": item.get("content") or f"{item['title']}에 대한 상세 내용입니다.\n\n(본문 내용이 없습니다.)",
+        "date": item["date"],
+        "tags": item.get("topic_tags", []),
+        "url": item.get("url")
+    }
 
 
 
@@ -2382,7 +2334,7 @@ def generate_youtube_summary(url: str, title: str, lawyer_name: str = "") -> dic
 
 @app.post("/api/lawyers/{lawyer_id}/content")
 def submit_general_content(lawyer_id: str, submission: ContentSubmission):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
@@ -2505,14 +2457,15 @@ def submit_general_content(lawyer_id: str, submission: ContentSubmission):
     }
     
     # Direct add to lawyer items for demo speed
-    lawyer["content_items"].insert(0, new_submission)
-    save_db()
+    LAWYERS.add_content(lawyer, new_submission, position=0)
+    _content_changed(lawyer)
+    save_db(changed=[lawyer])
     
     return {"message": "콘텐츠가 등록되었습니다.", "item": new_submission}
 
 @app.get("/api/lawyers/{lawyer_id}/cases")
 def get_lawyer_cases(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
         
@@ -2523,26 +2476,23 @@ def get_lawyer_cases(lawyer_id: str):
 
 @app.delete("/api/lawyers/{lawyer_id}/content/{item_id}")
 def delete_lawyer_content(lawyer_id: str, item_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
-    content_items = lawyer.get("content_items", [])
-    initial_len = len(content_items)
-    
-    # Filter out the item to delete
-    lawyer["content_items"] = [item for item in content_items if item.get("id") != item_id]
-    
-    if len(lawyer["content_items"]) == initial_len:
+    # Remove the item only if it belongs to this lawyer
+    _, item = LAWYERS.remove_content(item_id, lawyer_id=lawyer_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Content not found")
         
-    save_lawyers_db(LAWYERS_DB)
+    _content_changed(lawyer)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     return {"message": "Content deleted successfully"}
 
 @app.get("/api/lawyers/{lawyer_id}")
 def get_lawyer_profile(lawyer_id: str):
     """변호사 개별 프로필 조회 (대시보드 갱신용)"""
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     return lawyer
@@ -2561,7 +2511,7 @@ def get_pending_lawyers():
 
 @app.post("/api/admin/lawyers/{lawyer_id}/verify")
 def verify_lawyer(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다.")
     
@@ -2570,18 +2520,19 @@ def verify_lawyer(lawyer_id: str):
     lawyer["matchScore"] = 50 # Give a base score so they can appear in search
     lawyer["content_highlights"] = "신규 등록 변호사"
     
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     return {"message": "변호사가 성공적으로 인증되었습니다.", "lawyer": lawyer}
 
 @app.post("/api/admin/lawyers/{lawyer_id}/reject")
 def reject_lawyer(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다.")
     
     # Remove from DB entirely (rejected signup)
-    LAWYERS_DB.remove(lawyer)
-    save_lawyers_db(LAWYERS_DB)
+    LAWYERS.remove(lawyer_id)
+    MAGAZINE.remove_lawyer(lawyer_id)
+    save_lawyers_db(LAWYERS_DB, changed=[])
     return {"message": "변호사 가입이 반려되었습니다."}
 
 class BatchLawyerIds(BaseModel):
@@ -2589,17 +2540,18 @@ class BatchLawyerIds(BaseModel):
 
 @app.post("/api/admin/lawyers/batch-verify")
 def batch_verify_lawyers(data: BatchLawyerIds):
-    verified_count = 0
+    verified = []
     for lawyer_id in data.lawyer_ids:
-        lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+        lawyer = LAWYERS.get(lawyer_id)
         if lawyer and lawyer.get("verified") is False:
             lawyer["verified"] = True
             lawyer["location"] = lawyer.get("location", "").replace(" (등록 대기)", "")
             lawyer["matchScore"] = 50
             lawyer["content_highlights"] = "신규 등록 변호사"
-            verified_count += 1  # type: ignore
+            verified.append(lawyer)
+    verified_count = len(verified)
     
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=verified)
     return {"message": f"{verified_count}명의 변호사가 승인되었습니다.", "count": verified_count}
 
 @app.post("/api/admin/lawyers/batch-reject")
@@ -2607,15 +2559,16 @@ def batch_reject_lawyers(data: BatchLawyerIds):
     rejected_count = 0
     to_remove = []
     for lawyer_id in data.lawyer_ids:
-        lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+        lawyer = LAWYERS.get(lawyer_id)
         if lawyer and lawyer.get("verified") is False:
             to_remove.append(lawyer)
             rejected_count += 1  # type: ignore
     
     for lawyer in to_remove:
-        LAWYERS_DB.remove(lawyer)
+        LAWYERS.remove(lawyer["id"])
+        MAGAZINE.remove_lawyer(lawyer["id"])
     
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[])
     return {"message": f"{rejected_count}명의 변호사 가입이 반려되었습니다.", "count": rejected_count}
 
 # --- Admin Lawyer Management (List & Edit) ---
@@ -2642,7 +2595,7 @@ def get_all_lawyers(q: Optional[str] = None, include_mock: bool = False):
 
 @app.put("/api/admin/lawyers/{lawyer_id}")
 def update_lawyer(lawyer_id: str, update_data: LawyerUpdateModel):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다.")
     
@@ -2660,7 +2613,8 @@ def update_lawyer(lawyer_id: str, update_data: LawyerUpdateModel):
     if update_data.introduction_long is not None: lawyer["introduction_long"] = update_data.introduction_long
     
     print(f"Updated lawyer {lawyer_id}: {update_data}")
-    save_lawyers_db(LAWYERS_DB)
+    MAGAZINE.refresh_lawyer(lawyer) # name / firm appear on articles
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     return {"message": "변호사 정보가 업데이트되었습니다.", "lawyer": lawyer}
 
 
@@ -2848,7 +2802,7 @@ async def publish_case(data: CasePublishRequest):
     """
     Submit a winning case for admin approval.
     """
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == data.lawyer_id), None)
+    lawyer = LAWYERS.get(data.lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found.")
 
@@ -2883,11 +2837,8 @@ async def publish_case(data: CasePublishRequest):
         "key_takeaways": data.key_takeaways or [] # Persist key takeaways
     }
     
-    if "content_items" not in lawyer:
-        lawyer["content_items"] = []
-    
-    lawyer["content_items"].insert(0, pending_item)
-    save_lawyers_db(LAWYERS_DB)
+    LAWYERS.add_content(lawyer, pending_item, position=0)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     
     return {"message": "승소사례가 성공적으로 접수되었습니다. 관리자 승인 후 게시됩니다.", "case_id": case_id}
 
@@ -2940,24 +2891,24 @@ async def approve_submission(item_id: str):
     """
     Approve a submission by ID. Finds the lawyer and updates status.
     """
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            if item.get("id") == item_id:
-                if item.get("status") == "published":
-                    return {"message": "Already approved"}
-                
-                item["status"] = "published"
-                item["verified"] = True
-                
-                # Boost score
-                if "suitability_score" not in lawyer:
-                    lawyer["suitability_score"] = 0
-                lawyer["suitability_score"] += 10  # type: ignore
-                
-                save_lawyers_db(LAWYERS_DB)
-                return {"message": "Approved successfully"}
-                
-    raise HTTPException(status_code=404, detail="Submission not found")
+    lawyer, item = LAWYERS.get_content(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    if item.get("status") == "published":
+        return {"message": "Already approved"}
+
+    item["status"] = "published"
+    item["verified"] = True
+
+    # Boost score
+    if "suitability_score" not in lawyer:
+        lawyer["suitability_score"] = 0
+    lawyer["suitability_score"] += 10  # type: ignore
+
+    _content_changed(lawyer)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
+    return {"message": "Approved successfully"}
 
 
 @app.post("/api/admin/submissions/{item_id}/reject")
@@ -2965,14 +2916,14 @@ async def reject_submission(item_id: str):
     """
     Reject a submission by ID.
     """
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            if item.get("id") == item_id:
-                item["status"] = "rejected"
-                save_lawyers_db(LAWYERS_DB)
-                return {"message": "Rejected successfully"}
-                
-    raise HTTPException(status_code=404, detail="Submission not found")
+    lawyer, item = LAWYERS.get_content(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    item["status"] = "rejected"
+    _content_changed(lawyer)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
+    return {"message": "Rejected successfully"}
 
 
 @app.post("/api/admin/cases/approve")
@@ -2980,7 +2931,7 @@ async def approve_case(case_id: str = Body(...), lawyer_id: str = Body(...)):
     """
     Legacy Admin approval endpoint: publishes the case and boosts lawyer score.
     """
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found.")
         
@@ -3001,7 +2952,8 @@ async def approve_case(case_id: str = Body(...), lawyer_id: str = Body(...)):
     
     lawyer["suitability_score"] += 10 # Boost by 10 per approved case
     
-    save_lawyers_db(LAWYERS_DB)
+    _content_changed(lawyer)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     
     return {
         "message": f"'{case_item['title']}' 사례가 승인되었습니다.",
@@ -3015,7 +2967,7 @@ async def create_consultation(request: ConsultationCreateRequest):
     """
     Creates a new consultation request and analyzes it with AI.
     """
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == request.lawyer_id), None)
+    lawyer = LAWYERS.get(request.lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
 
@@ -3048,7 +3000,7 @@ async def create_consultation(request: ConsultationCreateRequest):
         lawyer["consultations"] = []
         
     lawyer["consultations"].insert(0, new_consultation)
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     
     return {"message": "Consultation created", "id": new_consultation["id"]}
 
@@ -3057,7 +3009,7 @@ async def get_consultations(lawyer_id: str, status: Optional[str] = None, search
     """
     Get consultations for a specific lawyer, optionally filtered by status or search text.
     """
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
         
@@ -3133,22 +3085,20 @@ def update_case_status(case_id: str, update: StatusUpdate):
 @app.post("/api/admin/content/{content_id}/toggle-visibility")
 def toggle_content_visibility(content_id: str):
     """Toggle the 'verified' status of a content item."""
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            if item["id"] == content_id:
-                item["verified"] = not item.get("verified", False)
-                save_db()
-                return {"message": "Visibility toggled", "verified": item["verified"]}
-    raise HTTPException(status_code=404, detail="Content not found")
+    lawyer, item = LAWYERS.get_content(content_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+    item["verified"] = not item.get("verified", False)
+    _content_changed(lawyer)
+    save_db(changed=[lawyer])
+    return {"message": "Visibility toggled", "verified": item["verified"]}
 
 @app.delete("/api/admin/content/{content_id}")
 def delete_content(content_id: str):
     """Permanently delete a content item."""
-    for lawyer in LAWYERS_DB:
-        content_items = lawyer.get("content_items", [])
-        for i, item in enumerate(content_items):
-            if item["id"] == content_id:
-                del content_items[i]
-                save_db()
-                return {"message": "Content deleted"}
-    raise HTTPException(status_code=404, detail="Content not found")
+    lawyer, item = LAWYERS.remove_content(content_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+    _content_changed(lawyer)
+    save_db(changed=[lawyer])
+    return {"message": "Content deleted"}
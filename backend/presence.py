@@ -0,0 +1,157 @@
+"""
+Presence Store
+- 변호사별 마지막 heartbeat 시각 + 만료 min-heap (deadline, lawyer_id, heartbeat 시각, 다음 상태)
+- heap 선두만 확인하며 online → away → offline 전이 (더 최근 heartbeat가 있는 항목은 건너뜀)
+- online / away 집합을 유지 → 온라인 목록 O(online), statuses(ids) O(k)
+- start_sweeper(): 이벤트 루프에서 주기적으로 만료 처리. 조회 시에도 expire()를 먼저 호출하므로 항상 정확
+- 워커 간 공유: ChatManager가 브로커 presence 토픽으로 heartbeat 시각과 스냅샷(snapshot / merge)을 전달
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+PRESENCE_AWAY_SECONDS = int(os.environ.get("PRESENCE_AWAY_SECONDS", 300))  # 5 mins
+PRESENCE_OFFLINE_SECONDS = int(os.environ.get("PRESENCE_OFFLINE_SECONDS", 1800))  # 30 mins
+PRESENCE_SWEEP_INTERVAL = float(os.environ.get("PRESENCE_SWEEP_INTERVAL", 5))
+
+
+class PresenceManager:
+    def __init__(self, away_threshold: int = PRESENCE_AWAY_SECONDS,
+                 offline_threshold: int = PRESENCE_OFFLINE_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        self.AWAY_THRESHOLD = away_threshold
+        self.OFFLINE_THRESHOLD = offline_threshold
+        self.clock = clock
+        self.last_active: Dict[str, float] = {}  # lawyer_id -> timestamp (online / away 만)
+        self._heap: List[Tuple[float, str, float, str]] = []  # (deadline, lawyer_id, heartbeat ts, next status)
+        self._online: Set[str] = set()
+        self._away: Set[str] = set()
+        self._lock = threading.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.transitions = 0
+
+    # --- Writes ---
+    def update_heartbeat(self, lawyer_id: str, timestamp: float = None) -> bool:
+        """heartbeat 기록. 이미 더 최근 heartbeat가 있으면 무시하고 False"""
+        ts = self.clock() if timestamp is None else timestamp
+        with self._lock:
+            return self._apply(lawyer_id, ts, self.clock())
+
+    def merge(self, last_active: Dict[str, float]):
+        """다른 워커의 스냅샷 반영 (각 변호사의 최신 heartbeat만 유지)"""
+        now = self.clock()
+        with self._lock:
+            for lawyer_id, ts in last_active.items():
+                self._apply(lawyer_id, float(ts), now)
+
+    def _apply(self, lawyer_id: str, ts: float, now: float) -> bool:
+        if ts <= self.last_active.get(lawyer_id, 0):
+            return False
+        self._online.discard(lawyer_id)
+        self._away.discard(lawyer_id)
+        age = now - ts
+        if age < self.AWAY_THRESHOLD:
+            self._online.add(lawyer_id)
+            heapq.heappush(self._heap, (ts + self.AWAY_THRESHOLD, lawyer_id, ts, "away"))
+        elif age < self.OFFLINE_THRESHOLD:
+            self._away.add(lawyer_id)
+            heapq.heappush(self._heap, (ts + self.OFFLINE_THRESHOLD, lawyer_id, ts, "offline"))
+        else:
+            self.last_active.pop(lawyer_id, None)
+            return False
+        self.last_active[lawyer_id] = ts
+        if len(self._heap) > 4 * len(self.last_active) + 64:
+            self._compact()
+        return True
+
+    def _compact(self):
+        """heartbeat마다 쌓인 지난 heap 항목 제거"""
+        self._heap = [entry for entry in self._heap if self.last_active.get(entry[1]) == entry[2]]
+        heapq.heapify(self._heap)
+
+    def expire(self, now: float = None) -> int:
+        """deadline이 지난 항목의 상태 전이. 전이 수 반환"""
+        now = self.clock() if now is None else now
+        changed = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, lawyer_id, ts, next_status = heapq.heappop(self._heap)
+                if self.last_active.get(lawyer_id) != ts:
+                    continue  # superseded by a later heartbeat
+                if next_status == "away":
+                    self._online.discard(lawyer_id)
+                    self._away.add(lawyer_id)
+                    heapq.heappush(self._heap, (ts + self.OFFLINE_THRESHOLD, lawyer_id, ts, "offline"))
+                else:
+                    self._away.discard(lawyer_id)
+                    del self.last_active[lawyer_id]
+                changed += 1
+            self.transitions += changed
+        return changed
+
+    # --- Reads ---
+    def _status(self, lawyer_id: str) -> str:
+        if lawyer_id in self._online:
+            return "online"
+        if lawyer_id in self._away:
+            return "away"
+        return "offline"
+
+    def get_status(self, lawyer_id: str) -> str:
+        self.expire()
+        return self._status(lawyer_id)
+
+    def is_online(self, lawyer_id: str) -> bool:
+        return self.get_status(lawyer_id) == "online"
+
+    def statuses(self, lawyer_ids: Iterable[str]) -> Dict[str, str]:
+        """여러 변호사 상태를 한 번에 조회 (만료 처리 1회)"""
+        self.expire()
+        return {lawyer_id: self._status(lawyer_id) for lawyer_id in lawyer_ids}
+
+    def online_ids(self) -> Set[str]:
+        self.expire()
+        with self._lock:
+            return set(self._online)
+
+    def active(self) -> Dict[str, str]:
+        """online / away 변호사 -> 상태 (online 먼저, 최근 heartbeat 순)"""
+        self.expire()
+        with self._lock:
+            online = sorted(self._online, key=self.last_active.__getitem__, reverse=True)
+            away = sorted(self._away, key=self.last_active.__getitem__, reverse=True)
+        result = {lawyer_id: "online" for lawyer_id in online}
+        result.update((lawyer_id, "away") for lawyer_id in away)
+        return result
+
+    def snapshot(self) -> Dict[str, float]:
+        self.expire()
+        with self._lock:
+            return dict(self.last_active)
+
+    def stats(self) -> Dict:
+        return {"online": len(self._online), "away": len(self._away),
+                "heap": len(self._heap), "transitions": self.transitions}
+
+    # --- Background expiry ---
+    def start_sweeper(self, interval: float = PRESENCE_SWEEP_INTERVAL):
+        """실행 중인 이벤트 루프에서 호출"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep(interval))
+
+    def stop_sweeper(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def _sweep(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.expire()
+            except Exception as e:
+                print(f"Presence sweep error: {e}")
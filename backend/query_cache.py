@@ -0,0 +1,142 @@
+"""
+Query Analysis Cache
+- analyze_query(gpt-4o-mini) 결과를 정규화된 질의 텍스트 기준으로 SQLite에 저장
+- 정규화: 유니코드 NFKC + 소문자 + 문장부호/공백 접기 ("이혼  소송?" == "이혼 소송")
+- 같은 파일을 쓰는 여러 워커 프로세스가 캐시를 공유 (WAL 모드)
+- TTL 초과 항목은 조회 시 무시, 최대 항목 수 초과 시 가장 오래 조회되지 않은 항목부터 삭제
+- hits / misses 카운터는 프로세스별, stats()로 확인
+- SQLite 파일은 첫 조회/저장 시 생성 (import나 SearchEngine() 생성만으로는 파일을 만들지 않음)
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from typing import Dict, Optional
+
+QUERY_CACHE_PATH = os.environ.get("QUERY_CACHE_PATH", "query_cache.sqlite3")
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", 10000))
+QUERY_CACHE_TTL = int(os.environ.get("QUERY_CACHE_TTL", 7 * 24 * 3600))  # seconds
+
+_PUNCT_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_query(query: str) -> str:
+    text = unicodedata.normalize("NFKC", query or "").lower()
+    return " ".join(_PUNCT_RE.sub(" ", text).split())
+
+
+class QueryAnalysisCache:
+    def __init__(self, path: str = QUERY_CACHE_PATH, max_entries: int = QUERY_CACHE_SIZE,
+                 ttl_seconds: int = QUERY_CACHE_TTL, namespace: str = "", clock=time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace  # 모델 / 프롬프트 버전이 바뀌면 다른 키 공간 사용
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._disabled = False
+
+    def _ready(self) -> bool:
+        """첫 사용 시 테이블 생성, 실패하면 캐시 없이 동작"""
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    try:
+                        self._conn().execute(
+                            "CREATE TABLE IF NOT EXISTS query_analysis ("
+                            " key TEXT PRIMARY KEY, query TEXT, value TEXT,"
+                            " created_at REAL, accessed_at REAL)"
+                        )
+                        self._conn().execute("CREATE INDEX IF NOT EXISTS idx_accessed ON query_analysis(accessed_at)")
+                    except Exception as e:
+                        # 읽기 전용 파일시스템 등: 캐시 없이 동작
+                        print(f"⚠️ 질의 분석 캐시 비활성화: {e}")
+                        self._disabled = True
+                    self._initialized = True
+        return not self._disabled
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def key(self, query: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\x00{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def get(self, query: str) -> Optional[Dict]:
+        if not self._ready():
+            self.misses += 1
+            return None
+        key, now = self.key(query), self._clock()
+        try:
+            row = self._conn().execute(
+                "SELECT value, created_at FROM query_analysis WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn().execute("UPDATE query_analysis SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return json.loads(row[0])
+        except Exception as e:
+            print(f"⚠️ 질의 분석 캐시 조회 실패: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, query: str, value: Dict):
+        if not self._ready():
+            return
+        now = self._clock()
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO query_analysis (key, query, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (self.key(query), normalize_query(query), json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._evict(conn, now)
+        except Exception as e:
+            print(f"⚠️ 질의 분석 캐시 저장 실패: {e}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM query_analysis WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = conn.execute("SELECT COUNT(*) FROM query_analysis").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM query_analysis WHERE key IN"
+                " (SELECT key FROM query_analysis ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self):
+        if self._ready():
+            self._conn().execute("DELETE FROM query_analysis")
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        size = 0
+        if self._ready():
+            try:
+                size = self._conn().execute("SELECT COUNT(*) FROM query_analysis").fetchone()[0]
+            except Exception:
+                pass
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,170 @@
+"""
+Lawyer Repository
+- LAWYERS_DB 리스트를 감싸는 조회 경로: 변호사 id / 콘텐츠 id / (변호사 id, slug) 해시 인덱스
+- 감싼 리스트 객체는 그대로 유지 (기존 `for l in LAWYERS_DB` 순회 코드와 공존)
+- add / remove / add_content / remove_content / reindex로 인덱스를 즉시 갱신 (저장할 때마다 전체 재빌드 X)
+    · content_items를 직접 수정한 경우 reindex(lawyer): 그 변호사의 항목만 다시 색인
+- 전체 재빌드는 invalidate() 이후와 변호사 수가 바뀐 경우 (리스트 직접 수정 가드)에만
+    · 조회가 빗나가면 (없음) 그냥 None — 없는 이메일 로그인 / 가입 / 잘못된 id 404가 O(N) 재빌드를 부르지 않도록
+    · content_items를 직접 고친 코드는 반드시 reindex(lawyer) 호출
+    · 찾은 항목의 id / slug가 키와 다르면 (색인 후 값이 바뀜) 그 변호사만 다시 색인하고 한 번 더 조회
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class LawyerRepository:
+    def __init__(self, lawyers: List[Dict]):
+        self.lawyers = lawyers
+        self._by_id: Dict[str, Dict] = {}
+        self._content: Dict[str, Tuple[Dict, Dict]] = {}
+        self._slugs: Dict[Tuple[str, str], Dict] = {}
+        self._owned: Dict[str, Tuple[List[str], List[Tuple[str, str]]]] = {}  # 변호사 id -> 색인한 (콘텐츠 id, slug 키)
+        self._size = -1
+        self._dirty = True
+
+    def __iter__(self):
+        return iter(self.lawyers)
+
+    def __len__(self):
+        return len(self.lawyers)
+
+    # --- Index maintenance ---
+
+    def invalidate(self, *_args):
+        """리스트를 통째로 바꾼 경우 (예: load_db) 다음 조회 때 전체 재빌드"""
+        self._dirty = True
+
+    def _index_lawyer(self, lawyer: Dict):
+        lawyer_id = lawyer.get("id")
+        self._by_id.setdefault(lawyer_id, lawyer)
+        content_ids, slug_keys = self._owned.setdefault(lawyer_id, ([], []))
+        for item in lawyer.get("content_items") or []:
+            self._index_content(lawyer, item, content_ids, slug_keys)
+
+    def _index_content(self, lawyer: Dict, item: Dict, content_ids: List[str], slug_keys: List[Tuple[str, str]], replace: bool = False):
+        if item.get("id") is not None and (replace or item["id"] not in self._content):
+            self._content[item["id"]] = (lawyer, item)
+            content_ids.append(item["id"])
+        if item.get("slug"):
+            key = (lawyer.get("id"), item["slug"])
+            if replace or key not in self._slugs:
+                self._slugs[key] = item
+                slug_keys.append(key)
+
+    def _unindex_content(self, lawyer: Dict, lawyer_id: Optional[str] = None):
+        """이 변호사 몫으로 색인한 콘텐츠 / slug 키 제거 (리스트에서 이미 빠진 항목 포함). lawyer_id: 색인 당시 id"""
+        content_ids, slug_keys = self._owned.pop(lawyer.get("id") if lawyer_id is None else lawyer_id, ([], []))
+        for item_id in content_ids:
+            entry = self._content.get(item_id)
+            if entry is not None and entry[0] is lawyer:
+                del self._content[item_id]
+        for key in slug_keys:
+            if key in self._slugs:
+                del self._slugs[key]
+
+    def _unindex_lawyer(self, lawyer: Dict):
+        lawyer_id = lawyer.get("id")
+        if self._by_id.get(lawyer_id) is lawyer:
+            del self._by_id[lawyer_id]
+        self._unindex_content(lawyer)
+
+    def rebuild(self):
+        self._by_id, self._content, self._slugs, self._owned = {}, {}, {}, {}
+        for lawyer in self.lawyers:
+            self._index_lawyer(lawyer)
+        self._size = len(self.lawyers)
+        self._dirty = False
+
+    def _ensure(self):
+        if self._dirty or self._size != len(self.lawyers):
+            self.rebuild()
+
+    def reindex(self, lawyer: Dict):
+        """한 변호사의 content_items(추가 / 삭제 / slug 변경)를 직접 수정한 뒤 호출. 그 변호사의 항목 수만큼만 비용"""
+        self._ensure()
+        self._unindex_content(lawyer)
+        self._index_lawyer(lawyer)
+
+    # --- Lookups (O(1)) ---
+
+    def get(self, lawyer_id: str) -> Optional[Dict]:
+        self._ensure()
+        lawyer = self._by_id.get(lawyer_id)
+        if lawyer is not None and lawyer.get("id") != lawyer_id:
+            # id changed in place: move this lawyer to its new key
+            del self._by_id[lawyer_id]
+            self._unindex_content(lawyer, lawyer_id)
+            self._index_lawyer(lawyer)
+            lawyer = self._by_id.get(lawyer_id)
+        return lawyer
+
+    def exists(self, lawyer_id: str) -> bool:
+        return self.get(lawyer_id) is not None
+
+    def get_content(self, item_id: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """콘텐츠 id → (변호사, 콘텐츠). 없으면 (None, None)"""
+        self._ensure()
+        entry = self._content.get(item_id)
+        if entry is not None and entry[1].get("id") != item_id:
+            self.reindex(entry[0])
+            entry = self._content.get(item_id)
+        return entry if entry is not None else (None, None)
+
+    def get_content_by_slug(self, lawyer_id: str, slug: str) -> Optional[Dict]:
+        self._ensure()
+        item = self._slugs.get((lawyer_id, slug))
+        if item is not None and item.get("slug") != slug:
+            owner = self._by_id.get(lawyer_id)
+            if owner is None:
+                del self._slugs[(lawyer_id, slug)]
+            else:
+                self.reindex(owner)
+            item = self._slugs.get((lawyer_id, slug))
+        return item
+
+    # --- Mutations (keep the wrapped list and the indexes in sync) ---
+
+    def add(self, lawyer: Dict):
+        self._ensure()
+        self.lawyers.append(lawyer)
+        self._index_lawyer(lawyer)
+        self._size = len(self.lawyers)
+
+    def remove(self, lawyer_id: str) -> Optional[Dict]:
+        lawyer = self.get(lawyer_id)
+        if lawyer is None:
+            return None
+        self.lawyers.remove(lawyer)
+        self._unindex_lawyer(lawyer)
+        self._size = len(self.lawyers)
+        return lawyer
+
+    def remove_where(self, predicate: Callable[[Dict], bool]) -> List[Dict]:
+        """조건에 맞는 변호사를 리스트에서 제자리 삭제 (리스트 객체 유지)"""
+        removed = [l for l in self.lawyers if predicate(l)]
+        if removed:
+            self.lawyers[:] = [l for l in self.lawyers if not predicate(l)]
+            self.rebuild()
+        return removed
+
+    def add_content(self, lawyer: Dict, item: Dict, position: Optional[int] = None):
+        self._ensure()
+        items = lawyer.get("content_items")
+        if items is None:
+            items = lawyer["content_items"] = []
+        if position is None:
+            items.append(item)
+        else:
+            items.insert(position, item)
+        content_ids, slug_keys = self._owned.setdefault(lawyer.get("id"), ([], []))
+        self._index_content(lawyer, item, content_ids, slug_keys, replace=True)
+
+    def remove_content(self, item_id: str, lawyer_id: Optional[str] = None) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """콘텐츠 삭제. lawyer_id를 주면 해당 변호사의 콘텐츠일 때만 삭제. (변호사, 콘텐츠) 반환"""
+        lawyer, item = self.get_content(item_id)
+        if item is None or (lawyer_id is not None and lawyer.get("id") != lawyer_id):
+            return None, None
+        lawyer["content_items"] = [i for i in lawyer.get("content_items") or [] if i.get("id") != item_id]
+        self.reindex(lawyer)
+        return lawyer, item
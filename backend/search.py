@@ -2,12 +2,21 @@
 # pyre-ignore-all-errors
 import os
 import json
+import copy
+import hashlib
+import threading
 import numpy as np  # type: ignore
-from typing import List, Dict
+from typing import List, Dict, Optional
 from openai import OpenAI  # type: ignore
 from sklearn.metrics.pairwise import cosine_similarity  # type: ignore
-from data import LAWYERS_DB  # type: ignore
-from functools import lru_cache
+from data import LAWYERS_DB, LAWYERS, on_lawyers_db_saved  # type: ignore
+from embedding_store import EmbeddingStore  # type: ignore
+from embedder import create_embedder, CachedEmbedder, EmbeddingCache, EMBEDDING_DIM  # type: ignore
+from filter_index import LawyerFilterIndex  # type: ignore
+from content_scores import ContentScoreTable  # type: ignore
+from ann_index import create_ann_index, ANN_MIN_ROWS, ANN_CANDIDATES  # type: ignore
+from query_cache import QueryAnalysisCache  # type: ignore
+from text_index import TextIndex  # type: ignore
 try:
     from backend.chat import presence_manager  # type: ignore
 except ImportError:
@@ -16,7 +25,64 @@ except ImportError:
 
 # API Key는 환경변수에서 로드 (하드코딩 금지)
 EMBEDDING_MODEL = "text-embedding-3-small"
-CACHE_FILE = "embeddings_cache.json"
+CACHE_FILE = "embeddings_cache.json" # Legacy JSON cache (migrated to EMBEDDING_STORE_DIR on first load)
+EMBEDDING_STORE_DIR = "embeddings_store"
+EMBEDDING_STORE_DTYPE = os.environ.get("EMBEDDING_STORE_DTYPE", "float32") # float32 | float16
+# Vector CRC check: "0" off, "background" (default) after the lazy mmap load, "1" synchronously (reads the whole file)
+EMBEDDING_STORE_VERIFY = os.environ.get("EMBEDDING_STORE_VERIFY", "background")
+ANALYSIS_MODEL = "gpt-4o-mini"
+ANALYSIS_PROMPT_VERSION = "1" # Bump when the analyze_query prompt changes to invalidate cached analyses
+SEARCH_MODES = ("vector", "hybrid")
+SEARCH_MODE = os.environ.get("SEARCH_MODE", "vector") # Default retrieval mode; /api/recommend?mode= overrides per request
+RRF_K = int(os.environ.get("RRF_K", 60)) # Reciprocal rank fusion constant
+LEXICAL_WEIGHT = float(os.environ.get("LEXICAL_WEIGHT", 1.0)) # Weight of the BM25 rank in the fusion
+
+# Item type codes for the parallel mapping arrays
+ITEM_CASE = 0
+ITEM_CONTENT = 1
+
+def _content_key(text: str, model: str = EMBEDDING_MODEL) -> str:
+    """Stable per-item key: hash of the embedding model and the embedded text."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()[:32]
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, in O(n + k log k) via argpartition.
+    Ties keep the lower index first, matching a stable descending sort.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < n:
+        kth_score = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > kth_score)
+        ties = np.flatnonzero(scores == kth_score)[:k - len(above)]
+        idx = np.concatenate([above, ties])
+    else:
+        idx = np.arange(n)
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+def _rrf_fuse(vector_scores: np.ndarray, lexical_scores: np.ndarray, k: int = None, lexical_weight: float = None) -> np.ndarray:  # type: ignore
+    """
+    Reciprocal rank fusion of the vector ranking and the BM25 ranking of the same candidates:
+    1 / (k + vector rank) + w / (k + lexical rank). Candidates without a lexical hit get no lexical term.
+    Ranks are 1-based; ties keep the candidate order (see _top_k_indices).
+    """
+    k = RRF_K if k is None else k
+    lexical_weight = LEXICAL_WEIGHT if lexical_weight is None else lexical_weight
+    n = len(vector_scores)
+    fused = np.zeros(n)
+    if n == 0:
+        return fused
+    vector_rank = np.empty(n)
+    vector_rank[_top_k_indices(vector_scores, n)] = np.arange(1, n + 1)
+    fused += 1.0 / (k + vector_rank)
+    hits = np.flatnonzero(lexical_scores > 0)
+    if len(hits):
+        lexical_rank = np.empty(len(hits))
+        lexical_rank[_top_k_indices(lexical_scores[hits], len(hits))] = np.arange(1, len(hits) + 1)
+        fused[hits] += lexical_weight / (k + lexical_rank)
+    return fused
 
 class SearchEngine:
     def __init__(self):
@@ -32,132 +98,355 @@ class SearchEngine:
             print(f"Failed to initialize OpenAI client: {e}")
             self.client = None
 
+        # Shared batching embedder (EMBEDDING_BACKEND=fake for offline use)
+        self.embedder = create_embedder(self.client, model=EMBEDDING_MODEL)
+        # LRU (+ optional disk spill) for query-like texts; corpus items go through the embedding store instead
+        self.query_embedding_cache = EmbeddingCache()
+
+        self.store = EmbeddingStore(EMBEDDING_STORE_DIR, dtype=EMBEDDING_STORE_DTYPE)
         self.corpus_embeddings = []
         self.mapping = [] # Maps index to (lawyer_id, case_index)
+        self._reset_mapping_arrays()
+        self._store_corrupt = False # set by the background checksum check (EMBEDDING_STORE_VERIFY=background)
+
+        # Hard-filter index over LAWYERS_DB, rebuilt lazily after every save_lawyers_db
+        self.filter_index = LawyerFilterIndex()
+        on_lawyers_db_saved(self.filter_index.invalidate)
+
+        # Lawyer x area content relevance (weighted score, count), updated per lawyer on content changes
+        self.content_scores = ContentScoreTable(list(self.AREA_MAPPING))
+
+        # BM25 over case / content titles and summaries, one document per corpus row (hybrid mode).
+        # Rows get the title / summary they were embedded from (refresh / add_*_to_index); rows loaded
+        # from the store are matched back to LAWYERS_DB by content key in build_lexical_index
+        self.lexical_index = TextIndex({"title": 2.0, "summary": 1.0})
+        self._lexical_lock = threading.Lock()
+        self._lexical_generation = 0 # bumped when corpus rows are renumbered; a stale build stops adding
+        self._lexical_thread: Optional[threading.Thread] = None
+
+        # Approximate nearest neighbour index (ANN_BACKEND), trained in a background thread once the corpus
+        # reaches ANN_MIN_ROWS (load_index / refresh_index); searches stay exact until it is ready
+        self.ann_index = create_ann_index()
+        self._ann_ready = False
+        self._ann_lock = threading.Lock()
+        self._ann_generation = 0 # bumped when corpus rows are renumbered; a build for an older generation is dropped
+        self._ann_building = False
+
+        # Persistent analyze_query cache shared by all workers (QUERY_CACHE_PATH / _SIZE / _TTL)
+        self.analysis_cache = QueryAnalysisCache(namespace=f"{ANALYSIS_MODEL}:{ANALYSIS_PROMPT_VERSION}")
         # self._load_or_generate_embeddings()
         print("Lazy loading embeddings... Call refresh_index() manually if needed.")
         
+    @property
+    def embedding_model(self) -> str:
+        return self.embedder.model if self.embedder else EMBEDDING_MODEL
+
     def _get_embedding(self, text: str) -> List[float]:
-        if not self.client:
+        return self._get_embeddings([text])[0]
+
+    def _get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in batches, in input order. Failed items come back as zero vectors."""
+        if not self.embedder:
             print("OpenAI client not initialized.")
-            return [0.0] * 1536 # Return zero vector or raise error?
-            
+            return [[0.0] * EMBEDDING_DIM for _ in texts]
+
+        vectors = self.embedder.embed(texts)
+        return [vec if vec is not None else [0.0] * EMBEDDING_DIM for vec in vectors]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query / draft text through the query-embedding cache (zeros on failure)."""
+        if self.embedder is None:
+            return [0.0] * EMBEDDING_DIM
         try:
-            text = text.replace("\n", " ")
-            return self.client.embeddings.create(input=[text], model=EMBEDDING_MODEL).data[0].embedding  # type: ignore
+            vec = CachedEmbedder(self.embedder, self.query_embedding_cache).embed_one(text)
         except Exception as e:
-            print(f"Error generating embedding: {e}")
-            return [0.0] * 1536
+            print(f"Error getting embedding: {e}")
+            vec = None
+        return vec if vec is not None else [0.0] * EMBEDDING_DIM
 
     def load_index(self):
         """Load embeddings from cache if available, otherwise generate."""
         self._load_or_generate_embeddings(force_update=False)
+        self.build_ann_index()
 
     def refresh_index(self):
-        """Force refresh of embeddings from current LAWYERS_DB state."""
-        # Simple approach: clear internal state and re-run load/generate
-        self.corpus_embeddings = []
-        self.mapping = []
+        """Incrementally re-index LAWYERS_DB, re-embedding only new or changed items."""
+        self.filter_index.invalidate()
+        self.content_scores.build(LAWYERS_DB)
         self._load_or_generate_embeddings(force_update=True)
+        self.build_ann_index()
 
-    def _load_or_generate_embeddings(self, force_update=False):
-        # 1. Try to load from cache (skip if forced)
-        if not force_update and os.path.exists(CACHE_FILE):
-            print("Loading embeddings from cache...")
-            try:
-                with open(CACHE_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    
-                    # Basic consistency check: 
-                    # If DB has more lawyers/cases than cache, we might need to update?
-                    # For now, let's just assume cache is truth unless forced.
-                    # But if we just added a lawyer, we need to update.
-                    
-                    self.corpus_embeddings = np.array(data["embeddings"])
-                    self.mapping = data["mapping"]
-                print(f"Loaded {len(self.corpus_embeddings)} embeddings.")
-                return
-            except Exception as e:
-                print(f"Failed to load cache: {e}")
-
-        # 2. Generate new embeddings (Only for items missing from cache if possible? 
-        # For prototype simplicity: Re-generate ALL if forced or cache missing. 
-        # Ideally, we should do incremental updates.)
-        
-        # Incremental check: 
-        # We need to re-index EVERYTHING from LAWYERS_DB.
-        
-        print(f"Generating embeddings via OpenAI API (Force={force_update})...")
-        embeddings_list = []
-        mapping_list = []
-        
-        # To avoid re-generating expensive embeddings for unchanged data, 
-        # we could check if cache data is reusable. 
-        # But `data.py` structures don't have stable hashmaps easily.
-        # Let's just re-generate for the user's small scale (mock data).
-        # BEWARE: This consumes API credits.
-        
-        # Optimization: Use existing cache in memory if available?
-        # Let's assume the user accepts the cost for this fix, or we implement a simple memory-check.
-        
-        if len(self.corpus_embeddings) > 0 and len(self.mapping) > 0:
-            # Re-use existing embeddings if ID/Title match?
-            pass
-
-        current_embeddings = []
-        self.mapping = []
+    @staticmethod
+    def _item_document(item: Dict) -> Dict:
+        """Lexical document of a case / content item: the same title and summary that get embedded."""
+        return {"title": item.get("title", ""), "summary": item.get("summary", "")}
 
-        processed_count = 0
-        MAX_LAWYERS = 100 # Increased for better location filtering coverage
-        
+    def _iter_index_items(self):
+        """Yield (mapping_entry, text, lexical document) for every case and verified content item in LAWYERS_DB."""
         for lawyer in LAWYERS_DB:
-            if processed_count >= MAX_LAWYERS:
-                 break
-            processed_count += 1
-            if processed_count % 5 == 0:
-                print(f"Embedding lawyer {processed_count}/{MAX_LAWYERS}...")
-
-            # 1. Embed Cases
+            # 1. Cases
             for i, case in enumerate(lawyer.get("cases", [])):
                 text = f"{case['title']} {case['summary']}"
-                try:
-                    embedding = self._get_embedding(text)
-                    current_embeddings.append(embedding)
-                    self.mapping.append({"lawyer_id": lawyer["id"], "type": "case", "index": i})  # type: ignore
-                except Exception as e:
-                    print(f"Embedding failed for case {lawyer['id']}: {e}")  # type: ignore
-
-            # 2. Embed Content Items (Verified only)
+                yield {"lawyer_id": lawyer["id"], "type": "case", "index": i, "key": _content_key(text, self.embedding_model)}, text, self._item_document(case)
+
+            # 2. Content Items (Verified only)
             lawyer_content_items = lawyer.get("content_items") or []
             for i, content in enumerate(lawyer_content_items):
                 if not content.get("verified"): continue
-                
-                # Check if it's substantial content (skip if too short or just a link)
-                # But for search, title + summary is usually enough.
                 # Only embed 'case' and 'column' types mainly for relevance.
                 if content.get("type") not in ["case", "column", "blog", "youtube"]: continue
-                
+
                 text = f"{content.get('title', '')} {content.get('summary', '')}"
-                try:
-                    embedding = self._get_embedding(text)
-                    current_embeddings.append(embedding)
-                    self.mapping.append({"lawyer_id": lawyer["id"], "type": "content", "index": i})
-                except Exception as e:
-                    print(f"Embedding failed for content {lawyer['id']}: {e}")
-
-        if current_embeddings:
-            self.corpus_embeddings = np.array(current_embeddings)
-            
-            # 3. Save to cache
-            with open(CACHE_FILE, "w", encoding="utf-8") as f:
-                json.dump({
-                    "embeddings": self.corpus_embeddings.tolist(),  # type: ignore
-                    "mapping": self.mapping
-                }, f)
-            print("Embeddings saved to cache.")
+                yield {"lawyer_id": lawyer["id"], "type": "content", "index": i, "key": _content_key(text, self.embedding_model)}, text, self._item_document(content)
+
+    def _load_or_generate_embeddings(self, force_update=False):
+        # 1. Try to load from binary store (skip if forced)
+        if not force_update and self._load_from_store():
+            return
+
+        # 2. Seed the reuse pool from disk if nothing is in memory yet
+        if len(self.corpus_embeddings) == 0:
+            self._load_from_store()
+
+        # Vectors are keyed by hash(model + title + summary), so unchanged items
+        # keep their vector even if their position in LAWYERS_DB moved.
+        previous = self.corpus_embeddings
+        reusable = {}
+        if self._store_corrupt:
+            print("Embedding store failed its checksum, re-embedding every row.")
+            self.mapping = []
+        for row, entry in enumerate(self.mapping):
+            key = entry.get("key")
+            if key and key not in reusable:
+                reusable[key] = row
+
+        new_mapping = []
+        documents = [] # lexical document per row
+        rows = []
+        pending = [] # (row position, text) to embed
+        for entry, text, document in self._iter_index_items():
+            row = reusable.get(entry["key"])
+            # Zero vectors come from failed API calls; retry those instead of reusing
+            if row is not None and np.any(previous[row]):
+                rows.append(np.asarray(previous[row], dtype=np.float32))
+            else:
+                rows.append(None)
+                pending.append((len(rows) - 1, text))
+            new_mapping.append(entry)
+            documents.append(document)
+
+        current_keys = {entry["key"] for entry in new_mapping}
+        removed_count = sum(1 for key in reusable if key not in current_keys)
+        print(f"Index refresh: {len(new_mapping)} items, {len(new_mapping) - len(pending)} reused, "
+              f"{len(pending)} to embed, {removed_count} removed.")
+
+        if not pending and new_mapping == self.mapping:
+            print("Index is up to date.")
+            return
+
+        if pending:
+            vectors = self._get_embeddings([text for _, text in pending])
+            for (pos, _), vec in zip(pending, vectors):
+                rows[pos] = np.asarray(vec, dtype=np.float32)
+
+        if rows:
+            self.corpus_embeddings = np.array(rows, dtype=np.float32)
         else:
-            self.corpus_embeddings = np.array([])
+            self.corpus_embeddings = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
             print("No items found to embed.")
+        self.mapping = new_mapping
+        self._rebuild_mapping_arrays()
+        with self._lexical_lock:
+            for row, document in enumerate(documents):
+                self.lexical_index.add(row, document)
+
+        # 3. Save to binary store
+        try:
+            self.store.save(self.corpus_embeddings, self.mapping, model=self.embedding_model)
+            self._store_corrupt = False
+            print("Embeddings saved to store.")
+        except Exception as e:
+            print(f"Failed to save embedding store: {e}")
+
+    def _load_from_store(self) -> bool:
+        """Open the memory-mapped embedding store, migrating the legacy JSON cache if needed."""
+        try:
+            if not self.store.exists():
+                if not self.store.migrate_json_cache(CACHE_FILE, model=EMBEDDING_MODEL):
+                    return False
+
+            print("Loading embeddings from store...")
+            vectors, mapping, meta = self.store.load(verify=EMBEDDING_STORE_VERIFY == "1")
+            if meta.get("model") and meta["model"] != self.embedding_model:
+                print(f"Embedding store model mismatch ({meta['model']} != {self.embedding_model}), rebuilding.")
+                return False
+
+            self.corpus_embeddings = vectors
+            self.mapping = mapping
+            self._rebuild_mapping_arrays()
+            self.build_lexical_index()
+            print(f"Loaded {len(self.corpus_embeddings)} embeddings ({meta['dtype']}, memory-mapped).")
+            if EMBEDDING_STORE_VERIFY == "background":
+                threading.Thread(target=self._verify_store, args=(vectors, meta), name="embedding-verify", daemon=True).start()
+            return True
+        except Exception as e:
+            print(f"Failed to load embedding store: {e}")
+            return False
+
+    def _verify_store(self, vectors, meta: Dict):
+        """Background CRC check of the mapped vectors; a mismatch re-embeds on the next refresh_index."""
+        try:
+            if self.store.verify_vectors(vectors, meta):
+                return
+            print("⚠️ Embedding store checksum mismatch: rows will be re-embedded on the next refresh_index().")
+            self._store_corrupt = True
+        except Exception as e:
+            print(f"Embedding store verification failed: {e}")
+
+    # --- Parallel mapping arrays ---
+    # self.mapping (list of dicts) is the persisted form. For scoring we keep, per corpus row,
+    # the lawyer position / item type / item index as NumPy arrays, plus a stable sort of the
+    # rows by lawyer so per-lawyer stats are computed with reduceat instead of a Python loop.
+
+    def _reset_mapping_arrays(self):
+        self._lawyer_ids: List[str] = []
+        self._lawyer_pos: Dict[str, int] = {}
+        self._row_lawyer = np.zeros(0, dtype=np.int32)
+        self._row_type = np.zeros(0, dtype=np.int8)
+        self._row_item = np.zeros(0, dtype=np.int32)
+        self._group_order = np.zeros(0, dtype=np.int64)
+        self._group_starts = np.zeros(0, dtype=np.int64)
+        self._lawyer_row_start = np.zeros(0, dtype=np.int64)
+        self._lawyer_row_count = np.zeros(0, dtype=np.int64)
+
+    def _encode_entries(self, entries: List[Dict]):
+        lawyer_col = np.empty(len(entries), dtype=np.int32)
+        type_col = np.empty(len(entries), dtype=np.int8)
+        item_col = np.empty(len(entries), dtype=np.int32)
+        for row, entry in enumerate(entries):
+            pos = self._lawyer_pos.get(entry["lawyer_id"])
+            if pos is None:
+                pos = self._lawyer_pos[entry["lawyer_id"]] = len(self._lawyer_ids)
+                self._lawyer_ids.append(entry["lawyer_id"])
+            lawyer_col[row] = pos
+            type_col[row] = ITEM_CASE if entry["type"] == "case" else ITEM_CONTENT
+            item_col[row] = entry["index"]
+        return lawyer_col, type_col, item_col
+
+    def _regroup(self):
+        # Stable sort keeps original row order within each lawyer (first-max tie breaking).
+        # Lawyer p owns _group_order[_lawyer_row_start[p] : _lawyer_row_start[p] + _lawyer_row_count[p]].
+        self._group_order = np.argsort(self._row_lawyer, kind="stable")
+        counts = np.bincount(self._row_lawyer, minlength=len(self._lawyer_ids)).astype(np.int64)
+        self._lawyer_row_count = counts
+        self._lawyer_row_start = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        self._group_starts = self._lawyer_row_start[counts > 0]
+
+    def _grouped_rows(self, lawyer_positions=None):
+        """
+        Corpus rows grouped by lawyer, as (rows, group_starts).
+        With lawyer_positions, only the rows of those lawyers are returned.
+        """
+        if lawyer_positions is None:
+            return self._group_order, self._group_starts
+        positions = np.asarray(lawyer_positions, dtype=np.int64)
+        counts = self._lawyer_row_count[positions]
+        positions, counts = positions[counts > 0], counts[counts > 0]
+        if not len(positions):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        offsets = np.repeat(self._lawyer_row_start[positions] - starts, counts) + np.arange(counts.sum())
+        return self._group_order[offsets], starts
+
+    def _rebuild_mapping_arrays(self):
+        """Derive the parallel NumPy arrays from self.mapping."""
+        with self._ann_lock:
+            self._ann_ready = False # corpus rows changed; retrain (build_ann_index)
+            self._ann_generation += 1
+        with self._lexical_lock:
+            self._lexical_generation += 1
+            self.lexical_index.clear()
+        self._reset_mapping_arrays()
+        self._row_lawyer, self._row_type, self._row_item = self._encode_entries(self.mapping)
+        self._regroup()
+
+    def _append_to_index(self, vectors, entries: List[Dict], documents: List[Dict]):
+        """Append embedded rows to the in-memory corpus, mapping, mapping arrays and lexical index."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(entries), -1)
+        if len(self.corpus_embeddings) > 0:
+            self.corpus_embeddings = np.vstack([self.corpus_embeddings, vectors])
+        else:
+            self.corpus_embeddings = vectors
+        start = len(self.mapping)
+        self.mapping.extend(entries)
+        with self._lexical_lock:
+            for row, document in enumerate(documents, start=start):
+                self.lexical_index.add(row, document)
+
+        lawyer_col, type_col, item_col = self._encode_entries(entries)
+        self._row_lawyer = np.concatenate([self._row_lawyer, lawyer_col])
+        self._row_type = np.concatenate([self._row_type, type_col])
+        self._row_item = np.concatenate([self._row_item, item_col])
+        self._regroup()
+        with self._ann_lock:
+            if self._ann_ready:
+                self.ann_index.add(vectors)
+            # rows appended during a background build are added when it finishes
+
+    def _aggregate_scores(self, scores, grouped=None) -> Dict[str, np.ndarray]:
+        """
+        Per-lawyer similarity stats in one vectorized pass.
+        `scores` holds one similarity per corpus row, or, when `grouped` (from _grouped_rows) is
+        given, one per row of that selection in the same order.
+        Returns arrays indexed by lawyer position (self._lawyer_pos):
+        max_sim, sum_sim (positive scores only), count, best_case_idx, best_content_idx, best_content_score.
+        Lawyers outside the selection keep the defaults (-1 / 0).
+        """
+        if grouped is None:
+            grouped = self._grouped_rows()
+            scores = np.asarray(scores, dtype=np.float64)[grouped[0]]
+        rows, starts = grouped
+        scores = np.asarray(scores, dtype=np.float64)
+
+        n_lawyers = len(self._lawyer_ids)
+        stats = {
+            "max_sim": np.full(n_lawyers, -1.0),
+            "sum_sim": np.zeros(n_lawyers),
+            "count": np.zeros(n_lawyers, dtype=np.int64),
+            "best_case_idx": np.full(n_lawyers, -1, dtype=np.int64),
+            "best_content_idx": np.full(n_lawyers, -1, dtype=np.int64),
+            "best_content_score": np.full(n_lawyers, -1.0),
+        }
+        if len(rows) == 0:
+            return stats
+
+        row_type = self._row_type[rows]
+        row_item = self._row_item[rows]
+        group_lawyer = self._row_lawyer[rows[starts]]
+        group_of_row = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(rows))))
+
+        def best_of(item_type):
+            masked = np.where(row_type == item_type, scores, -np.inf)
+            best_score = np.maximum.reduceat(masked, starts)
+            # First row per group that attains the group max
+            hits = np.flatnonzero(masked == best_score[group_of_row])
+            hits = hits[np.r_[True, group_of_row[hits[1:]] != group_of_row[hits[:-1]]]]
+            best_idx = np.full(len(starts), -1, dtype=np.int64)
+            best_idx[group_of_row[hits]] = row_item[hits]
+            missing = np.isneginf(best_score)
+            best_idx[missing] = -1
+            return np.where(missing, -1.0, best_score), best_idx
+
+        _, best_case_idx = best_of(ITEM_CASE)
+        best_content_score, best_content_idx = best_of(ITEM_CONTENT)
+
+        stats["max_sim"][group_lawyer] = np.maximum.reduceat(scores, starts)
+        stats["sum_sim"][group_lawyer] = np.add.reduceat(np.where(scores > 0, scores, 0.0), starts)
+        stats["count"][group_lawyer] = np.add.reduceat((scores > 0).astype(np.int64), starts)
+        stats["best_case_idx"][group_lawyer] = best_case_idx
+        stats["best_content_idx"][group_lawyer] = best_content_idx
+        stats["best_content_score"][group_lawyer] = best_content_score
+        return stats
 
     AREA_MAPPING = {
         "가사": ["가사법 전문", "이혼", "상속"],
@@ -174,8 +463,29 @@ class SearchEngine:
         "기타": []
     }
 
-    @lru_cache(maxsize=100)
     def analyze_query(self, query: str) -> Dict:
+        cached = self.analysis_cache.get(query)
+        if cached is not None:
+            return cached
+        analysis = self._analyze_query_llm(query)
+        if analysis is not None:
+            self.analysis_cache.put(query, analysis)
+            return analysis
+        # Fallback results are not cached, so the next request retries the LLM
+        return {
+            "primary_area": "기타",
+            "confidence": 0.0,
+            "summary_for_matching": query,
+            "key_issues": [],
+        }
+
+    def cache_stats(self) -> Dict:
+        return {
+            "query_analysis": self.analysis_cache.stats(),
+            "query_embedding": self.query_embedding_cache.stats(),
+        }
+
+    def _analyze_query_llm(self, query: str):
         system_prompt = """
         You are a legal case router for 'Lawnald'. Analyze the user's legal situation and provide a structured analysis.
         
@@ -214,7 +524,7 @@ class SearchEngine:
         
         try:
             response = self.client.chat.completions.create(  # type: ignore
-                model="gpt-4o-mini",
+                model=ANALYSIS_MODEL,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": query}
@@ -230,12 +540,7 @@ class SearchEngine:
             return json.loads(content)
         except Exception as e:
             print(f"Error analyzing query: {e}")
-            return {
-                "primary_area": "기타",
-                "confidence": 0.0,
-                "summary_for_matching": query,
-                "key_issues": [],
-            }
+            return None
 
     def _get_mapped_expertise(self, area: str) -> List[str]:
         # Return list of official tags relevant to the area
@@ -255,35 +560,179 @@ class SearchEngine:
         text = f"{case_data['title']} {case_data['summary']}"
         try:
             embedding = self._get_embedding(text)
-            
-            # Append to corpus
-            if len(self.corpus_embeddings) > 0:
-                self.corpus_embeddings = np.vstack([self.corpus_embeddings, embedding])
-            else:
-                self.corpus_embeddings = np.array([embedding])
-                
-            # Append to mapping
-            # Note: Index in mapping is relative to the lawyer's case list. 
-            # We assume this is the NEW last item.
-            # Ideally we need to know the actual index, but for search 'mapping' it just needs to point correctly.
-            # If we just added it to DB, it's at len(lawyer['cases']) - 1
-            
-            # Find the lawyer in DB to get the correct index?
-            # Or just assume it's appended.
-            # for logic simplicity in prototype:
-            
-            target_lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+
+            # The case was just appended to the lawyer's list, so it is the last one
+            target_lawyer = LAWYERS.get(lawyer_id)
             new_index = len(target_lawyer["cases"]) - 1 if target_lawyer else 0
-            
-            self.mapping.append({"lawyer_id": lawyer_id, "type": "case", "index": new_index})
+
+            self._append_to_index([embedding], [{"lawyer_id": lawyer_id, "type": "case", "index": new_index, "key": _content_key(text, self.embedding_model)}],
+                                  [self._item_document(case_data)])
             print(f"Index updated for lawyer {lawyer_id}, case '{case_data['title']}'")
             
         except Exception as e:
             print(f"Failed to index new case: {e}")
 
-    def search(self, query: str, top_k: int = 10, location: str = None, gender: str = None, education: str = None, career: str = None) -> Dict:  # type: ignore
+    def add_content_to_index(self, lawyer_id: str, content_index: int, item: Dict):
+        """
+        Add a content item inserted at `content_index` of the lawyer's content_items.
+        Existing rows for that lawyer's later content items are shifted by one.
+        """
+        text = f"{item.get('title', '')} {item.get('summary', '')}"
+        try:
+            embedding = self._get_embedding(text)
+
+            pos = self._lawyer_pos.get(lawyer_id)
+            if pos is not None:
+                shifted = np.flatnonzero((self._row_lawyer == pos) & (self._row_type == ITEM_CONTENT) & (self._row_item >= content_index))
+                self._row_item[shifted] += 1
+                for row in shifted:
+                    self.mapping[row]["index"] += 1
+
+            self._append_to_index([embedding], [{"lawyer_id": lawyer_id, "type": "content", "index": content_index, "key": _content_key(text, self.embedding_model)}],
+                                  [self._item_document(item)])
+            print(f"Index updated for lawyer {lawyer_id}, content '{item.get('title', '')}'")
+        except Exception as e:
+            print(f"Failed to index new content: {e}")
+
+    def build_ann_index(self, background: bool = True):
+        """
+        Train the ANN index over the current corpus (no-op below ANN_MIN_ROWS or when already trained).
+        The new index is trained on a copy and swapped in when done, so searches keep using exact
+        scoring meanwhile instead of waiting for k-means on the request path.
+        """
+        with self._ann_lock:
+            if self.ann_index is None or len(self.mapping) < ANN_MIN_ROWS or self._ann_building:
+                return None
+            if self._ann_ready and self.ann_index.ntotal == len(self.mapping):
+                return None
+            self._ann_building = True
+            generation = self._ann_generation
+            vectors = self.corpus_embeddings
+            index = copy.copy(self.ann_index) # same parameters, fresh training state
+
+        def run():
+            try:
+                print(f"Building ANN index over {len(vectors)} rows...")
+                index.build(vectors)
+                with self._ann_lock:
+                    if generation != self._ann_generation:
+                        return # rows were renumbered meanwhile; the next build_ann_index retrains
+                    if len(self.corpus_embeddings) > index.ntotal:
+                        index.add(self.corpus_embeddings[index.ntotal:])
+                    self.ann_index = index
+                    self._ann_ready = True
+                print(f"ANN index ready ({index.ntotal} rows).")
+            except Exception as e:
+                print(f"Failed to build ANN index: {e}")
+            finally:
+                with self._ann_lock:
+                    self._ann_building = False
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="ann-build", daemon=True)
+        thread.start()
+        return thread
+
+    def _ensure_ann_index(self):
+        """Return the trained ANN index, or None when exact search should be used (a build is started if needed)."""
+        if self.ann_index is None or len(self.mapping) < ANN_MIN_ROWS:
+            return None
+        with self._ann_lock:
+            if self._ann_ready and self.ann_index.ntotal == len(self.mapping):
+                return self.ann_index
+        self.build_ann_index()
+        return None
+
+    def _ann_shortlist(self, query_vec, top_k: int, positions=None):
+        """
+        Lawyer positions whose rows the ANN index ranks near the query (restricted to `positions`
+        when filters apply). None means: use exact search over all / filtered rows instead.
+        """
+        index = self._ensure_ann_index()
+        if index is None:
+            return None
+        n_rows = max(ANN_CANDIDATES, top_k * 20)
+        if positions is not None:
+            filtered_rows = int(self._lawyer_row_count[positions].sum())
+            if filtered_rows < ANN_MIN_ROWS:
+                return None # exact over the filtered subset is already cheap
+            # Widen the shortlist by the filter selectivity so enough rows survive the intersection
+            n_rows = min(len(self.mapping), n_rows * len(self.mapping) // max(filtered_rows, 1))
+
+        shortlist = np.unique(self._row_lawyer[index.search(query_vec, n_rows)])
+        if positions is not None:
+            shortlist = np.intersect1d(shortlist, positions)
+        if len(shortlist) < top_k:
+            return None
+        return shortlist
+
+    def build_lexical_index(self, background: bool = True):
+        """
+        Give lexical documents to corpus rows that have none, i.e. rows loaded from the embedding store
+        (the store keeps no texts). A row's content key hashes the exact title / summary it was embedded
+        from, so rows are matched to LAWYERS_DB items by key rather than by position: an item that moved
+        or was deleted since the store was written can't hand its row someone else's text. Unmatched rows
+        (items gone since) stay without a document until the next refresh_index drops them.
+        Runs in a background thread by default; hybrid searches meanwhile use the rows indexed so far.
+        """
+        thread = self._lexical_thread
+        if thread is not None and thread.is_alive():
+            if background:
+                return
+            thread.join()
+        if background:
+            self._lexical_thread = threading.Thread(target=self._index_stored_rows, args=(self._lexical_generation,),
+                                                    name="lexical-index", daemon=True)
+            self._lexical_thread.start()
+        else:
+            self._index_stored_rows(self._lexical_generation)
+
+    def _index_stored_rows(self, generation: int):
+        with self._lexical_lock:
+            if generation != self._lexical_generation:
+                return
+            rows_by_key: Dict[str, List[int]] = {}
+            for row, entry in enumerate(self.mapping):
+                if entry.get("key") and row not in self.lexical_index:
+                    rows_by_key.setdefault(entry["key"], []).append(row)
+        if not rows_by_key:
+            return
+        for entry, _, document in self._iter_index_items():
+            rows = rows_by_key.pop(entry["key"], None)
+            if not rows:
+                continue
+            with self._lexical_lock:
+                if generation != self._lexical_generation:
+                    return # the mapping was rebuilt meanwhile and indexed its own rows
+                for row in rows:
+                    self.lexical_index.add(row, document)
+            if not rows_by_key:
+                return
+
+    def _lexical_scores(self, query: str):
+        """(rows, BM25 scores) of the corpus rows sharing at least one token with the query."""
+        hits = self.lexical_index.search(query, match="any")
+        rows = np.fromiter((row for row, _ in hits), dtype=np.int64, count=len(hits))
+        scores = np.fromiter((score for _, score in hits), dtype=np.float64, count=len(hits))
+        return rows, scores
+
+    def update_content_scores(self, lawyer: Dict):
+        """Recompute the content relevance row of a lawyer whose content_items changed."""
+        try:
+            self.content_scores.update_lawyer(lawyer)
+        except Exception as e:
+            print(f"Failed to update content scores: {e}")
+
+    def search(self, query: str, top_k: int = 10, location: str = None, gender: str = None, education: str = None, career: str = None, mode: str = None) -> Dict:  # type: ignore
+        """
+        mode: "vector" (embedding similarity + practice / content weights) or "hybrid", which re-ranks the same
+        candidates by reciprocal rank fusion with BM25 over case / content titles and summaries. Default SEARCH_MODE.
+        """
         if len(self.corpus_embeddings) == 0:
             return {"lawyers": [], "analysis": "데이터가 없습니다."}
+        hybrid = (mode or SEARCH_MODE) == "hybrid"
             
         # 1. Analyze Query
         analysis = self.analyze_query(query)
@@ -296,66 +745,75 @@ class SearchEngine:
         print(f"[{primary_area} ({confidence})] Secondary: {secondary_area}")
 
         # 2. Get query embedding
-        query_vec = self._get_embedding(search_text)
+        query_vec = self.embed_query(search_text)
         query_vec = np.array([query_vec])
+
+        # 3. Resolve hard filters first (metadata index), then narrow to the ANN shortlist on large corpora,
+        #    so similarity only touches the rows of surviving lawyers
+        self.filter_index.ensure(LAWYERS_DB)
+        selected = self.filter_index.select(gender=gender, education=education, career=career, location=location)
+        positions = None
+        candidate_lawyers = LAWYERS_DB
+        if selected is not None:
+            candidate_lawyers = [LAWYERS_DB[p] for p in selected]
+            positions = np.array([self._lawyer_pos[l["id"]] for l in candidate_lawyers if l["id"] in self._lawyer_pos], dtype=np.int64)
+        # Hybrid: lexical hits on the raw query (exact terms such as statute names), in-process — no extra round trip
+        lexical = self._lexical_scores(query) if hybrid else None
+        shortlist = self._ann_shortlist(query_vec[0], top_k, positions)
+        if shortlist is not None:
+            if lexical is not None and len(lexical[0]):
+                # Keep lawyers with lexical hits that the ANN shortlist missed (same hard filters apply)
+                lexical_lawyers = np.unique(self._row_lawyer[lexical[0]])
+                if positions is not None:
+                    lexical_lawyers = np.intersect1d(lexical_lawyers, positions)
+                shortlist = np.union1d(shortlist, lexical_lawyers)
+            positions = shortlist
+            candidate_lawyers = [LAWYERS_DB[p] for p in self.filter_index.positions_of(self._lawyer_ids[i] for i in shortlist)]
+        grouped = self._grouped_rows(positions)
         
-        # 3. Calculate cosine similarity
-        cosine_similarities = cosine_similarity(query_vec, self.corpus_embeddings).flatten()
+        # 4. Calculate exact cosine similarity (whole corpus, or only the selected rows)
+        rows = grouped[0]
+        if positions is None:
+            cosine_similarities = cosine_similarity(query_vec, self.corpus_embeddings).flatten()[rows]
+        else:
+            # Gather in ascending row order (sequential reads on the memmap), then restore grouping order
+            gather = np.argsort(rows)
+            cosine_similarities = np.zeros(len(rows))
+            if len(rows):
+                cosine_similarities[gather] = cosine_similarity(query_vec, self.corpus_embeddings[rows[gather]]).flatten()
         
-        # 4. Filter Candidate Pool logic
+        # Filter Candidate Pool logic
         target_tags_primary = self.AREA_MAPPING.get(primary_area, [])
         target_tags_secondary = self.AREA_MAPPING.get(secondary_area, []) if secondary_area else []
         
-        # 5. Score and Rank
-        lawyer_scores = {}
-        
-        for idx, score in enumerate(cosine_similarities):
-            mapping = self.mapping[idx]
-            lawyer_id = mapping["lawyer_id"]
-            item_type = mapping["type"]
-            item_index = mapping["index"]
-            
-            if lawyer_id not in lawyer_scores:
-                lawyer_scores[lawyer_id] = {
-                    "max_sim": -1.0, 
-                    "sum_sim": 0.0, 
-                    "count": 0, 
-                    "best_case_idx": -1,
-                    "best_content_idx": -1,
-                    "best_content_score": -1.0
-                }
-            
-            stats = lawyer_scores[lawyer_id]
-            
-            if item_type == "case":
-                if score > stats["max_sim"]:
-                    stats["max_sim"] = score
-                    stats["best_case_idx"] = item_index  # type: ignore
-            elif item_type == "content":
-                # Check if this content is better than previous best content
-                if score > stats["best_content_score"]:
-                    stats["best_content_score"] = score
-                    stats["best_content_idx"] = item_index  # type: ignore
-                
-                # Also contribute to max_sim if it's really good?
-                # Let's say content can be the BEST match overall.
-                if score > stats["max_sim"]:
-                    stats["max_sim"] = score
-                    # But if best match is content, we might not have a 'best_case_idx' set yet?
-                    # That's fine, we will handle it.
-            
-            if score > 0:
-                stats["sum_sim"] += score
-                stats["count"] += 1
+        # 5. Score and Rank (grouped reductions over the parallel mapping arrays)
+        lawyer_stats = self._aggregate_scores(cosine_similarities, grouped)
 
-        final_candidates = []
+        # Best BM25 row per lawyer over the same selected rows
+        lexical_max = np.zeros(len(self._lawyer_ids))
+        if lexical is not None and len(rows):
+            row_bm25 = np.zeros(len(self.mapping))
+            row_bm25[lexical[0]] = lexical[1]
+            starts = grouped[1]
+            lexical_max[self._row_lawyer[rows[starts]]] = np.maximum.reduceat(row_bm25[rows], starts)
+
+        # Content relevance for the primary area: precomputed (weighted score, verified count) per lawyer
+        raw_content_scores, valid_content_counts = self.content_scores.lookup(candidate_lawyers, primary_area)
+
+        # Pass 1: score every candidate with scalars only; the response payload is built later for the top-k
+        scored = [] # (lawyer, l_pos, practice_score, is_primary_match, valid_content_count, is_online)
+        final_scores = []
+        lexical_scores = []
+        online_ids = presence_manager.online_ids() # one expiry pass + O(1) membership per candidate
         
-        for lawyer in LAWYERS_DB:
+        for c_idx, lawyer in enumerate(candidate_lawyers):
             l_id = lawyer["id"]
-            if l_id not in lawyer_scores:
+            l_pos = self._lawyer_pos.get(l_id)
+            if l_pos is None:
                 continue
                 
             # --- Hard Filters (Metadata) ---
+            # Already resolved by filter_index; kept as a guard against a stale index
             if gender and lawyer.get("gender") != gender: continue
             if education and lawyer.get("education") != education: continue
             
@@ -386,39 +844,9 @@ class SearchEngine:
             # Let's apply a boost/penalty approach first.
             
             # --- Content Matching Score ---
-            # Calculate score based on verified content matching the primary area
-            raw_content_score = 0
-            valid_content_count = 0
-            
-            # Simple keyword matching for topic tags vs primary area
-            # e.g. primary="가사" -> matches "가사법", "이혼"
-            target_keywords = [primary_area]
-            if primary_area == "가사": target_keywords.extend(["이혼", "상속", "가사"])  # type: ignore
-            elif primary_area == "형사": target_keywords.extend(["성범죄", "교통", "형사"])  # type: ignore
-            elif primary_area == "부동산": target_keywords.extend(["임대차", "건설", "부동산"])  # type: ignore
-            
-            lawyer_content_items = lawyer.get("content_items") or []
-            for item in lawyer_content_items:
-                if not item.get("verified"): continue
-                
-                # Check topic relevance
-                is_relevant = False
-                for tag in item.get("topic_tags", []):
-                    for kw in target_keywords:
-                        if kw in tag:
-                            is_relevant = True
-                            break
-                    if is_relevant: break
-                
-                if not is_relevant: continue
-                
-                valid_content_count += 1  # type: ignore
-                itype = item.get("type")
-                if itype == "book": raw_content_score += 5  # type: ignore
-                elif itype == "lecture": raw_content_score += 3
-                elif itype == "column": raw_content_score += 2
-                elif itype == "blog": raw_content_score += 1
-                elif itype == "youtube": raw_content_score += 1 # Same as blog per user request
+            # Verified content whose topic_tags match the primary area (see content_scores.py)
+            raw_content_score = int(raw_content_scores[c_idx])
+            valid_content_count = int(valid_content_counts[c_idx])
             
             # Saturation: log(1 + x) / log(10) -> log10(1+x)
             # e.g. score 9 -> log10(10) = 1.0
@@ -427,9 +855,8 @@ class SearchEngine:
             content_score = min(content_score, 1.0) # Cap at 1.0
             
             # --- Final Score Calculation ---
-            sim_stats = lawyer_scores[l_id]  # type: ignore
             # Base similarity (0.9 Max + 0.1 Avg)
-            sim_score = (sim_stats["max_sim"] * 0.9) + (min(sim_stats["sum_sim"], 3.0)/3.0 * 0.1)
+            sim_score = (lawyer_stats["max_sim"][l_pos] * 0.9) + (min(lawyer_stats["sum_sim"][l_pos], 3.0)/3.0 * 0.1)
             
             # Hybrid Base: 75% Similarity, 25% Practice Match
             base_score = (0.75 * sim_score) + (0.25 * practice_score)
@@ -441,15 +868,39 @@ class SearchEngine:
             if confidence >= 0.7 and practice_score == 0.0:
                  final_score *= 0.5 
             
+            # --- Presence Boost ---
+            is_online = l_id in online_ids
+            if is_online:
+                final_score *= 1.1 # 10% Boost
+
+            scored.append((lawyer, l_pos, practice_score, is_primary_match, valid_content_count, is_online))
+            final_scores.append(final_score)
+            lexical_scores.append(lexical_max[l_pos])
+
+        # Pass 2: partial top-k selection, then build the heavy payload only for the survivors
+        # --- Post-Processing constraint ---
+        # "Unrelated area (practice_score=0) cannot exceed 50% of Top 10"
+        # With 0.25 practice weight + 0.5 penalty, unrelated lawyers already score lower,
+        # so we trust the score order for now.
+        # Hybrid: order by RRF of the vector ranking and the BM25 ranking; matchScore stays the vector score
+        rank_scores = np.asarray(final_scores, dtype=np.float64)
+        if hybrid:
+            rank_scores = _rrf_fuse(rank_scores, np.asarray(lexical_scores, dtype=np.float64))
+        results = []
+        for i in _top_k_indices(rank_scores, top_k):
+            lawyer, l_pos, practice_score, is_primary_match, valid_content_count, is_online = scored[i]
+            best_case_idx = lawyer_stats["best_case_idx"][l_pos]
+            best_content_idx = lawyer_stats["best_content_idx"][l_pos]
+
             best_case = None
-            if sim_stats["best_case_idx"] != -1 and sim_stats["best_case_idx"] < len(lawyer["cases"]):
-                best_case = lawyer["cases"][sim_stats["best_case_idx"]]
+            if best_case_idx != -1 and best_case_idx < len(lawyer["cases"]):
+                best_case = lawyer["cases"][best_case_idx]
                 
             best_content = None
             # If best content match is better than (or close to) best case match, or just significant
-            if sim_stats["best_content_idx"] != -1 and sim_stats["best_content_idx"] < len(lawyer["content_items"]):
+            if best_content_idx != -1 and best_content_idx < len(lawyer["content_items"]):
                 # We return it regardless, logic in frontend can decide what to show
-                best_content = lawyer["content_items"][sim_stats["best_content_idx"]]
+                best_content = lawyer["content_items"][best_content_idx]
             
             # Generate Reason
             # Default
@@ -463,22 +914,13 @@ class SearchEngine:
                 reason = f"'{case_nature}' 관련, '{best_content['title']}' 등 전문 콘텐츠를 통해 입증된 전문성이 있습니다."
             elif is_primary_match:
                  reason = f"이 사안은 {primary_area} 쟁점이며, {lawyer['expertise'][0]} 변호사로서 전문성을 보유하고 있습니다."
-            
-            # --- Presence Boost ---
-            is_online = False
-            try:
-                if presence_manager.is_online(l_id):
-                    is_online = True
-                    final_score *= 1.1 # 10% Boost
-            except:
-                pass
 
             # Content Highlights
             content_highlights = ""
             if valid_content_count > 0:
                 content_highlights = f"관련 전문 콘텐츠 {valid_content_count}건 (검증됨)"
             
-            final_candidates.append({
+            results.append({
                 "id": lawyer["id"],
                 "name": lawyer["name"],
                 "firm": lawyer["firm"],
@@ -488,7 +930,7 @@ class SearchEngine:
                 "careerTags": lawyer.get("careerTags", []),
                 "gender": lawyer.get("gender"),
                 "expertise": lawyer["expertise"],
-                "matchScore": float(final_score),
+                "matchScore": float(final_scores[i]),
                 "bestCase": best_case,
                 "bestContent": best_content, # Added
                 "imageUrl": lawyer.get("imageUrl"),
@@ -504,28 +946,6 @@ class SearchEngine:
                 "isOnline": is_online
             })
 
-        # Sort
-        final_candidates.sort(key=lambda x: x["matchScore"], reverse=True)
-        
-        # --- Post-Processing constraint ---
-        # "Unrelated area (practice_score=0) cannot exceed 50% of Top 10"
-        # We pick top 10, but ensure at least 5 are related if possible.
-        
-        top_results = []
-        related_pool = [c for c in final_candidates if c["practiceScore"] > 0]  # type: ignore
-        unrelated_pool = [c for c in final_candidates if c["practiceScore"] == 0]
-        
-        # If we have enough related, prioritize them
-        if len(related_pool) >= 5:
-             # Take top 10 from (Related sorted + Unrelated sorted)?
-             # No, final_score already accounts for meaningfulness. 
-             # Just strict truncation might be risky if similarity on unrelated is HUGE.
-             # But with 0.25 weight + 0.5 penalty, unrelated should be lower.
-             # Let's just trust the score sort for now, as the penalty is strong.
-             pass
-             
-        results = final_candidates[:top_k]  # type: ignore
-
         # Prepare Analysis Summary Text from Router
         key_issues_str = ", ".join(analysis.get('key_issues', [])[:3])
         analysis_summary = f"이 사안은 {primary_area} 관련 쟁점({key_issues_str})으로 분석됩니다."
@@ -22,6 +22,13 @@ def get_supabase():
 
     _initialized = True
 
+    stub = os.getenv("SUPABASE_STUB", "")
+    if stub:
+        from supabase_stub import StubSupabase  # type: ignore
+        _supabase_client = StubSupabase(None if stub == "1" else stub)
+        print(f"⚠️ SUPABASE_STUB 설정 → 로컬 스텁 클라이언트 사용 ({stub})")
+        return _supabase_client
+
     url = os.getenv("SUPABASE_URL", "")
     # 서비스 키(secret key)를 우선 사용 — RLS 바이패스 (Storage 업로드에 필요)
     key = os.getenv("SUPABASE_SECRET_KEY", "") or os.getenv("SUPABASE_KEY", "")
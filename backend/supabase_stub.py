@@ -0,0 +1,121 @@
+"""
+Local Supabase Stub
+- 실제 Supabase 없이 persistent_db 경로를 실행하기 위한 인메모리 클라이언트
+- 사용하는 쿼리 빌더만 구현: table().select / eq / or_ / order / range / upsert / update / execute
+- SUPABASE_STUB=1 → 메모리 전용, SUPABASE_STUB=<경로> → JSON 파일에 저장 (get_supabase에서 선택)
+"""
+
+import os
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class StubResponse:
+    def __init__(self, data: List[Dict]):
+        self.data = data
+
+
+_LITERALS = {"null": None, "true": True, "false": False}
+
+
+def _condition(text: str):
+    column, op, raw = text.strip().split(".", 2)
+    value = _LITERALS.get(raw, raw)
+    if op == "is":
+        return lambda row: row.get(column) is value
+    if op == "eq":
+        return lambda row: row.get(column) == value
+    raise ValueError(f"unsupported filter operator: {op}")
+
+
+class _StubQuery:
+    def __init__(self, client: "StubSupabase", table: str):
+        self.client = client
+        self.table = table
+        self.op = "select"
+        self.columns: Optional[List[str]] = None
+        self.filters: List = []
+        self.order_by: Optional[str] = None
+        self.bounds: Optional[tuple] = None
+        self.payload: Any = None
+
+    def select(self, columns: str = "*"):
+        self.op = "select"
+        self.columns = None if columns == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def eq(self, column: str, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def or_(self, conditions: str):
+        """PostgREST or 필터 ("is_mock.is.null,is_mock.eq.false"), is / eq 연산자만"""
+        predicates = [_condition(c) for c in conditions.split(",")]
+        self.filters.append(lambda row: any(p(row) for p in predicates))
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self.order_by = column
+        return self
+
+    def range(self, start: int, end: int):
+        self.bounds = (start, end)
+        return self
+
+    def upsert(self, rows, on_conflict: str = "id"):
+        self.op = "upsert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def update(self, values: Dict):
+        self.op = "update"
+        self.payload = values
+        return self
+
+    def execute(self) -> StubResponse:
+        return self.client._execute(self)
+
+
+class StubSupabase:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.tables: Dict[str, Dict[str, Dict]] = {}  # table -> id -> row
+        self.calls: List[tuple] = []  # (table, op, row count)
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.tables = json.load(f)
+
+    def table(self, name: str) -> _StubQuery:
+        return _StubQuery(self, name)
+
+    def _execute(self, query: _StubQuery) -> StubResponse:
+        with self._lock:
+            rows = self.tables.setdefault(query.table, {})
+            matched = [r for r in rows.values() if all(f(r) for f in query.filters)]
+            if query.op == "upsert":
+                for row in query.payload:
+                    rows[row["id"]] = dict(rows.get(row["id"], {}), **row)
+                self.calls.append((query.table, "upsert", len(query.payload)))
+                self._save()
+                return StubResponse(list(query.payload))
+            if query.op == "update":
+                for row in matched:
+                    row.update(query.payload)
+                self.calls.append((query.table, "update", len(matched)))
+                self._save()
+                return StubResponse(matched)
+            if query.order_by:
+                matched.sort(key=lambda r: str(r.get(query.order_by, "")))
+            if query.bounds:
+                matched = matched[query.bounds[0]:query.bounds[1] + 1]
+            self.calls.append((query.table, "select", len(matched)))
+            if query.columns:
+                matched = [{c: r.get(c) for c in query.columns} for r in matched]
+            return StubResponse(matched)
+
+    def _save(self):
+        if self.path:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.tables, f, ensure_ascii=False)
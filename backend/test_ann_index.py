@@ -0,0 +1,98 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import data
+import search
+from search import SearchEngine
+from ann_index import IVFPQIndex, exact_search
+from embedding_store import EmbeddingStore
+from embedder import FakeEmbedder
+
+def clustered(rows, dim, clusters, seed=0):
+    rng = np.random.RandomState(seed)
+    centers = rng.standard_normal((clusters, dim))
+    return (centers[rng.randint(0, clusters, rows)] + 0.5 * rng.standard_normal((rows, dim))).astype(np.float32)
+
+class TestIVFPQIndex(unittest.TestCase):
+    def setUp(self):
+        self.corpus = clustered(3000, 64, 30)
+        self.index = IVFPQIndex(nprobe=8, iters=5).build(self.corpus)
+
+    def test_recall_against_brute_force(self):
+        rng = np.random.RandomState(1)
+        hits = 0
+        for q in self.corpus[rng.choice(len(self.corpus), 20)]:
+            expected = set(exact_search(self.corpus, q, 10).tolist())
+            hits += len(expected & set(self.index.search(q, 200).tolist()))
+        self.assertGreaterEqual(hits / 200, 0.9)
+
+    def test_add_continues_row_numbers(self):
+        extra = clustered(10, 64, 30, seed=5)
+        self.index.add(extra)
+        self.assertEqual(self.index.ntotal, 3010)
+        self.assertIn(3004, self.index.search(extra[4], 5).tolist())
+
+class TestSearchWithAnn(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.original_db = list(search.LAWYERS_DB)
+        search.LAWYERS_DB[:] = data.generate_lawyers(40)
+        self.engine = SearchEngine()
+        self.engine.embedder = FakeEmbedder(dim=32)
+        self.engine.store = EmbeddingStore(os.path.join(self.tmp_dir, "store"))
+        self.engine.refresh_index()
+        self.query = "전세 보증금을 돌려받지 못하고 있습니다"
+
+    def tearDown(self):
+        search.LAWYERS_DB[:] = self.original_db
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_small_corpus_uses_exact_search(self):
+        self.engine.search(self.query)
+        self.assertFalse(self.engine._ann_ready)
+
+    def test_probing_every_list_matches_exact(self):
+        exact = self.engine.search(self.query, top_k=10)["lawyers"]
+        self.engine.ann_index = IVFPQIndex(n_lists=4, nprobe=4)
+        with mock.patch.object(search, "ANN_MIN_ROWS", 10):
+            self.engine.build_ann_index(background=False)
+            approx = self.engine.search(self.query, top_k=10, location="서울")["lawyers"]
+            self.assertTrue(self.engine._ann_ready)
+            self.assertEqual(approx, [c for c in self.engine.search(self.query, top_k=1000)["lawyers"] if "서울" in c["location"]][:10])
+            self.assertEqual(self.engine.search(self.query, top_k=10)["lawyers"], exact)
+
+    def test_search_stays_exact_until_background_build_finishes(self):
+        exact = self.engine.search(self.query, top_k=10)["lawyers"]
+        self.engine.ann_index = IVFPQIndex(n_lists=4, nprobe=4)
+        release = threading.Event()
+        build = IVFPQIndex.build
+        with mock.patch.object(search, "ANN_MIN_ROWS", 10), \
+                mock.patch.object(IVFPQIndex, "build", lambda index, vectors: release.wait(5) and build(index, vectors)):
+            thread = self.engine.build_ann_index()
+            self.assertEqual(self.engine.search(self.query, top_k=10)["lawyers"], exact)
+            self.assertFalse(self.engine._ann_ready)
+            release.set()
+            thread.join()
+        self.assertTrue(self.engine._ann_ready)
+        self.assertEqual(self.engine.ann_index.ntotal, len(self.engine.mapping))
+
+    def test_shortlist_limits_scored_lawyers(self):
+        self.engine.ann_index = IVFPQIndex(n_lists=16, nprobe=1)
+        with mock.patch.object(search, "ANN_MIN_ROWS", 10), mock.patch.object(search, "ANN_CANDIDATES", 20):
+            self.engine.build_ann_index(background=False)
+            shortlist = self.engine._ann_shortlist(np.ones(32), 1)
+        self.assertIsNotNone(shortlist)
+        self.assertLess(len(shortlist), len(self.engine._lawyer_ids))
+
+if __name__ == '__main__':
+    unittest.main()
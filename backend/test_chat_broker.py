@@ -0,0 +1,99 @@
+import sys
+import os
+import socket
+import asyncio
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chat
+from chat_broker import InMemoryBroker, LocalSocketBroker
+from test_chat_hub import FakeSocket
+
+async def settle(rounds=20):
+    for _ in range(rounds):
+        await asyncio.sleep(0.005)
+
+class BrokerScenarios:
+    """Two chat server workers sharing one backplane and one message log"""
+
+    def make_broker(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.legacy = mock.patch.object(chat, "CHAT_DB_FILE", os.path.join(self.tmp_dir, "missing.json"))
+        self.legacy.start()
+        log_dir = os.path.join(self.tmp_dir, "log")
+        self.worker_a = chat.ChatManager(log_dir=log_dir, broker=self.make_broker())
+        self.worker_b = chat.ChatManager(log_dir=log_dir, broker=self.make_broker())
+
+    def tearDown(self):
+        self.worker_a.log.close()
+        self.worker_b.log.close()
+        self.legacy.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_message_reaches_lawyer_on_other_worker(self):
+        async def scenario():
+            await self.worker_a.start_broker()
+            await self.worker_b.start_broker()
+            lawyer, monitor, user = FakeSocket(), FakeSocket(), FakeSocket()
+            await self.worker_a.connect(lawyer, "l1", "c1", "lawyer")
+            await self.worker_a.connect_monitor(monitor, "l1")
+            await self.worker_b.connect(user, "l1", "c1", "user")
+
+            await self.worker_b.send_message("l1", "c1", "user", "다른 워커에서 보낸 메시지")
+            await settle()
+            self.assertEqual([m["content"] for m in lawyer.sent], ["다른 워커에서 보낸 메시지"])
+            self.assertEqual(monitor.sent[0]["client_id"], "c1")
+            self.assertEqual(len(user.sent), 1)
+
+            # The message log is shared too
+            self.assertEqual(len(self.worker_a.get_history("l1", "c1")), 1)
+            await self.worker_a.stop_broker()
+            await self.worker_b.stop_broker()
+        asyncio.run(scenario())
+
+    def test_presence_is_shared(self):
+        async def scenario():
+            await self.worker_a.start_broker()
+            await self.worker_b.start_broker()
+            with mock.patch.object(chat.presence_manager, "update_heartbeat") as heartbeat:
+                await self.worker_a.heartbeat("l1")
+                await settle()
+            self.assertEqual(heartbeat.call_count, 2)  # both workers
+            await self.worker_a.stop_broker()
+            await self.worker_b.stop_broker()
+        asyncio.run(scenario())
+
+class TestInMemoryBroker(BrokerScenarios, unittest.TestCase):
+    def make_broker(self):
+        return InMemoryBroker(channel=self.tmp_dir)
+
+class TestLocalSocketBroker(BrokerScenarios, unittest.TestCase):
+    def make_broker(self):
+        return LocalSocketBroker(os.path.join(self.tmp_dir, "broker"))
+
+    def test_stale_worker_socket_is_removed(self):
+        async def scenario():
+            broker = self.worker_a.broker
+            await self.worker_a.start_broker()
+            stale_path = os.path.join(broker.directory, "dead.sock")
+            stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            stale.bind(stale_path)
+            stale.close()  # worker died without cleaning up
+
+            await broker.publish("presence", {"lawyer_id": "l1"})
+            self.assertFalse(os.path.exists(stale_path))
+            self.assertEqual(broker.stats()["peers"], 1)
+            await self.worker_a.stop_broker()
+            self.assertFalse(os.path.exists(broker.path))
+        asyncio.run(scenario())
+
+if __name__ == '__main__':
+    unittest.main()
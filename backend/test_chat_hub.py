@@ -0,0 +1,113 @@
+import sys
+import os
+import asyncio
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chat
+from chat_hub import ConnectionHub, SLOW_CONSUMER_CLOSE_CODE
+
+class FakeSocket:
+    def __init__(self, stalled=False, broken=False):
+        self.sent = []
+        self.closed_with = None
+        self.stalled = asyncio.Event() if stalled else None
+        self.broken = broken
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, payload):
+        if self.broken:
+            raise RuntimeError("connection reset")
+        if self.stalled is not None:
+            await self.stalled.wait()
+        self.sent.append(payload)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+class TestConnectionHub(unittest.TestCase):
+    def test_every_tab_receives_messages(self):
+        async def scenario():
+            hub = ConnectionHub()
+            tabs = [FakeSocket(), FakeSocket(), FakeSocket()]
+            for tab in tabs:
+                hub.register("monitor_l1", tab)
+            self.assertEqual(hub.publish("monitor_l1", {"n": 1}), 3)
+            await settle()
+            self.assertTrue(all(tab.sent == [{"n": 1}] for tab in tabs))
+
+            hub.unregister("monitor_l1", tabs[0])
+            hub.publish("monitor_l1", {"n": 2})
+            await settle()
+            self.assertEqual([len(tab.sent) for tab in tabs], [1, 2, 2])
+            self.assertEqual(hub.metrics()["connections"], 2)
+        asyncio.run(scenario())
+
+    def test_slow_consumer_is_dropped_without_blocking(self):
+        async def scenario():
+            hub = ConnectionHub(queue_size=2)
+            slow, fast = FakeSocket(stalled=True), FakeSocket()
+            hub.register("k", slow)
+            hub.register("k", fast)
+            for i in range(5):
+                hub.publish("k", {"n": i})
+                await settle()
+            self.assertEqual(len(fast.sent), 5)
+            self.assertEqual(slow.closed_with, SLOW_CONSUMER_CLOSE_CODE)
+            metrics = hub.metrics()
+            self.assertEqual((metrics["connections"], metrics["dropped_slow"]), (1, 1))
+        asyncio.run(scenario())
+
+    def test_broken_socket_is_removed(self):
+        async def scenario():
+            hub = ConnectionHub()
+            hub.register("k", FakeSocket(broken=True))
+            hub.publish("k", {"n": 1})
+            await settle()
+            self.assertFalse(hub.has("k"))
+            self.assertEqual(hub.metrics()["send_errors"], 1)
+        asyncio.run(scenario())
+
+class TestChatManagerFanOut(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.legacy = mock.patch.object(chat, "CHAT_DB_FILE", os.path.join(self.tmp_dir, "missing.json"))
+        self.legacy.start()
+        self.manager = chat.ChatManager(log_dir=self.tmp_dir)
+
+    def tearDown(self):
+        self.manager.log.close()
+        self.legacy.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_message_reaches_both_parties_and_all_monitors(self):
+        async def scenario():
+            user, lawyer, monitors = FakeSocket(), FakeSocket(), [FakeSocket(), FakeSocket()]
+            await self.manager.connect(user, "l1", "c1", "user")
+            await self.manager.connect(lawyer, "l1", "c1", "lawyer")
+            for monitor in monitors:
+                await self.manager.connect_monitor(monitor, "l1")
+            await self.manager.send_message("l1", "c1", "user", "안녕하세요")
+            await settle()
+            self.assertEqual(user.sent[0]["content"], "안녕하세요")
+            self.assertEqual(lawyer.sent[0]["content"], "안녕하세요")
+            for monitor in monitors:
+                self.assertEqual(monitor.sent[0]["type"], "new_message")
+
+            self.manager.disconnect_monitor("l1", monitors[0])
+            self.assertEqual(self.manager.connection_metrics()["connections"], 3)
+        asyncio.run(scenario())
+
+if __name__ == '__main__':
+    unittest.main()
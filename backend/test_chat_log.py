@@ -0,0 +1,272 @@
+import sys
+import os
+import json
+import asyncio
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chat
+from chat_log import ChatMessageLog, SNAPSHOT_FILE, _segment_name
+
+def message(i):
+    return {"sender": "user", "content": f"메시지 {i}", "timestamp": f"2026-01-01 00:00:{i:02d}"}
+
+class TestChatMessageLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log_dir = os.path.join(self.tmp_dir, "log")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def make_log(self, **kwargs):
+        log = ChatMessageLog(self.log_dir, fsync_interval=0, **kwargs)
+        log.load()
+        return log
+
+    def test_append_then_recover(self):
+        log = self.make_log()
+        log.append_session("l_c", "l", "c")
+        for i in range(3):
+            log.append_message("l_c", "l", "c", message(i))
+        log.close()
+
+        sessions = ChatMessageLog(self.log_dir).load()
+        self.assertEqual(sessions["l_c"]["messages"], [message(i) for i in range(3)])
+
+    def test_write_cost_is_one_record(self):
+        log = self.make_log()
+        for i in range(50):
+            log.append_message("l_c", "l", "c", message(i))
+        segment = os.path.join(self.log_dir, _segment_name(log.generation))
+        before = os.path.getsize(segment)
+        log.append_message("l_c", "l", "c", message(50))
+        self.assertLess(os.path.getsize(segment) - before, 200)
+        log.close()
+
+    def test_torn_tail_is_truncated(self):
+        log = self.make_log()
+        log.append_message("l_c", "l", "c", message(0))
+        log.append_message("l_c", "l", "c", message(1))
+        log.close()
+        segment = os.path.join(self.log_dir, _segment_name(log.generation))
+        with open(segment, "ab") as f:
+            f.write(b'0000abcd {"op":"message","key":"l_c"')  # crash mid-write
+
+        sessions = ChatMessageLog(self.log_dir).load()
+        self.assertEqual(len(sessions["l_c"]["messages"]), 2)
+        with open(segment, "rb") as f:
+            self.assertTrue(f.read().endswith(b"\n"))
+
+    def test_compaction_rolls_segment(self):
+        log = self.make_log(compact_bytes=1000)
+        for i in range(30):
+            log.append_message("l_c", "l", "c", message(i))
+        self.assertGreater(log.generation, 1)
+        self.assertEqual(len(os.listdir(self.log_dir)), 3)  # snapshot, current segment, LOCK
+        self.assertLess(os.path.getsize(os.path.join(self.log_dir, _segment_name(log.generation))), 1000)
+        log.close()
+
+        sessions = ChatMessageLog(self.log_dir).load()
+        self.assertEqual(sessions["l_c"]["messages"], [message(i) for i in range(30)])
+
+    def test_other_writer_survives_compaction(self):
+        a, b = self.make_log(), self.make_log()
+        a.append_message("l_c", "l", "c", message(0))
+        b.append_message("l_c", "l", "c", message(1))
+        a.compact()
+        b.append_message("l_c", "l", "c", message(2))  # b's segment was replaced
+        a.close()
+        b.close()
+
+        sessions = ChatMessageLog(self.log_dir).load()
+        self.assertEqual(sessions["l_c"]["messages"], [message(i) for i in range(3)])
+
+    def test_crash_before_old_segment_removed(self):
+        log = self.make_log()
+        log.append_message("l_c", "l", "c", message(0))
+        log.close()
+        stale = os.path.join(self.log_dir, _segment_name(log.generation))
+        shutil.copy(stale, stale + ".bak")
+        log = self.make_log()
+        log.compact()
+        log.close()
+        os.replace(stale + ".bak", stale)  # compaction died before deleting it
+
+        sessions = ChatMessageLog(self.log_dir).load()
+        self.assertEqual(len(sessions["l_c"]["messages"]), 1)
+        self.assertFalse(os.path.exists(stale))
+
+    def test_migrates_legacy_chats_json(self):
+        legacy = os.path.join(self.tmp_dir, "chats.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump({"l_c": {"lawyer_id": "l", "client_id": "c", "messages": [message(0)], "last_updated": "x"}}, f)
+        sessions = ChatMessageLog(self.log_dir).load(legacy_file=legacy)
+        self.assertEqual(sessions["l_c"]["messages"], [message(0)])
+        self.assertTrue(os.path.exists(os.path.join(self.log_dir, SNAPSHOT_FILE)))
+
+class TestChatManagerPersistence(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        # Keep the repo's chats.json out of the migration
+        self.legacy = mock.patch.object(chat, "CHAT_DB_FILE", os.path.join(self.tmp_dir, "missing.json"))
+        self.legacy.start()
+
+    def tearDown(self):
+        self.legacy.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_messages_survive_restart(self):
+        manager = chat.ChatManager(log_dir=self.tmp_dir)
+        asyncio.run(manager.send_message("lawyer-1", "client-1", "user", "안녕하세요"))
+        asyncio.run(manager.send_message("lawyer-1", "client-1", "lawyer", "네, 말씀하세요"))
+        manager.log.close()
+
+        restarted = chat.ChatManager(log_dir=self.tmp_dir)
+        history = restarted.get_history("lawyer-1", "client-1")
+        self.assertEqual([m["content"] for m in history], ["안녕하세요", "네, 말씀하세요"])
+        restarted.log.close()
+
+    def test_log_is_opened_on_first_use(self):
+        log_dir = os.path.join(self.tmp_dir, "lazy")
+        manager = chat.ChatManager(log_dir=log_dir)
+        self.assertFalse(os.path.exists(log_dir))
+        self.assertEqual(manager.get_history("lawyer-1", "client-1"), [])
+        self.assertTrue(os.path.exists(log_dir))
+        manager.log.close()
+
+    def test_poll_returns_only_other_writers_records(self):
+        a = ChatMessageLog(self.tmp_dir, fsync_interval=0)
+        b = ChatMessageLog(self.tmp_dir, fsync_interval=0)
+        a.load()
+        b.load()
+        a.append_message("l_c", "l", "c", {"timestamp": "t1"})
+        b.append_message("l_c", "l", "c", {"timestamp": "t2"})
+        self.assertEqual([r["message"]["timestamp"] for r in b.poll()], ["t1"])
+        self.assertEqual(b.poll(), [])
+        a.compact()
+        self.assertIsNone(b.poll())
+        a.close()
+        b.close()
+
+class TestChatSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.legacy = mock.patch.object(chat, "CHAT_DB_FILE", os.path.join(self.tmp_dir, "missing.json"))
+        self.legacy.start()
+        self.server = chat.ChatManager(log_dir=self.tmp_dir)  # e.g. chat_server.py
+        self.api = chat.ChatManager(log_dir=self.tmp_dir)  # e.g. main.py
+        # Both processes have served a request already (the log is opened on first use)
+        self.server.refresh()
+        self.api.refresh()
+
+    def tearDown(self):
+        self.server.log.close()
+        self.api.log.close()
+        self.legacy.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def send(self, lawyer_id, client_id, content, timestamp):
+        with mock.patch.object(chat, "datetime") as clock:
+            clock.now.return_value.strftime.return_value = timestamp
+            asyncio.run(self.server.send_message(lawyer_id, client_id, "user", content))
+
+    def test_reads_pick_up_other_process_without_reloading(self):
+        self.send("lawyer-1", "client-1", "첫 메시지", "2026-01-01 10:00:00")
+        with mock.patch.object(self.api, "load_chats") as reload:
+            history = self.api.get_history("lawyer-1", "client-1")
+            self.api.get_history("lawyer-1", "client-1")
+        reload.assert_not_called()
+        self.assertEqual([m["content"] for m in history], ["첫 메시지"])
+
+    def test_compaction_elsewhere_triggers_one_reload(self):
+        self.send("lawyer-1", "client-1", "a", "2026-01-01 10:00:00")
+        self.server.save_chats()
+        self.send("lawyer-1", "client-1", "b", "2026-01-01 10:00:01")
+        self.assertEqual([m["content"] for m in self.api.get_history("lawyer-1", "client-1")], ["a", "b"])
+
+    def test_inbox_sorted_by_last_updated(self):
+        self.send("lawyer-1", "client-a", "1", "2026-01-01 10:00:00")
+        self.send("lawyer-1", "client-b", "2", "2026-01-01 11:00:00")
+        self.send("lawyer-2", "client-a", "3", "2026-01-01 12:00:00")
+        self.send("lawyer-1", "client-a", "4", "2026-01-01 13:00:00")
+
+        for manager in (self.server, self.api):
+            self.assertEqual([c["client_id"] for c in manager.get_lawyer_chats("lawyer-1")], ["client-a", "client-b"])
+            self.assertEqual([c["lawyer_id"] for c in manager.get_client_chats("client-a")], ["lawyer-1", "lawyer-2"])
+        self.assertEqual(len(self.api._inbox["lawyer-1"]), 2)
+
+class TestChatPagination(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.legacy = mock.patch.object(chat, "CHAT_DB_FILE", os.path.join(self.tmp_dir, "missing.json"))
+        self.legacy.start()
+        self.manager = chat.ChatManager(log_dir=self.tmp_dir)
+        for i in range(7):
+            self.send("lawyer-1", "client-1", "lawyer" if i in (0, 3) else "user", f"m{i}", f"2026-01-01 10:00:{i:02d}")
+
+    def tearDown(self):
+        self.manager.log.close()
+        self.legacy.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def send(self, lawyer_id, client_id, role, content, timestamp):
+        with mock.patch.object(chat, "datetime") as clock:
+            clock.now.return_value.strftime.return_value = timestamp
+            asyncio.run(self.manager.send_message(lawyer_id, client_id, role, content))
+
+    def contents(self, page):
+        return [m["content"] for m in page["messages"]]
+
+    def test_backwards_with_before_cursor(self):
+        page = self.manager.get_history_page("lawyer-1", "client-1", limit=3)
+        self.assertEqual((self.contents(page), page["has_more"]), (["m4", "m5", "m6"], True))
+        page = self.manager.get_history_page("lawyer-1", "client-1", limit=3, before=page["before"])
+        self.assertEqual(self.contents(page), ["m1", "m2", "m3"])
+        page = self.manager.get_history_page("lawyer-1", "client-1", limit=3, before=page["before"])
+        self.assertEqual((self.contents(page), page["has_more"]), (["m0"], False))
+
+    def test_forwards_with_after_cursor_and_timestamps(self):
+        first = self.manager.get_history("lawyer-1", "client-1")[1]["id"]
+        page = self.manager.get_history_page("lawyer-1", "client-1", limit=2, after=first)
+        self.assertEqual((self.contents(page), page["has_more"]), (["m2", "m3"], True))
+        page = self.manager.get_history_page("lawyer-1", "client-1", limit=10, after_ts="2026-01-01 10:00:04")
+        self.assertEqual(self.contents(page), ["m5", "m6"])
+        page = self.manager.get_history_page("lawyer-1", "client-1", limit=10, before_ts="2026-01-01 10:00:02")
+        self.assertEqual(self.contents(page), ["m0", "m1"])
+        self.assertIsNone(self.manager.get_history_page("lawyer-1", "client-1", before="nope"))
+
+    def test_inbox_summaries_and_unread_counts(self):
+        # The lawyer last replied with m3, so m4..m6 are unread
+        self.send("lawyer-1", "client-2", "user", "다른 문의", "2026-01-01 11:00:00")
+        inbox = self.manager.get_lawyer_inbox("lawyer-1", limit=1)
+        self.assertEqual(len(inbox["chats"]), 1)
+        newest = inbox["chats"][0]
+        self.assertEqual((newest["client_id"], newest["unread_count"], newest["last_message"]["content"]), ("client-2", 1, "다른 문의"))
+        self.assertNotIn("messages", newest)
+
+        inbox = self.manager.get_lawyer_inbox("lawyer-1", limit=1, cursor=inbox["next_cursor"])
+        older = inbox["chats"][0]
+        self.assertEqual((older["client_id"], older["unread_count"], older["message_count"]), ("client-1", 3, 7))
+        self.assertFalse(inbox["has_more"])
+
+        self.assertEqual(self.manager.mark_read("lawyer-1", "client-1", "lawyer")["unread_count"], 0)
+        self.send("lawyer-1", "client-1", "user", "추가 질문", "2026-01-01 12:00:00")
+        self.assertEqual(self.manager.get_lawyer_inbox("lawyer-1")["chats"][0]["unread_count"], 1)
+
+    def test_read_markers_survive_restart(self):
+        self.manager.mark_read("lawyer-1", "client-1", "lawyer", upto=5)
+        self.manager.log.close()
+        restarted = chat.ChatManager(log_dir=self.tmp_dir)
+        restarted.refresh()
+        self.assertEqual(restarted.sessions["lawyer-1_client-1"].unread_count("lawyer"), 2)
+        self.assertEqual(restarted.sessions["lawyer-1_client-1"].unread_count("user"), 0)
+        restarted.log.close()
+
+if __name__ == '__main__':
+    unittest.main()
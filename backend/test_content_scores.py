@@ -0,0 +1,82 @@
+import sys
+import os
+import unittest
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import data
+from content_scores import ContentScoreTable
+from search import SearchEngine
+
+def reference_content_score(lawyer, primary_area):
+    """The original nested loop from SearchEngine.search, kept as the oracle."""
+    raw_content_score = 0
+    valid_content_count = 0
+    target_keywords = [primary_area]
+    if primary_area == "가사": target_keywords.extend(["이혼", "상속", "가사"])
+    elif primary_area == "형사": target_keywords.extend(["성범죄", "교통", "형사"])
+    elif primary_area == "부동산": target_keywords.extend(["임대차", "건설", "부동산"])
+
+    for item in lawyer.get("content_items") or []:
+        if not item.get("verified"): continue
+        is_relevant = False
+        for tag in item.get("topic_tags", []):
+            for kw in target_keywords:
+                if kw in tag:
+                    is_relevant = True
+                    break
+            if is_relevant: break
+        if not is_relevant: continue
+        valid_content_count += 1
+        itype = item.get("type")
+        if itype == "book": raw_content_score += 5
+        elif itype == "lecture": raw_content_score += 3
+        elif itype == "column": raw_content_score += 2
+        elif itype == "blog": raw_content_score += 1
+        elif itype == "youtube": raw_content_score += 1
+    return raw_content_score, valid_content_count
+
+AREAS = list(SearchEngine.AREA_MAPPING)
+
+class TestContentScoreTable(unittest.TestCase):
+    def setUp(self):
+        self.lawyers = data.generate_lawyers(30)
+        self.lawyers[0]["content_items"][0]["verified"] = False
+        self.lawyers[1]["content_items"].append(
+            {"id": "yt-1", "type": "youtube", "title": "영상", "topic_tags": ["이혼 절차"], "verified": True}
+        )
+        self.table = ContentScoreTable(AREAS)
+        self.table.build(self.lawyers)
+
+    def assertMatchesReference(self, lawyers, area):
+        raw, count = self.table.lookup(lawyers, area)
+        expected = [reference_content_score(l, area) for l in lawyers]
+        self.assertEqual(list(zip(raw.tolist(), count.tolist())), expected, area)
+
+    def test_matches_nested_loop_for_every_area(self):
+        for area in AREAS:
+            self.assertMatchesReference(self.lawyers, area)
+
+    def test_unknown_area_is_computed_on_demand(self):
+        self.assertMatchesReference(self.lawyers, "가사법")
+        self.assertMatchesReference(self.lawyers[:5], "가사법")
+
+    def test_update_after_approve_and_delete(self):
+        lawyer = self.lawyers[2]
+        lawyer["content_items"].insert(0, {"id": "new", "type": "book", "title": "책", "topic_tags": ["상속"], "verified": True})
+        self.table.update_lawyer(lawyer)
+        self.assertMatchesReference(self.lawyers, "가사")
+
+        lawyer["content_items"] = lawyer["content_items"][2:]
+        self.table.update_lawyer(lawyer)
+        self.assertMatchesReference(self.lawyers, "가사")
+
+    def test_lawyers_missing_from_table_are_added(self):
+        newcomer = {"id": "lawyer-new", "content_items": [
+            {"id": "c", "type": "column", "title": "칼럼", "topic_tags": ["형사"], "verified": True}
+        ]}
+        self.assertMatchesReference(self.lawyers[:3] + [newcomer], "형사")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import sys
+import os
+import io
+import shutil
+import tempfile
+import unittest
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+
+import cover_utils
+from magazine import MagazineFeed
+
+def png_bytes(width=1200, height=900):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (120, 80, 40)).save(out, format="PNG")
+    return out.getvalue()
+
+class TestCoverAssignment(unittest.TestCase):
+    def test_cover_is_deterministic_per_article(self):
+        self.assertEqual(cover_utils.cover_for("item-1"), cover_utils.cover_for("item-1"))
+        covers = {cover_utils.cover_for(f"item-{i}") for i in range(20)}
+        self.assertGreater(len(covers), 1)
+        self.assertTrue(all(cover_utils.is_generated_cover(url) for url in covers))
+
+    def test_assign_cover_skips_items_with_media(self):
+        item = {"id": "a"}
+        self.assertTrue(cover_utils.assign_cover(item))
+        self.assertFalse(cover_utils.assign_cover(item))
+        self.assertFalse(cover_utils.assign_cover({"id": "b", "file_url": "/uploads/b.pdf"}))
+
+    def test_feed_persists_cover_on_the_item(self):
+        item = {"id": "c1", "type": "case", "title": "사례", "date": "2025-01-01", "verified": True}
+        lawyer = {"id": "l1", "name": "김변호사", "content_items": [item]}
+        feed = MagazineFeed()
+        feed.rebuild([lawyer])
+        first = feed.articles()[0]["cover_image"]
+        self.assertEqual(item["image"], first)
+        feed.rebuild([lawyer])
+        self.assertEqual(feed.articles()[0]["cover_image"], first)
+
+class TestCoverCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.original_dir = cover_utils.COVER_LOCAL_DIR
+        cover_utils.COVER_LOCAL_DIR = self.tmp_dir
+
+    def tearDown(self):
+        cover_utils.COVER_LOCAL_DIR = self.original_dir
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_render_variants_resizes_to_webp(self):
+        variants = cover_utils.render_variants(png_bytes(), (800, 400, 2000))
+        sizes = {w: Image.open(io.BytesIO(data)).size for w, data in variants.items()}
+        self.assertEqual(sizes, {800: (800, 600), 400: (400, 300), 2000: (1200, 900)})
+        self.assertEqual(Image.open(io.BytesIO(variants[800])).format, "WEBP")
+
+    def test_prefetch_replaces_generated_covers_once(self):
+        fetched = []
+        def fetch(url):
+            fetched.append(url)
+            return png_bytes()
+
+        items = [{"id": "x"}, {"id": "y", "image": "https://cdn.example.com/y.png"}]
+        cover_utils.assign_cover(items[0])
+        lawyers = [{"id": "l1", "content_items": items}]
+        refreshed = []
+        self.assertEqual(cover_utils.prefetch_covers(lawyers, refreshed.append, fetch), 1)
+        self.assertEqual(len(fetched), 1)
+        self.assertEqual(refreshed, lawyers)
+        self.assertTrue(items[0]["image"].endswith("/static/images/covers/x-800.webp"))
+        self.assertEqual(set(items[0]["image_variants"]), {"800", "400"})
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, "x-400.webp")))
+
+        # Second pass: nothing left to fetch
+        self.assertEqual(cover_utils.prefetch_covers(lawyers, fetch=fetch), 0)
+        self.assertEqual(len(fetched), 1)
+
+    def test_list_cards_use_the_small_variant(self):
+        item = {"id": "s1", "type": "case", "title": "사례", "date": "2025-01-01", "verified": True}
+        lawyer = {"id": "l1", "name": "김변호사", "content_items": [item]}
+        feed = MagazineFeed()
+        feed.rebuild([lawyer])
+        self.assertIsNone(feed.articles()[0]["cover_image_small"])
+
+        cover_utils.prefetch_covers([lawyer], feed.refresh_lawyer, lambda url: png_bytes(), feed.lock)
+        card = feed.page(10)["items"][0]
+        self.assertTrue(card["cover_image"].endswith("s1-800.webp"))
+        self.assertTrue(card["cover_image_small"].endswith("s1-400.webp"))
+
+    def test_queue_stores_covers_of_submitted_lawyers(self):
+        item = {"id": "q1"}
+        cover_utils.assign_cover(item)
+        lawyer = {"id": "l1", "content_items": [item]}
+        stored = []
+        covers = cover_utils.CoverQueue(on_lawyer=stored.append, fetch=lambda url: png_bytes(), enabled=True)
+        self.assertTrue(covers.submit(lawyer))
+        covers.join()
+        self.assertEqual(stored, [lawyer])
+        self.assertFalse(cover_utils.is_generated_cover(item["image"]))
+        self.assertFalse(covers.submit(lawyer))  # nothing generated left
+        self.assertFalse(cover_utils.CoverQueue(enabled=False).submit({"id": "l2", "content_items": [{"image": cover_utils.cover_for("x")}]}))
+
+    def test_cover_changed_during_fetch_is_kept(self):
+        item = {"id": "r1"}
+        cover_utils.assign_cover(item)
+        def fetch(_url):
+            item["image"] = "https://cdn.example.com/uploaded.png"  # author uploaded an image meanwhile
+            return png_bytes()
+        self.assertFalse(cover_utils.store_cover(item, fetch))
+        self.assertEqual(item["image"], "https://cdn.example.com/uploaded.png")
+
+    def test_failed_fetch_keeps_generated_url(self):
+        item = {"id": "z"}
+        cover_utils.assign_cover(item)
+        url = item["image"]
+        def fetch(_url):
+            raise ConnectionError("offline")
+        self.assertFalse(cover_utils.store_cover(item, fetch))
+        self.assertEqual(item["image"], url)
+
+if __name__ == '__main__':
+    unittest.main()
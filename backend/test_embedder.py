@@ -0,0 +1,158 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from embedder import BatchEmbedder, FakeEmbedder, CachedEmbedder, EmbeddingCache, estimate_tokens
+
+class RateLimitError(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers={"retry-after": retry_after} if retry_after else {})
+
+class BadRequestError(Exception):
+    status_code = 400
+
+class FakeEmbeddingsAPI:
+    """Mimics client.embeddings.create, returning data in shuffled order like the real API may."""
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def create(self, input, model):
+        with self.lock:
+            self.requests.append(list(input))
+            if self.failures:
+                raise self.failures.pop(0)
+        data = [SimpleNamespace(index=i, embedding=[float(len(text)), float(i)]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+def make_embedder(api, **kwargs):
+    client = SimpleNamespace(embeddings=api)
+    return BatchEmbedder(client, sleep=lambda s: None, **kwargs)
+
+class TestBatchEmbedder(unittest.TestCase):
+    def test_results_follow_input_order(self):
+        api = FakeEmbeddingsAPI()
+        texts = ["a" * n for n in range(1, 40)]
+        vectors = make_embedder(api, max_batch_size=7, max_concurrency=4).embed(texts)
+
+        self.assertEqual([v[0] for v in vectors], [float(len(t)) for t in texts])
+        self.assertEqual(len(api.requests), 6)
+
+    def test_batches_respect_token_budget(self):
+        texts = ["법률 상담 " * 50 for _ in range(10)]
+        budget = estimate_tokens(texts[0]) * 3
+        batches = make_embedder(FakeEmbeddingsAPI(), max_batch_tokens=budget).make_batches(texts)
+
+        self.assertEqual([len(b) for b in batches], [3, 3, 3, 1])
+        self.assertEqual(sum(batches, []), list(range(10)))
+
+    def test_retries_rate_limit_then_succeeds(self):
+        sleeps = []
+        api = FakeEmbeddingsAPI(failures=[RateLimitError(retry_after="2"), RateLimitError()])
+        embedder = BatchEmbedder(SimpleNamespace(embeddings=api), sleep=sleeps.append)
+
+        vectors = embedder.embed(["이혼", "상속"])
+        self.assertEqual(len(api.requests), 3)
+        self.assertEqual(sleeps[0], 2.0)
+        self.assertTrue(all(v is not None for v in vectors))
+
+    def test_non_retryable_error_marks_batch_failed(self):
+        api = FakeEmbeddingsAPI(failures=[BadRequestError()])
+        vectors = make_embedder(api).embed(["이혼", "상속"])
+
+        self.assertEqual(len(api.requests), 1)
+        self.assertEqual(vectors, [None, None])
+
+    def test_empty_texts_are_skipped(self):
+        api = FakeEmbeddingsAPI()
+        vectors = make_embedder(api).embed(["", "형사", "   "])
+
+        self.assertEqual(api.requests, [["형사"]])
+        self.assertIsNone(vectors[0])
+        self.assertIsNotNone(vectors[1])
+        self.assertIsNone(vectors[2])
+
+class TestFakeEmbedder(unittest.TestCase):
+    def test_deterministic_unit_vectors(self):
+        embedder = FakeEmbedder(dim=16)
+        a1, a2, b = embedder.embed(["이혼 소송", "이혼 소송", "음주운전"])
+
+        self.assertEqual(a1, a2)
+        self.assertNotEqual(a1, b)
+        self.assertAlmostEqual(sum(x * x for x in a1), 1.0, places=6)
+
+class TestCachedEmbedder(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_only_misses_reach_inner_embedder(self):
+        inner = FakeEmbedder(dim=8)
+        embedder = CachedEmbedder(inner, EmbeddingCache(max_entries=10))
+        first = embedder.embed(["이혼", "상속"])
+        second = embedder.embed(["상속", "형사", "이혼"])
+
+        self.assertEqual(inner.embedded, 3)
+        self.assertEqual(second[0], first[1])
+        self.assertEqual(second[2], first[0])
+        self.assertEqual(embedder.cache.stats()["hits"], 2)
+
+    def test_lru_eviction(self):
+        inner = FakeEmbedder(dim=8)
+        embedder = CachedEmbedder(inner, EmbeddingCache(max_entries=2))
+        embedder.embed(["a", "b"])
+        embedder.embed(["a"])       # a is now most recent
+        embedder.embed(["c"])       # evicts b
+        embedder.embed(["a", "b"])
+
+        self.assertEqual(inner.embedded, 4)
+        self.assertEqual(embedder.cache.stats()["size"], 2)
+
+    def test_evicted_entries_spill_to_disk(self):
+        spill = os.path.join(self.tmp_dir, "spill.sqlite3")
+        inner = FakeEmbedder(dim=8)
+        embedder = CachedEmbedder(inner, EmbeddingCache(max_entries=1, spill_path=spill))
+        original = embedder.embed_one("음주운전")
+        embedder.embed_one("전세사기")  # pushes 음주운전 to disk
+
+        self.assertEqual(embedder.embed_one("음주운전"), original)
+        self.assertEqual(inner.embedded, 2)
+        self.assertEqual(embedder.cache.stats()["spill_hits"], 1)
+
+        # A fresh process sharing the spill file reuses it too
+        fresh = CachedEmbedder(FakeEmbedder(dim=8), EmbeddingCache(max_entries=1, spill_path=spill))
+        fresh.embed_one("음주운전")
+        self.assertEqual(fresh.embedder.embedded, 0)
+
+    def test_model_is_part_of_the_key(self):
+        cache = EmbeddingCache()
+        CachedEmbedder(FakeEmbedder(dim=8, model="m1"), cache).embed_one("이혼")
+        other = CachedEmbedder(FakeEmbedder(dim=8, model="m2"), cache)
+        other.embed_one("이혼")
+        self.assertEqual(other.embedder.embedded, 1)
+
+class TestSearchQueryEmbedding(unittest.TestCase):
+    def test_repeated_query_is_embedded_once(self):
+        from search import SearchEngine
+        engine = SearchEngine()
+        engine.embedder = FakeEmbedder(dim=8)
+
+        self.assertEqual(engine.embed_query("이혼 소송"), engine.embed_query("이혼 소송"))
+        self.assertEqual(engine.embedder.embedded, 1)
+        self.assertEqual(engine.cache_stats()["query_embedding"]["hit_ratio"], 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
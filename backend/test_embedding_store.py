@@ -0,0 +1,139 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import embedding_store
+from embedding_store import EmbeddingStore, EmbeddingStoreError
+
+class TestEmbeddingStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.tmp_dir, "store")
+        self.vectors = np.random.RandomState(0).rand(5, 8).astype(np.float32)
+        self.mapping = [{"lawyer_id": f"lawyer{i}", "type": "case", "index": i} for i in range(5)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_roundtrip_is_memory_mapped(self):
+        store = EmbeddingStore(self.store_dir)
+        store.save(self.vectors, self.mapping, model="test-model")
+
+        vectors, mapping, meta = store.load()
+        self.assertIsInstance(vectors, np.memmap)
+        np.testing.assert_array_equal(np.asarray(vectors), self.vectors)
+        self.assertEqual(mapping, self.mapping)
+        self.assertEqual(meta["model"], "test-model")
+        self.assertEqual((meta["count"], meta["dim"]), (5, 8))
+
+    def test_float16_store(self):
+        store = EmbeddingStore(self.store_dir, dtype="float16")
+        store.save(self.vectors, self.mapping)
+
+        vectors, _, meta = store.load()
+        self.assertEqual(meta["dtype"], "float16")
+        self.assertEqual(os.path.getsize(store.vectors_path), 5 * 8 * 2)
+        np.testing.assert_allclose(np.asarray(vectors, dtype=np.float32), self.vectors, atol=1e-3)
+
+    def test_corruption_is_detected(self):
+        store = EmbeddingStore(self.store_dir)
+        store.save(self.vectors, self.mapping)
+
+        with open(store.vectors_path, "r+b") as f:
+            f.seek(3)
+            f.write(b"\xff")
+
+        with self.assertRaises(EmbeddingStoreError):
+            store.load()
+
+    def test_deferred_verification(self):
+        store = EmbeddingStore(self.store_dir)
+        store.save(self.vectors, self.mapping)
+
+        with open(store.vectors_path, "r+b") as f:
+            f.seek(3)
+            f.write(b"\xff")
+
+        # verify=False opens without reading the vectors; the check runs later
+        vectors, _, meta = store.load(verify=False)
+        self.assertFalse(store.verify_vectors(vectors, meta))
+
+    def test_version_mismatch_is_rejected(self):
+        store = EmbeddingStore(self.store_dir)
+        store.save(self.vectors, self.mapping)
+
+        with open(store.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        meta["version"] = 999
+        with open(store.meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        with self.assertRaises(EmbeddingStoreError):
+            store.load()
+
+    def test_save_commits_a_new_generation(self):
+        store = EmbeddingStore(self.store_dir)
+        store.save(self.vectors, self.mapping)
+        first_vectors, first_mapping, first_meta = store.load()
+        first_path = store.vectors_path
+
+        # later saves never touch the files an open memmap still points at
+        second = self.vectors * 2
+        store.save(second, self.mapping[::-1])
+        np.testing.assert_array_equal(np.asarray(first_vectors), self.vectors)
+        self.assertTrue(os.path.exists(first_path))
+
+        vectors, mapping, meta = store.load()
+        self.assertEqual(meta["generation"], first_meta["generation"] + 1)
+        self.assertNotEqual(store.vectors_path, first_path)
+        np.testing.assert_array_equal(np.asarray(vectors), second)
+        self.assertEqual(mapping, self.mapping[::-1])
+
+        # only the current and previous generations are kept
+        del first_vectors
+        store.save(self.vectors, self.mapping)
+        self.assertFalse(os.path.exists(first_path))
+        self.assertEqual(len([n for n in os.listdir(self.store_dir) if n.startswith("vectors-")]), 2)
+
+    def test_reads_fixed_name_store(self):
+        os.makedirs(self.store_dir)
+        raw = self.vectors.tobytes()
+        mapping_bytes = json.dumps(self.mapping).encode("utf-8")
+        with open(os.path.join(self.store_dir, "vectors.bin"), "wb") as f:
+            f.write(raw)
+        with open(os.path.join(self.store_dir, "mapping.json"), "wb") as f:
+            f.write(mapping_bytes)
+        store = EmbeddingStore(self.store_dir)
+        meta = {"version": 1, "dtype": "float32", "count": 5, "dim": 8, "model": "",
+                "checksum": embedding_store._crc32_of(raw), "mapping_checksum": embedding_store._crc32_of(mapping_bytes)}
+        with open(store.meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        vectors, mapping, _ = store.load()
+        np.testing.assert_array_equal(np.asarray(vectors), self.vectors)
+        self.assertEqual(mapping, self.mapping)
+
+    def test_migrates_legacy_json_cache(self):
+        legacy_path = os.path.join(self.tmp_dir, "embeddings_cache.json")
+        with open(legacy_path, "w", encoding="utf-8") as f:
+            json.dump({"embeddings": self.vectors.tolist(), "mapping": self.mapping}, f)
+
+        store = EmbeddingStore(self.store_dir)
+        self.assertFalse(store.exists())
+        store.migrate_json_cache(legacy_path)
+        self.assertTrue(store.exists())
+
+        vectors, mapping, _ = store.load()
+        np.testing.assert_allclose(np.asarray(vectors), self.vectors, rtol=1e-6)
+        self.assertEqual(mapping, self.mapping)
+
+if __name__ == '__main__':
+    unittest.main()
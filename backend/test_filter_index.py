@@ -0,0 +1,122 @@
+import sys
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import data
+import search
+from search import SearchEngine
+from filter_index import LawyerFilterIndex
+from embedding_store import EmbeddingStore
+from embedder import FakeEmbedder
+
+def make_lawyers(count=60):
+    lawyers = data.generate_lawyers(count)
+    rng = random.Random(1)
+    for lawyer in lawyers:
+        lawyer["gender"] = rng.choice(["male", "female"])
+    lawyers[0]["location"] = None
+    return lawyers
+
+def brute_force(lawyers, gender=None, education=None, career=None, location=None):
+    """The original hard-filter loop from SearchEngine.search."""
+    result = []
+    for pos, lawyer in enumerate(lawyers):
+        if gender and lawyer.get("gender") != gender: continue
+        if education and lawyer.get("education") != education: continue
+        if career and career not in (lawyer.get("careerTags") or []): continue
+        if location and location not in (lawyer.get("location") or ""): continue
+        result.append(pos)
+    return result
+
+FILTER_COMBOS = [
+    {"location": "서울"},
+    {"location": "경기", "gender": "female"},
+    {"education": data.EDUCATION_TYPES[0], "career": data.CAREER_TAGS[0]},
+    {"gender": "male", "education": data.EDUCATION_TYPES[1], "location": "부산"},
+    {"location": "없는지역"},
+    {"career": "없는경력"},
+]
+
+class TestLawyerFilterIndex(unittest.TestCase):
+    def setUp(self):
+        self.lawyers = make_lawyers()
+        self.index = LawyerFilterIndex()
+        self.index.build(self.lawyers)
+
+    def test_no_filters_means_everyone(self):
+        self.assertIsNone(self.index.select())
+
+    def test_matches_brute_force(self):
+        for filters in FILTER_COMBOS:
+            self.assertEqual(list(self.index.select(**filters)), brute_force(self.lawyers, **filters), filters)
+
+    def test_expertise_is_any_of(self):
+        tags = ["가사법 전문", "형사법 전문"]
+        expected = [pos for pos, l in enumerate(self.lawyers) if set(l["expertise"]) & set(tags)]
+        self.assertEqual(list(self.index.select(expertise=tags)), expected)
+
+    def test_rebuilds_after_invalidate_or_resize(self):
+        self.lawyers[1]["location"] = "제주 서귀포시"
+        self.index.ensure(self.lawyers)
+        self.assertNotIn(1, self.index.select(location="서귀포"))
+
+        self.index.invalidate()
+        self.index.ensure(self.lawyers)
+        self.assertIn(1, self.index.select(location="서귀포"))
+
+        self.lawyers.append(dict(self.lawyers[1], id="lawyer-new"))
+        self.index.ensure(self.lawyers)
+        self.assertIn(len(self.lawyers) - 1, self.index.select(location="서귀포"))
+
+    def test_save_lawyers_db_notifies_listeners(self):
+        calls = []
+        data.on_lawyers_db_saved(calls.append)
+        cwd, tmp_dir = os.getcwd(), tempfile.mkdtemp()
+        try:
+            os.chdir(tmp_dir)
+            data.save_lawyers_db(self.lawyers)
+            data.flush_lawyers_db()
+        finally:
+            os.chdir(cwd)
+            data._SAVE_LISTENERS.remove(calls.append)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.assertEqual(calls, [self.lawyers])
+
+class TestFilteredSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.original_db = list(search.LAWYERS_DB)
+        search.LAWYERS_DB[:] = make_lawyers()
+        self.engine = SearchEngine()
+        self.engine.embedder = FakeEmbedder(dim=32)
+        self.engine.store = EmbeddingStore(os.path.join(self.tmp_dir, "store"))
+        self.engine.refresh_index()
+
+    def tearDown(self):
+        search.LAWYERS_DB[:] = self.original_db
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_prefiltered_search_matches_filtering_afterwards(self):
+        query = "이혼 소송에서 양육권과 재산분할이 걱정됩니다"
+        everyone = self.engine.search(query, top_k=1000)["lawyers"]
+        for filters in FILTER_COMBOS:
+            allowed = {search.LAWYERS_DB[p]["id"] for p in brute_force(search.LAWYERS_DB, **filters)}
+            expected = [(c["id"], c["matchScore"], c["bestCase"]) for c in everyone if c["id"] in allowed]
+            results = self.engine.search(query, top_k=1000, **filters)["lawyers"]
+            self.assertEqual([(c["id"], c["matchScore"], c["bestCase"]) for c in results], expected, filters)
+
+    def test_similarity_only_on_filtered_rows(self):
+        positions = [self.engine._lawyer_pos[search.LAWYERS_DB[p]["id"]] for p in brute_force(search.LAWYERS_DB, location="서울")]
+        rows, _ = self.engine._grouped_rows(positions)
+        self.assertLess(len(rows), len(self.engine.mapping))
+        self.assertEqual({self.engine.mapping[r]["lawyer_id"] for r in rows},
+                         {self.engine._lawyer_ids[p] for p in positions})
+
+if __name__ == '__main__':
+    unittest.main()
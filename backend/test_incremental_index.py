@@ -0,0 +1,89 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import search
+from search import SearchEngine
+from embedding_store import EmbeddingStore
+from embedder import FakeEmbedder
+
+def make_lawyer(lawyer_id, cases, contents=()):
+    return {
+        "id": lawyer_id,
+        "cases": [{"title": t, "summary": f"{t} 요약"} for t in cases],
+        "content_items": [
+            {"id": f"{lawyer_id}-{t}", "type": "column", "title": t, "summary": f"{t} 요약", "verified": True}
+            for t in contents
+        ],
+    }
+
+class TestIncrementalIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.original_db = list(search.LAWYERS_DB)
+        search.LAWYERS_DB[:] = [
+            make_lawyer("lawyer-a", ["이혼 소송", "양육권 분쟁"], ["상속 칼럼"]),
+            make_lawyer("lawyer-b", ["음주운전 방어"]),
+        ]
+        self.engine = SearchEngine()
+        self.engine.embedder = FakeEmbedder()
+        self.engine.store = EmbeddingStore(os.path.join(self.tmp_dir, "store"))
+
+    def tearDown(self):
+        search.LAWYERS_DB[:] = self.original_db
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def refresh(self, engine=None):
+        """Run refresh_index() and return how many texts were sent to the embedder."""
+        engine = engine or self.engine
+        before = engine.embedder.embedded
+        engine.refresh_index()
+        return engine.embedder.embedded - before
+
+    def test_unchanged_items_are_not_re_embedded(self):
+        self.assertEqual(self.refresh(), 4)
+        self.assertEqual(self.refresh(), 0)
+
+    def test_only_new_and_changed_items_are_embedded(self):
+        self.refresh()
+        search.LAWYERS_DB[0]["cases"][0]["summary"] = "재산분할 쟁점 추가"
+        search.LAWYERS_DB.append(make_lawyer("lawyer-c", ["전세사기 고소"]))
+
+        self.assertEqual(self.refresh(), 2)
+        self.assertEqual(len(self.engine.mapping), 5)
+        self.assertEqual(len(self.engine.corpus_embeddings), 5)
+
+    def test_deleted_items_are_removed(self):
+        self.refresh()
+        del search.LAWYERS_DB[1]
+
+        self.assertEqual(self.refresh(), 0)
+        self.assertEqual(len(self.engine.corpus_embeddings), 3)
+        self.assertTrue(all(m["lawyer_id"] == "lawyer-a" for m in self.engine.mapping))
+
+    def test_reuses_vectors_from_disk_in_new_process(self):
+        self.refresh()
+        fresh_engine = SearchEngine()
+        fresh_engine.embedder = FakeEmbedder()
+        fresh_engine.store = self.engine.store
+
+        self.assertEqual(self.refresh(fresh_engine), 0)
+        np.testing.assert_allclose(
+            np.asarray(fresh_engine.corpus_embeddings), np.asarray(self.engine.corpus_embeddings)
+        )
+
+    def test_no_lawyer_cap(self):
+        search.LAWYERS_DB[:] = [make_lawyer(f"lawyer-{i}", [f"사건 {i}"]) for i in range(150)]
+        self.assertEqual(self.refresh(), 150)
+        self.assertEqual(len({m["lawyer_id"] for m in self.engine.mapping}), 150)
+        self.assertEqual(self.engine.embedder.calls, 1) # one batched call, not one per item
+
+if __name__ == '__main__':
+    unittest.main()
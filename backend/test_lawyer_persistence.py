@@ -0,0 +1,156 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import data
+from supabase_stub import StubSupabase
+
+class TestDirtyTrackingSave(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "lawyers_db.json")
+        self.lawyers = [
+            {"id": "real@example.com", "name": "실제 변호사", "is_mock": False, "location": "서울"},
+            {"id": "lawyer-1", "name": "가상 변호사", "is_mock": True, "location": "부산"},
+        ]
+        self.single_writes, self.batch_writes = [], []
+        patches = [
+            mock.patch.object(data, "DB_FILE", self.db_path),
+            mock.patch.object(data, "_save_single_to_supabase", side_effect=self.record_single),
+            mock.patch.object(data, "_save_to_supabase", side_effect=self.record_batch),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        data._remember_persisted(self.lawyers)
+
+    def tearDown(self):
+        data.flush_lawyers_db()
+        data._PERSISTED_FINGERPRINTS.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def record_single(self, lawyer):
+        self.single_writes.append(lawyer["id"])
+        return True
+
+    def record_batch(self, lawyers):
+        self.batch_writes.append([l["id"] for l in lawyers])
+        return True
+
+    def test_unchanged_db_writes_no_rows(self):
+        data.save_lawyers_db(self.lawyers)
+        self.assertEqual((self.single_writes, self.batch_writes), ([], []))
+
+    def test_profile_edit_writes_one_row(self):
+        self.lawyers[0]["location"] = "경기"
+        data.save_lawyers_db(self.lawyers)
+        data.save_lawyers_db(self.lawyers)
+
+        self.assertEqual(self.single_writes, ["real@example.com"])
+        self.assertEqual(self.batch_writes, [])
+
+    def test_multiple_changes_are_batched(self):
+        self.lawyers[1]["verified"] = True
+        self.lawyers.append({"id": "new@example.com", "name": "신규", "is_mock": False})
+        data.save_lawyers_db(self.lawyers)
+        self.assertEqual(self.batch_writes, [["lawyer-1", "new@example.com"]])
+
+    def test_explicit_changes_skip_the_sweep(self):
+        self.lawyers[0]["location"] = "경기"
+        self.lawyers[1]["location"] = "대구"
+        with mock.patch.object(data, "_fingerprint", wraps=data._fingerprint) as fingerprint:
+            data.save_lawyers_db(self.lawyers, changed=[self.lawyers[1]])
+        self.assertEqual(fingerprint.call_count, 1)
+        self.assertEqual(self.single_writes, ["lawyer-1"])
+
+        # The untracked edit is still picked up by the next full sweep
+        data.save_lawyers_db(self.lawyers)
+        self.assertEqual(self.single_writes, ["lawyer-1", "real@example.com"])
+
+    def test_failed_write_is_retried_on_next_save(self):
+        self.lawyers[0]["location"] = "경기"
+        with mock.patch.object(data, "_save_single_to_supabase", return_value=False):
+            data.save_lawyers_db(self.lawyers)
+        data.save_lawyers_db(self.lawyers)
+        self.assertEqual(self.single_writes, ["real@example.com"])
+
+    def test_json_snapshot_is_debounced_and_atomic(self):
+        with mock.patch.object(data, "_write_json_atomic", wraps=data._write_json_atomic) as write:
+            for i in range(5):
+                self.lawyers[0]["name"] = f"이름 {i}"
+                data.save_lawyers_db(self.lawyers)
+            self.assertFalse(os.path.exists(self.db_path))
+            data.flush_lawyers_db()
+
+        # One lawyers_db.json write + one real_lawyers_backup.json write
+        self.assertEqual(write.call_count, 2)
+        with open(self.db_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)[0]["name"], "이름 4")
+        with open(os.path.join(self.tmp_dir, "real_lawyers_backup.json"), encoding="utf-8") as f:
+            self.assertEqual([l["id"] for l in json.load(f)], ["real@example.com"])
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ["lawyers_db.json", "real_lawyers_backup.json"])
+
+    def test_snapshot_is_written_in_background(self):
+        with mock.patch.object(data._snapshot_writer, "delay", 0.01):
+            data.save_lawyers_db(self.lawyers)
+            data._snapshot_writer._timer.join(timeout=5)
+        self.assertTrue(os.path.exists(self.db_path))
+
+class TestPagedStartupLoad(unittest.TestCase):
+    def setUp(self):
+        self.client = StubSupabase()
+        rows = [{"id": f"real-{i:02d}@example.com", "is_mock": False, "verified": True,
+                 "data": {"name": f"변호사 {i}", "expertise": ["이혼 전문"]}} for i in range(7)]
+        rows.append({"id": "lawyer-3", "is_mock": False, "verified": True, "data": {"name": "레거시 가상"}})
+        rows.append({"id": "mock@example.com", "is_mock": True, "verified": True, "data": {"name": "가상"}})
+        self.client.table("lawyers").upsert(rows).execute()
+        self.client.calls.clear()
+        patches = [
+            mock.patch("supabase_client.get_supabase", return_value=self.client),
+            mock.patch.object(data, "LAWYERS_PAGE_SIZE", 3),
+            mock.patch.object(data, "_snapshot_writer", mock.Mock()),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(data._PERSISTED_FINGERPRINTS.clear)
+
+    def test_rows_are_streamed_in_pages_without_writes(self):
+        lawyers = data.load_lawyers_db()
+        self.assertEqual([l["id"] for l in lawyers], [f"real-{i:02d}@example.com" for i in range(7)])
+        self.assertEqual([c[2] for c in self.client.calls], [3, 3, 2])  # is_mock rows filtered server-side
+        # Backfilled fields live in memory only; saving the loaded state writes nothing
+        self.assertTrue(all(l["imageUrl"] and l["cases"] for l in lawyers))
+        data.save_lawyers_db(lawyers)
+        self.assertEqual([c for c in self.client.calls if c[1] != "select"], [])
+
+    def test_backfill_is_stable_across_cold_starts(self):
+        first = data.load_lawyers_db()
+        for row in self.client.tables["lawyers"].values():
+            row["data"] = {k: v for k, v in row["data"].items() if k in ("name", "expertise")}
+        second = data.load_lawyers_db()
+        self.assertEqual([(l["kakao_id"], l["cases"]) for l in first],
+                         [(l["kakao_id"], l["cases"]) for l in second])
+
+    def test_backfill_does_not_depend_on_position(self):
+        records = [{"id": f"real-{i}@example.com"} for i in range(4)]
+        forward = data.prepare_lawyers([dict(r) for r in records])
+        backward = data.prepare_lawyers([dict(r) for r in reversed(records)])[::-1]
+        self.assertEqual([(l["imageUrl"], l["homepage"]) for l in forward],
+                         [(l["imageUrl"], l["homepage"]) for l in backward])
+
+    def test_rows_without_is_mock_are_loaded(self):
+        self.client.table("lawyers").upsert([{"id": "real-99@example.com", "is_mock": None, "data": {"name": "플래그 없음"}}]).execute()
+        lawyers = data.load_lawyers_db()
+        self.assertIn("real-99@example.com", [l["id"] for l in lawyers])
+        self.assertFalse(next(l for l in lawyers if l["id"] == "real-99@example.com")["is_mock"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import sys
+import os
+import unittest
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from repository import LawyerRepository
+
+def make_lawyers(count=5):
+    return [
+        {
+            "id": f"lawyer-{i}",
+            "name": f"변호사{i}",
+            "content_items": [
+                {"id": f"item-{i}-{j}", "slug": f"post-{j}", "title": f"글 {j}"}
+                for j in range(3)
+            ],
+        }
+        for i in range(count)
+    ]
+
+class TestLawyerRepository(unittest.TestCase):
+    def setUp(self):
+        self.lawyers = make_lawyers()
+        self.repo = LawyerRepository(self.lawyers)
+
+    def test_lookups(self):
+        self.assertIs(self.repo.get("lawyer-3"), self.lawyers[3])
+        self.assertIsNone(self.repo.get("missing"))
+        lawyer, item = self.repo.get_content("item-2-1")
+        self.assertIs(lawyer, self.lawyers[2])
+        self.assertIs(item, self.lawyers[2]["content_items"][1])
+        self.assertEqual(self.repo.get_content("missing"), (None, None))
+        self.assertIs(self.repo.get_content_by_slug("lawyer-1", "post-2"), self.lawyers[1]["content_items"][2])
+        self.assertIsNone(self.repo.get_content_by_slug("lawyer-1", "post-9"))
+
+    def test_add_and_remove_keep_the_same_list(self):
+        new = {"id": "lawyer-new", "content_items": [{"id": "item-new", "slug": "hello"}]}
+        self.repo.add(new)
+        self.assertIs(self.lawyers[-1], new)
+        self.assertEqual(self.repo.get_content("item-new")[0], new)
+
+        removed = self.repo.remove("lawyer-0")
+        self.assertEqual(removed["id"], "lawyer-0")
+        self.assertNotIn(removed, self.lawyers)
+        self.assertIsNone(self.repo.get("lawyer-0"))
+        self.assertEqual(self.repo.get_content("item-0-0"), (None, None))
+
+        rejected = self.repo.remove_where(lambda l: l["id"] in {"lawyer-1", "lawyer-2"})
+        self.assertEqual([l["id"] for l in rejected], ["lawyer-1", "lawyer-2"])
+        self.assertEqual([l["id"] for l in self.repo.lawyers], ["lawyer-3", "lawyer-4", "lawyer-new"])
+        self.assertIsNone(self.repo.get("lawyer-1"))
+
+    def test_content_mutations(self):
+        lawyer = self.lawyers[4]
+        self.repo.add_content(lawyer, {"id": "item-x", "slug": "x"}, position=0)
+        self.assertEqual(lawyer["content_items"][0]["id"], "item-x")
+        self.assertIs(self.repo.get_content_by_slug("lawyer-4", "x"), lawyer["content_items"][0])
+
+        self.assertEqual(self.repo.remove_content("item-x", lawyer_id="lawyer-3"), (None, None))
+        owner, item = self.repo.remove_content("item-x", lawyer_id="lawyer-4")
+        self.assertIs(owner, lawyer)
+        self.assertEqual(item["id"], "item-x")
+        self.assertNotIn("item-x", [i["id"] for i in lawyer["content_items"]])
+        self.assertEqual(self.repo.get_content("item-x"), (None, None))
+        self.assertIsNone(self.repo.get_content_by_slug("lawyer-4", "x"))
+
+    def test_direct_mutations_are_picked_up(self):
+        self.repo.get("lawyer-0")
+        # Size change forces a rebuild
+        self.lawyers.append({"id": "lawyer-direct", "content_items": []})
+        self.assertIsNotNone(self.repo.get("lawyer-direct"))
+
+        # A stale hit (the key no longer matches) re-indexes that lawyer only
+        self.lawyers[1]["content_items"][0]["slug"] = "renamed"
+        self.assertIsNone(self.repo.get_content_by_slug("lawyer-1", "post-0"))
+        self.assertIsNotNone(self.repo.get_content_by_slug("lawyer-1", "renamed"))
+        self.lawyers[4]["id"] = "lawyer-4-renamed"
+        self.assertIsNone(self.repo.get("lawyer-4"))
+        self.assertIs(self.repo.get("lawyer-4-renamed"), self.lawyers[4])
+        self.assertIs(self.repo.get_content("item-4-0")[0], self.lawyers[4])
+
+        # A miss is just a miss: direct content_items edits must call reindex
+        self.lawyers[2]["content_items"].append({"id": "item-late", "slug": "late"})
+        self.assertEqual(self.repo.get_content("item-late"), (None, None))
+        self.repo.reindex(self.lawyers[2])
+        self.assertIs(self.repo.get_content("item-late")[0], self.lawyers[2])
+        self.assertIs(self.repo.get_content_by_slug("lawyer-2", "late"), self.lawyers[2]["content_items"][-1])
+
+    def test_misses_do_not_rebuild(self):
+        self.repo.get("lawyer-0")
+        calls = []
+        self.repo.rebuild = lambda: calls.append(1)
+        self.assertIsNone(self.repo.get("nobody@example.com"))
+        self.assertFalse(self.repo.exists("nobody@example.com"))
+        self.assertEqual(self.repo.get_content("missing"), (None, None))
+        self.assertIsNone(self.repo.get_content_by_slug("lawyer-1", "missing"))
+        self.assertEqual(calls, [])
+
+    def test_reindex_only_touches_one_lawyer(self):
+        lawyer = self.lawyers[3]
+        lawyer["content_items"] = [{"id": "item-3-new", "slug": "new"}]
+        self.repo.reindex(lawyer)
+        self.assertFalse(self.repo._dirty)
+        self.assertEqual(self.repo._content.get("item-3-0"), None)
+        self.assertNotIn(("lawyer-3", "post-0"), self.repo._slugs)
+        self.assertIs(self.repo._content["item-3-new"][0], lawyer)
+        self.assertIs(self.repo._content["item-2-0"][0], self.lawyers[2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import sys
+import os
+import json
+import unittest
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from magazine import MagazineFeed, etag_matches, decode_cursor
+
+def make_item(item_id, title, date, **extra):
+    item = {"id": item_id, "type": "column", "title": title, "date": date,
+            "verified": True, "content": "본문", "image": f"/covers/{item_id}.webp"}
+    item.update(extra)
+    return item
+
+class TestMagazineFeed(unittest.TestCase):
+    def setUp(self):
+        self.lawyers = [
+            {"id": "l1", "name": "김변호사", "content_items": [
+                make_item("a", "이혼 소송 절차.pdf", "2025-03-01"),
+                make_item("b", "상속 분쟁", "2025-01-15"),
+                make_item("hidden", "유튜브", "2025-05-01", type="youtube"),
+            ]},
+            {"id": "l2", "name": "이변호사", "content_items": [
+                make_item("c", "이혼_소송_절차", "2025-02-01"),
+                make_item("d", "전세 사기 대응", "2025-04-01", source="admin_injected"),
+            ]},
+        ]
+        self.feed = MagazineFeed()
+        self.feed.rebuild(self.lawyers)
+
+    def ids(self):
+        return [a["id"] for a in self.feed.articles()]
+
+    def test_feed_is_sorted_and_deduplicated(self):
+        # "c" normalizes to the same title as the newer "a"
+        self.assertEqual(self.ids(), ["a", "b"])
+        article = self.feed.articles()[0]
+        self.assertEqual(article["display_title"], "이혼 소송 절차")
+        self.assertEqual(article["category_label"], "법률칼럼")
+        self.assertTrue(article["key_issues"])
+
+    def test_incremental_updates(self):
+        # Toggling the title winner off promotes the older duplicate
+        self.lawyers[0]["content_items"][0]["verified"] = False
+        self.assertTrue(self.feed.refresh_lawyer(self.lawyers[0]))
+        self.assertEqual(self.ids(), ["c", "b"])
+
+        # Newly approved content appears in date order
+        self.lawyers[1]["content_items"].append(make_item("e", "임대차 분쟁", "2025-06-01"))
+        self.feed.refresh_lawyer(self.lawyers[1])
+        self.assertEqual(self.ids(), ["e", "c", "b"])
+
+        # Unchanged refresh keeps the version (and the cached payload)
+        version = self.feed.version
+        self.assertFalse(self.feed.refresh_lawyer(self.lawyers[0]))
+        self.assertEqual(self.feed.version, version)
+
+        self.feed.remove_lawyer("l2")
+        self.assertEqual(self.ids(), ["b"])
+
+    def test_profile_change_updates_articles(self):
+        self.lawyers[0]["name"] = "김개명"
+        self.feed.refresh_lawyer(self.lawyers[0])
+        self.assertEqual({a["lawyer_name"] for a in self.feed.articles()}, {"김개명"})
+
+    def test_payload_is_cached_until_the_feed_changes(self):
+        etag, body = self.feed.payload()
+        self.assertIs(self.feed.payload()[1], body)
+        self.assertEqual([a["id"] for a in json.loads(body)], ["a", "b"])
+        self.assertTrue(etag_matches(etag, etag))
+        self.assertTrue(etag_matches(f'"other", W/{etag}', etag))
+        self.assertFalse(etag_matches(None, etag))
+
+        self.lawyers[0]["content_items"].pop(1)
+        self.feed.refresh_lawyer(self.lawyers[0])
+        self.assertNotEqual(self.feed.payload()[0], etag)
+
+class TestMagazinePages(unittest.TestCase):
+    def setUp(self):
+        items = [make_item(f"i{n:02d}", f"글 {n}", f"2025-01-{n:02d}",
+                           type="case" if n % 2 else "column",
+                           topic_tags=["이혼"] if n % 3 == 0 else [])
+                 for n in range(1, 11)]
+        self.lawyers = [{"id": "l1", "name": "김변호사", "content_items": items}]
+        self.feed = MagazineFeed()
+        self.feed.rebuild(self.lawyers)
+
+    def walk(self, limit, **filters):
+        ids, cursor = [], None
+        while True:
+            page = self.feed.page(limit, cursor, **filters)
+            ids.extend(card["id"] for card in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return ids, page["total"]
+
+    def test_cursor_walks_the_feed_newest_first(self):
+        ids, total = self.walk(3)
+        self.assertEqual(ids, [f"i{n:02d}" for n in range(10, 0, -1)])
+        self.assertEqual(total, 10)
+        card = self.feed.page(1)["items"][0]
+        self.assertNotIn("content", card)
+        self.assertEqual(card["display_title"], "글 10")
+
+    def test_category_and_tag_filters(self):
+        self.assertEqual(self.walk(2, category="승소사례")[0], ["i09", "i07", "i05", "i03", "i01"])
+        self.assertEqual(self.walk(2, tag="이혼")[0], ["i09", "i06", "i03"])
+        self.assertEqual(self.walk(2, category="법률칼럼", tag="이혼")[0], ["i06"])
+        self.assertEqual(self.feed.page(5, tag="없음"), {"items": [], "next_cursor": None, "total": 0})
+
+    def test_cursor_survives_feed_changes(self):
+        page = self.feed.page(4)
+        self.assertEqual(decode_cursor(page["next_cursor"]), ("2025-01-07", "l1", "i07"))
+        # A newer article and a removed one don't shift the next page
+        items = self.lawyers[0]["content_items"]
+        items.append(make_item("i11", "글 11", "2025-01-11"))
+        items[:] = [item for item in items if item["id"] != "i05"]
+        self.feed.refresh_lawyer(self.lawyers[0])
+        next_ids = [card["id"] for card in self.feed.page(4, page["next_cursor"])["items"]]
+        self.assertEqual(next_ids, ["i06", "i04", "i03", "i02"])
+
+    def test_full_text_search(self):
+        items = self.lawyers[0]["content_items"]
+        items.append(make_item("i20", "상속분쟁 유류분 반환", "2024-12-01", content="이혼 이후 상속 문제"))
+        self.feed.refresh_lawyer(self.lawyers[0])
+        page = self.feed.page(5, q="유류분")
+        self.assertEqual([card["id"] for card in page["items"]], ["i20"])
+        self.assertNotIn("content", page["items"][0])
+        # Body and lawyer name are searchable too
+        self.assertEqual(self.feed.page(5, q="본문")["total"], 10)
+        self.assertEqual(self.feed.page(5, q="김변호사", category="승소사례")["total"], 5)
+        # Relevance pages use an offset cursor
+        first = self.feed.page(4, q="본문")
+        second = self.feed.page(4, first["next_cursor"], q="본문")
+        ids = [card["id"] for card in first["items"] + second["items"]]
+        self.assertEqual(len(set(ids)), 8)
+        # Hidden articles drop out of the search index
+        items.pop()
+        self.feed.refresh_lawyer(self.lawyers[0])
+        self.assertEqual(self.feed.page(5, q="유류분")["total"], 0)
+
+    def test_search_pages_with_filters_and_short_queries(self):
+        ids, total = self.walk(3, q="본문")
+        self.assertEqual(total, 10)
+        self.assertEqual(sorted(ids), [f"i{n:02d}" for n in range(1, 11)])
+        ids, total = self.walk(2, q="본문", category="승소사례", tag="이혼")
+        self.assertEqual((sorted(ids), total), (["i03", "i09"], 2))
+        # One-syllable queries match inside longer words (김 → 김변호사)
+        self.assertEqual(self.feed.page(20, q="본")["total"], 10)
+        self.assertEqual(self.feed.page(20, q="김")["total"], 10)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.feed.page(3, "not-a-cursor")
+        with self.assertRaises(ValueError):
+            self.feed.page(3, self.feed.page(3)["next_cursor"], q="글")
+
+    def test_lazy_mode_rebuilds_after_invalidate(self):
+        feed = MagazineFeed()
+        feed.bind(self.lawyers)
+        self.assertEqual(feed.page(1)["total"], 10)
+        self.lawyers[0]["content_items"].pop()
+        self.assertEqual(feed.page(1)["total"], 10)
+        feed.invalidate(self.lawyers)
+        self.assertEqual(feed.page(1)["total"], 9)
+
+if __name__ == '__main__':
+    unittest.main()
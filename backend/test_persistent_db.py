@@ -0,0 +1,124 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+# Add current directory and the Vercel API directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frontend", "api"))
+
+import persistent_db
+from supabase_stub import StubSupabase
+
+class FlakyStub(StubSupabase):
+    """Fails the first `failures` writes"""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def _execute(self, query):
+        if query.op != "select" and self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("supabase unavailable")
+        return super()._execute(query)
+
+class TestWriteBehind(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.client = StubSupabase()
+        persistent_db.set_client(self.client)
+        self.queue = persistent_db.WriteBehindQueue(
+            interval=60, batch_size=2, max_retries=1, backoff=0,
+            dead_letter_file=os.path.join(self.tmp_dir, "dead.jsonl"))
+        self.original_queue = persistent_db.write_queue
+        persistent_db.write_queue = self.queue
+
+    def tearDown(self):
+        self.queue.close()
+        persistent_db.write_queue = self.original_queue
+        persistent_db.set_client(None)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_writes_are_coalesced_into_batches(self):
+        for i in range(3):
+            persistent_db.sb_append("leads", {"id": f"lead-{i}", "lawyer_id": "l1", "stage": "new"})
+        persistent_db.sb_update("leads", {"id": "lead-0", "lawyer_id": "l1", "stage": "won"})
+        persistent_db.sb_update("leads", "lead-1", {"id": "lead-1", "lawyer_id": "l1", "stage": "lost"})
+        self.assertEqual(self.client.calls, [])  # nothing sent from the request path
+        self.assertEqual(self.queue.pending("leads"), 3)
+
+        self.assertEqual(persistent_db.sb_flush(), 3)
+        self.assertEqual(self.client.calls, [("leads", "upsert", 2), ("leads", "upsert", 1)])
+        stored = self.client.tables["leads"]
+        self.assertEqual(stored["lead-0"]["data"]["stage"], "won")
+        self.assertEqual(stored["lead-1"]["data"]["stage"], "lost")
+        self.assertEqual(stored["lead-2"]["lawyer_id"], "l1")
+
+    def test_sync_mode_reports_the_write(self):
+        original = persistent_db.SB_WRITE_MODE
+        persistent_db.SB_WRITE_MODE = "sync"
+        try:
+            self.assertTrue(persistent_db.sb_append("leads", {"id": "lead-0", "lawyer_id": "l1"}))
+            self.assertEqual(self.client.calls, [("leads", "upsert", 1)])
+            persistent_db.set_client(FlakyStub(failures=2))
+            self.assertFalse(persistent_db.sb_append("leads", {"id": "lead-1", "lawyer_id": "l1"}))
+        finally:
+            persistent_db.SB_WRITE_MODE = original
+
+    def test_request_mode_flushes_before_the_response(self):
+        original = persistent_db.SB_WRITE_MODE
+        persistent_db.SB_WRITE_MODE = "request"
+        try:
+            persistent_db.sb_append("leads", {"id": "lead-0", "lawyer_id": "l1", "stage": "new"})
+            persistent_db.sb_update("leads", {"id": "lead-0", "lawyer_id": "l1", "stage": "won"})
+            self.assertIsNone(self.queue._timer)  # no timer to outlive the request
+            self.assertEqual(persistent_db.flush_request_writes(), 1)
+            self.assertEqual(self.client.tables["leads"]["lead-0"]["data"]["stage"], "won")
+            self.assertEqual(persistent_db.flush_request_writes(), 0)
+        finally:
+            persistent_db.SB_WRITE_MODE = original
+
+    def test_update_without_fk_uses_row_update(self):
+        persistent_db.sb_append("esign_docs", {"id": "doc-1", "lawyer_id": "l1", "status": "draft"})
+        persistent_db.sb_flush()
+        persistent_db.sb_update("esign_docs", "doc-1", {"id": "doc-1", "status": "signed"})
+        persistent_db.sb_flush()
+        self.assertEqual(self.client.calls[-1], ("esign_docs", "update", 1))
+        self.assertEqual(self.client.tables["esign_docs"]["doc-1"]["data"]["status"], "signed")
+
+    def test_loads_are_paginated_and_see_pending_writes(self):
+        for i in range(5):
+            persistent_db.sb_append("matters", {"id": f"m-{i}", "lawyer_id": "l1" if i % 2 else "l2"})
+        items = list(persistent_db.sb_iter("matters", page_size=2))
+        self.assertEqual([m["id"] for m in items], [f"m-{i}" for i in range(5)])
+        selects = [call for call in self.client.calls if call[1] == "select"]
+        self.assertEqual([count for _, _, count in selects], [2, 2, 1])
+        self.assertEqual(len(persistent_db.sb_load_by_fk("matters", "lawyer_id", "l1")), 2)
+
+    def test_failed_batch_goes_to_dead_letter_and_replays(self):
+        flaky = FlakyStub(failures=2)
+        persistent_db.set_client(flaky)
+        persistent_db.sb_append("consultations", {"id": "c-1", "lawyer_id": "l1"})
+        self.assertEqual(persistent_db.sb_flush(), 0)
+        self.assertEqual(self.queue.stats["retries"], 1)
+        with open(self.queue.dead_letter_file, encoding="utf-8") as f:
+            record = json.loads(f.readline())
+        self.assertEqual((record["table"], record["row"]["id"]), ("consultations", "c-1"))
+
+        self.assertEqual(self.queue.replay_dead_letters(), 1)
+        self.assertEqual(persistent_db.sb_flush(), 1)
+        self.assertIn("c-1", flaky.tables["consultations"])
+        self.assertFalse(os.path.exists(self.queue.dead_letter_file))
+
+    def test_stub_persists_to_file(self):
+        path = os.path.join(self.tmp_dir, "stub.json")
+        client = StubSupabase(path)
+        client.table("leads").upsert({"id": "lead-1", "lawyer_id": "l1", "data": {}}).execute()
+        reopened = StubSupabase(path)
+        self.assertEqual(reopened.table("leads").select("id").execute().data, [{"id": "lead-1"}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import os
+import unittest
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from presence import PresenceManager
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class TestPresenceStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.presence = PresenceManager(away_threshold=300, offline_threshold=1800, clock=self.clock)
+
+    def test_transitions_online_away_offline(self):
+        self.presence.update_heartbeat("l1")
+        self.assertEqual(self.presence.get_status("l1"), "online")
+        self.clock.now += 299
+        self.assertTrue(self.presence.is_online("l1"))
+        self.clock.now += 1
+        self.assertEqual(self.presence.get_status("l1"), "away")
+        self.clock.now += 1500
+        self.assertEqual(self.presence.get_status("l1"), "offline")
+        self.assertEqual(self.presence.snapshot(), {})
+        self.assertEqual(self.presence.get_status("never_seen"), "offline")
+
+    def test_heartbeat_supersedes_pending_expiry(self):
+        self.presence.update_heartbeat("l1")
+        self.clock.now += 200
+        self.presence.update_heartbeat("l1")
+        self.clock.now += 200  # 400s after the first heartbeat, 200s after the second
+        self.assertEqual(self.presence.get_status("l1"), "online")
+        # Out-of-order heartbeat from another worker is ignored
+        self.assertFalse(self.presence.update_heartbeat("l1", self.clock.now - 1000))
+        self.assertEqual(self.presence.get_status("l1"), "online")
+
+    def test_bulk_statuses_and_online_set(self):
+        self.presence.update_heartbeat("l1")
+        self.clock.now += 400
+        self.presence.update_heartbeat("l2")
+        self.presence.update_heartbeat("l3")
+        self.assertEqual(self.presence.statuses(["l1", "l2", "l4"]),
+                         {"l1": "away", "l2": "online", "l4": "offline"})
+        self.assertEqual(self.presence.online_ids(), {"l2", "l3"})
+        active = self.presence.active()
+        self.assertEqual(active["l1"], "away")
+        self.assertEqual(list(active)[-1], "l1")  # online lawyers first
+
+    def test_merge_snapshot_from_another_worker(self):
+        other = PresenceManager(away_threshold=300, offline_threshold=1800, clock=self.clock)
+        other.update_heartbeat("l1")
+        other.update_heartbeat("l2", self.clock.now - 600)
+        other.update_heartbeat("l3", self.clock.now - 5000)  # already offline, not stored
+        self.presence.merge(other.snapshot())
+        self.assertEqual(self.presence.statuses(["l1", "l2", "l3"]),
+                         {"l1": "online", "l2": "away", "l3": "offline"})
+
+    def test_stale_heap_entries_are_compacted(self):
+        for _ in range(500):
+            self.clock.now += 1
+            self.presence.update_heartbeat("l1")
+        self.assertLess(self.presence.stats()["heap"], 100)
+        self.assertEqual(self.presence.online_ids(), {"l1"})
+
+if __name__ == '__main__':
+    unittest.main()
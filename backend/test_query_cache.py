@@ -0,0 +1,93 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from query_cache import QueryAnalysisCache, normalize_query
+from search import SearchEngine
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestQueryAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "cache.sqlite3")
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def make_cache(self, **kwargs):
+        return QueryAnalysisCache(self.path, clock=self.clock, **kwargs)
+
+    def test_normalization_folds_whitespace_and_punctuation(self):
+        self.assertEqual(normalize_query("  이혼 소송,   어떻게 하나요?? "), "이혼 소송 어떻게 하나요")
+        self.assertEqual(normalize_query("ＡＢＣ 사기!"), normalize_query("abc 사기"))
+
+    def test_hit_and_miss_counters(self):
+        cache = self.make_cache()
+        self.assertIsNone(cache.get("음주운전 처벌"))
+        cache.put("음주운전 처벌", {"primary_area": "형사"})
+        self.assertEqual(cache.get("음주운전   처벌?"), {"primary_area": "형사"})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.stats()["hit_ratio"], 0.5)
+
+    def test_entries_expire_after_ttl(self):
+        cache = self.make_cache(ttl_seconds=60)
+        cache.put("전세 사기", {"primary_area": "부동산"})
+        self.clock.now += 61
+        self.assertIsNone(cache.get("전세 사기"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.make_cache(max_entries=2)
+        cache.put("a", {"v": 1})
+        self.clock.now += 1
+        cache.put("b", {"v": 2})
+        self.clock.now += 1
+        cache.get("a")
+        self.clock.now += 1
+        cache.put("c", {"v": 3})
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.stats()["size"], 2)
+
+    def test_shared_between_instances_and_namespaced(self):
+        self.make_cache(namespace="m1").put("상속 분쟁", {"primary_area": "가사"})
+        self.assertIsNotNone(self.make_cache(namespace="m1").get("상속 분쟁"))
+        self.assertIsNone(self.make_cache(namespace="m2").get("상속 분쟁"))
+
+class TestAnalyzeQueryCaching(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = SearchEngine()
+        self.engine.analysis_cache = QueryAnalysisCache(os.path.join(self.tmp_dir, "cache.sqlite3"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_near_identical_queries_call_llm_once(self):
+        with mock.patch.object(self.engine, "_analyze_query_llm", return_value={"primary_area": "형사"}) as llm:
+            self.engine.analyze_query("폭행 사건 합의금?")
+            result = self.engine.analyze_query("폭행  사건 합의금")
+        self.assertEqual(llm.call_count, 1)
+        self.assertEqual(result["primary_area"], "형사")
+
+    def test_fallback_is_not_cached(self):
+        with mock.patch.object(self.engine, "_analyze_query_llm", return_value=None) as llm:
+            self.assertEqual(self.engine.analyze_query("이혼")["primary_area"], "기타")
+            self.engine.analyze_query("이혼")
+        self.assertEqual(llm.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
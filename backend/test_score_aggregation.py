@@ -0,0 +1,119 @@
+import sys
+import os
+import time
+import unittest
+
+import numpy as np
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from search import SearchEngine
+
+def reference_scores(scores, mapping):
+    """The original per-row Python loop from SearchEngine.search, kept as the oracle."""
+    lawyer_scores = {}
+    for idx, score in enumerate(scores):
+        m = mapping[idx]
+        stats = lawyer_scores.setdefault(m["lawyer_id"], {
+            "max_sim": -1.0, "sum_sim": 0.0, "count": 0,
+            "best_case_idx": -1, "best_content_idx": -1, "best_content_score": -1.0,
+        })
+        if m["type"] == "case":
+            if score > stats["max_sim"]:
+                stats["max_sim"] = score
+                stats["best_case_idx"] = m["index"]
+        else:
+            if score > stats["best_content_score"]:
+                stats["best_content_score"] = score
+                stats["best_content_idx"] = m["index"]
+            if score > stats["max_sim"]:
+                stats["max_sim"] = score
+        if score > 0:
+            stats["sum_sim"] += score
+            stats["count"] += 1
+    return lawyer_scores
+
+def make_mapping(n_lawyers, rng):
+    mapping = []
+    for l in range(n_lawyers):
+        for i in range(rng.randint(0, 4)):
+            mapping.append({"lawyer_id": f"lawyer-{l}", "type": "case", "index": i})
+        for i in range(rng.randint(0, 4)):
+            mapping.append({"lawyer_id": f"lawyer-{l}", "type": "content", "index": i})
+    return mapping
+
+class TestScoreAggregation(unittest.TestCase):
+    def setUp(self):
+        self.engine = SearchEngine()
+
+    def check_against_reference(self, mapping, scores):
+        self.engine.mapping = mapping
+        self.engine._rebuild_mapping_arrays()
+        stats = self.engine._aggregate_scores(scores)
+        expected = reference_scores(scores, mapping)
+
+        self.assertEqual(set(self.engine._lawyer_ids), set(expected))
+        for lawyer_id, exp in expected.items():
+            pos = self.engine._lawyer_pos[lawyer_id]
+            for key in ("max_sim", "sum_sim", "best_content_score"):
+                self.assertAlmostEqual(float(stats[key][pos]), exp[key], places=9, msg=(lawyer_id, key))
+            for key in ("count", "best_case_idx", "best_content_idx"):
+                self.assertEqual(int(stats[key][pos]), exp[key], msg=(lawyer_id, key))
+
+    def test_matches_python_loop_on_random_corpus(self):
+        rng = np.random.RandomState(42)
+        for _ in range(20):
+            mapping = make_mapping(30, rng)
+            scores = rng.uniform(-0.3, 1.0, size=len(mapping))
+            self.check_against_reference(mapping, scores)
+
+    def test_ties_pick_first_row(self):
+        mapping = [
+            {"lawyer_id": "a", "type": "case", "index": 0},
+            {"lawyer_id": "a", "type": "case", "index": 1},
+            {"lawyer_id": "a", "type": "content", "index": 0},
+            {"lawyer_id": "a", "type": "content", "index": 1},
+        ]
+        self.check_against_reference(mapping, np.array([0.5, 0.5, 0.2, 0.2]))
+
+    def test_lawyer_without_cases_or_content(self):
+        mapping = [
+            {"lawyer_id": "only-content", "type": "content", "index": 3},
+            {"lawyer_id": "only-case", "type": "case", "index": 2},
+        ]
+        self.check_against_reference(mapping, np.array([0.7, -0.1]))
+
+    def test_appended_rows_are_grouped(self):
+        rng = np.random.RandomState(7)
+        mapping = make_mapping(10, rng)
+        self.engine.mapping = list(mapping)
+        self.engine._rebuild_mapping_arrays()
+        extra = [{"lawyer_id": "lawyer-3", "type": "case", "index": 9}, {"lawyer_id": "new", "type": "content", "index": 0}]
+        self.engine.corpus_embeddings = np.zeros((len(mapping), 4), dtype=np.float32)
+        self.engine._append_to_index(np.zeros((2, 4)), extra, [{"title": "추가", "summary": ""}] * 2)
+
+        scores = rng.uniform(0, 1, size=len(mapping) + 2)
+        stats = self.engine._aggregate_scores(scores)
+        expected = reference_scores(scores, mapping + extra)
+        for lawyer_id, exp in expected.items():
+            pos = self.engine._lawyer_pos[lawyer_id]
+            self.assertAlmostEqual(float(stats["max_sim"][pos]), exp["max_sim"], places=9)
+
+    def test_vectorized_is_fast_at_scale(self):
+        rng = np.random.RandomState(0)
+        n_rows = 50000
+        mapping = [{"lawyer_id": f"lawyer-{i % 5000}", "type": "case" if i % 3 else "content", "index": i // 5000}
+                   for i in range(n_rows)]
+        self.engine.mapping = mapping
+        self.engine._rebuild_mapping_arrays()
+        scores = rng.uniform(-1, 1, size=n_rows)
+
+        start = time.perf_counter()
+        self.engine._aggregate_scores(scores)
+        elapsed = time.perf_counter() - start
+        print(f"aggregate over {n_rows} rows: {elapsed * 1000:.2f} ms")
+        self.assertLess(elapsed, 0.1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import search
+from search import SearchEngine, _rrf_fuse
+from embedding_store import EmbeddingStore
+from embedder import FakeEmbedder
+from eval_search import ndcg_at_k, queries_from_cases, recall_at_k, reciprocal_rank
+
+def make_lawyer(lawyer_id, cases, location="서울"):
+    return {
+        "id": lawyer_id, "name": lawyer_id, "firm": "로펌", "location": location, "career": "",
+        "expertise": ["형사법 전문"], "content_items": [],
+        "cases": [{"title": t, "summary": f"{t} 사건 요약"} for t in cases],
+    }
+
+class TestRRF(unittest.TestCase):
+    def test_lexical_rank_lifts_candidates(self):
+        vector = np.array([0.9, 0.8, 0.7])
+        lexical = np.array([0.0, 0.0, 5.0])
+        fused = _rrf_fuse(vector, lexical, k=1)
+        # 1/2 vs 1/3 vs 1/4 + 1/2
+        np.testing.assert_allclose(fused, [1 / 2, 1 / 3, 1 / 4 + 1 / 2])
+        self.assertEqual(int(np.argmax(fused)), 2)
+
+    def test_without_lexical_hits_order_is_unchanged(self):
+        vector = np.array([0.2, 0.9, 0.5])
+        fused = _rrf_fuse(vector, np.zeros(3))
+        self.assertEqual(list(np.argsort(-fused)), [1, 2, 0])
+        self.assertEqual(len(_rrf_fuse(np.zeros(0), np.zeros(0))), 0)
+
+class TestHybridSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.original_db = list(search.LAWYERS_DB)
+        search.LAWYERS_DB[:] = [make_lawyer(f"lawyer-{i}", [f"일반 민사 분쟁 {i}", f"계약 해지 {i}"]) for i in range(30)]
+        search.LAWYERS_DB.append(make_lawyer("lawyer-target", ["준강간 혐의 무죄 판결"], location="부산"))
+        search.LAWYERS.invalidate()
+        self.engine = SearchEngine()
+        self.engine.client = None
+        self.engine.embedder = FakeEmbedder()
+        self.engine.store = EmbeddingStore(os.path.join(self.tmp_dir, "store"))
+        self.engine.refresh_index()
+
+    def tearDown(self):
+        search.LAWYERS_DB[:] = self.original_db
+        search.LAWYERS.invalidate()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def ids(self, query, **kwargs):
+        return [lawyer["id"] for lawyer in self.engine.search(query, top_k=5, **kwargs)["lawyers"]]
+
+    def test_hybrid_surfaces_exact_terms(self):
+        self.assertEqual(self.ids("준강간", mode="hybrid")[0], "lawyer-target")
+        result = self.engine.search("준강간", top_k=5, mode="hybrid")["lawyers"][0]
+        self.assertLessEqual(result["matchScore"], 1.5)  # still the vector score, not the fused rank
+
+    def test_hybrid_keeps_hard_filters(self):
+        self.assertNotIn("lawyer-target", self.ids("준강간", mode="hybrid", location="서울"))
+        self.assertEqual(self.ids("준강간", mode="hybrid", location="부산"), ["lawyer-target"])
+
+    def test_default_mode_is_vector(self):
+        self.assertEqual(self.ids("준강간"), self.ids("준강간", mode="vector"))
+
+    def test_lexical_index_follows_new_rows(self):
+        search.LAWYERS_DB[0]["cases"].append({"title": "전세사기 고소", "summary": "보증금 반환"})
+        self.engine.add_case_to_index("lawyer-0", search.LAWYERS_DB[0]["cases"][-1])
+        self.assertEqual(self.ids("전세사기", mode="hybrid")[0], "lawyer-0")
+
+    def key(self, title):
+        return search._content_key(f"{title} {title} 사건 요약", self.engine.embedding_model)
+
+    def test_lexical_rows_keep_their_embedded_text(self):
+        # Items shift after a deletion; the rows still carry the text they were embedded from
+        del search.LAWYERS_DB[1]["cases"][0]
+        search.LAWYERS.invalidate()
+        rows, _ = self.engine._lexical_scores("해지")
+        self.assertEqual({self.engine.mapping[row]["key"] for row in rows},
+                         {self.key(f"계약 해지 {i}") for i in range(30)})
+
+    def test_store_rows_are_matched_by_content_key(self):
+        del search.LAWYERS_DB[1]["cases"][0]
+        search.LAWYERS.invalidate()
+        engine = SearchEngine()
+        engine.client = None
+        engine.embedder = FakeEmbedder()
+        engine.store = self.engine.store
+        self.assertTrue(engine._load_from_store())
+        engine.build_lexical_index(background=False)
+        row_of = {entry["key"]: row for row, entry in enumerate(engine.mapping)}
+        self.assertIn(row_of[self.key("계약 해지 1")], engine.lexical_index)
+        self.assertNotIn(row_of[self.key("일반 민사 분쟁 1")], engine.lexical_index)  # deleted since the store was saved
+        rows, _ = engine._lexical_scores("준강간")
+        self.assertEqual([engine.mapping[row]["lawyer_id"] for row in rows], ["lawyer-target"])
+
+class TestEvalMetrics(unittest.TestCase):
+    def test_metrics(self):
+        ranked = ["a", "b", "c"]
+        self.assertEqual(recall_at_k(ranked, ["b", "z"], 2), 0.5)
+        self.assertEqual(reciprocal_rank(ranked, ["c"]), 1 / 3)
+        self.assertEqual(ndcg_at_k(ranked, ["a"], 3), 1.0)
+        self.assertEqual(ndcg_at_k(ranked, ["z"], 3), 0.0)
+
+    def test_known_item_queries(self):
+        lawyers = [make_lawyer("x", ["음주운전"]), make_lawyer("y", ["음주운전", "이혼"])]
+        labelled = queries_from_cases(lawyers, 10)
+        self.assertEqual({q["query"]: q["relevant"] for q in labelled}, {"음주운전": ["x", "y"], "이혼": ["y"]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import sys
+import os
+import time
+import random
+import unittest
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import text_index
+from text_index import TextIndex, tokenize
+
+class TestTokenize(unittest.TestCase):
+    def test_korean_bigrams_and_words(self):
+        self.assertEqual(tokenize("상속분쟁 ABC-12"), ["상속", "속분", "분쟁", "abc", "12"])
+        self.assertEqual(tokenize("법 은"), ["법", "은"])
+        self.assertEqual(tokenize("!!"), [])
+
+class TestTextIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TextIndex({"title": 3.0, "tags": 2.0, "summary": 1.0})
+        self.index.add("a", {"title": "이혼 소송 승소", "tags": ["이혼"], "summary": "재산분할 청구를 인정받은 사례"})
+        self.index.add("b", {"title": "전세 사기 대응", "tags": ["부동산"], "summary": "이혼 후 전세 보증금 반환"})
+        self.index.add("c", {"title": "상속분쟁에서의 유류분", "tags": ["상속"], "summary": "유류분 반환 청구"})
+
+    def ids(self, query):
+        return [doc_id for doc_id, _ in self.index.search(query)]
+
+    def test_title_matches_outrank_body_matches(self):
+        self.assertEqual(self.ids("이혼"), ["a", "b"])
+
+    def test_all_query_tokens_must_match(self):
+        self.assertEqual(self.ids("분쟁"), ["c"])  # inside the compound 상속분쟁에서
+        self.assertEqual(self.ids("유류분 반환"), ["c"])
+        self.assertEqual(self.ids("이혼 유류분"), [])
+        self.assertEqual(self.ids("   "), [])
+
+    def test_incremental_add_replace_remove(self):
+        self.index.add("b", {"title": "임대차 분쟁", "tags": [], "summary": ""})
+        self.assertEqual(self.ids("이혼"), ["a"])
+        self.assertEqual(sorted(self.ids("분쟁")), ["b", "c"])
+        self.assertTrue(self.index.remove("c"))
+        self.assertFalse(self.index.remove("c"))
+        self.assertEqual(self.ids("분쟁"), ["b"])
+        self.assertEqual(len(self.index), 2)
+
+    def test_any_match_ranks_partial_hits(self):
+        self.assertEqual(self.ids("이혼 유류분"), [])
+        hits = [doc_id for doc_id, _ in self.index.search("이혼 유류분 청구", match="any")]
+        self.assertEqual(set(hits), {"a", "b", "c"})
+        self.assertEqual(hits[-1], "b")  # only a body match on one term
+
+    def test_limit_and_allowed(self):
+        self.assertEqual(len(self.index.search("이혼", limit=1)), 1)
+        self.assertEqual([d for d, _ in self.index.search("이혼", allowed={"b"})], ["b"])
+
+    def test_short_queries_expand_over_the_vocabulary(self):
+        self.index.add("d", {"title": "형법 위반 사건", "tags": [], "summary": "taxation appeal"})
+        self.assertEqual(self.ids("법"), ["d"])  # one syllable matches inside the bigram 형법
+        self.assertEqual(self.ids("taxa"), ["d"])  # latin prefix
+        self.assertEqual(self.ids("taxa 사건"), ["d"])
+        self.assertEqual(self.ids("t"), [])  # single letters stay exact
+        self.assertEqual(self.index.count("법"), 1)
+
+    def test_count_matches_search(self):
+        for query in ["이혼", "청구", "유류분 반환", "없는말"]:
+            for match in ("all", "any"):
+                self.assertEqual(self.index.count(query, match=match), len(self.index.search(query, match=match)))
+        self.assertEqual(self.index.count("이혼", allowed={"b", "c"}), 1)
+
+    def test_limited_search_equals_the_full_ranking(self):
+        rng = random.Random(3)
+        words = ["이혼", "상속", "전세", "사기", "유류분", "교통사고", "tax", "taxation", "형법 위반"]
+        index = TextIndex({"title": 3.0, "summary": 1.0})
+
+        def check():
+            for query in ["이혼", "유류분 반환", "법", "taxa", "교통사고 이혼 사기"]:
+                for match in ("all", "any"):
+                    full = [round(score, 9) for _, score in index.search(query, match=match)]
+                    for limit in (1, 5, 30):
+                        top = [round(score, 9) for _, score in index.search(query, limit=limit, match=match)]
+                        self.assertEqual(top, full[:limit], (query, match, limit))
+
+        for i in range(600):
+            index.add(i, {"title": " ".join(rng.sample(words, 2)), "summary": " ".join(rng.choices(words, k=rng.randint(0, 12)))})
+        check()
+        # Cached impact lists are kept in place across removals, replacements and longer documents
+        for i in range(0, 600, 4):
+            index.remove(i)
+        for i in range(1, 600, 9):
+            index.add(i, {"title": "교통사고 " * 5, "summary": "이혼 " * 30})
+        check()
+
+    def test_long_postings_are_ordered_in_the_background(self):
+        original = text_index.IMPACT_SYNC_MAX
+        text_index.IMPACT_SYNC_MAX = 0
+        try:
+            index = TextIndex({"title": 3.0, "summary": 1.0})
+            for i in range(50):
+                index.add(i, {"title": "이혼" if i % 2 else "상속", "summary": "이혼 " * (i % 7)})
+            first = [round(score, 9) for _, score in index.search("이혼", limit=5)]  # plain scan meanwhile
+            index.wait_for_impacts(timeout=10)
+            self.assertIn("이혼", index._impacts)
+            self.assertEqual([round(score, 9) for _, score in index.search("이혼", limit=5)], first)
+        finally:
+            text_index.IMPACT_SYNC_MAX = original
+
+    def test_search_stays_fast_on_a_large_index(self):
+        rng = random.Random(7)
+        words = ["이혼", "상속", "전세", "사기", "형사", "손해배상", "임대차", "교통사고", "재산분할", "유류분",
+                 "명예훼손", "성범죄", "횡령", "배임", "근로", "해고", "부동산", "계약", "보증금", "양육권"]
+        index = TextIndex({"title": 3.0, "summary": 1.0})
+        for i in range(20000):
+            index.add(i, {"title": " ".join(rng.sample(words, 3)), "summary": " ".join(rng.sample(words, 8))})
+        start = time.perf_counter()
+        for query in ["유류분 반환", "교통사고", "양육권 이혼"]:
+            index.search(query, limit=20)
+        self.assertLess((time.perf_counter() - start) / 3, 0.5)  # generous bound for slow CI machines
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add current directory to sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import data
+import search
+from search import SearchEngine, _top_k_indices
+from embedding_store import EmbeddingStore
+from embedder import FakeEmbedder
+
+class TestTopKIndices(unittest.TestCase):
+    def test_matches_stable_sort(self):
+        rng = np.random.RandomState(3)
+        for _ in range(50):
+            # Few distinct values, so many ties straddle the k boundary
+            scores = rng.randint(0, 5, size=rng.randint(1, 40)).astype(np.float64)
+            expected = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+            for k in (1, 3, 10, 100):
+                self.assertEqual(list(_top_k_indices(scores, k)), expected[:k])
+
+    def test_empty_and_zero_k(self):
+        self.assertEqual(len(_top_k_indices(np.zeros(0), 5)), 0)
+        self.assertEqual(len(_top_k_indices(np.ones(4), 0)), 0)
+
+class TestLazyHydration(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.original_db = list(search.LAWYERS_DB)
+        search.LAWYERS_DB[:] = data.generate_lawyers(40)
+        self.engine = SearchEngine()
+        self.engine.embedder = FakeEmbedder(dim=32)
+        self.engine.store = EmbeddingStore(os.path.join(self.tmp_dir, "store"))
+        self.engine.refresh_index()
+
+    def tearDown(self):
+        search.LAWYERS_DB[:] = self.original_db
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_top_k_is_prefix_of_full_ranking(self):
+        query = "음주운전으로 적발되어 면허 취소가 걱정됩니다"
+        everyone = self.engine.search(query, top_k=1000)["lawyers"]
+        top = self.engine.search(query, top_k=5)["lawyers"]
+
+        self.assertEqual(len(everyone), 40)
+        self.assertEqual(top, everyone[:5])
+        scores = [c["matchScore"] for c in everyone]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -64,7 +64,7 @@ class ContentValidator:
         Check if content is too similar to existing contents using embeddings.
         """
         # Generate embedding for new content
-        new_vec = search_engine._get_embedding(content)
+        new_vec = search_engine.embed_query(content)
         if not new_vec or len(new_vec) == 0:
              return {"valid": True, "message": "임베딩 생성 실패로 중복 검사를 건너뜁니다."}
 
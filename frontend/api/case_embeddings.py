@@ -10,20 +10,20 @@ import hashlib
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
-# OpenAI 임베딩
-EMBEDDING_MODEL = "text-embedding-3-small"
-EMBEDDING_DIM = 1536
+# OpenAI 임베딩 (배치 / 재시도는 embedder.BatchEmbedder가 담당)
+from embedder import create_embedder, CachedEmbedder, EmbeddingCache, EMBEDDING_MODEL, EMBEDDING_DIM  # type: ignore
 
-_openai_client = None
+_embedder = None
+# 검색 질의(사건개요) 임베딩 캐시 - 같은 질의 반복 시 API 호출 생략
+_query_embedding_cache = EmbeddingCache()
 
-def _get_openai():
-    global _openai_client
-    if _openai_client:
-        return _openai_client
+def _get_embedder():
+    global _embedder
+    if _embedder:
+        return _embedder
     try:
-        from search import client  # type: ignore
-        _openai_client = client
-        return _openai_client
+        _embedder = create_embedder(model=EMBEDDING_MODEL)
+        return _embedder
     except Exception:
         return None
 
@@ -36,25 +36,90 @@ def _get_supabase():
         return None
 
 
+def create_embeddings(texts: List[str]) -> List[Optional[List[float]]]:
+    """여러 텍스트를 배치로 임베딩 (입력 순서 유지, 실패 항목은 None)"""
+    embedder = _get_embedder()
+    if not embedder:
+        return [None] * len(texts)
+    try:
+        return embedder.embed(texts)
+    except Exception as e:
+        print(f"❌ 임베딩 생성 실패: {e}")
+        return [None] * len(texts)
+
+
 def create_embedding(text: str) -> Optional[List[float]]:
     """텍스트를 임베딩 벡터로 변환"""
-    client = _get_openai()
-    if not client or not text.strip():
+    if not text.strip():
+        return None
+    return create_embeddings([text])[0]
+
+
+def create_query_embedding(text: str) -> Optional[List[float]]:
+    """검색 질의 임베딩 (LRU 캐시 경유)"""
+    embedder = _get_embedder()
+    if not embedder or not text.strip():
         return None
-    
     try:
-        # 최대 8000자로 제한 (토큰 초과 방지)
-        truncated = text[:8000]
-        response = client.embeddings.create(
-            input=[truncated],
-            model=EMBEDDING_MODEL
-        )
-        return response.data[0].embedding  # type: ignore
+        return CachedEmbedder(embedder, _query_embedding_cache).embed_one(text)
     except Exception as e:
         print(f"❌ 임베딩 생성 실패: {e}")
         return None
 
 
+def query_embedding_cache_stats() -> Dict[str, Any]:
+    """질의 임베딩 캐시 적중률"""
+    return _query_embedding_cache.stats()
+
+
+def store_case_embeddings(cases: List[Dict[str, Any]]) -> int:
+    """
+    여러 승소사례를 한 번의 배치 임베딩으로 Supabase에 저장.
+    각 항목은 store_case_embedding의 인자와 같은 키를 가진 dict. 저장된 건수를 반환.
+    """
+    sb = _get_supabase()
+    if not sb:
+        print("⚠️ Supabase 미연결 → 임베딩 저장 스킵")
+        return 0
+    if not cases:
+        return 0
+
+    # 임베딩 생성용 텍스트 (제목 + 본문 + 태그)
+    embed_texts = [f"[{c['title']}] {c.get('content', '')} 태그: {c.get('ai_tags', '')}" for c in cases]
+    embeddings = create_embeddings(embed_texts)
+
+    now = datetime.now().isoformat()
+    rows = []
+    for case, embedding in zip(cases, embeddings):
+        if not embedding:
+            print(f"❌ 임베딩 생성 실패: {case['title'][:30]}")
+            continue
+        rows.append({
+            "id": case["case_id"],
+            "lawyer_id": case["lawyer_id"],
+            "lawyer_name": case.get("lawyer_name", ""),
+            "title": case["title"],
+            "content_summary": case.get("content", "")[:500],  # 요약만 저장
+            "case_number": case.get("case_number", ""),
+            "court": case.get("court", ""),
+            "ai_tags": case.get("ai_tags", ""),
+            "file_hash": case.get("file_hash", ""),
+            "embedding": embedding,
+            "created_at": now
+        })
+
+    if not rows:
+        return 0
+
+    try:
+        sb.table("case_embeddings").upsert(rows).execute()
+        print(f"✅ 임베딩 저장: {len(rows)}건")
+        return len(rows)
+    except Exception as e:
+        print(f"❌ 임베딩 저장 실패: {e}")
+        return 0
+
+
 def store_case_embedding(
     case_id: str,
     lawyer_id: str,
@@ -70,40 +135,17 @@ def store_case_embedding(
     승소사례를 임베딩하여 Supabase에 저장.
     PDF 업로드 → AI 분석 후 이 함수를 호출.
     """
-    sb = _get_supabase()
-    if not sb:
-        print("⚠️ Supabase 미연결 → 임베딩 저장 스킵")
-        return False
-    
-    # 임베딩 생성용 텍스트 (제목 + 본문 + 태그)
-    embed_text = f"[{title}] {content} 태그: {ai_tags}"
-    embedding = create_embedding(embed_text)
-    
-    if not embedding:
-        print(f"❌ 임베딩 생성 실패: {title[:30]}")
-        return False
-    
-    try:
-        data = {
-            "id": case_id,
-            "lawyer_id": lawyer_id,
-            "lawyer_name": lawyer_name,
-            "title": title,
-            "content_summary": content[:500],  # 요약만 저장
-            "case_number": case_number,
-            "court": court,
-            "ai_tags": ai_tags,
-            "file_hash": file_hash,
-            "embedding": embedding,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        sb.table("case_embeddings").upsert(data).execute()
-        print(f"✅ 임베딩 저장: {title[:30]}...")
-        return True
-    except Exception as e:
-        print(f"❌ 임베딩 저장 실패: {e}")
-        return False
+    return store_case_embeddings([{
+        "case_id": case_id,
+        "lawyer_id": lawyer_id,
+        "lawyer_name": lawyer_name,
+        "title": title,
+        "content": content,
+        "case_number": case_number,
+        "court": court,
+        "ai_tags": ai_tags,
+        "file_hash": file_hash,
+    }]) == 1
 
 
 def search_similar_cases(
@@ -120,8 +162,8 @@ def search_similar_cases(
         print("⚠️ Supabase 미연결")
         return []
     
-    # 쿼리 임베딩
-    query_embedding = create_embedding(query)
+    # 쿼리 임베딩 (캐시)
+    query_embedding = create_query_embedding(query)
     if not query_embedding:
         return []
     
@@ -6,6 +6,8 @@ from fastapi import WebSocket
 from datetime import datetime
 import uuid
 
+from presence import PresenceManager  # type: ignore
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Fallback file for local dev
 _local_chat = os.path.join(BASE_DIR, "chats.json")
@@ -20,30 +22,6 @@ def _get_sb():
         return None
 
 
-class PresenceManager:
-    def __init__(self):
-        self.last_active: Dict[str, float] = {}  # lawyer_id -> timestamp
-        self.OFFLINE_THRESHOLD = 1800  # 30 mins
-        self.AWAY_THRESHOLD = 300  # 5 mins
-
-    def update_heartbeat(self, lawyer_id: str):
-        self.last_active[lawyer_id] = time.time()
-
-    def get_status(self, lawyer_id: str) -> str:
-        last = self.last_active.get(lawyer_id)
-        if not last:
-            return "offline"
-        diff = time.time() - last
-        if diff < self.AWAY_THRESHOLD:
-            return "online"
-        elif diff < self.OFFLINE_THRESHOLD:
-            return "away"
-        else:
-            return "offline"
-
-    def is_online(self, lawyer_id: str) -> bool:
-        return self.get_status(lawyer_id) == "online"
-
 presence_manager = PresenceManager()
 
 
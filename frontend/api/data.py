@@ -239,34 +239,63 @@ def generate_lawyers(count=100):
         })
     return lawyers
 
+import re
 import json
 import os
+import time
+import atexit
+import hashlib
+import threading
+from repository import LawyerRepository  # type: ignore
 
 _DIR = os.path.dirname(os.path.abspath(__file__))
 DB_FILE = os.path.join(_DIR, "lawyers_db.json")
 
+MOCK_ID_PATTERN = re.compile(r'^lawyer-\d+$')
+LAWYERS_PAGE_SIZE = int(os.environ.get("LAWYERS_PAGE_SIZE", "500"))  # Supabase 로드 페이지 크기
+_LAWYER_COLUMNS = "id,data,is_mock,verified"
+
+def _is_real_lawyer(lawyer):
+    # lawyer-N 패턴 ID도 가상으로 간주
+    return not lawyer.get("is_mock", False) and not MOCK_ID_PATTERN.match(lawyer.get("id", ""))
+
+def _iter_supabase_lawyers(sb, page_size=LAWYERS_PAGE_SIZE):
+    """lawyers 테이블을 id 순 페이지 단위로 스트리밍 (필요한 칼럼만, 가상 변호사 행 제외)"""
+    start = 0
+    while True:
+        response = (sb.table("lawyers").select(_LAWYER_COLUMNS)
+                    .or_("is_mock.is.null,is_mock.eq.false")  # NULL도 실제 변호사 (eq false는 NULL 행을 버림)
+                    .order("id").range(start, start + page_size - 1).execute())
+        rows = response.data or []
+        for row in rows:
+            lawyer = row.get("data") or {}
+            lawyer["id"] = row["id"]
+            lawyer["is_mock"] = bool(row.get("is_mock"))
+            lawyer["verified"] = row.get("verified", False)
+            yield lawyer
+        if len(rows) < page_size:
+            return
+        start += page_size
+
+
 def _load_from_supabase():
-    """Supabase에서 변호사 데이터를 로드합니다."""
+    """Supabase에서 실제 변호사 데이터를 페이지 단위로 로드합니다 (레코드별 보정)."""
     try:
         from supabase_client import get_supabase  # type: ignore
         sb = get_supabase()
         if sb is None:
             return None
-        
-        response = sb.table("lawyers").select("*").execute()
-        if response.data:
-            lawyers = []
-            for row in response.data:
-                lawyer = row.get("data", {})
-                lawyer["id"] = row["id"]
-                lawyer["is_mock"] = row.get("is_mock", False)
-                lawyer["verified"] = row.get("verified", False)
+
+        lawyers = []
+        for lawyer in _iter_supabase_lawyers(sb, LAWYERS_PAGE_SIZE):
+            if _is_real_lawyer(lawyer):
+                _prepare_lawyer(lawyer, len(lawyers))
                 lawyers.append(lawyer)
+        if lawyers:
             print(f"✅ Supabase에서 변호사 {len(lawyers)}명 로드 완료")
-            return lawyers
         else:
             print("📭 Supabase 테이블이 비어 있습니다")
-            return []
+        return lawyers
     except Exception as e:
         print(f"⚠️ Supabase 로드 실패: {e}")
         return None
@@ -302,17 +331,33 @@ def _save_to_supabase(db):
         return False
 
 
+def _save_single_to_supabase(lawyer):
+    """단일 변호사 데이터를 Supabase에 upsert합니다."""
+    try:
+        from supabase_client import get_supabase  # type: ignore
+        sb = get_supabase()
+        if sb is None:
+            return False
+        
+        from datetime import datetime as _dt
+        row = {
+            "id": lawyer["id"],
+            "data": lawyer,
+            "is_mock": lawyer.get("is_mock", False),
+            "verified": lawyer.get("verified", False),
+            "updated_at": _dt.now().isoformat(),
+        }
+        sb.table("lawyers").upsert(row, on_conflict="id").execute()
+        return True
+    except Exception as e:
+        print(f"⚠️ Supabase 단일 저장 실패: {e}")
+        return False
+
+
 def _filter_real_lawyers(lawyers):
     """is_mock=True인 가상 변호사를 필터링합니다."""
-    import re
-    real = []
-    mock_count = 0
-    for lawyer in lawyers:
-        is_mock = lawyer.get("is_mock", False)
-        if not is_mock and not re.match(r'^lawyer-\d+$', lawyer.get("id", "")):
-            real.append(lawyer)
-        else:
-            mock_count += 1  # type: ignore
+    real = [lawyer for lawyer in lawyers if _is_real_lawyer(lawyer)]
+    mock_count = len(lawyers) - len(real)
     if mock_count > 0:
         print(f"🗑️ 가상 변호사 {mock_count}명 필터링 완료 (실제 {len(real)}명 유지)")
     return real
@@ -357,51 +402,6 @@ _KIM_WON_YOUNG_SEED = {
 }
 
 
-def load_lawyers_db():
-    # 1. Supabase 시도 (프로덕션)
-    supabase_lawyers = _load_from_supabase()
-    if supabase_lawyers is not None and len(supabase_lawyers) > 0:
-        real_lawyers = _filter_real_lawyers(supabase_lawyers)
-        if len(real_lawyers) < len(supabase_lawyers):
-            save_lawyers_db(real_lawyers)
-        return real_lawyers
-
-    # 2. JSON 파일 폴백 (로컬 개발)
-    if os.path.exists(DB_FILE):
-        try:
-            with open(DB_FILE, "r", encoding="utf-8") as f:
-                print(f"Loading DB from {DB_FILE}")
-                lawyers = json.load(f)
-                real_lawyers = _filter_real_lawyers(lawyers)
-                if len(real_lawyers) < len(lawyers):
-                    save_lawyers_db(real_lawyers)
-                if supabase_lawyers is not None and len(supabase_lawyers) == 0 and real_lawyers:
-                    print("📤 JSON → Supabase 초기 시드 업로드 시작...")
-                    _save_to_supabase(real_lawyers)
-                return real_lawyers
-        except Exception as e:
-            print(f"Failed to load DB: {e}. Starting fresh.")
-
-    # 3. 데이터가 없으면 시드 유저만 생성
-    print("📋 DB 없음 → 시드 유저(김원영)만 생성")
-    lawyers = [_KIM_WON_YOUNG_SEED.copy()]
-    save_lawyers_db(lawyers)
-    return lawyers
-
-def save_lawyers_db(db):
-    # 1. JSON 파일 저장 (로컬 캐시)
-    try:
-        with open(DB_FILE, "w", encoding="utf-8") as f:
-            json.dump(db, f, ensure_ascii=False, indent=2)
-        print("DB Saved (JSON)")
-    except Exception as e:
-        print(f"JSON 저장 실패 (서버리스 환경에서는 정상): {e}")
-    
-    # 2. Supabase에도 저장 (프로덕션용)
-    _save_to_supabase(db)
-
-LAWYERS_DB = load_lawyers_db()
-
 # Local images map
 LOCAL_IMAGES = {
     "Male": [
@@ -416,47 +416,184 @@ LOCAL_IMAGES = {
     ]
 }
 
-# Assign random avatars and ensure essential fields exist
-updated = False
-for i, lawyer in enumerate(LAWYERS_DB):
+def _prepare_lawyer(lawyer, i):
+    """누락 필드 보정 (로드 시 레코드별). 변호사 id로 시드한 난수 → 콜드 스타트마다 같은 값"""
+    rng = random.Random(lawyer.get("id", i))
+
     # 1. Backfill Image
     if not lawyer.get("imageUrl"):
-        is_female = random.choice([True, False])
-        gender = "Female" if is_female else "Male"
+        gender = "Female" if rng.choice([True, False]) else "Male"
         lawyer["gender"] = gender
         images_pool = LOCAL_IMAGES[gender]
-        lawyer["imageUrl"] = images_pool[i % len(images_pool)]
-        updated = True
+        lawyer["imageUrl"] = rng.choice(images_pool)
 
     # 2. Backfill Kakao ID
     if not lawyer.get("kakao_id"):
-        lawyer["kakao_id"] = f"lawyer_{random.randint(100, 999)}"
-        updated = True
+        lawyer["kakao_id"] = f"lawyer_{rng.randint(100, 999)}"
 
     # 3. Backfill Homepage
     if not lawyer.get("homepage"):
-        lawyer["homepage"] = f"https://lawfirm-{i}.com"
-        updated = True
+        lawyer["homepage"] = f"https://lawfirm-{rng.randint(1000, 9999)}.com"
 
     # 4. Backfill Cases (if empty)
     if not lawyer.get("cases"):
-        # Borrow from templates based on their expertise or random if not found
-        specialty = lawyer.get("expertise", ["형사법 전문"])[0]
-        # Fallback if specialty not in templates
-        template_key = specialty if specialty in CASE_TEMPLATES else random.choice(list(CASE_TEMPLATES.keys()))
-        
-        # Pick 3 random cases
+        specialty = (lawyer.get("expertise") or ["형사법 전문"])[0]
+        template_key = specialty if specialty in CASE_TEMPLATES else rng.choice(list(CASE_TEMPLATES.keys()))
         case_pool = CASE_TEMPLATES[template_key]
         lawyer["cases"] = []
         for _ in range(3):
-            case_template = random.choice(case_pool)
+            case_template = rng.choice(case_pool)
             lawyer["cases"].append({
                 "title": case_template[0],
                 "summary": case_template[1]
             })
-        updated = True
 
-if updated:
-    print("Backfilled missing data for lawyers.")
-    save_lawyers_db(LAWYERS_DB)
+def load_lawyers_db():
+    """임포트 시 호출. 누락 필드 보정은 레코드별로 메모리에서만 적용 (전체 저장 없음)"""
+    # 1. Supabase 시도 (프로덕션, 페이지 단위 스트리밍)
+    supabase_lawyers = _load_from_supabase()
+    if supabase_lawyers:
+        return supabase_lawyers
+
+    # 2. JSON 파일 폴백 (로컬 개발)
+    if os.path.exists(DB_FILE):
+        try:
+            with open(DB_FILE, "r", encoding="utf-8") as f:
+                print(f"Loading DB from {DB_FILE}")
+                lawyers = json.load(f)
+            real_lawyers = _filter_real_lawyers(lawyers)
+            for i, lawyer in enumerate(real_lawyers):
+                _prepare_lawyer(lawyer, i)
+            if supabase_lawyers is not None and real_lawyers:
+                print("📤 JSON → Supabase 초기 시드 업로드 시작...")
+                if _save_to_supabase(real_lawyers):
+                    _remember_persisted(real_lawyers)
+            return real_lawyers
+        except Exception as e:
+            print(f"Failed to load DB: {e}. Starting fresh.")
+
+    # 3. 데이터가 없으면 시드 유저만 생성
+    print("📋 DB 없음 → 시드 유저(김원영)만 생성")
+    lawyers = [_KIM_WON_YOUNG_SEED.copy()]
+    _prepare_lawyer(lawyers[0], 0)
+    save_lawyers_db(lawyers)
+    return lawyers
+
+# save_lawyers_db 이후 호출되는 콜백 (예: 조회 인덱스 무효화)
+_SAVE_LISTENERS = []
+
+def on_lawyers_db_saved(callback):
+    _SAVE_LISTENERS.append(callback)
+
+# --- 변경 추적 저장 ---
+# 마지막으로 Supabase에 저장된 변호사별 지문(fingerprint). 바뀐 행만 upsert.
+_PERSISTED_FINGERPRINTS = {}
+SNAPSHOT_DELAY = float(os.environ.get("LAWYERS_DB_SNAPSHOT_DELAY", "1.0"))  # JSON 스냅샷 디바운스 (초)
+
+def _fingerprint(lawyer):
+    payload = json.dumps(lawyer, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+def _remember_persisted(lawyers):
+    """이미 Supabase에 있는 상태로 간주 (로드 직후 / 전체 업로드 후)"""
+    _PERSISTED_FINGERPRINTS.clear()
+    for lawyer in lawyers:
+        _PERSISTED_FINGERPRINTS[lawyer["id"]] = _fingerprint(lawyer)
+
+def _changed_lawyers(lawyers):
+    """주어진 변호사 중 마지막 저장 이후 내용이 바뀌었거나 새로 추가된 변호사와 그 지문"""
+    changed = []
+    for lawyer in lawyers:
+        fp = _fingerprint(lawyer)
+        if _PERSISTED_FINGERPRINTS.get(lawyer.get("id")) != fp:
+            changed.append((lawyer, fp))
+    return changed
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _SnapshotWriter:
+    """
+    lawyers_db.json 스냅샷을 백그라운드에서 디바운스 후 원자적으로 기록.
+    연속 저장 요청은 마지막 상태 한 번으로 합쳐짐.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+
+    def schedule(self, db):
+        with self._lock:
+            self._pending = db
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            db, self._pending = self._pending, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if db is None:
+            return
+        for attempt in range(3):
+            try:
+                # 다른 스레드가 수정 중이면 직렬화가 실패할 수 있으므로 재시도
+                snapshot = json.loads(json.dumps(db, ensure_ascii=False, default=str))
+                break
+            except RuntimeError:
+                time.sleep(0.05)
+        else:
+            print("JSON 스냅샷 직렬화 실패, 다음 저장 때 재시도")
+            return
+        try:
+            _write_json_atomic(DB_FILE, snapshot)
+            print("DB Saved (JSON)")
+        except Exception as e:
+            print(f"JSON 저장 실패 (서버리스 환경에서는 정상): {e}")
+
+_snapshot_writer = _SnapshotWriter(SNAPSHOT_DELAY)
+atexit.register(_snapshot_writer.flush)
+
+def flush_lawyers_db():
+    """대기 중인 JSON 스냅샷을 즉시 기록 (종료 / 테스트용)"""
+    _snapshot_writer.flush()
+
+def save_lawyers_db(db, changed=None):
+    """
+    changed: 이번 요청에서 수정 / 추가한 변호사 목록 (삭제만 했으면 []). 그 변호사들만 지문 비교 후 upsert.
+    None이면 전체 변호사를 직렬화해 지문을 비교하는 스윕 (어디가 바뀌었는지 모르는 저장용 폴백)
+    """
+    # 0. 인메모리 파생 인덱스 무효화
+    for callback in _SAVE_LISTENERS:
+        try:
+            callback(db)
+        except Exception as e:
+            print(f"save listener 실패: {e}")
+
+    # 1. Supabase: 마지막 저장 이후 바뀐 변호사만 upsert (프로필 수정 1건 = 1행)
+    dirty = _changed_lawyers(db if changed is None else changed)
+    if dirty:
+        lawyers = [lawyer for lawyer, _ in dirty]
+        ok = _save_single_to_supabase(lawyers[0]) if len(lawyers) == 1 else _save_to_supabase(lawyers)
+        if ok:
+            for lawyer, fp in dirty:
+                _PERSISTED_FINGERPRINTS[lawyer["id"]] = fp
+
+    # 2. JSON 파일 (로컬 캐시): 디바운스 후 백그라운드에서 원자적으로 기록
+    _snapshot_writer.schedule(db)
+
+LAWYERS_DB = load_lawyers_db()
 
+# id / 콘텐츠 id / slug 조회는 LAWYERS를 통해 (LAWYERS_DB와 같은 리스트 객체를 감쌈)
+LAWYERS = LawyerRepository(LAWYERS_DB)
@@ -0,0 +1,358 @@
+"""
+Embedding Client Module
+- 여러 텍스트를 토큰 예산 단위 배치로 묶어 embeddings.create 한 번에 전송
+- 배치는 제한된 스레드 풀에서 동시 실행
+- 429 / 5xx / 연결 오류는 지수 백오프로 재시도 (Retry-After 헤더 우선)
+- 결과는 항상 입력 순서대로 반환, 실패한 항목은 None
+- FakeEmbedder: 네트워크 없이 결정적 벡터 반환 (테스트 / 오프라인 개발용)
+- CachedEmbedder: (모델, 텍스트 해시) 키 LRU 캐시로 반복 질의 임베딩 재사용, 선택적으로 SQLite 디스크 스필
+"""
+
+import os
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np  # type: ignore
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+
+MAX_INPUT_CHARS = 8000        # 입력 1건당 최대 길이 (토큰 초과 방지)
+MAX_BATCH_TOKENS = 60000      # 요청 1회당 토큰 예산 (API 한도 300k 대비 여유)
+MAX_BATCH_SIZE = 256          # 요청 1회당 최대 입력 수 (API 한도 2048)
+MAX_CONCURRENCY = 4
+MAX_RETRIES = 5
+
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", 1024))          # 메모리 LRU 항목 수
+EMBEDDING_CACHE_SPILL = os.environ.get("EMBEDDING_CACHE_SPILL")                   # SQLite 경로 (없으면 스필 안 함)
+EMBEDDING_CACHE_SPILL_SIZE = int(os.environ.get("EMBEDDING_CACHE_SPILL_SIZE", 100000))
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"}
+
+try:
+    import tiktoken  # type: ignore
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정. tiktoken이 없으면 UTF-8 바이트 기준 보수적 추정 (한글 1자 ≈ 1토큰)"""
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def _prepare(text: str) -> str:
+    return (text or "").replace("\n", " ").strip()[:MAX_INPUT_CHARS]
+
+
+def _is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class BaseEmbedder:
+    model = EMBEDDING_MODEL
+    dim = EMBEDDING_DIM
+
+    def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        raise NotImplementedError
+
+    def embed_one(self, text: str) -> Optional[List[float]]:
+        return self.embed([text])[0]
+
+
+class BatchEmbedder(BaseEmbedder):
+    """OpenAI embeddings.create를 배치 + 동시 실행 + 재시도로 감싼 클라이언트"""
+
+    def __init__(
+        self,
+        client,
+        model: str = EMBEDDING_MODEL,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        sleep=time.sleep,
+    ):
+        self.client = client
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """비어 있지 않은 텍스트의 인덱스를 토큰 예산 / 개수 한도에 맞춰 묶음"""
+        batches = []
+        current, current_tokens = [], 0
+        for i, text in enumerate(texts):
+            if not text:
+                continue
+            tokens = estimate_tokens(text)
+            if current and (current_tokens + tokens > self.max_batch_tokens or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _request(self, inputs: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.client.embeddings.create(input=inputs, model=self.model)
+                # 응답 순서는 보장되지 않으므로 index 기준으로 정렬
+                data = sorted(response.data, key=lambda d: d.index)
+                return [d.embedding for d in data]
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                    delay *= 0.5 + random.random() / 2  # jitter
+                print(f"⏳ 임베딩 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}s 후): {e}")
+                self._sleep(delay)
+        return []
+
+    def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        prepared = [_prepare(t) for t in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        batches = self.make_batches(prepared)
+        if not batches:
+            return results
+
+        def run(batch: List[int]):
+            try:
+                vectors = self._request([prepared[i] for i in batch])
+                for i, vec in zip(batch, vectors):
+                    results[i] = vec
+            except Exception as e:
+                print(f"❌ 임베딩 배치 실패 ({len(batch)}건): {e}")
+
+        if len(batches) == 1 or self.max_concurrency <= 1:
+            for batch in batches:
+                run(batch)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+                list(pool.map(run, batches))
+        return results
+
+
+class FakeEmbedder(BaseEmbedder):
+    """텍스트 해시 기반 결정적 단위 벡터. API 키 없이 인덱싱 / 검색 흐름을 테스트할 때 사용."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM, model: str = "fake-embedding"):
+        self.dim = dim
+        self.model = model
+        self.calls = 0      # embed() 호출 횟수 (배치 수 확인용)
+        self.embedded = 0   # 실제 임베딩한 텍스트 수
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+        vec = np.random.RandomState(seed).standard_normal(self.dim)
+        return (vec / np.linalg.norm(vec)).tolist()
+
+    def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        self.calls += 1
+        results = []
+        for text in texts:
+            prepared = _prepare(text)
+            if not prepared:
+                results.append(None)
+                continue
+            self.embedded += 1
+            results.append(self._vector(prepared))
+        return results
+
+
+class EmbeddingCache:
+    """
+    (모델, 텍스트 해시) → float32 벡터 LRU.
+    spill_path가 있으면 메모리에서 밀려난 항목을 SQLite에 보관했다가 다시 조회 시 메모리로 올림.
+    """
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_SIZE, spill_path: Optional[str] = EMBEDDING_CACHE_SPILL,
+                 max_spill_entries: int = EMBEDDING_CACHE_SPILL_SIZE):
+        self.max_entries = max_entries
+        self.spill_path = spill_path
+        self.max_spill_entries = max_spill_entries
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if spill_path:
+            try:
+                self._spill().execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB, accessed_at REAL)")
+            except Exception as e:
+                print(f"⚠️ 임베딩 캐시 스필 비활성화: {e}")
+                self.spill_path = None
+
+    @staticmethod
+    def key(text: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\x00{_prepare(text)}".encode("utf-8")).hexdigest()
+
+    def _spill(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.spill_path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vec = self._entries.get(key)
+            if vec is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vec
+        if self.spill_path:
+            try:
+                row = self._spill().execute("SELECT vec FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._spill().execute("UPDATE embeddings SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                    vec = np.frombuffer(row[0], dtype=np.float32)
+                    with self._lock:
+                        self.spill_hits += 1
+                    self.put(key, vec)
+                    return vec
+            except Exception as e:
+                print(f"⚠️ 임베딩 캐시 스필 조회 실패: {e}")
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, vec) -> np.ndarray:
+        vec = np.asarray(vec, dtype=np.float32)
+        evicted = []
+        with self._lock:
+            self._entries[key] = vec
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False))
+        if evicted and self.spill_path:
+            self._spill_out(evicted)
+        return vec
+
+    def _spill_out(self, items):
+        try:
+            conn = self._spill()
+            now = time.time()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vec, accessed_at) VALUES (?, ?, ?)",
+                [(k, v.tobytes(), now) for k, v in items],
+            )
+            count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_spill_entries:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_spill_entries,),
+                )
+        except Exception as e:
+            print(f"⚠️ 임베딩 캐시 스필 저장 실패: {e}")
+
+    def stats(self) -> Dict:
+        total = self.hits + self.spill_hits + self.misses
+        return {
+            "hits": self.hits,
+            "spill_hits": self.spill_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.spill_hits) / total, 4) if total else 0.0,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "spill": bool(self.spill_path),
+        }
+
+
+class CachedEmbedder(BaseEmbedder):
+    """다른 임베더를 감싸 캐시에 없는 텍스트만 한 번의 배치로 임베딩"""
+
+    def __init__(self, embedder: BaseEmbedder, cache: Optional[EmbeddingCache] = None):
+        self.embedder = embedder
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.model = embedder.model
+        self.dim = embedder.dim
+
+    def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        keys = [self.cache.key(t, self.model) for t in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        for i, (text, key) in enumerate(zip(texts, keys)):
+            if not _prepare(text):
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[i] = cached.tolist()
+            else:
+                pending.setdefault(key, []).append(i)
+
+        if pending:
+            firsts = [idxs[0] for idxs in pending.values()]
+            vectors = self.embedder.embed([texts[i] for i in firsts])
+            for (key, idxs), vec in zip(pending.items(), vectors):
+                if vec is None:
+                    continue
+                # 캐시에 저장된 float32 값으로 반환해 적중 / 미적중 결과가 같도록 함
+                stored = self.cache.put(key, vec).tolist()
+                for i in idxs:
+                    results[i] = stored
+        return results
+
+
+def create_embedder(client=None, model: str = EMBEDDING_MODEL) -> Optional[BaseEmbedder]:
+    """
+    환경에 맞는 임베더 생성.
+    - EMBEDDING_BACKEND=fake → FakeEmbedder
+    - client 또는 OPENAI_API_KEY가 있으면 BatchEmbedder
+    - 둘 다 없으면 None
+    """
+    if os.environ.get("EMBEDDING_BACKEND", "").lower() == "fake":
+        return FakeEmbedder()
+
+    if client is None:
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            return None
+        try:
+            from openai import OpenAI  # type: ignore
+            client = OpenAI(api_key=api_key)
+        except Exception as e:
+            print(f"Failed to initialize OpenAI client: {e}")
+            return None
+
+    return BatchEmbedder(
+        client,
+        model=model,
+        max_concurrency=int(os.environ.get("EMBEDDING_CONCURRENCY", MAX_CONCURRENCY)),
+    )
@@ -11,13 +11,14 @@ if API_DIR not in sys.path:
 from dotenv import load_dotenv  # type: ignore
 load_dotenv(os.path.join(API_DIR, '.env'))
 
-from fastapi import FastAPI, Query, UploadFile, File, HTTPException, Form, Body  # type: ignore
+from fastapi import FastAPI, Query, UploadFile, File, HTTPException, Form, Body, Header  # type: ignore
 from pydantic import BaseModel  # type: ignore
 from typing import List, Optional, Dict, Any
 from fastapi.middleware.cors import CORSMiddleware  # type: ignore
 # StaticFiles removed for Vercel serverless
 from search import search_engine  # type: ignore
-from data import LAWYERS_DB, save_lawyers_db  # type: ignore
+from data import LAWYERS_DB, LAWYERS, save_lawyers_db, on_lawyers_db_saved  # type: ignore
+from magazine import MAGAZINE, MAGAZINE_PAGE_MAX, MAGAZINE_PAGE_SIZE, etag_matches  # type: ignore
 import image_utils  # type: ignore
 import os
 import json
@@ -45,6 +46,8 @@ app.add_middleware(
 from datetime import datetime, timedelta
 from starlette.middleware.base import BaseHTTPMiddleware  # type: ignore
 from starlette.requests import Request as StarletteRequest  # type: ignore
+from starlette.concurrency import run_in_threadpool  # type: ignore
+from persistent_db import flush_request_writes  # type: ignore
 import time
 
 # --- Supabase-Persistent Daily Stats ---
@@ -176,6 +179,16 @@ class VisitorTrackingMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(VisitorTrackingMiddleware)
 
+
+class SupabaseWriteFlushMiddleware(BaseHTTPMiddleware):
+    """SB_WRITE_MODE=request: 요청 중 병합된 Supabase 쓰기를 응답 반환 전에 전송 (서버리스는 응답 후 실행 보장 없음)"""
+    async def dispatch(self, request: StarletteRequest, call_next):
+        response = await call_next(request)
+        await run_in_threadpool(flush_request_writes)
+        return response
+
+app.add_middleware(SupabaseWriteFlushMiddleware)
+
 # --- Admin Stats Endpoints ---
 
 @app.get("/api/admin/stats")
@@ -553,7 +566,7 @@ async def signup_lawyer(
     licenseImage: UploadFile = File(...)
 ):
     # Check if email exists
-    if any(l["id"] == email for l in LAWYERS_DB):
+    if LAWYERS.exists(email):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Validation: licenseImage must be an image
@@ -631,8 +644,8 @@ async def signup_lawyer(
     elif set_standard_trial:
         set_standard_trial(new_lawyer)
     
-    LAWYERS_DB.append(new_lawyer)
-    save_lawyers_db(LAWYERS_DB)
+    LAWYERS.add(new_lawyer)
+    save_lawyers_db(LAWYERS_DB, changed=[new_lawyer])
     
     # 직접 Supabase에 개별 저장 (save_lawyers_db의 대량 upsert 실패 대비)
     try:
@@ -677,7 +690,7 @@ def serve_uploaded_file(subdir: str, filename: str):
 @app.get("/api/lawyers/{lawyer_id}")
 def get_lawyer_profile(lawyer_id: str):
     """변호사 개별 프로필 조회 (대시보드 갱신용)"""
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     return lawyer
@@ -693,7 +706,7 @@ def get_pending_lawyers():
 @app.post("/api/admin/lawyers/{lawyer_id}/verify")
 def verify_lawyer(lawyer_id: str):
     """변호사 가입 승인 (자격증 검토 완료)"""
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
@@ -712,32 +725,30 @@ def verify_lawyer(lawyer_id: str):
     except ImportError:
         pass
     
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     return {"message": f"{lawyer['name']} 변호사가 승인되었습니다.", "lawyer_id": lawyer_id}
 
 @app.post("/api/admin/lawyers/{lawyer_id}/reject")
 def reject_lawyer(lawyer_id: str):
     """변호사 가입 반려"""
-    global LAWYERS_DB
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
 
     lawyer_name = lawyer["name"]
-    LAWYERS_DB = [l for l in LAWYERS_DB if l["id"] != lawyer_id]
-    save_lawyers_db(LAWYERS_DB)
+    LAWYERS.remove(lawyer_id)
+    save_lawyers_db(LAWYERS_DB, changed=[])
     return {"message": f"{lawyer_name} 변호사의 가입이 반려되었습니다.", "lawyer_id": lawyer_id}
 
 @app.delete("/api/admin/lawyers/{lawyer_id}")
 def delete_lawyer(lawyer_id: str):
     """변호사 완전 삭제"""
-    global LAWYERS_DB
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
     lawyer_name = lawyer["name"]
-    LAWYERS_DB = [l for l in LAWYERS_DB if l["id"] != lawyer_id]
+    LAWYERS.remove(lawyer_id)
     
     # Supabase에서도 삭제
     try:
@@ -748,7 +759,7 @@ def delete_lawyer(lawyer_id: str):
     except Exception:
         pass
     
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[])
     return {"message": f"{lawyer_name} 변호사가 삭제되었습니다.", "lawyer_id": lawyer_id}
 
 # --- Batch Approval / Rejection ---
@@ -759,15 +770,15 @@ class BatchLawyerRequest(BaseModel):
 @app.post("/api/admin/lawyers/batch-verify")
 def batch_verify_lawyers(request: BatchLawyerRequest):
     """변호사 일괄 승인"""
-    verified_count = 0
+    verified = []
     for lawyer_id in request.lawyer_ids:
-        lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+        lawyer = LAWYERS.get(lawyer_id)
         if lawyer and not lawyer.get("verified", False):
             lawyer["verified"] = True
             lawyer["location"] = lawyer.get("location", "").replace(" (등록 대기)", "")
             lawyer["matchScore"] = 50
             lawyer["content_highlights"] = "신규 등록 변호사"
-            verified_count += 1  # type: ignore
+            verified.append(lawyer)
             # 파운딩 멤버 혜택
             try:
                 from billing import set_founder_benefits, FOUNDER_LIMIT  # type: ignore
@@ -776,18 +787,17 @@ def batch_verify_lawyers(request: BatchLawyerRequest):
                     set_founder_benefits(lawyer)
             except ImportError:
                 pass
-    save_lawyers_db(LAWYERS_DB)
+    verified_count = len(verified)
+    save_lawyers_db(LAWYERS_DB, changed=verified)
     return {"message": f"{verified_count}명의 변호사가 승인되었습니다.", "verified_count": verified_count}
 
 @app.post("/api/admin/lawyers/batch-reject")
 def batch_reject_lawyers(request: BatchLawyerRequest):
     """변호사 일괄 반려"""
-    global LAWYERS_DB
     reject_ids = set(request.lawyer_ids)
-    original_count = len(LAWYERS_DB)
-    LAWYERS_DB = [l for l in LAWYERS_DB if l["id"] not in reject_ids or l.get("verified", False)]
-    rejected_count = original_count - len(LAWYERS_DB)
-    save_lawyers_db(LAWYERS_DB)
+    rejected = LAWYERS.remove_where(lambda l: l["id"] in reject_ids and not l.get("verified", False))
+    rejected_count = len(rejected)
+    save_lawyers_db(LAWYERS_DB, changed=[])
     return {"message": f"{rejected_count}명의 변호사 가입이 반려되었습니다.", "rejected_count": rejected_count}
 
 # ── Social Login (Kakao / Naver) ──────────────────────────────
@@ -844,7 +854,7 @@ print(f"📊 리드 복원 (Supabase): {len(LEADS_DB)}건")
 @app.post("/api/lawyers/{lawyer_id}/leads")
 def create_lead(lawyer_id: str, request: LeadCreateRequest):
     # Verify lawyer exists
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
         
@@ -1087,7 +1097,7 @@ def get_client_chats(client_id: str):
     for session in chat_manager.sessions.values():
         if session.client_id == client_id:
             # Find lawyer name
-            lawyer = next((l for l in LAWYERS_DB if l["id"] == session.lawyer_id), None)
+            lawyer = LAWYERS.get(session.lawyer_id)
             chat_data = session.to_dict()
             chat_data["lawyer_name"] = lawyer["name"] if lawyer else "알 수 없음"
             chat_data["lawyer_firm"] = lawyer.get("firm", "") if lawyer else ""
@@ -1537,24 +1547,25 @@ async def list_esigns():
 def get_online_lawyers():
     from chat import presence_manager  # type: ignore
     online = []
-    for lawyer in LAWYERS_DB:
-        status = presence_manager.get_status(lawyer["id"])
-        if status in ("online", "away"):
-            online.append({
-                "id": lawyer["id"],
-                "name": lawyer["name"],
-                "firm": lawyer.get("firm", ""),
-                "expertise": lawyer.get("expertise", []),
-                "imageUrl": lawyer.get("imageUrl"),
-                "status": status,
-                "location": lawyer.get("location", "")
-            })
+    for lawyer_id, status in presence_manager.active().items():
+        lawyer = LAWYERS.get(lawyer_id)
+        if not lawyer:
+            continue
+        online.append({
+            "id": lawyer["id"],
+            "name": lawyer["name"],
+            "firm": lawyer.get("firm", ""),
+            "expertise": lawyer.get("expertise", []),
+            "imageUrl": lawyer.get("imageUrl"),
+            "status": status,
+            "location": lawyer.get("location", "")
+        })
     return online
 
 @app.get("/api/public/lawyers/{lawyer_id}")
 def get_public_lawyer_detail(lawyer_id: str):
     """Public endpoint for lawyer profile page"""
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     # Return full public profile data
@@ -1639,29 +1650,24 @@ def get_all_magazine_content():
 
 @app.post("/api/admin/content/{item_id}/toggle-visibility")
 def toggle_content_visibility(item_id: str):
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            if item.get("id") == item_id:
-                # Toggle
-                current_status = item.get("verified", False)
-                item["verified"] = not current_status
-                save_lawyers_db(LAWYERS_DB)
-                return {"message": "Visibility toggled", "new_status": item["verified"]}
-    
-    raise HTTPException(status_code=404, detail="Content not found")
+    owner, item = LAWYERS.get_content(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+
+    # Toggle
+    current_status = item.get("verified", False)
+    item["verified"] = not current_status
+    save_lawyers_db(LAWYERS_DB, changed=[owner])
+    return {"message": "Visibility toggled", "new_status": item["verified"]}
 
 @app.delete("/api/admin/content/{item_id}")
 def delete_content(item_id: str):
-    for lawyer in LAWYERS_DB:
-        if "content_items" in lawyer:
-            initial_len = len(lawyer["content_items"])
-            lawyer["content_items"] = [item for item in lawyer["content_items"] if item.get("id") != item_id]
-            
-            if len(lawyer["content_items"]) < initial_len:
-                save_lawyers_db(LAWYERS_DB)
-                return {"message": "Content deleted successfully"}
-                
-    raise HTTPException(status_code=404, detail="Content not found")
+    owner, item = LAWYERS.remove_content(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+
+    save_lawyers_db(LAWYERS_DB, changed=[owner])
+    return {"message": "Content deleted successfully"}
 
 class MagazineCreateRequest(BaseModel):
     title: str
@@ -1676,7 +1682,7 @@ class MagazineCreateRequest(BaseModel):
 def create_magazine_post(request: MagazineCreateRequest):
     # Default to main lawyer for demo
     target_lawyer_id = "welder49264@naver.com" 
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == target_lawyer_id), None)
+    lawyer = LAWYERS.get(target_lawyer_id)
     
     if not lawyer:
         lawyer = LAWYERS_DB[0] # Fallback
@@ -1725,11 +1731,8 @@ def create_magazine_post(request: MagazineCreateRequest):
         }
     }
     
-    if "content_items" not in lawyer:  # type: ignore
-        lawyer["content_items"] = []  # type: ignore
-        
-    lawyer["content_items"].insert(0, new_item)  # type: ignore
-    save_lawyers_db(LAWYERS_DB)
+    LAWYERS.add_content(lawyer, new_item, position=0)  # type: ignore
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     
     # 검색 인덱스에 즉시 추가 (변호사 추천 알고리즘 점수 반영)
     try:
@@ -1946,10 +1949,10 @@ async def upload_case_pdf(lawyer_id: str = Form(...), file: UploadFile = File(..
     }
     
     # Save to DB
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if lawyer:
-        lawyer["content_items"].insert(0, draft) # Add to top
-        save_db()
+        LAWYERS.add_content(lawyer, draft, position=0) # Add to top
+        save_db(changed=[lawyer])
         
     return {
         "success": True,
@@ -2000,10 +2003,10 @@ def create_case_draft(request: CaseSummaryRequest):
         "image": image_url # Store generated image
     }
     
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == request.lawyer_id), None)
+    lawyer = LAWYERS.get(request.lawyer_id)
     if lawyer:
-        lawyer["content_items"].insert(0, draft)
-        save_db()
+        LAWYERS.add_content(lawyer, draft, position=0)
+        save_db(changed=[lawyer])
         
     return {
         "success": True,
@@ -2150,7 +2153,7 @@ def get_dashboard_actions(lawyer_id: str):
     suggestions = []
     
     # 1. Check profile completeness (Mock logic)
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if lawyer:
         if not lawyer.get("imageUrl"):
              suggestions.append({
@@ -2328,7 +2331,7 @@ def recommend_lawyers(
 @app.post("/api/lawyers/{lawyer_id}/upload-photo")
 async def upload_lawyer_photo(lawyer_id: str, file: UploadFile = File(...)):
     # 1. Find the lawyer
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
 
@@ -2345,7 +2348,7 @@ async def upload_lawyer_photo(lawyer_id: str, file: UploadFile = File(...)):
     lawyer["cutoutImageUrl"] = photo_url  # Use original as cutout
     lawyer["bgRemoveStatus"] = "skipped"
     
-    save_db()
+    save_db(changed=[lawyer])
     
     return {
         "message": "Photo uploaded successfully", 
@@ -2385,7 +2388,7 @@ async def submit_content(
     file: Optional[UploadFile] = File(None)
 ):
     # Verify lawyer exists
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
 
@@ -2461,16 +2464,14 @@ async def submit_content(
             "url": None, # Internal content
             "content": submission["content"] # Store content for magazine detail
         }
-        if "content_items" not in lawyer:
-            lawyer["content_items"] = []
-        lawyer["content_items"].append(new_content_item)
-        save_db() # Persist changes
+        LAWYERS.add_content(lawyer, new_content_item)
+        save_db(changed=[lawyer]) # Persist changes
 
     return {"message": "Submission received and published", "id": submission["id"]}
 
 @app.get("/api/lawyers/{lawyer_id}/blog")
 def get_lawyer_blog_posts(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
         
@@ -2481,12 +2482,12 @@ def get_lawyer_blog_posts(lawyer_id: str):
 
 @app.get("/api/lawyers/{lawyer_id}/blog/{slug}")
 def get_lawyer_blog_post_detail(lawyer_id: str, slug: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
         
     # Match by slug
-    post = next((item for item in lawyer.get("content_items", []) if item.get("slug") == slug), None)
+    post = LAWYERS.get_content_by_slug(lawyer_id, slug)
     
     # Fallback to ID match if slug not found (for legacy compatibility or if slug is actually an ID)
     if not post:
@@ -2509,7 +2510,7 @@ def approve_submission_legacy(submission_id: str):
         
     submission["status"] = "approved"
     
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == submission["lawyer_id"]), None)
+    lawyer = LAWYERS.get(submission["lawyer_id"])
     if not lawyer:
         return {"message": "Approved, but lawyer not found"}
 
@@ -2536,7 +2537,7 @@ def approve_submission_legacy(submission_id: str):
             # Fix NoneType error: check if content exists before startswith
             "url": submission.get("url") or submission.get("file_url") or (submission["content"] if submission["content"] and submission["content"].startswith("http") else None)  # type: ignore
         }
-        lawyer["content_items"].insert(0, new_content) # Add to top
+        LAWYERS.add_content(lawyer, new_content, position=0) # Add to top
         
         # Update Content Highlights
         count = len([c for c in lawyer["content_items"] if c["verified"]])
@@ -2561,7 +2562,7 @@ class InjectContentRequest(BaseModel):
 
 @app.post("/api/admin/lawyers/{lawyer_id}/content/inject")
 def inject_content(lawyer_id: str, request: InjectContentRequest):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
@@ -2596,7 +2597,7 @@ def inject_content(lawyer_id: str, request: InjectContentRequest):
             "url": None,
             "source": "admin_injected" # Flag to hide from magazine
         }
-        lawyer["content_items"].append(item)
+        LAWYERS.add_content(lawyer, item)
         added_items.append(item)
         
     # Update Highlights
@@ -2619,6 +2620,7 @@ def load_db():
                 loaded_data = json.load(f)
                 LAWYERS_DB.clear()
                 LAWYERS_DB.extend(loaded_data)
+                LAWYERS.invalidate() # same list object, new records
             print(f"Loaded {len(LAWYERS_DB)} lawyers from {DB_FILE}")
         except Exception as e:
             print(f"Failed to load DB: {e}. Using initial mock data.")
@@ -2626,13 +2628,17 @@ def load_db():
         print("No DB file found. Using initial mock data.")
         save_db()
 
-def save_db():
-    save_lawyers_db(LAWYERS_DB)
+def save_db(changed=None):
+    save_lawyers_db(LAWYERS_DB, changed=changed) # changed=None: full fingerprint sweep
 
 
 # Initialize DB on startup (module level)
 load_db()
 
+# Magazine feed: invalidated on every save, rebuilt on the next read
+MAGAZINE.bind(LAWYERS_DB)
+on_lawyers_db_saved(MAGAZINE.invalidate)
+
 # Initialize Search Engine (Load/Generate Embeddings)
 try:
     print("Initializing Search Engine...")
@@ -2653,7 +2659,7 @@ async def signup_lawyer(
     licenseImage: UploadFile = File(...)
 ):
     # Check if email exists
-    if any(l["id"] == email for l in LAWYERS_DB):
+    if LAWYERS.exists(email):
         raise HTTPException(status_code=400, detail="Email already registered")
         
     # Validation: licenseImage must be an image
@@ -2719,8 +2725,8 @@ async def signup_lawyer(
     else:
         set_standard_trial(new_lawyer)
     
-    LAWYERS_DB.append(new_lawyer)
-    save_lawyers_db(LAWYERS_DB)
+    LAWYERS.add(new_lawyer)
+    save_lawyers_db(LAWYERS_DB, changed=[new_lawyer])
 
     founder_msg = " 🚀 파운딩 멤버로 선정되었습니다! 3개월 무료 + 평생 50% 할인" if new_lawyer.get("is_founder") else ""
     return {"message": f"Signup successful{founder_msg}", "lawyer_id": new_lawyer["id"], "is_founder": new_lawyer.get("is_founder", False)}
@@ -2732,7 +2738,7 @@ class LawyerLoginRequest(BaseModel):
 @app.post("/api/auth/login")
 def login_lawyer(request: LawyerLoginRequest):
     # Find lawyer by email (id)
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == request.email), None)
+    lawyer = LAWYERS.get(request.email)
     
     if not lawyer:
         raise HTTPException(status_code=400, detail="Invalid email or password")
@@ -2777,7 +2783,7 @@ def get_public_lawyers():
 
 @app.get("/api/public/lawyers/{lawyer_id}")
 def get_public_lawyer_detail(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
@@ -2804,149 +2810,51 @@ def get_public_lawyer_detail(lawyer_id: str):
 # --- Legal Magazine API ---
 
 @app.get("/api/magazine")
-def get_magazine_articles():
-    import urllib.parse
-    
-    def generate_ai_image_url(prompt: str) -> str:
-        """Generate a dynamic AI image URL using pollinations.ai"""
-        # Ignore input prompt (which might be Korean/complex) and use safe presets
-        import random
-        safe_prompts = [
-            "lawyer working at desk, professional, cinematic, 4k",
-            "supreme court building, architecture, dramatic sky",
-            "legal documents, pen, closeup, detailed",
-            "judge gavel, wooden, blurred background, high quality",
-            "statue of lady justice, silhouette, sunset"
-        ]
-        chosen_prompt = random.choice(safe_prompts)
-        encoded = urllib.parse.quote(chosen_prompt)
-        return f"https://image.pollinations.ai/prompt/{encoded}?width=800&height=600&nologo=true"
-
-    # Gather all verified content from all lawyers
-    articles = []
-    
-    # 1. From LAWYERS_DB (Verified content)
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            # Filter out admin injected content
-            # Filter out admin injected content AND 'youtube' type (Score-only)
-            if item.get("verified") and item.get("type") in ["column", "case"] and item.get("source") != "admin_injected":
-                
-                # Ensure cover image exists
-                cover_image = item.get("image")
-                if not cover_image and not item.get("file_url"):
-                    # Generate one on the fly if missing (and persist it optionally, but here just return dynamic)
-                    # For performance, we should persist, but for now let's just generate URL.
-                    # Best to stick to what's in DB, but if DB is empty, provide dynamic one.
-                    cover_image = generate_ai_image_url(item["title"])
-                
-                articles.append({
-                    "id": item["id"],
-                    "lawyer_id": lawyer["id"],  # type: ignore
-                    "lawyer_name": lawyer["name"],  # type: ignore
-                    "lawyer_firm": lawyer.get("firm", "Lawnald Partner"),
-                    "lawyer_firm": lawyer.get("firm", "Lawnald Partner"),
-                    "lawyer_image": lawyer.get("cutoutImageUrl") or lawyer.get("imageUrl"), # Frontend handles null with default icon
-                    "type": item["type"],
-                    "type": item["type"],
-                    "title": item["title"],
-                    "summary": item.get("content", "")[:100] + "..." if item.get("content") else f"{item['title']}에 대한 법률적 분석과 해결 사례입니다.",
-                    "content": item.get("content", ""), # Return full content
-                    "date": item.get("date") or item.get("timestamp", "")[:10] or "2025-01-01",
-                    "tags": item.get("topic_tags", []),
-                    "url": item.get("url"),
-                    "cover_image": cover_image
-                })
-                
-    # Sort by date desc initially to prioritize latest when deduplicating
-    articles.sort(key=lambda x: x["date"] or "", reverse=True)
-    
-    # 2. Deduplicate by standardized title
-    unique_articles = []
-    seen_titles = set()
-    
-    import re
-    def normalize_title(t):
-        # Remove extensions, special chars, standardize
-        t = re.sub(r'\.(pdf|docx|txt)$', '', t, flags=re.IGNORECASE)
-        t = re.sub(r'[_\-]', ' ', t)
-        return t.strip()
-
-    # Deterministic helpers for enrichment (simulate "analysis")
-    def get_mock_enrichment(output_id):
-        # deterministically generate based on ID hash
-        h = sum(ord(c) for c in output_id)
-        
-        durations = ["3개월", "6개월", "8개월", "1년", "1년 4개월", "2년"]
-        results = [
-            "승소 (전부 승소)", "일부 승소 (80% 인정)", "화해 권고 결정", 
-            "조정 성립", "집행유예", "기소유예", "무죄 판결"
-        ]
-        issues_pool = [
-            "증거 불충분 입증", "법리적 오해 주장", "절차적 위법성 강조", 
-            "피해자 합의 유도", "양형 사유 적극 소명", "재산 형성 기여도 입증",
-            "계약 해석의 다툼", "과실 비율 산정"
-        ]
-        
-        return {
-            "duration": durations[h % len(durations)],
-            "result": results[(h + 1) % len(results)],
-            "key_issues": [
-                issues_pool[(h + 2) % len(issues_pool)],
-                issues_pool[(h + 5) % len(issues_pool)]
-            ]
-        }
-
-    for art in articles:
-        norm_title = normalize_title(art["title"])
-        
-        # Humanize title for display
-        art["display_title"] = norm_title
-        
-        if norm_title in seen_titles:
-            continue
-            
-        seen_titles.add(norm_title)
-        
-        # Enrich if missing
-        # Check if item has 'case_result' usually not in content_items of old mocks
-        # So we use mock generator
-        enrichment = get_mock_enrichment(art["id"])
-        
-        art["key_issues"] = art.get("key_issues") or enrichment["key_issues"]
-        art["result_summary"] = art.get("result_summary") or enrichment["result"]
-        art["duration"] = art.get("duration") or enrichment["duration"]
-        
-        # Simplify category mapping
-        type_map = {"case": "승소사례", "column": "법률칼럼", "blog": "블로그"}
-        art["category_label"] = type_map.get(art["type"], "기타")
-        
-        unique_articles.append(art)
-        
-    return unique_articles
+def get_magazine_articles(
+    limit: Optional[int] = Query(None, ge=1, le=MAGAZINE_PAGE_MAX),
+    cursor: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    tag: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, max_length=100),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Materialized feed (see magazine.py): list cards only, the body comes from /api/magazine/{id}.
+    With limit/cursor/category/tag/q → {"items", "next_cursor", "total"} page (q: full-text search, relevance order),
+    without → the full card array (RSS / sitemap) as pre-serialized bytes with an ETag
+    """
+    from fastapi.responses import Response  # type: ignore
+    if limit is not None or cursor or category or tag or q:
+        try:
+            return MAGAZINE.page(limit or MAGAZINE_PAGE_SIZE, cursor, category, tag, q)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+    etag, body = MAGAZINE.payload()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/api/magazine/{article_id}")
 def get_magazine_article_detail(article_id: str):
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            if item["id"] == article_id:
-                # Found the item
-                return {
-                    "id": item["id"],
-                    "lawyer_id": lawyer["id"],  # type: ignore
-                    "lawyer_name": lawyer["name"],  # type: ignore
-                    "lawyer_image": lawyer.get("cutoutImageUrl"),
-                    "firm": lawyer.get("firm", "Lawnald Partner"),
-                    "type": item["type"],
-                    "title": item["title"],
-                    "summary": item.get("summary") or (item.get("content", "")[:100] + "..." if item.get("content") else f"{item['title']}에 대한 요약입니다."),
-                    "content": item.get("content") or f"{item['title']}에 대한 상세 내용입니다.\n\n(본문 내용이 없습니다.)",
-                    "date": item["date"],
-                    "tags": item.get("topic_tags", []),
-                    "url": item.get("url")
-                }
-    
-    raise HTTPException(status_code=404, detail="기사를 찾을 수 없습니다.")
+    lawyer, item = LAWYERS.get_content(article_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="기사를 찾을 수 없습니다.")
+
+    return {
+        "id": item["id"],
+        "lawyer_id": lawyer["id"],  # type: ignore
+        "lawyer_name": lawyer["name"],  # type: ignore
+        "lawyer_image": lawyer.get("cutoutImageUrl"),
+        "firm": lawyer.get("firm", "Lawnald Partner"),
+        "type": item["type"],
+        "title": item["title"],
+        "summary": item.get("summary") or (item.get("content", "")[:100] + "..." if item.get("content") else f"{item['title']}에 대한 요약입니다."),
+        "content": item.get("content") or f"{item['title']}에 대한 상세 내용입니다.\n\n(본문 내용이 없습니다.)",
+        "date": item["date"],
+        "tags": item.get("topic_tags", []),
+        "url": item.get("url")
+    }
 
 
 
@@ -2968,7 +2876,7 @@ def generate_youtube_summary(url: str, title: str) -> str:
 
 @app.post("/api/lawyers/{lawyer_id}/content")
 def submit_general_content(lawyer_id: str, submission: ContentSubmission):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
@@ -3070,14 +2978,14 @@ def submit_general_content(lawyer_id: str, submission: ContentSubmission):
     }
     
     # Direct add to lawyer items for demo speed
-    lawyer["content_items"].insert(0, new_submission)
-    save_db()
+    LAWYERS.add_content(lawyer, new_submission, position=0)
+    save_db(changed=[lawyer])
     
     return {"message": "콘텐츠가 등록되었습니다.", "item": new_submission}
 
 @app.get("/api/lawyers/{lawyer_id}/cases")
 def get_lawyer_cases(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
         
@@ -3088,20 +2996,16 @@ def get_lawyer_cases(lawyer_id: str):
 
 @app.delete("/api/lawyers/{lawyer_id}/content/{item_id}")
 def delete_lawyer_content(lawyer_id: str, item_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
-    content_items = lawyer.get("content_items", [])
-    initial_len = len(content_items)
-    
-    # Filter out the item to delete
-    lawyer["content_items"] = [item for item in content_items if item.get("id") != item_id]
-    
-    if len(lawyer["content_items"]) == initial_len:
+    # Remove the item only if it belongs to this lawyer
+    _, item = LAWYERS.remove_content(item_id, lawyer_id=lawyer_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Content not found")
         
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     return {"message": "Content deleted successfully"}
 
 @app.get("/api/admin/lawyers/pending", response_model=List[LawyerModel])
@@ -3111,7 +3015,7 @@ def get_pending_lawyers():
 
 @app.post("/api/admin/lawyers/{lawyer_id}/verify")
 def verify_lawyer(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다.")
     
@@ -3120,7 +3024,7 @@ def verify_lawyer(lawyer_id: str):
     lawyer["matchScore"] = 50 # Give a base score so they can appear in search
     lawyer["content_highlights"] = "신규 등록 변호사"
     
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     return {"message": "변호사가 성공적으로 인증되었습니다.", "lawyer": lawyer}
 
 # --- Admin Lawyer Management (List & Edit) ---
@@ -3147,7 +3051,7 @@ def get_all_lawyers(q: Optional[str] = None, include_mock: bool = False):
 
 @app.put("/api/admin/lawyers/{lawyer_id}")
 def update_lawyer(lawyer_id: str, update_data: LawyerUpdateModel):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다.")
     
@@ -3165,7 +3069,7 @@ def update_lawyer(lawyer_id: str, update_data: LawyerUpdateModel):
     if update_data.introduction_long is not None: lawyer["introduction_long"] = update_data.introduction_long
     
     print(f"Updated lawyer {lawyer_id}: {update_data}")
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     return {"message": "변호사 정보가 업데이트되었습니다.", "lawyer": lawyer}
 
 
@@ -3353,7 +3257,7 @@ async def publish_case(data: CasePublishRequest):
     """
     Submit a winning case for admin approval.
     """
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == data.lawyer_id), None)
+    lawyer = LAWYERS.get(data.lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found.")
 
@@ -3388,11 +3292,8 @@ async def publish_case(data: CasePublishRequest):
         "key_takeaways": data.key_takeaways or [] # Persist key takeaways
     }
     
-    if "content_items" not in lawyer:
-        lawyer["content_items"] = []
-    
-    lawyer["content_items"].insert(0, pending_item)
-    save_lawyers_db(LAWYERS_DB)
+    LAWYERS.add_content(lawyer, pending_item, position=0)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     
     # RAG: 임베딩 저장
     try:
@@ -3537,7 +3438,7 @@ async def bulk_publish_cases(data: BulkPublishRequest):
     """
     여러 건의 승소사례를 일괄 게시 요청.
     """
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == data.lawyer_id), None)
+    lawyer = LAWYERS.get(data.lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found.")
     
@@ -3546,6 +3447,7 @@ async def bulk_publish_cases(data: BulkPublishRequest):
     
     published = []
     skipped = []
+    embedding_jobs = []
     
     for case_item in data.cases:
         # Dedup check
@@ -3580,27 +3482,28 @@ async def bulk_publish_cases(data: BulkPublishRequest):
             "key_takeaways": case_item.key_takeaways or []
         }
         
-        lawyer["content_items"].insert(0, pending_item)
+        LAWYERS.add_content(lawyer, pending_item, position=0)
         published.append({"title": case_item.title, "case_id": case_id})
-        
-        # RAG: 임베딩 저장
-        try:
-            from case_embeddings import store_case_embedding  # type: ignore
-            store_case_embedding(
-                case_id=case_id,
-                lawyer_id=data.lawyer_id,
-                lawyer_name=lawyer["name"],
-                title=case_item.title,
-                content=case_item.story,
-                case_number=case_item.case_number,
-                court=case_item.court,
-                ai_tags=case_item.ai_tags,
-                file_hash=case_item.file_hash
-            )
-        except Exception as e:
-            print(f"⚠️ RAG 임베딩 저장 실패 (무시): {e}")
+        embedding_jobs.append({
+            "case_id": case_id,
+            "lawyer_id": data.lawyer_id,
+            "lawyer_name": lawyer["name"],
+            "title": case_item.title,
+            "content": case_item.story,
+            "case_number": case_item.case_number,
+            "court": case_item.court,
+            "ai_tags": case_item.ai_tags,
+            "file_hash": case_item.file_hash
+        })
     
-    save_lawyers_db(LAWYERS_DB)
+    # RAG: 임베딩 저장 (전체 사례를 한 번에 배치 임베딩)
+    try:
+        from case_embeddings import store_case_embeddings  # type: ignore
+        store_case_embeddings(embedding_jobs)
+    except Exception as e:
+        print(f"⚠️ RAG 임베딩 저장 실패 (무시): {e}")
+    
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     
     return {
         "message": f"{len(published)}건의 승소사례가 접수되었습니다.",
@@ -3643,6 +3546,13 @@ async def search_similar_cases_api(data: SimilarCaseQuery):
         raise HTTPException(status_code=500, detail=f"검색 실패: {str(e)}")
 
 
+@app.get("/api/cases/search-similar/cache-stats")
+async def get_similar_case_cache_stats():
+    """유사 판례 검색의 질의 임베딩 캐시 적중률"""
+    from case_embeddings import query_embedding_cache_stats  # type: ignore
+    return query_embedding_cache_stats()
+
+
 @app.get("/api/cases/rag-setup")
 async def get_rag_setup_sql():
     """RAG 테이블 설정 SQL을 반환합니다."""
@@ -3701,24 +3611,23 @@ async def approve_submission(item_id: str):
     """
     Approve a submission by ID. Finds the lawyer and updates status.
     """
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            if item.get("id") == item_id:
-                if item.get("status") == "published":
-                    return {"message": "Already approved"}
-                
-                item["status"] = "published"
-                item["verified"] = True
-                
-                # Boost score
-                if "suitability_score" not in lawyer:
-                    lawyer["suitability_score"] = 0
-                lawyer["suitability_score"] += 10  # type: ignore
-                
-                save_lawyers_db(LAWYERS_DB)
-                return {"message": "Approved successfully"}
-                
-    raise HTTPException(status_code=404, detail="Submission not found")
+    lawyer, item = LAWYERS.get_content(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    if item.get("status") == "published":
+        return {"message": "Already approved"}
+
+    item["status"] = "published"
+    item["verified"] = True
+
+    # Boost score
+    if "suitability_score" not in lawyer:
+        lawyer["suitability_score"] = 0
+    lawyer["suitability_score"] += 10  # type: ignore
+
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
+    return {"message": "Approved successfully"}
 
 
 @app.post("/api/admin/submissions/{item_id}/reject")
@@ -3726,14 +3635,13 @@ async def reject_submission(item_id: str):
     """
     Reject a submission by ID.
     """
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            if item.get("id") == item_id:
-                item["status"] = "rejected"
-                save_lawyers_db(LAWYERS_DB)
-                return {"message": "Rejected successfully"}
-                
-    raise HTTPException(status_code=404, detail="Submission not found")
+    owner, item = LAWYERS.get_content(item_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    item["status"] = "rejected"
+    save_lawyers_db(LAWYERS_DB, changed=[owner])
+    return {"message": "Rejected successfully"}
 
 
 @app.post("/api/admin/cases/approve")
@@ -3741,7 +3649,7 @@ async def approve_case(case_id: str = Body(...), lawyer_id: str = Body(...)):
     """
     Legacy Admin approval endpoint: publishes the case and boosts lawyer score.
     """
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found.")
         
@@ -3762,7 +3670,7 @@ async def approve_case(case_id: str = Body(...), lawyer_id: str = Body(...)):
     
     lawyer["suitability_score"] += 10 # Boost by 10 per approved case
     
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     
     return {
         "message": f"'{case_item['title']}' 사례가 승인되었습니다.",
@@ -3776,7 +3684,7 @@ async def create_consultation(request: ConsultationCreateRequest):
     """
     Creates a new consultation request and analyzes it with AI.
     """
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == request.lawyer_id), None)
+    lawyer = LAWYERS.get(request.lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
 
@@ -3809,7 +3717,7 @@ async def create_consultation(request: ConsultationCreateRequest):
         lawyer["consultations"] = []
         
     lawyer["consultations"].insert(0, new_consultation)
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     
     return {"message": "Consultation created", "id": new_consultation["id"]}
 
@@ -3818,7 +3726,7 @@ async def get_consultations(lawyer_id: str, status: Optional[str] = None, search
     """
     Get consultations for a specific lawyer, optionally filtered by status or search text.
     """
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
         
@@ -3894,25 +3802,21 @@ def update_case_status(case_id: str, update: StatusUpdate):
 @app.post("/api/admin/content/{content_id}/toggle-visibility")
 def toggle_content_visibility(content_id: str):
     """Toggle the 'verified' status of a content item."""
-    for lawyer in LAWYERS_DB:
-        for item in lawyer.get("content_items", []):
-            if item["id"] == content_id:
-                item["verified"] = not item.get("verified", False)
-                save_db()
-                return {"message": "Visibility toggled", "verified": item["verified"]}
-    raise HTTPException(status_code=404, detail="Content not found")
+    owner, item = LAWYERS.get_content(content_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+    item["verified"] = not item.get("verified", False)
+    save_db(changed=[owner])
+    return {"message": "Visibility toggled", "verified": item["verified"]}
 
 @app.delete("/api/admin/content/{content_id}")
 def delete_content(content_id: str):
     """Permanently delete a content item."""
-    for lawyer in LAWYERS_DB:
-        content_items = lawyer.get("content_items", [])
-        for i, item in enumerate(content_items):
-            if item["id"] == content_id:
-                del content_items[i]
-                save_db()
-                return {"message": "Content deleted"}
-    raise HTTPException(status_code=404, detail="Content not found")
+    owner, item = LAWYERS.remove_content(content_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+    save_db(changed=[owner])
+    return {"message": "Content deleted"}
 
 # --- Admin Lawyer Management ---
 
@@ -3939,7 +3843,7 @@ def get_pending_lawyers():
 
 @app.post("/api/admin/lawyers/{lawyer_id}/verify")
 def verify_lawyer(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다.")
     
@@ -3948,32 +3852,32 @@ def verify_lawyer(lawyer_id: str):
     lawyer["matchScore"] = 50
     lawyer["content_highlights"] = "신규 등록 변호사"
     
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     return {"message": "변호사가 성공적으로 인증되었습니다.", "lawyer": lawyer}
 
 @app.post("/api/admin/lawyers/{lawyer_id}/reject")
 def reject_lawyer(lawyer_id: str):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="변호사를 찾을 수 없습니다.")
     
-    LAWYERS_DB.remove(lawyer)
-    save_lawyers_db(LAWYERS_DB)
+    LAWYERS.remove(lawyer_id)
+    save_lawyers_db(LAWYERS_DB, changed=[])
     return {"message": "변호사 가입이 반려되었습니다."}
 
 @app.post("/api/admin/lawyers/batch-verify")
 def batch_verify_lawyers(data: BatchLawyerIds):
-    verified_count = 0
+    verified = []
     for lawyer_id in data.lawyer_ids:
-        lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+        lawyer = LAWYERS.get(lawyer_id)
         if lawyer and lawyer.get("verified") is False:
             lawyer["verified"] = True
             lawyer["location"] = lawyer.get("location", "").replace(" (등록 대기)", "")
             lawyer["matchScore"] = 50
             lawyer["content_highlights"] = "신규 등록 변호사"
-            verified_count += 1
-    
-    save_lawyers_db(LAWYERS_DB)
+            verified.append(lawyer)
+    verified_count = len(verified)
+    save_lawyers_db(LAWYERS_DB, changed=verified)
     return {"message": f"{verified_count}명의 변호사가 승인되었습니다.", "count": verified_count}
 
 @app.post("/api/admin/lawyers/batch-reject")
@@ -3981,15 +3885,15 @@ def batch_reject_lawyers(data: BatchLawyerIds):
     rejected_count = 0
     to_remove = []
     for lawyer_id in data.lawyer_ids:
-        lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+        lawyer = LAWYERS.get(lawyer_id)
         if lawyer and lawyer.get("verified") is False:
             to_remove.append(lawyer)
             rejected_count += 1
     
     for lawyer in to_remove:
-        LAWYERS_DB.remove(lawyer)
+        LAWYERS.remove(lawyer["id"])
     
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[])
     return {"message": f"{rejected_count}명의 변호사 가입이 반려되었습니다.", "count": rejected_count}
 
 @app.get("/api/admin/lawyers")
@@ -4001,7 +3905,7 @@ def get_all_lawyers(q: Optional[str] = None, include_mock: bool = False):
 
 @app.put("/api/admin/lawyers/{lawyer_id}")
 def update_lawyer(lawyer_id: str, update_data: LawyerUpdateModel):
-    lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+    lawyer = LAWYERS.get(lawyer_id)
     if not lawyer:
         raise HTTPException(status_code=404, detail="Lawyer not found")
     
@@ -4010,5 +3914,5 @@ def update_lawyer(lawyer_id: str, update_data: LawyerUpdateModel):
         if value is not None:
             lawyer[key] = value
     
-    save_lawyers_db(LAWYERS_DB)
+    save_lawyers_db(LAWYERS_DB, changed=[lawyer])
     return {"message": "Updated", "lawyer": lawyer}
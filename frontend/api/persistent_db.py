@@ -3,10 +3,43 @@ Persistent DB Helper
 - Supabase-backed storage for LEADS_DB, CLIENT_STORIES_DB, CONSULTATIONS_DB, SUBMISSIONS_DB
 - Each uses a simple pattern: Supabase table with id + data JSONB
 - In-memory cache with periodic sync
+- 쓰기 모드 (SB_WRITE_MODE)
+    · timer: sb_append / sb_update는 큐에 넣고 바로 반환, 같은 (table, id)의 쓰기는 병합 → SB_FLUSH_INTERVAL마다 테이블별 배치 upsert
+      (상주 프로세스 전용: 백엔드 서버 기본값)
+    · sync: 호출 즉시 전송하고 실제 저장 결과를 반환. Vercel(VERCEL 설정) 기본값 — 서버리스 인스턴스는 응답 후 동결 / 종료되어
+      타이머 / atexit가 실행된다는 보장이 없고, /tmp의 dead-letter 파일도 인스턴스와 함께 사라짐
+    · request: 요청 안에서만 병합, 응답 전에 flush_request_writes() (index.py 미들웨어)로 전송
+    · SB_WRITE_BEHIND=0 (이전 설정)은 sync와 같음
+    · 실패한 배치는 SB_MAX_RETRIES회 재시도 후 dead-letter 파일(JSONL)에 기록, replay_dead_letters()로 재시도
+- 로드는 id 순 페이지 단위 (SB_PAGE_SIZE), 대기 중인 쓰기를 먼저 flush해 읽기 일관성 유지
 """
 
+import os
+import json
+import time
+import atexit
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SB_WRITE_MODES = ("timer", "request", "sync")
+SB_WRITE_MODE = os.getenv("SB_WRITE_MODE") or (
+    "sync" if os.getenv("SB_WRITE_BEHIND") == "0" or os.getenv("VERCEL") else "timer")
+if SB_WRITE_MODE not in SB_WRITE_MODES:
+    print(f"⚠️ 알 수 없는 SB_WRITE_MODE '{SB_WRITE_MODE}', sync 사용")
+    SB_WRITE_MODE = "sync"
+SB_FLUSH_INTERVAL = float(os.getenv("SB_FLUSH_INTERVAL", "0.5"))  # seconds
+SB_BATCH_SIZE = int(os.getenv("SB_BATCH_SIZE", "200"))
+SB_PAGE_SIZE = int(os.getenv("SB_PAGE_SIZE", "1000"))
+SB_MAX_RETRIES = int(os.getenv("SB_MAX_RETRIES", "3"))
+SB_RETRY_BACKOFF = float(os.getenv("SB_RETRY_BACKOFF", "0.5"))  # seconds, doubled per attempt
+SB_DEAD_LETTER_FILE = os.getenv("SB_DEAD_LETTER_FILE", "/tmp/sb_dead_letter.jsonl")
+
+_client_override = None
+
 
 def _sb():
+    if _client_override is not None:
+        return _client_override
     try:
         from supabase_client import get_supabase  # type: ignore
         return get_supabase()
@@ -14,32 +47,218 @@ def _sb():
         return None
 
 
-def sb_append(table: str, item: dict, id_field: str = "id", fk_field: str = "lawyer_id"):
-    """Supabase에 항목 추가 (upsert)"""
-    sb = _sb()
-    if sb is None:
+def set_client(client):
+    """테스트 / 로컬 스텁용 클라이언트 지정 (None이면 supabase_client 사용)"""
+    global _client_override
+    _client_override = client
+
+
+class WriteBehindQueue:
+    """(table, id) 단위로 병합되는 쓰기 큐"""
+
+    def __init__(self, interval: float = SB_FLUSH_INTERVAL, batch_size: int = SB_BATCH_SIZE,
+                 max_retries: int = SB_MAX_RETRIES, backoff: float = SB_RETRY_BACKOFF,
+                 dead_letter_file: str = SB_DEAD_LETTER_FILE):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.dead_letter_file = dead_letter_file
+        # table -> id -> {"row": 전체 행 (upsert) 또는 None, "data": update만 하는 경우}
+        self._pending: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self.stats = {"queued": 0, "coalesced": 0, "batches": 0, "rows": 0, "retries": 0, "dead_lettered": 0}
+
+    def put_row(self, table: str, row: Dict) -> Optional[int]:
+        """sync 모드면 전송한 행 수, 나중에 전송하는 모드면 None"""
+        with self._lock:
+            rows = self._pending.setdefault(table, {})
+            if row["id"] in rows:
+                self.stats["coalesced"] += 1
+            rows[row["id"]] = {"row": row}
+            self.stats["queued"] += 1
+        return self._schedule()
+
+    def put_update(self, table: str, item_id: str, data: Dict, fk_field: str) -> Optional[int]:
+        with self._lock:
+            rows = self._pending.setdefault(table, {})
+            entry = rows.get(item_id)
+            if entry is not None:
+                self.stats["coalesced"] += 1
+            if entry is not None and entry.get("row") is not None:
+                # Not yet inserted: fold the update into the pending upsert
+                entry["row"] = dict(entry["row"], data=data)
+            elif data.get(fk_field):
+                rows[item_id] = {"row": {"id": item_id, fk_field: data[fk_field], "data": data}}
+            else:
+                rows[item_id] = {"row": None, "data": data}
+            self.stats["queued"] += 1
+        return self._schedule()
+
+    def pending(self, table: str = None) -> int:
+        with self._lock:
+            if table is not None:
+                return len(self._pending.get(table, {}))
+            return sum(len(rows) for rows in self._pending.values())
+
+    def _schedule(self) -> Optional[int]:
+        if SB_WRITE_MODE == "request":
+            return None  # 응답 전에 flush_request_writes()가 전송
+        if SB_WRITE_MODE == "sync" or self.interval <= 0:
+            return self.flush()
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        return None
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️ Supabase write-behind flush 실패: {e}")
+
+    def flush(self, table: str = None) -> int:
+        """대기 중인 쓰기 전송 (table 지정 시 해당 테이블만). 전송 성공한 행 수 반환"""
+        with self._flush_lock:
+            with self._lock:
+                tables = [table] if table is not None else list(self._pending)
+                work = [(t, self._pending.pop(t)) for t in tables if self._pending.get(t)]
+            written = 0
+            for t, rows in work:
+                written += self._write_table(t, rows)
+            return written
+
+    def _write_table(self, table: str, rows: Dict[str, Dict]) -> int:
+        sb = _sb()
+        if sb is None:
+            return 0  # JSON 파일 모드: 저장할 곳 없음 (기존 동작과 동일)
+        upserts = [entry["row"] for entry in rows.values() if entry.get("row") is not None]
+        updates = [(item_id, entry["data"]) for item_id, entry in rows.items() if entry.get("row") is None]
+        written = 0
+        # 행마다 키 구성이 같아야 배치 upsert 가능 (clients는 email, client_stories는 client_id)
+        by_shape: Dict[Tuple[str, ...], List[Dict]] = {}
+        for row in upserts:
+            by_shape.setdefault(tuple(sorted(row)), []).append(row)
+        for shape_rows in by_shape.values():
+            for i in range(0, len(shape_rows), self.batch_size):
+                batch = shape_rows[i:i + self.batch_size]
+                if self._attempt(table, "upsert", batch,
+                                 lambda b=batch: sb.table(table).upsert(b, on_conflict="id").execute()):
+                    written += len(batch)
+        for item_id, data in updates:
+            if self._attempt(table, "update", [{"id": item_id, "data": data}],
+                             lambda i=item_id, d=data: sb.table(table).update({"data": d}).eq("id", i).execute()):
+                written += 1
+        return written
+
+    def _attempt(self, table: str, op: str, rows: List[Dict], call) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                call()
+                self.stats["batches"] += 1
+                self.stats["rows"] += len(rows)
+                return True
+            except Exception as e:
+                if attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    time.sleep(self.backoff * (2 ** attempt))
+                else:
+                    print(f"⚠️ {table} Supabase {op} 실패 ({len(rows)}건) → dead-letter: {e}")
+                    self._dead_letter(table, op, rows, str(e))
         return False
-    try:
-        row = {
-            "id": item[id_field],
-            fk_field: item.get(fk_field, ""),
-            "data": item,
-        }
-        sb.table(table).upsert(row, on_conflict="id").execute()
-        return True
-    except Exception as e:
-        print(f"⚠️ {table} Supabase 저장 실패: {e}")
+
+    def _dead_letter(self, table: str, op: str, rows: List[Dict], error: str):
+        self.stats["dead_lettered"] += len(rows)
+        try:
+            with open(self.dead_letter_file, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps({"table": table, "op": op, "row": row, "error": error,
+                                        "failed_at": time.time()}, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"⚠️ dead-letter 기록 실패: {e}")
+
+    def replay_dead_letters(self) -> int:
+        """dead-letter 파일의 항목을 다시 큐에 넣고 파일 비움. 재투입 건수 반환"""
+        try:
+            with open(self.dead_letter_file, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+            os.remove(self.dead_letter_file)
+        except FileNotFoundError:
+            return 0
+        count = 0
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                rows = self._pending.setdefault(record["table"], {})
+                row = record["row"]
+                if row["id"] not in rows:  # 새 쓰기가 대기 중이면 그쪽이 최신
+                    if record["op"] == "upsert":
+                        rows[row["id"]] = {"row": row}
+                    else:
+                        rows[row["id"]] = {"row": None, "data": row["data"]}
+                    count += 1
+        if count:
+            self._schedule()
+        return count
+
+    def close(self):
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+
+
+write_queue = WriteBehindQueue()
+atexit.register(write_queue.close)
+
+
+def sb_append(table: str, item: dict, id_field: str = "id", fk_field: str = "lawyer_id"):
+    """Supabase에 항목 추가 (upsert). sync 모드는 저장 성공 여부, 나머지 모드는 큐에 넣었으면 True"""
+    if _sb() is None:
         return False
+    row = {
+        "id": item[id_field],
+        fk_field: item.get(fk_field, ""),
+        "data": item,
+    }
+    written = write_queue.put_row(table, row)
+    return True if written is None else written > 0
 
 
-def sb_load_all(table: str) -> list:
-    """Supabase에서 전체 항목 로드"""
+def sb_iter(table: str, page_size: int = SB_PAGE_SIZE, fk_field: str = None, fk_value: str = None) -> Iterator[dict]:
+    """Supabase 항목을 id 순으로 페이지 단위 스트리밍"""
     sb = _sb()
     if sb is None:
-        return []
+        return
+    write_queue.flush(table)
+    start = 0
+    while True:
+        query = sb.table(table).select("data")
+        if fk_field is not None:
+            query = query.eq(fk_field, fk_value)
+        res = query.order("id").range(start, start + page_size - 1).execute()
+        rows = res.data or []
+        for r in rows:
+            yield r["data"]
+        if len(rows) < page_size:
+            return
+        start += page_size
+
+
+def sb_load_all(table: str) -> list:
+    """Supabase에서 전체 항목 로드 (페이지 단위)"""
     try:
-        res = sb.table(table).select("data").execute()
-        return [r["data"] for r in (res.data or [])]
+        return list(sb_iter(table))
     except Exception as e:
         print(f"⚠️ {table} Supabase 로드 실패: {e}")
         return []
@@ -47,25 +266,33 @@ def sb_load_all(table: str) -> list:
 
 def sb_load_by_fk(table: str, fk_field: str, fk_value: str) -> list:
     """Supabase에서 FK 기준으로 항목 로드"""
-    sb = _sb()
-    if sb is None:
-        return []
     try:
-        res = sb.table(table).select("data").eq(fk_field, fk_value).execute()
-        return [r["data"] for r in (res.data or [])]
+        return list(sb_iter(table, fk_field=fk_field, fk_value=fk_value))
     except Exception as e:
         print(f"⚠️ {table} Supabase 로드 실패: {e}")
         return []
 
 
-def sb_update(table: str, item_id: str, data: dict):
-    """Supabase 항목 업데이트"""
-    sb = _sb()
-    if sb is None:
-        return False
-    try:
-        sb.table(table).update({"data": data}).eq("id", item_id).execute()
-        return True
-    except Exception as e:
-        print(f"⚠️ {table} Supabase 업데이트 실패: {e}")
+def sb_update(table: str, item_id, data: dict = None, fk_field: str = "lawyer_id"):
+    """
+    Supabase 항목 업데이트 (반환값은 sb_append와 같음).
+    sb_update(table, item_id, data) 또는 sb_update(table, item) 형태 모두 지원.
+    data에 fk_field가 있으면 배치 upsert로, 없으면 행 단위 update로 전송.
+    """
+    if _sb() is None:
         return False
+    if data is None:
+        data = item_id
+        item_id = data["id"]
+    written = write_queue.put_update(table, item_id, data, fk_field)
+    return True if written is None else written > 0
+
+
+def sb_flush(table: str = None) -> int:
+    """대기 중인 쓰기 즉시 전송"""
+    return write_queue.flush(table)
+
+
+def flush_request_writes() -> int:
+    """응답 직전에 호출 (SB_WRITE_MODE=request): 이 요청에서 병합된 쓰기 전송"""
+    return write_queue.flush() if write_queue.pending() else 0
@@ -6,7 +6,7 @@ import numpy as np  # type: ignore
 from typing import List, Dict
 from openai import OpenAI  # type: ignore
 from sklearn.metrics.pairwise import cosine_similarity  # type: ignore
-from data import LAWYERS_DB  # type: ignore
+from data import LAWYERS_DB, LAWYERS  # type: ignore
 from functools import lru_cache
 from chat import presence_manager  # type: ignore
 
@@ -270,7 +270,7 @@ class SearchEngine:
             # Or just assume it's appended.
             # for logic simplicity in prototype:
             
-            target_lawyer = next((l for l in LAWYERS_DB if l["id"] == lawyer_id), None)
+            target_lawyer = LAWYERS.get(lawyer_id)
             new_index = len(target_lawyer["cases"]) - 1 if target_lawyer else 0
             
             self.mapping.append({"lawyer_id": lawyer_id, "type": "case", "index": new_index})
@@ -347,6 +347,7 @@ class SearchEngine:
                 stats["count"] += 1
 
         final_candidates = []
+        online_ids = presence_manager.online_ids() # one expiry pass + O(1) membership per candidate
         
         for lawyer in LAWYERS_DB:
             l_id = lawyer["id"]
@@ -463,13 +464,9 @@ class SearchEngine:
                  reason = f"이 사안은 {primary_area} 쟁점이며, {lawyer['expertise'][0]} 변호사로서 전문성을 보유하고 있습니다."
             
             # --- Presence Boost ---
-            is_online = False
-            try:
-                if presence_manager.is_online(l_id):
-                    is_online = True
-                    final_score *= 1.1 # 10% Boost
-            except:
-                pass
+            is_online = l_id in online_ids
+            if is_online:
+                final_score *= 1.1 # 10% Boost
 
             # Content Highlights
             content_highlights = ""
@@ -0,0 +1,396 @@
+"""
+Full-Text Inverted Index
+- 판례 아카이브 / 매거진 검색용 인프로세스 역색인 (BM25F 랭킹)
+- 토크나이저: 한글은 음절 바이그램 (형태소 분석기 없이 조사 / 붙여쓰기에 강함), 영문·숫자는 단어 단위
+    · "상속분쟁에서" → 상속 / 속분 / 분쟁 / 쟁에 / 에서 — "분쟁" 검색이 붙여 쓴 본문에도 걸림
+- 필드 가중치: 필드별 tf를 길이 정규화 후 가중합 → BM25 포화 함수 한 번 적용 (BM25F)
+- 짧은 질의 확장 (사전 스캔): 한 글자 한글은 그 음절을 포함한 모든 토큰 ("법" → 형법 / 법위 / 법), 영문·숫자는 접두어 ("taxa" → taxation)
+- 기본은 질의의 모든 토큰을 포함하는 문서만 (AND, 기존 부분 문자열 검색과 같은 의미), 가장 짧은 포스팅부터 교집합
+    · match="any": 하나라도 포함하면 후보 (하이브리드 추천의 어휘 신호처럼 긴 질의에 쓰는 OR)
+- limit가 있으면 top-k 가지치기 (결과는 전체 정렬의 앞부분과 같음)
+    · 임팩트 순 포스팅: term별 길이 정규화한 가중 tf 내림차순 목록, add / remove 때 제자리 갱신
+      처음 질의될 때 짧은 목록은 바로, 긴 목록은 백그라운드 스레드가 만듦 (그동안은 포스팅 순으로 전부 계산)
+    · AND: 가장 짧은 포스팅을 임팩트 순으로 훑다가 남은 문서의 상한이 k번째 점수 아래로 내려가면 중단
+    · OR (MaxScore): 상한이 큰 term부터, 그 term부터 처음 보는 문서의 상한 (남은 term 상한 합)이 k번째 점수 아래면 중단
+    · 문서 하나도 term별로 더하다가 남은 상한을 다 더해도 모자라면 그만 계산
+- add / remove로 문서 단위 증분 갱신 (게시 / 승인 / 삭제 시점), 전체 재색인 없음
+"""
+
+import re
+import math
+import heapq
+import operator
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+K1 = 1.2
+B = 0.75
+PREFIX_MIN_LEN = 2  # 영문·숫자 토큰은 이 길이부터 접두어 확장 (한 글자 "a"가 사전 전체로 번지지 않도록)
+IMPACT_SYNC_MAX = 10000  # 이보다 긴 포스팅의 임팩트 목록은 백그라운드 스레드가 만듦 (질의 지연에 얹지 않음)
+IMPACT_MAX_DRIFT = 1.1  # 목록을 만든 뒤 평균 필드 길이가 이 배율 넘게 늘면 다시 만듦 (그 전까지는 상한에 배율을 곱해 보정)
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if run[0] < "가" or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _field_text(value) -> str:
+    if isinstance(value, (list, tuple, set)):
+        return " ".join(str(v) for v in value)
+    return str(value or "")
+
+
+def _saturate(idf: float, tf: float) -> float:
+    return idf * tf * (K1 + 1) / (tf + K1)
+
+
+class _ImpactList:
+    """한 term의 (길이 정규화한 가중 tf, doc_id) 내림차순 목록. averages 기준으로 계산, add / remove 때 제자리 갱신"""
+
+    __slots__ = ("averages", "keys", "ids")
+
+    def __init__(self, averages: List[float], pairs: List[Tuple[float, Hashable]]):
+        pairs.sort(key=lambda pair: pair[0], reverse=True)
+        self.averages = averages
+        self.keys = [-impact for impact, _ in pairs]  # ascending, for bisect
+        self.ids = [doc_id for _, doc_id in pairs]
+
+    def insert(self, impact: float, doc_id: Hashable):
+        pos = bisect_right(self.keys, -impact)
+        self.keys.insert(pos, -impact)
+        self.ids.insert(pos, doc_id)
+
+    def discard(self, impact: float, doc_id: Hashable):
+        pos = bisect_left(self.keys, -impact)
+        while pos < len(self.ids) and self.keys[pos] == -impact and self.ids[pos] != doc_id:
+            pos += 1
+        if pos == len(self.ids) or self.ids[pos] != doc_id:
+            pos = self.ids.index(doc_id)  # not where its impact says (should not happen): linear fallback
+        del self.keys[pos]
+        del self.ids[pos]
+
+    def drift(self, averages: List[float]) -> float:
+        """평균 필드 길이가 늘면 정규화 tf도 커짐 (최대 now / then 배) → 상한에 곱할 배율"""
+        return max([1.0] + [now / then for now, then in zip(averages, self.averages)])
+
+
+class TextIndex:
+    def __init__(self, fields: Dict[str, float]):
+        """fields: 필드 이름 → 가중치 (예: {"title": 3.0, "tags": 2.0, "summary": 1.0})"""
+        self.fields = list(fields)
+        self.boosts = [fields[f] for f in self.fields]
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[Hashable, Tuple[int, ...]]] = {}  # term -> doc -> tf per field
+        self._lengths: Dict[Hashable, Tuple[int, ...]] = {}  # doc -> token count per field
+        self._terms: Dict[Hashable, Tuple[str, ...]] = {}  # doc -> distinct terms (for remove)
+        self._totals = [0] * len(self.fields)  # sum of field lengths (for the averages)
+        self._impacts: Dict[str, _ImpactList] = {}  # term -> impact-ordered docs (built on first query)
+        self._vocab: List[str] = []  # sorted latin / digit terms (prefix expansion)
+        self._syllables: Dict[str, Set[str]] = {}  # hangul syllable -> terms containing it
+        self._version = 0  # bumped on every add / remove (background builds check it before installing)
+        self._pending: Set[str] = set()  # terms waiting for the background impact builder
+        self._builder: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._lengths
+
+    def _norms(self, lengths: Tuple[int, ...], averages: List[float]) -> List[float]:
+        return [boost / (1 - B + B * length / avg) for boost, length, avg in zip(self.boosts, lengths, averages)]
+
+    def _impact(self, tfs: Tuple[int, ...], lengths: Tuple[int, ...], averages: List[float]) -> float:
+        return sum(map(operator.mul, tfs, self._norms(lengths, averages)))
+
+    def add(self, doc_id: Hashable, doc: Dict):
+        """문서 추가 (같은 id가 있으면 교체)"""
+        per_field = [tokenize(_field_text(doc.get(f))) for f in self.fields]
+        counts: Dict[str, List[int]] = {}
+        for i, tokens in enumerate(per_field):
+            for token in tokens:
+                counts.setdefault(token, [0] * len(self.fields))[i] += 1
+        lengths = tuple(len(tokens) for tokens in per_field)
+        with self._lock:
+            self.remove(doc_id)
+            self._version += 1
+            for term, tfs in counts.items():
+                docs = self._postings.get(term)
+                if docs is None:
+                    docs = self._postings[term] = {}
+                    self._add_term(term)
+                docs[doc_id] = tuple(tfs)
+                impacts = self._impacts.get(term)
+                if impacts is not None:
+                    impacts.insert(self._impact(docs[doc_id], lengths, impacts.averages), doc_id)
+            self._lengths[doc_id] = lengths
+            self._terms[doc_id] = tuple(counts)
+            for i, length in enumerate(lengths):
+                self._totals[i] += length
+
+    def remove(self, doc_id: Hashable) -> bool:
+        with self._lock:
+            lengths = self._lengths.pop(doc_id, None)
+            if lengths is None:
+                return False
+            self._version += 1
+            for i, length in enumerate(lengths):
+                self._totals[i] -= length
+            for term in self._terms.pop(doc_id):
+                docs = self._postings[term]
+                tfs = docs.pop(doc_id)
+                if not docs:
+                    del self._postings[term]
+                    self._drop_term(term)
+                    continue
+                impacts = self._impacts.get(term)
+                if impacts is not None:
+                    impacts.discard(self._impact(tfs, lengths, impacts.averages), doc_id)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._lengths.clear()
+            self._terms.clear()
+            self._totals = [0] * len(self.fields)
+            self._impacts.clear()
+            self._pending.clear()
+            self._version += 1
+            self._vocab.clear()
+            self._syllables.clear()
+
+    def _add_term(self, term: str):
+        if term[0] >= "가":
+            for syllable in set(term):
+                self._syllables.setdefault(syllable, set()).add(term)
+        else:
+            insort(self._vocab, term)
+
+    def _drop_term(self, term: str):
+        self._impacts.pop(term, None)
+        if term[0] >= "가":
+            for syllable in set(term):
+                terms = self._syllables[syllable]
+                terms.discard(term)
+                if not terms:
+                    del self._syllables[syllable]
+        else:
+            del self._vocab[bisect_left(self._vocab, term)]
+
+    def _expand(self, token: str) -> List[str]:
+        """질의 토큰 → 매칭할 색인 term들 (한 글자 한글: 그 음절을 포함한 term, 영문·숫자: 접두어가 같은 term)"""
+        if token[0] >= "가":
+            if len(token) == 1:
+                return sorted(self._syllables.get(token, ()))
+        elif len(token) >= PREFIX_MIN_LEN:
+            start = bisect_left(self._vocab, token)
+            end = bisect_left(self._vocab, token + "{", start)  # "{" sorts right after "z"
+            return self._vocab[start:end]
+        return [token] if token in self._postings else []
+
+    def _lookup(self, token: str) -> Optional[Tuple[Dict[Hashable, Tuple[int, ...]], Optional[str]]]:
+        """질의 토큰 → (포스팅, 임팩트 목록 캐시 키). 여러 term으로 확장되면 문서별로 합친 포스팅 (캐시 키 None)"""
+        terms = self._expand(token)
+        if not terms:
+            return None
+        if len(terms) == 1:
+            return self._postings[terms[0]], terms[0]
+        # Bigrams sharing a syllable count the same occurrence twice: take the max, not the sum
+        combine = max if token[0] >= "가" else operator.add
+        merged: Dict[Hashable, Tuple[int, ...]] = {}
+        for term in terms:
+            for doc_id, tfs in self._postings[term].items():
+                prev = merged.get(doc_id)
+                merged[doc_id] = tfs if prev is None else tuple(map(combine, prev, tfs))
+        return merged, None
+
+    def _impact_list(self, docs: Dict[Hashable, Tuple[int, ...]], averages: List[float],
+                     norms: Dict[Hashable, List[float]]) -> _ImpactList:
+        """norms: 이번 질의에서 계산한 문서별 필드 정규화 계수 (질의 term끼리 공유)"""
+        pairs = []
+        for doc_id, tfs in docs.items():
+            doc_norms = norms.get(doc_id)
+            if doc_norms is None:
+                doc_norms = norms[doc_id] = self._norms(self._lengths[doc_id], averages)
+            pairs.append((sum(map(operator.mul, tfs, doc_norms)), doc_id))
+        return _ImpactList(averages, pairs)
+
+    def _schedule(self, terms: List[str]):
+        """긴 포스팅의 임팩트 목록을 백그라운드에서 만들도록 예약 (lock 안에서 호출)"""
+        self._pending.update(terms)
+        if self._builder is None:
+            self._builder = threading.Thread(target=self._build_pending, name="text-index-impacts", daemon=True)
+            self._builder.start()
+
+    def _build_pending(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._builder = None
+                    return
+                term = self._pending.pop()
+                docs = self._postings.get(term)
+                if docs is None:
+                    continue
+                n = len(self._lengths)
+                averages = [max(total / n, 1.0) for total in self._totals]
+                cached = self._impacts.get(term)
+                if cached is not None and cached.drift(averages) <= IMPACT_MAX_DRIFT:
+                    continue
+                rows = [(doc_id, tfs, self._lengths[doc_id]) for doc_id, tfs in docs.items()]
+                version = self._version
+            # Score outside the lock; drop the result if the index changed meanwhile (the next query reschedules)
+            impacts = _ImpactList(averages, [(self._impact(tfs, lengths, averages), doc_id)
+                                             for doc_id, tfs, lengths in rows])
+            with self._lock:
+                if self._version == version:
+                    self._impacts[term] = impacts
+
+    def wait_for_impacts(self, timeout: Optional[float] = None):
+        """백그라운드 임팩트 목록 생성이 끝날 때까지 (테스트 / 벤치마크용)"""
+        builder = self._builder
+        if builder is not None:
+            builder.join(timeout)
+
+    def count(self, query: str, allowed: Optional[Set[Hashable]] = None, match: str = "all") -> int:
+        """search와 같은 조건으로 매칭되는 문서 수 (점수 계산 없음, 페이지 total용)"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return 0
+        with self._lock:
+            postings = []
+            for token in terms:
+                expanded = self._expand(token)
+                postings.append(set().union(*(self._postings[term] for term in expanded)) if expanded else set())
+            if match == "all":
+                candidates = set(allowed) if allowed is not None else postings.pop(0)
+                for docs in postings:
+                    candidates &= docs
+                return len(candidates)
+            candidates = set().union(*postings)
+            return len(candidates & allowed if allowed is not None else candidates)
+
+    def search(self, query: str, limit: Optional[int] = None,
+               allowed: Optional[Set[Hashable]] = None, match: str = "all") -> List[Tuple[Hashable, float]]:
+        """
+        BM25F 점수 내림차순 (doc_id, score).
+        match="all": 질의 토큰을 모두 포함하는 문서만, match="any": 하나라도 포함하는 문서 (긴 자연어 질의용)
+        limit: 상위 limit개만 — k번째 점수에 못 미칠 문서는 끝까지 계산하지 않음
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or (limit is not None and limit <= 0):
+            return []
+        with self._lock:
+            n = len(self._lengths)
+            if not n:
+                return []
+            averages = [max(total / n, 1.0) for total in self._totals]
+            found = [self._lookup(term) for term in terms]
+            if match == "all":
+                if not all(found):
+                    return []
+            else:
+                found = [hit for hit in found if hit]
+                if not found:
+                    return []
+
+            # Impact lists: short ones are built inline, long ones by the background builder (this query
+            # walks the plain postings meanwhile). AND walks only the shortest list, so a merged non-lead
+            # term just takes the loose bound
+            lead = min(range(len(found)), key=lambda i: len(found[i][0])) if match == "all" else None
+            norms: Dict[Hashable, List[float]] = {}
+            impacts: List[Optional[_ImpactList]] = [None] * len(found)
+            missing = []
+            for i, (docs, key) in enumerate(found if limit is not None else []):
+                cached = self._impacts.get(key) if key is not None else None
+                if cached is not None and cached.drift(averages) <= IMPACT_MAX_DRIFT:
+                    impacts[i] = cached
+                elif key is None and lead is not None and i != lead:
+                    continue
+                elif len(docs) <= IMPACT_SYNC_MAX:
+                    impacts[i] = self._impact_list(docs, averages, norms)
+                    if key is not None:
+                        self._impacts[key] = impacts[i]
+                elif key is not None:
+                    missing.append(key)
+            if missing:
+                self._schedule(missing)
+
+            # (upper bound, idf, drift, postings, impacts, is lead), highest bound first
+            plan = []
+            for i, (docs, _) in enumerate(found):
+                idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                ordered = impacts[i]
+                drift = ordered.drift(averages) if ordered else 1.0
+                bound = _saturate(idf, -ordered.keys[0] * drift) if ordered else idf * (K1 + 1)
+                plan.append((bound, idf, drift, docs, ordered, i == lead))
+            plan.sort(key=lambda term: term[0], reverse=True)
+            rest = [0.0] * (len(plan) + 1)  # rest[i]: combined upper bound of terms i..
+            for i in range(len(plan) - 1, -1, -1):
+                rest[i] = rest[i + 1] + plan[i][0]
+
+            top: List[Tuple[float, int, Hashable]] = []  # min-heap (score, -seq, doc_id) when limited
+            seen: Set[Hashable] = set()
+            floor = -math.inf  # k-th best score so far
+
+            def consider(doc_id: Hashable, start: int):
+                nonlocal floor
+                doc_norms = norms.get(doc_id) or self._norms(self._lengths[doc_id], averages)
+                score = 0.0
+                for i in range(start, len(plan)):
+                    tfs = plan[i][3].get(doc_id)
+                    if tfs is not None:
+                        score += _saturate(plan[i][1], sum(map(operator.mul, tfs, doc_norms)))
+                    if score + rest[i + 1] < floor:
+                        return
+                entry = (score, -len(seen), doc_id)
+                if limit is None:
+                    top.append(entry)
+                    return
+                if len(top) < limit:
+                    heapq.heappush(top, entry)
+                else:
+                    heapq.heappushpop(top, entry)
+                if len(top) == limit:
+                    floor = top[0][0]
+
+            def walk(docs, ordered):
+                """(정규화 tf 또는 None, doc_id): 임팩트 목록이 있으면 그 순서로, 없으면 포스팅 순서로"""
+                if ordered is None:
+                    return ((None, doc_id) for doc_id in docs)
+                return ((-key, doc_id) for key, doc_id in zip(ordered.keys, ordered.ids))
+
+            if match == "all":
+                # Walk the shortest list; the other terms only need membership checks
+                bound, idf, drift, docs, ordered, _ = next(term for term in plan if term[5])
+                others = rest[0] - bound
+                postings = [term[3] for term in plan]
+                for impact, doc_id in walk(docs, ordered):
+                    if impact is not None and _saturate(idf, impact * drift) + others < floor:
+                        break
+                    if (allowed is None or doc_id in allowed) and all(doc_id in d for d in postings):
+                        seen.add(doc_id)
+                        consider(doc_id, 0)
+            else:
+                for i, (_, idf, drift, docs, ordered, _) in enumerate(plan):
+                    # A document first seen at term i holds none of the earlier terms
+                    for impact, doc_id in walk(docs, ordered):
+                        if impact is not None and _saturate(idf, impact * drift) + rest[i + 1] < floor:
+                            break
+                        if doc_id in seen or (allowed is not None and doc_id not in allowed):
+                            continue
+                        seen.add(doc_id)
+                        consider(doc_id, i)
+
+        top.sort(key=lambda entry: (-entry[0], -entry[1]))
+        return [(doc_id, score) for score, _, doc_id in top]
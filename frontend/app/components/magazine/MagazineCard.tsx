@@ -24,6 +24,7 @@ interface Article {
     result_summary?: string;
     duration?: string;
     cover_image?: string; // Potential specific image
+    cover_image_small?: string; // 400px WebP variant for list cards (when covers are cached)
 }
 
 interface MagazineCardProps {
@@ -73,9 +74,9 @@ export default function MagazineCard({ article, index }: MagazineCardProps) {
 
                     {/* Thumbnail Area */}
                     <div className={`h-48 w-full relative overflow-hidden ${gradientClass} flex items-center justify-center`}>
-                        {article.cover_image && !imgError ? (
+                        {(article.cover_image_small || article.cover_image) && !imgError ? (
                             <Image
-                                src={article.cover_image}
+                                src={(article.cover_image_small || article.cover_image)!}
                                 alt={title}
                                 fill
                                 sizes="(max-width: 768px) 100vw, (max-width: 1024px) 50vw, 33vw"
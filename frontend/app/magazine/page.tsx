@@ -2,7 +2,7 @@
 
 import { API_BASE } from "@/lib/api";
 
-import { useEffect, useState, useMemo } from "react";
+import { useCallback, useEffect, useRef, useState } from "react";
 import { motion } from "framer-motion";
 import { Search } from "lucide-react";
 import MagazineCard from "../components/magazine/MagazineCard";
@@ -25,46 +25,85 @@ interface Article {
     result_summary?: string;
     duration?: string;
     cover_image?: string;
+    cover_image_small?: string;
 }
 
 export default function MagazinePage() {
     const [articles, setArticles] = useState<Article[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [total, setTotal] = useState(0);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState(false);
     const [activeTab, setActiveTab] = useState("전체");
     const [searchQuery, setSearchQuery] = useState("");
+    const [debouncedQuery, setDebouncedQuery] = useState("");
+    const sentinelRef = useRef<HTMLDivElement>(null);
 
     const categories = ["전체", "승소사례", "법률칼럼", "성범죄", "이혼", "부동산", "손해배상"];
+    const PAGE_SIZE = 12;
 
     useEffect(() => {
-        fetch(`${API_BASE}/api/magazine`)
-            .then(res => res.json())
+        const timer = setTimeout(() => setDebouncedQuery(searchQuery.trim()), 250);
+        return () => clearTimeout(timer);
+    }, [searchQuery]);
+
+    // The listing is paginated server side: cards only (no content), category / tag filters, date+id cursor.
+    // A search query switches to full-text search ranked by relevance.
+    const fetchPage = useCallback((tab: string, query: string, cursor: string | null) => {
+        const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+        if (tab === "승소사례" || tab === "법률칼럼") params.set("category", tab);
+        else if (tab !== "전체") params.set("tag", tab);
+        if (query) params.set("q", query);
+        if (cursor) params.set("cursor", cursor);
+        return fetch(`${API_BASE}/api/magazine?${params}`).then(res => {
+            if (!res.ok) throw new Error(`HTTP ${res.status}`);
+            return res.json();
+        });
+    }, []);
+
+    useEffect(() => {
+        let cancelled = false;
+        setLoading(true);
+        setError(false);
+        fetchPage(activeTab, debouncedQuery, null)
             .then(data => {
-                setArticles(data);
+                if (cancelled) return;
+                setArticles(data.items);
+                setNextCursor(data.next_cursor);
+                setTotal(data.total);
             })
             .catch(err => {
                 console.error(err);
-                setError(true);
+                if (!cancelled) setError(true);
             })
-            .finally(() => setLoading(false));
-    }, []);
-
-    const filteredArticles = useMemo(() => {
-        return articles.filter(article => {
-            const matchesTab = activeTab === "전체"
-                || (activeTab === "승소사례" && article.type === 'case')
-                || (activeTab === "법률칼럼" && article.type === 'column')
-                || article.tags?.includes(activeTab)
-                || article.category_label === activeTab;
-
-            const matchesSearch = !searchQuery
-                || article.title.toLowerCase().includes(searchQuery.toLowerCase())
-                || article.emotional_title?.toLowerCase().includes(searchQuery.toLowerCase())
-                || article.lawyer_name.includes(searchQuery);
+            .finally(() => { if (!cancelled) setLoading(false); });
+        return () => { cancelled = true; };
+    }, [activeTab, debouncedQuery, fetchPage]);
+
+    const loadMore = useCallback(() => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        fetchPage(activeTab, debouncedQuery, nextCursor)
+            .then(data => {
+                setArticles(prev => [...prev, ...data.items]);
+                setNextCursor(data.next_cursor);
+                setTotal(data.total);
+            })
+            .catch(err => console.error(err))
+            .finally(() => setLoadingMore(false));
+    }, [activeTab, debouncedQuery, nextCursor, loadingMore, fetchPage]);
 
-            return matchesTab && matchesSearch;
-        });
-    }, [articles, activeTab, searchQuery]);
+    // Fetch the next page when the end of the grid scrolls into view
+    useEffect(() => {
+        const node = sentinelRef.current;
+        if (!node || !nextCursor) return;
+        const observer = new IntersectionObserver(entries => {
+            if (entries[0].isIntersecting) loadMore();
+        }, { rootMargin: "400px" });
+        observer.observe(node);
+        return () => observer.disconnect();
+    }, [nextCursor, loadMore]);
 
     return (
         <main className="min-h-screen bg-background font-sans">
@@ -144,17 +183,17 @@ export default function MagazinePage() {
                     <>
                         <div className="flex justify-between items-end mb-8 px-2 max-w-7xl mx-auto w-full">
                             <div className="text-sm font-semibold text-gray-400 tracking-wide uppercase">
-                                Total {filteredArticles.length} Stories
+                                Total {total} Stories
                             </div>
                         </div>
 
-                        {filteredArticles.length > 0 ? (
+                        {articles.length > 0 ? (
                             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-x-8 gap-y-12">
-                                {filteredArticles.map((article, idx) => (
+                                {articles.map((article, idx) => (
                                     <MagazineCard key={article.id} article={article} index={idx} />
                                 ))}
                             </div>
-                        ) : (
+                        ) : nextCursor ? null : (
                             <div className="text-center py-32">
                                 <p className="text-xl text-gray-400 font-light">검색 결과가 없습니다.</p>
                                 <button
@@ -165,6 +204,18 @@ export default function MagazinePage() {
                                 </button>
                             </div>
                         )}
+
+                        {nextCursor && (
+                            <div ref={sentinelRef} className="flex justify-center pt-16">
+                                <button
+                                    onClick={loadMore}
+                                    disabled={loadingMore}
+                                    className="px-6 py-3 rounded-full bg-white text-zinc-500 shadow-sm border border-point/10 hover:text-main hover:shadow-md transition-all duration-300 disabled:opacity-50"
+                                >
+                                    {loadingMore ? "불러오는 중..." : "더 보기"}
+                                </button>
+                            </div>
+                        )}
                     </>
                 )}
             </section>